@@ -2,20 +2,54 @@
 AiCalc Python SDK
 
 This SDK provides a Python interface to interact with AiCalc spreadsheet application.
+
+Only the decorator and value types are imported with the package, so function
+files that just need ``aicalc_function`` load in a few milliseconds. Clients
+are imported on first access (PEP 562), together with their transports.
 """
 
 __version__ = "0.1.0"
 __author__ = "AiCalc Team"
 
-from .client import connect, AiCalcClient
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
 from .decorators import aicalc_function
 from .types import CellValue, CellType, AutomationMode
 
+if TYPE_CHECKING:
+    from .client import connect, AiCalcClient
+    from .aio import AsyncAiCalcClient
+    from .pool import AiCalcClientPool
+
+# Public name -> submodule that defines it, imported on first access
+_LAZY_ATTRIBUTES = {
+    'connect': '.client',
+    'AiCalcClient': '.client',
+    'AsyncAiCalcClient': '.aio',
+    'AiCalcClientPool': '.pool',
+}
+
 __all__ = [
     'connect',
     'AiCalcClient',
+    'AsyncAiCalcClient',
+    'AiCalcClientPool',
     'aicalc_function',
     'CellValue',
     'CellType',
     'AutomationMode',
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
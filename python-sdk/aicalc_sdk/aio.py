@@ -0,0 +1,326 @@
+"""asyncio client for interacting with AiCalc"""
+
+import asyncio
+import collections
+import inspect
+import itertools
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Union
+
+from .client import DEFAULT_PAGE_SIZE, _as_rows, _range_pages
+from .serialization import JSON, Codec, get_codec, hello_command
+from .transports import (COMPRESSION_THRESHOLD, FRAME_HEADER, decompress, encode_frame, open_stream,
+                         split_header)
+from .types import CellChange
+
+# Plain functions or coroutine functions; see AsyncAiCalcClient.watch
+AsyncChangeCallback = Callable[[List[CellChange]], Union[Any, Awaitable[Any]]]
+
+# Newline-delimited responses for a whole range or batch can be large; readuntil() fails past this
+_STREAM_LIMIT = 64 * 1024 * 1024
+
+
+class AsyncAiCalcClient:
+    """asyncio client for AiCalc using the same commands as AiCalcClient.
+
+    Many calls can be awaited concurrently (e.g. with asyncio.gather) over a
+    single connection. The bridge answers requests on a connection in the
+    order they were sent, so responses are matched to callers in FIFO order.
+    A call that times out or is cancelled keeps its place in the queue and
+    its response is discarded when it arrives. Changes pushed for watch()
+    subscriptions are told apart from responses and handed to callbacks.
+
+    Example:
+        async with AsyncAiCalcClient() as client:
+            a1, b1 = await asyncio.gather(client.get_value("A1"), client.get_value("B1"))
+    """
+
+    def __init__(self, pipe_name: str = "AiCalc_Bridge", timeout: Optional[float] = 30.0,
+                 address: Optional[str] = None, codecs: Optional[Sequence[str]] = None,
+                 compression: bool = True):
+        self.pipe_name = f"\\\\.\\pipe\\{pipe_name}"
+        self.address = address or pipe_name
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._read_task: Optional[asyncio.Task] = None
+        self._waiters: Deque[asyncio.Future] = collections.deque()
+        self._subscriptions: Dict[int, AsyncChangeCallback] = {}
+        self._subscription_ids = itertools.count(1)
+        self._callback_tasks: Set[asyncio.Task] = set()
+        self._hello = hello_command(codecs, compression)
+        self._framed = False
+        self._codec: Codec = JSON
+        self._compress_threshold: Optional[int] = None
+        self._connected = False
+
+    async def connect(self, timeout: Optional[float] = 5.0) -> bool:
+        """Connect to AiCalc application."""
+        try:
+            await asyncio.wait_for(self._open_connection(), timeout)
+            await asyncio.wait_for(self._negotiate_framing(), timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+            raise ConnectionError(f"Failed to connect to AiCalc: {e}\nMake sure AiCalc is running and the Python bridge service has started.")
+
+        self._read_task = asyncio.get_running_loop().create_task(self._read_loop())
+
+        # Test connection with ping
+        response = await self._send_command({"command": "ping"}, timeout)
+        if response.get("success") and response.get("data") == "pong":
+            self._connected = True
+            return True
+        return False
+
+    async def _open_connection(self) -> None:
+        self._reader, self._writer = await open_stream(self.address, _STREAM_LIMIT)
+        self._framed = False
+
+    async def _negotiate_framing(self) -> None:
+        """Ask for length-prefixed framing, a codec and compression before the read loop starts."""
+        self._writer.write((json.dumps(self._hello) + "\n").encode('utf-8'))
+        await self._writer.drain()
+        response = json.loads(await self._reader.readuntil(b"\n"))
+        # Older bridges answer "Unknown command" and keep newline framing
+        agreed = (response.get("data") or {}) if response.get("success") else {}
+        self._framed = agreed.get("framing") == "length"
+        self._codec = get_codec(agreed.get("codec") or "json") if self._framed else JSON
+        self._compress_threshold = COMPRESSION_THRESHOLD if self._framed and agreed.get("compression") == "zlib" else None
+
+    async def _read_message(self) -> Any:
+        if not self._framed:
+            return JSON.decode(await self._reader.readuntil(b"\n"))
+        (header,) = FRAME_HEADER.unpack(await self._reader.readexactly(FRAME_HEADER.size))
+        length, compressed = split_header(header)
+        body = await self._reader.readexactly(length)
+        return self._codec.decode(decompress(body) if compressed else body)
+
+    async def disconnect(self) -> None:
+        """Disconnect from AiCalc application"""
+        self._connected = False
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+            self._writer = None
+        if self._read_task is not None:
+            self._read_task.cancel()
+            try:
+                await self._read_task
+            except asyncio.CancelledError:
+                pass
+            self._read_task = None
+        self._subscriptions.clear()
+        self._fail_waiters(ConnectionError("Disconnected from AiCalc"))
+
+    def is_connected(self) -> bool:
+        """Check if connected to AiCalc"""
+        return self._connected
+
+    async def ping(self) -> bool:
+        """Check the connection with a round trip; False if AiCalc didn't answer."""
+        try:
+            response = await self._send_command({"command": "ping"})
+        except (ConnectionError, OSError, ValueError, asyncio.TimeoutError):
+            return False
+        return bool(response.get("success")) and response.get("data") == "pong"
+
+    async def _read_loop(self) -> None:
+        """Hand each response to the oldest waiting caller."""
+        error: Exception = ConnectionError("Connection closed by AiCalc")
+        try:
+            while True:
+                response = await self._read_message()
+                if "event" in response:
+                    self._dispatch_event(response)
+                elif self._waiters:
+                    waiter = self._waiters.popleft()
+                    if not waiter.done():
+                        waiter.set_result(response)
+        except asyncio.IncompleteReadError:
+            pass
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = e
+        self._connected = False
+        self._fail_waiters(error)
+
+    def _dispatch_event(self, event: Dict[str, Any]) -> None:
+        callback = self._subscriptions.get(event.get("subscription_id"))
+        if callback is None or event.get("event") != "cells_changed":
+            return
+
+        loop = asyncio.get_running_loop()
+        try:
+            result = callback([CellChange.from_dict(change) for change in event.get("changes", [])])
+        except Exception as e:
+            loop.call_exception_handler({"message": "watch callback failed", "exception": e})
+            return
+
+        if inspect.isawaitable(result):
+            task = asyncio.ensure_future(result)
+            self._callback_tasks.add(task)
+            task.add_done_callback(self._callback_done)
+
+    def _callback_done(self, task: asyncio.Task) -> None:
+        self._callback_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            task.get_loop().call_exception_handler({
+                "message": "watch callback failed",
+                "exception": task.exception(),
+                "task": task,
+            })
+
+    def _fail_waiters(self, error: Exception) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(error)
+
+    async def _send_command(self, command: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Send command to AiCalc and await its response."""
+        if self._writer is None:
+            raise ConnectionError("Not connected to AiCalc")
+
+        waiter = asyncio.get_running_loop().create_future()
+        # Enqueue and write without awaiting in between so queue order matches wire order
+        self._waiters.append(waiter)
+        if self._framed:
+            self._writer.write(encode_frame(self._codec.encode(command), self._compress_threshold))
+        else:
+            self._writer.write(json.dumps(command).encode('utf-8') + b"\n")
+        await self._writer.drain()
+
+        return await asyncio.wait_for(waiter, timeout if timeout is not None else self.timeout)
+
+    async def _execute(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        if not self._connected:
+            raise ConnectionError("Not connected to AiCalc")
+
+        response = await self._send_command(command)
+        if not response.get("success"):
+            raise ValueError(response.get("error", "Unknown error"))
+        return response.get("data") or {}
+
+    async def get_value(self, cell_ref: str) -> Any:
+        """Get value from a cell (e.g. 'A1', 'Sheet1!B2')."""
+        data = await self._execute({"command": "get_value", "cellRef": cell_ref})
+        return data.get("value")
+
+    async def set_value(self, cell_ref: str, value: Any) -> bool:
+        """Set value of a cell."""
+        await self._execute({"command": "set_value", "cellRef": cell_ref, "value": value})
+        return True
+
+    async def set_range(self, start_ref: str, rows: Iterable[Iterable[Any]]) -> int:
+        """Write a block of values starting at start_ref; returns cells written."""
+        data = await self._execute({"command": "set_range", "rangeRef": start_ref, "values": _as_rows(rows)})
+        return data.get("cells_written", 0)
+
+    async def set_values(self, values: Mapping[str, Any]) -> int:
+        """Write {cell_ref: value} pairs in one message; returns cells written."""
+        data = await self._execute({"command": "set_values", "values": dict(values)})
+        return data.get("cells_written", 0)
+
+    async def get_range(self, range_ref: str) -> List[List[Any]]:
+        """Get values from a range of cells as a 2D list."""
+        data = await self._execute({"command": "get_range", "rangeRef": range_ref})
+        return data.get("values", [])
+
+    async def iter_rows(self, range_ref: str, page_size: int = DEFAULT_PAGE_SIZE) -> AsyncIterator[List[Any]]:
+        """Yield the rows of a range page by page (see AiCalcClient.iter_rows).
+
+        The next page is requested while the caller processes the current
+        one. Closing the iterator early cancels that request.
+
+        Example:
+            async for row in client.iter_rows("Sheet1!A:Z", page_size=10000):
+                ...
+        """
+        pages = _range_pages(range_ref, page_size)
+        loop = asyncio.get_running_loop()
+        pending: Optional[asyncio.Task] = loop.create_task(self.get_range(next(pages)))
+        try:
+            while pending is not None:
+                rows = await pending
+                # A short page means the sheet (or range) ended
+                page_ref = next(pages, None) if len(rows) == page_size else None
+                pending = loop.create_task(self.get_range(page_ref)) if page_ref else None
+                for row in rows:
+                    yield row
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def run_function(self, function_name: str, *args) -> Any:
+        """Execute an AiCalc function."""
+        data = await self._execute({
+            "command": "run_function",
+            "functionName": function_name,
+            "args": list(args)
+        })
+        return data.get("result")
+
+    async def get_sheets(self) -> List[Dict[str, Any]]:
+        """Get list of sheets in the workbook."""
+        data = await self._execute({"command": "get_sheets"})
+        return data.get("sheets", [])
+
+    async def watch(self, range_ref: str, callback: AsyncChangeCallback) -> int:
+        """Call back whenever cells in a range change (see AiCalcClient.watch).
+
+        Plain callbacks run on the event loop as changes arrive and should
+        not block. Coroutine functions are scheduled as tasks, so they may
+        await this client.
+
+        Returns:
+            Subscription id to pass to unwatch()
+        """
+        # The id is chosen here so changes pushed before the response can be routed
+        subscription_id = next(self._subscription_ids)
+        self._subscriptions[subscription_id] = callback
+        try:
+            await self._execute({"command": "watch", "rangeRef": range_ref, "subscriptionId": subscription_id})
+        except BaseException:
+            self._subscriptions.pop(subscription_id, None)
+            raise
+        return subscription_id
+
+    async def unwatch(self, subscription_id: int) -> bool:
+        """Stop a watch() subscription; returns True if it existed."""
+        self._subscriptions.pop(subscription_id, None)
+        data = await self._execute({"command": "unwatch", "subscriptionId": subscription_id})
+        return bool(data.get("removed"))
+
+    async def execute_many(self, commands: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Execute several commands in one round trip (see AiCalcClient.execute_many)."""
+        if not commands:
+            return []
+        data = await self._execute({"command": "batch", "commands": list(commands)})
+        return data.get("results", [])
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.disconnect()
+
+
+async def connect(pipe_name: str = "AiCalc_Bridge", timeout: Optional[float] = 30.0,
+                  address: Optional[str] = None) -> AsyncAiCalcClient:
+    """Connect to AiCalc application.
+
+    Args:
+        pipe_name: Name of the named pipe (default: AiCalc_Bridge)
+        timeout: Default per-call timeout in seconds (None waits forever)
+        address: Transport address overriding pipe_name, e.g. "tcp:127.0.0.1:8765"
+
+    Returns:
+        Connected AsyncAiCalcClient instance
+    """
+    client = AsyncAiCalcClient(pipe_name, timeout, address)
+    await client.connect()
+    return client
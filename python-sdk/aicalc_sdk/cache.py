@@ -0,0 +1,238 @@
+"""Result caches for @aicalc_function(cache=...)
+
+Results are keyed by a SHA-256 hash of the arguments in a canonical JSON
+form, so equal arguments map to the same entry in every process. Only
+arguments of known types have such a form (JSON values, tuples, and a few
+value types such as Decimal, datetime and UUID); calls passing anything
+else are not cached. Two stores are available:
+
+    MemoryCache   in-process LRU; lives as long as the function worker
+    DiskCache     SQLite file that survives restarts, shared by processes
+
+Both evict the least recently used entry once ``max_entries`` is reached and
+treat entries older than ``ttl`` seconds as missing. Both hand out a fresh
+copy of list and dict results, so a caller mutating one can't change what
+later hits return.
+"""
+
+import collections
+import copy
+import datetime
+import decimal
+import enum
+import fractions
+import hashlib
+import inspect
+import json
+import os
+import pathlib
+import pickle
+import threading
+import time
+import uuid
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple, Optional, Tuple
+
+if TYPE_CHECKING:
+    import sqlite3
+
+# Returned by get() when there is no usable entry, since None is a valid result
+MISSING = object()
+
+# Value types whose repr() identifies the value exactly and is the same in every process
+_REPR_TYPES = (complex, decimal.Decimal, fractions.Fraction, datetime.date, datetime.time,
+               datetime.timedelta, datetime.timezone, uuid.UUID, pathlib.PurePath)
+
+# Shared so make_key doesn't build a new encoder on every call
+_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"), allow_nan=True)
+
+
+class CacheInfo(NamedTuple):
+    """Counters reported by a cached function's cache_info()"""
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+def default_cache_dir() -> str:
+    """Directory for disk caches: $AICALC_CACHE_DIR or ~/.aicalc/cache."""
+    return os.environ.get("AICALC_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".aicalc", "cache")
+
+
+def _canonical(value: Any) -> Any:
+    """JSON-ready form of an argument; raises TypeError if it has no stable form.
+
+    Containers are tagged ({"l": [...]}, {"t": [...]}, {"d": {...}}) so a list,
+    a tuple and a dict that happen to look alike in JSON get different keys.
+    """
+    kind = type(value)
+    if value is None or kind in (bool, int, float, str):
+        return value
+    if kind is list:
+        return {"l": [_canonical(item) for item in value]}
+    if kind is tuple:
+        return {"t": [_canonical(item) for item in value]}
+    if kind is dict:
+        # JSON would turn 1 and "1" into the same key
+        if not all(type(key) is str for key in value):
+            raise TypeError("dict arguments with non-string keys can't be cached")
+        return {"d": {key: _canonical(item) for key, item in value.items()}}
+    if kind is bytes:
+        return {"b": value.hex()}
+    if isinstance(value, enum.Enum):
+        return {"e": [kind.__module__, kind.__qualname__, value.name]}
+    if isinstance(value, _REPR_TYPES):
+        return {"r": [kind.__module__, kind.__qualname__, repr(value)]}
+    if kind.__module__ == "numpy" and hasattr(value, "tolist"):
+        # Arrays and scalars; the dtype is part of the key since it can change results
+        return {"n": [str(value.dtype), _canonical(value.tolist())]}
+    raise TypeError(f"{kind.__name__} arguments can't be cached")
+
+
+def make_key(namespace: str, args: Tuple[Any, ...], kwargs: Optional[dict] = None) -> Optional[str]:
+    """Stable hash of a call, or None if an argument can't be keyed."""
+    try:
+        payload = _ENCODER.encode([namespace, _canonical(args), _canonical(kwargs or {})])
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def function_namespace(func: Callable) -> str:
+    """Identify a function and its code, so editing it invalidates disk entries."""
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        code = getattr(func, "__code__", None)
+        source = code.co_code.hex() if code is not None else ""
+    digest = hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+    return f"{func.__module__}.{func.__qualname__}:{digest}"
+
+
+def _copy(value: Any) -> Any:
+    """Deep copy of a list or dict result; other values are returned as is."""
+    if isinstance(value, (list, dict)):
+        return copy.deepcopy(value)
+    return value
+
+
+class MemoryCache:
+    """Thread-safe in-process LRU cache."""
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "collections.OrderedDict[str, Tuple[float, Any]]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            if self.ttl is not None and time.time() - entry[0] > self.ttl:
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+        return _copy(entry[1])
+
+    def set(self, key: str, value: Any) -> None:
+        value = _copy(value)
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCache:
+    """LRU cache in a SQLite file, shared by every function using the same path.
+
+    Values are pickled. Entries are scoped by namespace (see
+    function_namespace), so functions never see each other's results.
+    """
+
+    def __init__(self, namespace: str, path: Optional[str] = None,
+                 max_entries: int = 1024, ttl: Optional[float] = None):
+        self.namespace = namespace
+        self.path = path or os.path.join(default_cache_dir(), "functions.sqlite")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._connection: Optional["sqlite3.Connection"] = None
+
+    def _connect(self) -> "sqlite3.Connection":
+        # Opened on first use so decorating a function doesn't touch the disk
+        if self._connection is None:
+            import sqlite3
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))")
+            connection.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (namespace, accessed)")
+            self._connection = connection
+        return self._connection
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT value, created FROM entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key)).fetchone()
+            if row is None:
+                return MISSING
+            now = time.time()
+            if self.ttl is not None and now - row[1] > self.ttl:
+                connection.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+                return MISSING
+            connection.execute("UPDATE entries SET accessed = ? WHERE namespace = ? AND key = ?",
+                               (now, self.namespace, key))
+        return pickle.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return  # Unpicklable results are simply not persisted
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    "INSERT OR REPLACE INTO entries (namespace, key, value, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                    (self.namespace, key, blob, now, now))
+                connection.execute(
+                    "DELETE FROM entries WHERE namespace = ? AND key IN ("
+                    " SELECT key FROM entries WHERE namespace = ? ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.namespace, self.namespace, self.max_entries))
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM entries WHERE namespace = ?", (self.namespace,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connect().execute(
+                "SELECT COUNT(*) FROM entries WHERE namespace = ?", (self.namespace,)).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
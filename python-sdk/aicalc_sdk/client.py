@@ -1,72 +1,245 @@
 """Main client for interacting with AiCalc"""
 
+import itertools
 import json
-import win32pipe
-import win32file
-import pywintypes
-from typing import Optional, List, Any, Dict
-from .types import CellValue, CellType
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Any, Dict, Callable, Iterable, Iterator, Mapping, Sequence, Tuple
+from .serialization import JSON, Codec, get_codec, hello_command
+from .transports import COMPRESSION_THRESHOLD, MessageReader, Transport, encode_frame, open_transport
+from .types import CellValue, CellType, CellChange
+
+logger = logging.getLogger(__name__)
+
+# Receives the cells of one watch() subscription that changed within a frame
+ChangeCallback = Callable[[List[CellChange]], Any]
+
+
+def _as_rows(rows: Iterable[Iterable[Any]]) -> List[List[Any]]:
+    """Rows as JSON-ready lists; NumPy arrays and DataFrame.values work too."""
+    return [row.tolist() if hasattr(row, "tolist") else list(row) for row in rows]
+
+
+# Rows per get_range request in iter_rows()
+DEFAULT_PAGE_SIZE = 5000
+
+# Last column AiCalc can address ("XFD"); ranges are clipped to the sheet anyway
+_LAST_COLUMN = "XFD"
+
+
+def _split_cell(cell: str) -> Tuple[str, Optional[int]]:
+    """"$B$12" -> ("B", 12); whole rows give no letters, whole columns no row."""
+    cell = cell.replace("$", "").strip()
+    letters = cell.rstrip("0123456789")
+    digits = cell[len(letters):]
+    if letters and not (letters.isalpha() and letters.isascii()):
+        raise ValueError(f"Invalid cell reference: {cell}")
+    return letters.upper(), int(digits) if digits else None
+
+
+def _range_pages(range_ref: str, page_size: int) -> Iterator[str]:
+    """Split a range into references of at most page_size rows each.
+
+    Whole columns ("Sheet1!A:Z") and whole rows ("3:9") are accepted. The
+    bridge doesn't parse those, so every page names concrete cells. Pages
+    of an open-ended range go on until the caller stops asking.
+    """
+    if page_size < 1:
+        raise ValueError(f"page_size must be at least 1, got {page_size!r}")
+    sheet, sep, cells = range_ref.rpartition("!")
+    start, _, end = cells.partition(":")
+    try:
+        first_letters, first_row = _split_cell(start)
+        last_letters, last_row = _split_cell(end or start)
+    except ValueError:
+        raise ValueError(f"Invalid range: {range_ref}") from None
+    if (not first_letters) != (not last_letters) or (first_row is None) != (last_row is None) \
+            or not (first_letters or first_row) or first_row == 0 or last_row == 0:
+        raise ValueError(f"Invalid range: {range_ref}")
+
+    first_column, last_column = sorted((first_letters or "A", last_letters or _LAST_COLUMN),
+                                       key=lambda letters: (len(letters), letters))
+    if first_row is None:
+        first_row = 1
+    elif first_row > last_row:
+        first_row, last_row = last_row, first_row
+
+    prefix = sheet + sep
+    row = first_row
+    while last_row is None or row <= last_row:
+        page_end = row + page_size - 1 if last_row is None else min(row + page_size - 1, last_row)
+        yield f"{prefix}{first_column}{row}:{last_column}{page_end}"
+        row = page_end + 1
+
 
 class AiCalcClient:
-    """Client for interacting with AiCalc application via Named Pipes."""
+    """Client for interacting with AiCalc application.
+    
+    Connects over a Windows named pipe by default. Pass ``address`` to use
+    another transport, e.g. "unix:/tmp/aicalc.sock" or "tcp:127.0.0.1:8765"
+    (see aicalc_sdk.transports), or ``transport`` to supply an open one.
+    
+    On connect the client asks the bridge for length-prefixed framing, a
+    codec and compression (see aicalc_sdk.serialization), and falls back to
+    newline-delimited JSON if the bridge predates it. ``codecs`` limits the
+    codecs offered, e.g. ["json"]; ``compression=False`` turns compression
+    off.
+    
+    Commands are sent one at a time; the client can be shared between
+    threads. Once watch() is used, a background thread reads the connection
+    and another runs the callbacks.
+    """
     
-    def __init__(self, pipe_name: str = "AiCalc_Bridge"):
+    def __init__(self, pipe_name: str = "AiCalc_Bridge", address: Optional[str] = None,
+                 transport: Optional[Transport] = None, codecs: Optional[Sequence[str]] = None,
+                 compression: bool = True):
         self.pipe_name = f"\\\\.\\pipe\\{pipe_name}"
-        self._pipe_handle = None
+        self.address = address or pipe_name
+        self._transport = transport
+        self._reader: Optional[MessageReader] = None
+        self._hello = hello_command(codecs, compression)
+        self._framed = False
+        self._codec: Codec = JSON
+        self._compress_threshold: Optional[int] = None
         self._connected = False
+        self._lock = threading.Lock()
+        self._subscriptions: Dict[int, ChangeCallback] = {}
+        self._subscription_ids = itertools.count(1)
+        self._listener: Optional[threading.Thread] = None
+        self._responses: "queue.Queue[Any]" = queue.Queue()
+        self._events: "queue.Queue[Any]" = queue.Queue()
         
     def connect(self, timeout: int = 5000) -> bool:
         """Connect to AiCalc application."""
         try:
-            self._pipe_handle = win32file.CreateFile(
-                self.pipe_name,
-                win32file.GENERIC_READ | win32file.GENERIC_WRITE,
-                0,
-                None,
-                win32file.OPEN_EXISTING,
-                0,
-                None
-            )
-            
-            # Server already set pipe to byte mode, don't change it
+            if self._transport is None:
+                self._transport = open_transport(self.address, timeout / 1000 if timeout else None)
+            self._reader = MessageReader(self._transport)
+            self._framed = False
             
             # Test connection with ping
             response = self._send_command({"command": "ping"})
             if response.get("success") and response.get("data") == "pong":
+                # Older bridges answer "Unknown command" and keep newline framing
+                hello = self._send_command(self._hello)
+                agreed = (hello.get("data") or {}) if hello.get("success") else {}
+                if agreed.get("framing") == "length":
+                    self._codec = get_codec(agreed.get("codec") or "json")
+                    self._compress_threshold = COMPRESSION_THRESHOLD if agreed.get("compression") == "zlib" else None
+                    self._framed = True
                 self._connected = True
                 return True
             return False
-        except pywintypes.error as e:
+        except (ConnectionError, OSError) as e:
+            self.disconnect()
             raise ConnectionError(f"Failed to connect to AiCalc: {e}\nMake sure AiCalc is running and the Python bridge service has started.")
     
     def disconnect(self) -> None:
         """Disconnect from AiCalc application"""
-        if self._pipe_handle:
-            win32file.CloseHandle(self._pipe_handle)
-            self._pipe_handle = None
+        if self._transport:
+            self._transport.close()
+            self._transport = None
+        if self._listener is not None:
+            # The listener stops once the transport is closed; the None stops the callback thread
+            self._events.put(None)
+            self._listener = None
+            self._responses = queue.Queue()
+            self._events = queue.Queue()
+        self._subscriptions.clear()
+        self._reader = None
+        self._framed = False
+        self._codec = JSON
+        self._compress_threshold = None
         self._connected = False
     
     def is_connected(self) -> bool:
         """Check if connected to AiCalc"""
         return self._connected
     
+    def ping(self) -> bool:
+        """Check the connection with a round trip; False if AiCalc didn't answer."""
+        try:
+            response = self._send_command({"command": "ping"})
+        except (ConnectionError, OSError, ValueError):
+            self._connected = False
+            return False
+        return bool(response.get("success")) and response.get("data") == "pong"
+    
     def _send_command(self, command: Dict[str, Any]) -> Dict[str, Any]:
         """Send command to AiCalc and receive response."""
-        if not self._pipe_handle:
+        if not self._transport:
             raise ConnectionError("Not connected to AiCalc")
         
-        # Send request
-        request_json = json.dumps(command) + "\n"
-        win32file.WriteFile(self._pipe_handle, request_json.encode('utf-8'))
-        
-        # Read response (up to 4KB)
-        result, response_data = win32file.ReadFile(self._pipe_handle, 4096, None)
-        response_str = response_data.decode('utf-8').strip()
-        
-        if not response_str:
+        with self._lock:
+            if self._framed:
+                self._transport.send(encode_frame(self._codec.encode(command), self._compress_threshold))
+            else:
+                request_json = json.dumps(command) + "\n"
+                self._transport.send(request_json.encode('utf-8'))
+            
+            if self._listener is not None:
+                response = self._responses.get()
+                if isinstance(response, Exception):
+                    raise response
+                return response
+            
+            return self._read_message(self._reader, self._framed, self._codec)
+    
+    @staticmethod
+    def _read_message(reader: MessageReader, framed: bool, codec: Codec) -> Any:
+        if framed:
+            message = reader.read_frame()
+            if not message:
+                raise ConnectionError("No response from server")
+            return codec.decode(message)
+        line = reader.read_line()
+        if not line.strip():
             raise ConnectionError("No response from server")
-        
-        return json.loads(response_str)
+        return JSON.decode(line)
+    
+    def _start_listener(self) -> None:
+        """Hand reading over to a background thread so pushed changes arrive while idle."""
+        with self._lock:
+            if self._listener is not None:
+                return
+            self._listener = threading.Thread(
+                target=self._listen, args=(self._reader, self._framed, self._codec, self._responses, self._events),
+                name="aicalc-listener", daemon=True)
+            self._listener.start()
+            threading.Thread(target=self._dispatch, args=(self._events,),
+                             name="aicalc-callbacks", daemon=True).start()
+    
+    def _listen(self, reader: MessageReader, framed: bool, codec: Codec,
+                responses: "queue.Queue[Any]", events: "queue.Queue[Any]") -> None:
+        """Route pushed events to the callback thread and everything else to callers."""
+        try:
+            while True:
+                message = self._read_message(reader, framed, codec)
+                if "event" in message:
+                    events.put(message)
+                else:
+                    responses.put(message)
+        except Exception as e:
+            if self._listener is threading.current_thread():
+                self._connected = False
+            responses.put(e if isinstance(e, ConnectionError) else ConnectionError(f"Connection to AiCalc lost: {e}"))
+            events.put(None)
+    
+    def _dispatch(self, events: "queue.Queue[Any]") -> None:
+        """Run watch callbacks one at a time, in the order changes arrived."""
+        while True:
+            event = events.get()
+            if event is None:
+                return
+            callback = self._subscriptions.get(event.get("subscription_id"))
+            if callback is None or event.get("event") != "cells_changed":
+                continue
+            try:
+                callback([CellChange.from_dict(change) for change in event.get("changes", [])])
+            except Exception:
+                logger.exception("Callback for subscription %s failed", event.get("subscription_id"))
     
     def get_value(self, cell_ref: str) -> Any:
         """Get value from a cell.
@@ -115,6 +288,58 @@ class AiCalcClient:
         
         return True
     
+    def set_range(self, start_ref: str, rows: Iterable[Iterable[Any]]) -> int:
+        """Write a block of values in one message.
+        
+        The bridge checks the whole block fits before writing any cell, then
+        evaluates dependent cells once at the end.
+        
+        Args:
+            start_ref: Top-left cell (e.g., 'A1', 'Sheet1!B2')
+            rows: Rows of values, e.g. a list of lists or a 2D NumPy array
+            
+        Returns:
+            Number of cells written
+        """
+        if not self._connected:
+            raise ConnectionError("Not connected to AiCalc")
+        
+        response = self._send_command({
+            "command": "set_range",
+            "rangeRef": start_ref,
+            "values": _as_rows(rows)
+        })
+        
+        if not response.get("success"):
+            raise ValueError(response.get("error", "Unknown error"))
+        
+        return response.get("data", {}).get("cells_written", 0)
+    
+    def set_values(self, values: Mapping[str, Any]) -> int:
+        """Write many cells in one message.
+        
+        Every reference is resolved before any cell is written, and dependent
+        cells are evaluated once at the end.
+        
+        Args:
+            values: Cell reference to value, e.g. {"A1": 1, "Sheet2!B3": "x"}
+            
+        Returns:
+            Number of cells written
+        """
+        if not self._connected:
+            raise ConnectionError("Not connected to AiCalc")
+        
+        response = self._send_command({
+            "command": "set_values",
+            "values": dict(values)
+        })
+        
+        if not response.get("success"):
+            raise ValueError(response.get("error", "Unknown error"))
+        
+        return response.get("data", {}).get("cells_written", 0)
+    
     def get_range(self, range_ref: str) -> List[List[Any]]:
         """Get values from a range of cells.
         
@@ -137,6 +362,33 @@ class AiCalcClient:
         
         return response.get("data", {}).get("values", [])
     
+    def iter_rows(self, range_ref: str, page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[List[Any]]:
+        """Yield the rows of a range, fetching page_size rows per request.
+        
+        The next page is requested on a background thread while the caller
+        works through the current one, so at most two pages are held at a
+        time and the first row arrives after one small request. Rows stop
+        at the end of the range or of the sheet, whichever comes first.
+        
+        Args:
+            range_ref: Range reference, including whole columns such as
+                'Sheet1!A:Z' or whole rows such as '2:100'
+            page_size: Rows per get_range request
+            
+        Example:
+            >>> for row in client.iter_rows("Sheet1!A:Z"):
+            ...     writer.writerow(row)
+        """
+        pages = _range_pages(range_ref, page_size)
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="aicalc-prefetch") as prefetch:
+            pending = prefetch.submit(self.get_range, next(pages))
+            while pending is not None:
+                rows = pending.result()
+                # A short page means the sheet (or range) ended
+                page_ref = next(pages, None) if len(rows) == page_size else None
+                pending = prefetch.submit(self.get_range, page_ref) if page_ref else None
+                yield from rows
+    
     def run_function(self, function_name: str, *args) -> Any:
         """Execute an AiCalc function.
         
@@ -178,6 +430,100 @@ class AiCalcClient:
         
         return response.get("data", {}).get("sheets", [])
     
+    def watch(self, range_ref: str, callback: ChangeCallback) -> int:
+        """Call back whenever cells in a range change.
+        
+        The bridge pushes changes as cells are edited or evaluated. Changes
+        within one frame (about 16 ms) arrive together, with only the latest
+        state of each cell. Callbacks run on a background thread, one at a
+        time, and may call this client.
+        
+        Args:
+            range_ref: Cell or range reference (e.g., 'A1', 'Sheet1!A1:C10')
+            callback: Called with a list of CellChange
+            
+        Returns:
+            Subscription id to pass to unwatch()
+        
+        Example:
+            client.watch("A1:B10", lambda changes: print([c.cell_ref for c in changes]))
+        """
+        if not self._connected:
+            raise ConnectionError("Not connected to AiCalc")
+        
+        self._start_listener()
+        # The id is chosen here so changes pushed before the response can be routed
+        subscription_id = next(self._subscription_ids)
+        self._subscriptions[subscription_id] = callback
+        response = self._send_command({
+            "command": "watch",
+            "rangeRef": range_ref,
+            "subscriptionId": subscription_id
+        })
+        
+        if not response.get("success"):
+            self._subscriptions.pop(subscription_id, None)
+            raise ValueError(response.get("error", "Unknown error"))
+        
+        return subscription_id
+    
+    def unwatch(self, subscription_id: int) -> bool:
+        """Stop a watch() subscription.
+        
+        Returns:
+            True if the subscription existed
+        """
+        if not self._connected:
+            raise ConnectionError("Not connected to AiCalc")
+        
+        self._subscriptions.pop(subscription_id, None)
+        response = self._send_command({
+            "command": "unwatch",
+            "subscriptionId": subscription_id
+        })
+        
+        if not response.get("success"):
+            raise ValueError(response.get("error", "Unknown error"))
+        
+        return bool(response.get("data", {}).get("removed"))
+    
+    def execute_many(self, commands: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Execute several commands in one round trip.
+        
+        Args:
+            commands: Command dictionaries, e.g. {"command": "get_value", "cellRef": "A1"}
+            
+        Returns:
+            One response per command, in order. Each has its own "success"
+            flag and either "data" or "error".
+        """
+        if not self._connected:
+            raise ConnectionError("Not connected to AiCalc")
+        
+        if not commands:
+            return []
+        
+        response = self._send_command({
+            "command": "batch",
+            "commands": list(commands)
+        })
+        
+        if not response.get("success"):
+            raise ValueError(response.get("error", "Unknown error"))
+        
+        return response.get("data", {}).get("results", [])
+    
+    def batch(self) -> 'CommandBatch':
+        """Queue commands and send them together when the block exits.
+        
+        Example:
+            with client.batch() as batch:
+                a1 = batch.get_value("A1")
+                batch.set_value("B1", 42)
+            print(a1.result())
+        """
+        return CommandBatch(self)
+    
     def __enter__(self):
         self.connect()
         return self
@@ -185,15 +531,117 @@ class AiCalcClient:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.disconnect()
 
-def connect(pipe_name: str = "AiCalc_Bridge") -> AiCalcClient:
+
+class BatchItem:
+    """Result of one command queued in a CommandBatch."""
+    
+    def __init__(self, command: Dict[str, Any], extract):
+        self.command = command
+        self._extract = extract
+        self._response: Optional[Dict[str, Any]] = None
+    
+    @property
+    def done(self) -> bool:
+        """True once the batch has been executed"""
+        return self._response is not None
+    
+    @property
+    def success(self) -> bool:
+        """True if the command succeeded"""
+        return self.done and bool(self._response.get("success"))
+    
+    @property
+    def error(self) -> Optional[str]:
+        """Error message if the command failed"""
+        if not self.done or self.success:
+            return None
+        return self._response.get("error", "Unknown error")
+    
+    def result(self) -> Any:
+        """Return the command result, raising ValueError if it failed."""
+        if not self.done:
+            raise RuntimeError("Batch has not been executed yet")
+        if not self.success:
+            raise ValueError(self.error)
+        return self._extract(self._response.get("data") or {})
+    
+    def _set_response(self, response: Dict[str, Any]) -> None:
+        self._response = response
+
+
+class CommandBatch:
+    """Collects commands and sends them to AiCalc in a single message.
+    
+    Methods mirror AiCalcClient but return BatchItem placeholders that are
+    filled in when the batch is executed.
+    """
+    
+    def __init__(self, client: AiCalcClient):
+        self._client = client
+        self._items: List[BatchItem] = []
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def _add(self, command: Dict[str, Any], extract) -> BatchItem:
+        item = BatchItem(command, extract)
+        self._items.append(item)
+        return item
+    
+    def get_value(self, cell_ref: str) -> BatchItem:
+        return self._add({"command": "get_value", "cellRef": cell_ref},
+                         lambda data: data.get("value"))
+    
+    def set_value(self, cell_ref: str, value: Any) -> BatchItem:
+        return self._add({"command": "set_value", "cellRef": cell_ref, "value": value},
+                         lambda data: True)
+    
+    def set_range(self, start_ref: str, rows: Iterable[Iterable[Any]]) -> BatchItem:
+        return self._add({"command": "set_range", "rangeRef": start_ref, "values": _as_rows(rows)},
+                         lambda data: data.get("cells_written", 0))
+    
+    def set_values(self, values: Mapping[str, Any]) -> BatchItem:
+        return self._add({"command": "set_values", "values": dict(values)},
+                         lambda data: data.get("cells_written", 0))
+    
+    def get_range(self, range_ref: str) -> BatchItem:
+        return self._add({"command": "get_range", "rangeRef": range_ref},
+                         lambda data: data.get("values", []))
+    
+    def run_function(self, function_name: str, *args) -> BatchItem:
+        return self._add({"command": "run_function", "functionName": function_name, "args": list(args)},
+                         lambda data: data.get("result"))
+    
+    def get_sheets(self) -> BatchItem:
+        return self._add({"command": "get_sheets"},
+                         lambda data: data.get("sheets", []))
+    
+    def execute(self) -> List[BatchItem]:
+        """Send all queued commands and fill in their results."""
+        items, self._items = self._items, []
+        responses = self._client.execute_many([item.command for item in items])
+        for item, response in zip(items, responses):
+            item._set_response(response)
+        return items
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.execute()
+
+
+def connect(pipe_name: str = "AiCalc_Bridge", address: Optional[str] = None) -> AiCalcClient:
     """Connect to AiCalc application.
     
     Args:
         pipe_name: Name of the named pipe (default: AiCalc_Bridge)
+        address: Transport address overriding pipe_name, e.g. "tcp:127.0.0.1:8765"
         
     Returns:
         Connected AiCalcClient instance
     """
-    client = AiCalcClient(pipe_name)
+    client = AiCalcClient(pipe_name, address)
     client.connect()
     return client
@@ -2,13 +2,23 @@
 
 import functools
 import inspect
+import os
+import threading
 from typing import Callable, Optional, List, Dict, Any
 
 def aicalc_function(
     name: Optional[str] = None,
     category: str = "Python",
     description: Optional[str] = None,
-    examples: Optional[List[str]] = None
+    examples: Optional[List[str]] = None,
+    vectorized: bool = False,
+    array_type: str = "list",
+    cache: Optional[str] = None,
+    max_entries: int = 1024,
+    ttl: Optional[float] = None,
+    deterministic: bool = False,
+    cache_dir: Optional[str] = None,
+    max_concurrency: Optional[int] = None
 ):
     """
     Decorator to register a Python function as an AiCalc function.
@@ -18,7 +28,36 @@ def aicalc_function(
         category: Function category (default: "Python")
         description: Function description (default: function docstring)
         examples: List of usage examples (default: None)
-    
+        vectorized: If True, AiCalc calls the function once for a batch of cells.
+            Each parameter receives a column with that argument for every cell,
+            and the function returns a sequence with one result per cell.
+        array_type: Column type passed to vectorized functions, "list" or
+            "numpy" (requires NumPy)
+        cache: Memoize results by argument hash. "memory" keeps them for the
+            life of the worker process; "disk" stores them in a SQLite file
+            that survives restarts. Vectorized functions are cached per cell,
+            so only cells with new arguments reach the function.
+        max_entries: Least recently used results are evicted past this count
+        ttl: Seconds a cached result stays valid (default: forever)
+        deterministic: Declares that equal arguments always give equal
+            results. Implies cache="memory" when no cache is given.
+        cache_dir: Directory for the disk cache (default: $AICALC_CACHE_DIR
+            or ~/.aicalc/cache)
+        max_concurrency: Most calls of the function the worker runs at once.
+            For ``async def`` functions the default is the worker's limit,
+            1000; use it to stay within what a model server or database
+            accepts. Other functions run one call at a time by default;
+            a thread-safe one can set a higher limit to have its calls run
+            in parallel on the worker's thread pool.
+
+    ``async def`` functions are supported. The worker runs them on an event
+    loop, so many cells can wait on I/O at the same time.
+
+    Cached functions gain cache_info() and cache_clear(), as with
+    functools.lru_cache. Only calls whose arguments are JSON values, tuples,
+    bytes, enums or simple value types (Decimal, datetime, UUID, paths, ...)
+    are cached; other calls go straight to the function.
+
     Example:
         @aicalc_function(
             name="CUSTOM_SUM",
@@ -29,7 +68,34 @@ def aicalc_function(
         def custom_sum(a: float, b: float, multiplier: float = 1.0) -> float:
             '''Sum two numbers and multiply by a factor'''
             return (a + b) * multiplier
+
+        @aicalc_function(name="SCALE", vectorized=True, array_type="numpy")
+        def scale(values, factor):
+            '''Multiply a whole column of cells in one call'''
+            return values * factor
+
+        @aicalc_function(name="GEOCODE", cache="disk", ttl=86400)
+        def geocode(address: str) -> str:
+            '''Slow remote lookup, remembered for a day'''
+            ...
+
+        @aicalc_function(name="CLASSIFY", max_concurrency=16)
+        async def classify(text: str) -> str:
+            '''Ask the local model server; up to 16 requests in flight'''
+            async with session.post(MODEL_URL, json={"text": text}) as response:
+                return (await response.json())["label"]
     """
+    if array_type not in ("list", "numpy"):
+        raise ValueError(f"array_type must be 'list' or 'numpy', got {array_type!r}")
+    if cache is None and deterministic:
+        cache = "memory"
+    if cache not in (None, "memory", "disk"):
+        raise ValueError(f"cache must be 'memory' or 'disk', got {cache!r}")
+    if max_entries < 1:
+        raise ValueError(f"max_entries must be at least 1, got {max_entries!r}")
+    if max_concurrency is not None and max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency!r}")
+
     def decorator(func: Callable) -> Callable:
         # Extract function signature
         sig = inspect.signature(func)
@@ -53,11 +119,24 @@ def aicalc_function(
         func._aicalc_examples = examples or []
         func._aicalc_parameters = parameters
         func._aicalc_return_type = sig.return_annotation.__name__ if sig.return_annotation != inspect.Parameter.empty else "any"
-        
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            return func(*args, **kwargs)
-        
+        func._aicalc_vectorized = vectorized
+        func._aicalc_array_type = array_type
+        func._aicalc_cache = cache
+        func._aicalc_deterministic = deterministic
+        func._aicalc_async = inspect.iscoroutinefunction(func)
+        func._aicalc_max_concurrency = max_concurrency
+
+        if cache is not None:
+            wrapper = _cached(func, cache, max_entries, ttl, vectorized, array_type, cache_dir)
+        elif func._aicalc_async:
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                return await func(*args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                return func(*args, **kwargs)
+
         # Copy metadata to wrapper
         wrapper._aicalc_function = func._aicalc_function
         wrapper._aicalc_name = func._aicalc_name
@@ -66,11 +145,144 @@ def aicalc_function(
         wrapper._aicalc_examples = func._aicalc_examples
         wrapper._aicalc_parameters = func._aicalc_parameters
         wrapper._aicalc_return_type = func._aicalc_return_type
-        
+        wrapper._aicalc_vectorized = func._aicalc_vectorized
+        wrapper._aicalc_array_type = func._aicalc_array_type
+        wrapper._aicalc_cache = func._aicalc_cache
+        wrapper._aicalc_deterministic = func._aicalc_deterministic
+        wrapper._aicalc_async = func._aicalc_async
+        wrapper._aicalc_max_concurrency = func._aicalc_max_concurrency
+
         return wrapper
     return decorator
 
 
+def _cached(func: Callable, cache: str, max_entries: int, ttl: Optional[float],
+            vectorized: bool, array_type: str, cache_dir: Optional[str]) -> Callable:
+    """Wrap func so results are looked up by argument hash before calling it."""
+    # Imported here so uncached functions don't pay for hashlib and sqlite3
+    from .cache import MISSING, CacheInfo, DiskCache, MemoryCache, function_namespace, make_key
+
+    namespace = function_namespace(func)
+    if cache == "disk":
+        path = os.path.join(cache_dir, "functions.sqlite") if cache_dir else None
+        store = DiskCache(namespace, path, max_entries, ttl)
+    else:
+        store = MemoryCache(max_entries, ttl)
+    stats = {"hits": 0, "misses": 0}
+    # Sync functions are called from the worker's thread pool
+    stats_lock = threading.Lock()
+
+    def lookup(args, kwargs):
+        key = make_key(namespace, args, kwargs)
+        return key, (MISSING if key is None else store.get(key))
+
+    if not vectorized:
+        def hit(args, kwargs):
+            key, result = lookup(args, kwargs)
+            with stats_lock:
+                stats["hits" if result is not MISSING else "misses"] += 1
+            return key, result
+
+        def store_result(key, result):
+            if key is not None:
+                store.set(key, result)
+            return result
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                key, result = hit(args, kwargs)
+                if result is not MISSING:
+                    return result
+                return store_result(key, await func(*args, **kwargs))
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                key, result = hit(args, kwargs)
+                if result is not MISSING:
+                    return result
+                return store_result(key, func(*args, **kwargs))
+    else:
+        def split(rows, columns, kwargs):
+            """Look up each cell; returns (results, keys, missing cells, columns still to compute)."""
+            results: List[Any] = [None] * len(rows)
+            keys: List[Optional[str]] = []
+            missing: List[int] = []
+            for index, row in enumerate(rows):
+                key, result = lookup(row, kwargs)
+                keys.append(key)
+                if result is MISSING:
+                    missing.append(index)
+                else:
+                    results[index] = result
+            with stats_lock:
+                stats["hits"] += len(rows) - len(missing)
+                stats["misses"] += len(missing)
+            if missing and len(missing) < len(rows):
+                columns = tuple(_take(column, missing) for column in columns)
+            return results, keys, missing, columns
+
+        def merge(results, keys, missing, computed):
+            """Fill in and store computed results, in the array type the function returns."""
+            if hasattr(computed, 'tolist'):
+                computed = computed.tolist()
+            computed = list(computed)
+            if len(computed) != len(missing):
+                raise ValueError(f"Vectorized function returned {len(computed)} results for {len(missing)} cells")
+            for index, result in zip(missing, computed):
+                results[index] = result
+                if keys[index] is not None:
+                    store.set(keys[index], result)
+
+            if array_type == "numpy":
+                import numpy
+                return numpy.asarray(results)
+            return results
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*columns, **kwargs):
+                # One entry per cell, keyed by the row of arguments that cell passed
+                rows = list(zip(*columns)) if columns else []
+                if not rows:
+                    return await func(*columns, **kwargs)
+                results, keys, missing, columns = split(rows, columns, kwargs)
+                computed = await func(*columns, **kwargs) if missing else []
+                return merge(results, keys, missing, computed)
+        else:
+            @functools.wraps(func)
+            def wrapper(*columns, **kwargs):
+                rows = list(zip(*columns)) if columns else []
+                if not rows:
+                    return func(*columns, **kwargs)
+                results, keys, missing, columns = split(rows, columns, kwargs)
+                computed = func(*columns, **kwargs) if missing else []
+                return merge(results, keys, missing, computed)
+
+    def cache_info() -> "CacheInfo":
+        """Hits, misses, max_entries and current size of the cache."""
+        with stats_lock:
+            hits, misses = stats["hits"], stats["misses"]
+        return CacheInfo(hits, misses, max_entries, len(store))
+
+    def cache_clear() -> None:
+        """Drop every cached result and reset the counters."""
+        store.clear()
+        with stats_lock:
+            stats["hits"] = stats["misses"] = 0
+
+    wrapper.cache_info = cache_info
+    wrapper.cache_clear = cache_clear
+    return wrapper
+
+
+def _take(column, indices: List[int]):
+    """Select cells from a column, keeping NumPy arrays as arrays."""
+    if isinstance(column, (list, tuple)):
+        return [column[i] for i in indices]
+    return column[indices]
+
+
 def get_function_metadata(func: Callable) -> Optional[Dict[str, Any]]:
     """
     Extract AiCalc function metadata from a decorated function.
@@ -87,5 +299,11 @@ def get_function_metadata(func: Callable) -> Optional[Dict[str, Any]]:
         "description": getattr(func, '_aicalc_description', ''),
         "examples": getattr(func, '_aicalc_examples', []),
         "parameters": getattr(func, '_aicalc_parameters', []),
-        "return_type": getattr(func, '_aicalc_return_type', 'any')
+        "return_type": getattr(func, '_aicalc_return_type', 'any'),
+        "vectorized": getattr(func, '_aicalc_vectorized', False),
+        "array_type": getattr(func, '_aicalc_array_type', 'list'),
+        "cache": getattr(func, '_aicalc_cache', None),
+        "deterministic": getattr(func, '_aicalc_deterministic', False),
+        "is_async": getattr(func, '_aicalc_async', False),
+        "max_concurrency": getattr(func, '_aicalc_max_concurrency', None)
     }
@@ -5,7 +5,10 @@ This script is called by AiCalc to discover functions decorated with @aicalc_fun
 in Python files. It outputs JSON metadata that AiCalc can parse.
 
 Usage:
-    python discover_functions.py <python_file_path>
+    python discover_functions.py <python_file_path> [--mode static|import]
+                                 [--index PATH | --no-index]
+    python discover_functions.py <directory_or_file>... [--stdin]
+                                 [--format json|ndjson] [--jobs N]
 
 Output (JSON):
     {
@@ -22,26 +25,80 @@ Output (JSON):
                     {"name": "b", "type": "float", "required": true, "default": null}
                 ],
                 "return_type": "float",
-                "examples": ["=CUSTOM_SUM(A1, A2)"]
+                "examples": ["=CUSTOM_SUM(A1, A2)"],
+                "vectorized": false,
+                "array_type": "list",
+                "cache": null,
+                "deterministic": false,
+                "is_async": false,
+                "max_concurrency": null
             }
         ],
         "error": null
     }
+
+Directories, several paths or ``--stdin`` (one path per line) are scanned
+in one process. Output is then either a combined JSON object, with files
+that failed listed under "errors", or with ``--format ndjson`` one line per
+file as soon as it's done:
+    {"file_path": "fns/a.py", "success": true, "functions": [...], "error": null}
+
+Discovery modes:
+    static   (default) Read decorator arguments and signatures from the
+             file's syntax tree without running it, so top-level code and
+             heavy imports are skipped. Files whose decorator arguments
+             aren't literals (name=SOME_CONSTANT), or that define functions
+             anywhere but at the top level (under if/try/with, say), fall
+             back to importing.
+    import   Execute the module and read the attributes the decorator sets.
+
+Static results are remembered in an index keyed by absolute path,
+modification time, size and content hash, so unchanged files are never
+parsed again. Imported results are not: they depend on whatever the module
+imports and reads at load time, which the file's hash says nothing about.
+The index lives in $AICALC_CACHE_DIR or ~/.aicalc/cache.
 """
 
+import os
 import sys
+
+# Running as a script puts aicalc_sdk/ on sys.path, where types.py would
+# shadow the standard library module of the same name.
+_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:] = [p for p in sys.path if os.path.abspath(p or os.curdir) != _SCRIPT_DIR]
+
+import ast
+import hashlib
 import json
 import importlib.util
-import os
 from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# Bump when the shape of the discovered metadata changes
+INDEX_VERSION = 3
+
+# aicalc_function's parameters in order, for decorators called positionally
+_DECORATOR_PARAMETERS = ("name", "category", "description", "examples", "vectorized", "array_type",
+                         "cache", "max_entries", "ttl", "deterministic", "cache_dir", "max_concurrency")
+
+
+class DynamicMetadata(Exception):
+    """Raised when decorator arguments can only be known by running the module"""
+
+
+def default_index_path() -> str:
+    """Index location, next to the function result cache (see aicalc_sdk.cache)."""
+    cache_dir = os.environ.get("AICALC_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".aicalc", "cache")
+    return os.path.join(cache_dir, "discovery_index.json")
+
 
-def discover_functions(file_path: str):
+def discover_functions_by_import(file_path: str):
     """
-    Discover all @aicalc_function decorated functions in a Python file.
-    
+    Discover all @aicalc_function decorated functions by executing the file.
+
     Args:
         file_path: Path to Python file to scan
-        
+
     Returns:
         Dictionary with discovered functions and metadata
     """
@@ -53,7 +110,7 @@ def discover_functions(file_path: str):
                 "functions": [],
                 "error": f"File not found: {file_path}"
             }
-        
+
         # Load module from file
         module_name = Path(file_path).stem
         spec = importlib.util.spec_from_file_location(module_name, file_path)
@@ -63,27 +120,27 @@ def discover_functions(file_path: str):
                 "functions": [],
                 "error": f"Could not load module from {file_path}"
             }
-        
+
         module = importlib.util.module_from_spec(spec)
-        
+
         # Add parent directory to sys.path so relative imports work
         parent_dir = str(Path(file_path).parent)
         if parent_dir not in sys.path:
             sys.path.insert(0, parent_dir)
-        
+
         # Execute module
         spec.loader.exec_module(module)
-        
+
         # Discover decorated functions
         functions = []
         for name in dir(module):
             obj = getattr(module, name)
-            
+
             # Check if it's a decorated function
-            if (callable(obj) and 
-                hasattr(obj, '_aicalc_function') and 
+            if (callable(obj) and
+                hasattr(obj, '_aicalc_function') and
                 obj._aicalc_function):
-                
+
                 func_metadata = {
                     "name": getattr(obj, '_aicalc_name', name.upper()),
                     "category": getattr(obj, '_aicalc_category', 'Python'),
@@ -92,16 +149,22 @@ def discover_functions(file_path: str):
                     "function_name": name,
                     "parameters": getattr(obj, '_aicalc_parameters', []),
                     "return_type": getattr(obj, '_aicalc_return_type', 'any'),
-                    "examples": getattr(obj, '_aicalc_examples', [])
+                    "examples": getattr(obj, '_aicalc_examples', []),
+                    "vectorized": getattr(obj, '_aicalc_vectorized', False),
+                    "array_type": getattr(obj, '_aicalc_array_type', 'list'),
+                    "cache": getattr(obj, '_aicalc_cache', None),
+                    "deterministic": getattr(obj, '_aicalc_deterministic', False),
+                    "is_async": getattr(obj, '_aicalc_async', False),
+                    "max_concurrency": getattr(obj, '_aicalc_max_concurrency', None)
                 }
                 functions.append(func_metadata)
-        
+
         return {
             "success": True,
             "functions": functions,
             "error": None
         }
-        
+
     except Exception as e:
         return {
             "success": False,
@@ -110,15 +173,428 @@ def discover_functions(file_path: str):
         }
 
 
+def _decorator_names(tree: ast.Module):
+    """Names aicalc_function is reachable by: bare names and module aliases."""
+    names, modules = {"aicalc_function"}, set()
+    # Imports nested in try/if blocks count too, e.g. an ImportError fallback
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module and node.module.split(".")[0] == "aicalc_sdk":
+            for alias in node.names:
+                if alias.name == "aicalc_function":
+                    names.add(alias.asname or alias.name)
+                elif alias.name == "decorators":
+                    modules.add(alias.asname or alias.name)
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.name.split(".")[0] == "aicalc_sdk":
+                    modules.add(alias.asname or alias.name)
+    return names, modules
+
+
+def _is_aicalc_decorator(node: ast.expr, names, modules) -> bool:
+    if isinstance(node, ast.Name):
+        return node.id in names
+    if isinstance(node, ast.Attribute) and node.attr == "aicalc_function":
+        return _dotted_name(node.value) in modules
+    return False
+
+
+def _dotted_name(node: ast.expr) -> Optional[str]:
+    """'a.b.c' for a chain of attribute lookups on a name, otherwise None."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+def _type_name(annotation: Optional[ast.expr]) -> str:
+    """The name decorators.py reports for an annotation (its __name__)."""
+    if annotation is None:
+        return "any"
+    if isinstance(annotation, ast.Constant) and isinstance(annotation.value, str):
+        # Forward reference: report the name it refers to
+        try:
+            return _type_name(ast.parse(annotation.value, mode="eval").body)
+        except SyntaxError:
+            raise DynamicMetadata(f"annotation {annotation.value!r}")
+    if isinstance(annotation, ast.Constant) and annotation.value is None:
+        return "NoneType"
+    if isinstance(annotation, ast.Subscript):
+        return _type_name(annotation.value)
+    if isinstance(annotation, ast.Name):
+        return annotation.id
+    if isinstance(annotation, ast.Attribute):
+        return annotation.attr
+    raise DynamicMetadata(f"annotation on line {annotation.lineno}")
+
+
+def _default(node: Optional[ast.expr]) -> Any:
+    if node is None:
+        return None
+    try:
+        value = ast.literal_eval(node)
+    except (ValueError, TypeError):
+        # TypeError: a literal that can't be built, such as {[1]: 2}
+        raise DynamicMetadata(f"default on line {node.lineno}")
+    return list(value) if isinstance(value, tuple) else value
+
+
+def _parameters(arguments: ast.arguments) -> List[Dict[str, Any]]:
+    """Parameter metadata in signature order, as decorators.py builds it."""
+    positional = arguments.posonlyargs + arguments.args
+    defaults = [None] * (len(positional) - len(arguments.defaults)) + list(arguments.defaults)
+    entries = list(zip(positional, defaults))
+    if arguments.vararg:
+        entries.append((arguments.vararg, None))
+    entries.extend(zip(arguments.kwonlyargs, arguments.kw_defaults))
+    if arguments.kwarg:
+        entries.append((arguments.kwarg, None))
+
+    return [{
+        "name": arg.arg,
+        "type": _type_name(arg.annotation),
+        "required": default is None,
+        "default": _default(default)
+    } for arg, default in entries]
+
+
+def _decorator_arguments(call: ast.Call) -> Dict[str, Any]:
+    if any(isinstance(arg, ast.Starred) for arg in call.args) or any(kw.arg is None for kw in call.keywords):
+        raise DynamicMetadata("unpacked decorator arguments")
+    arguments = {}
+    pairs = list(zip(_DECORATOR_PARAMETERS, call.args)) + [(kw.arg, kw.value) for kw in call.keywords]
+    for key, node in pairs:
+        try:
+            arguments[key] = ast.literal_eval(node)
+        except (ValueError, TypeError):
+            raise DynamicMetadata(f"{key}= on line {node.lineno}")
+    return arguments
+
+
+def discover_functions_static(file_path: str, source: Optional[bytes] = None) -> Dict[str, Any]:
+    """
+    Discover @aicalc_function decorated functions without executing the file.
+
+    Raises:
+        DynamicMetadata: if a decorator argument, default or annotation needs
+            the module to run
+    """
+    if source is None:
+        with open(file_path, "rb") as f:
+            source = f.read()
+    tree = ast.parse(source, filename=file_path)
+    names, modules = _decorator_names(tree)
+
+    # Only decorators of plain top-level defs can be read here. Functions defined under
+    # if/try/with, in classes or by calling aicalc_function directly depend on how the
+    # module runs, so the whole file is imported instead of losing them.
+    top_level = {id(d) for node in tree.body if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+                 for d in node.decorator_list}
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Call) and _is_aicalc_decorator(node.func, names, modules)
+                and id(node) not in top_level):
+            raise DynamicMetadata(f"aicalc_function used outside a top-level def (line {node.lineno})")
+
+    functions = {}
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        calls = [d for d in node.decorator_list
+                 if isinstance(d, ast.Call) and _is_aicalc_decorator(d.func, names, modules)]
+        if not calls:
+            functions.pop(node.name, None)  # A later plain def replaces an earlier one
+            continue
+        if len(node.decorator_list) > 1:
+            # Other decorators may replace the function or its metadata
+            raise DynamicMetadata(f"{node.name} has several decorators")
+
+        arguments = _decorator_arguments(calls[0])
+        docstring = ast.get_docstring(node, clean=False)
+        cache = arguments.get("cache")
+        if cache is None and arguments.get("deterministic", False):
+            cache = "memory"
+        functions[node.name] = {
+            "name": arguments.get("name") or node.name.upper(),
+            "category": arguments.get("category", "Python"),
+            "description": arguments.get("description") or docstring or "",
+            "file_path": file_path,
+            "function_name": node.name,
+            "parameters": _parameters(node.args),
+            "return_type": _type_name(node.returns),
+            "examples": arguments.get("examples") or [],
+            "vectorized": arguments.get("vectorized", False),
+            "array_type": arguments.get("array_type", "list"),
+            "cache": cache,
+            "deterministic": arguments.get("deterministic", False),
+            "is_async": isinstance(node, ast.AsyncFunctionDef),
+            "max_concurrency": arguments.get("max_concurrency")
+        }
+
+    return {
+        "success": True,
+        # dir(module) order, as import discovery reports them
+        "functions": [functions[name] for name in sorted(functions)],
+        "error": None
+    }
+
+
+class DiscoveryIndex:
+    """
+    Discovered metadata for each file, persisted as JSON
+
+    Entries are keyed by absolute path. A file whose mtime and size match its
+    entry is not read at all; otherwise its SHA-256 decides whether the entry
+    still applies (e.g. after a checkout that only touched timestamps). Only
+    metadata read from the syntax tree is stored, since it depends on nothing
+    but the file itself.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_index_path()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                self.entries = data.get("files", {})
+        except (OSError, ValueError):
+            pass
+
+    def lookup(self, file_path: str) -> Optional[List[Dict[str, Any]]]:
+        """Cached functions for an unchanged file, or None."""
+        key = os.path.abspath(file_path)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        stat = os.stat(key)
+        if entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+            with open(key, "rb") as f:
+                if hashlib.sha256(f.read()).hexdigest() != entry["sha256"]:
+                    return None
+            entry["mtime_ns"], entry["size"] = stat.st_mtime_ns, stat.st_size
+            self.dirty = True
+        return [dict(function, file_path=file_path) for function in entry["functions"]]
+
+    def store(self, file_path: str, source: bytes, functions: List[Dict[str, Any]]) -> None:
+        """Remember functions read statically from ``source``, the file's content."""
+        key = os.path.abspath(file_path)
+        stat = os.stat(key)
+        self.entries[key] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": hashlib.sha256(source).hexdigest(),
+            "functions": functions
+        }
+        self.dirty = True
+
+    def save(self) -> None:
+        """Write the index if it changed; the file is replaced atomically."""
+        if not self.dirty:
+            return
+        # Forget files that no longer exist
+        self.entries = {path: entry for path, entry in self.entries.items() if os.path.exists(path)}
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "files": self.entries}, f)
+        os.replace(temp_path, self.path)
+        self.dirty = False
+
+
+def _error(file_path: str, message: str) -> Dict[str, Any]:
+    return {"file_path": file_path, "success": False, "functions": [], "error": message}
+
+
+def _scan_static(file_path: str, mode: str, index: Optional[DiscoveryIndex]):
+    """
+    Everything short of importing: index lookup, then the syntax tree.
+
+    Returns (result, source); result is None when the file must be imported.
+    source is the file's content when result was just read from it and may
+    be indexed, otherwise None.
+    """
+    if not os.path.exists(file_path):
+        return _error(file_path, f"File not found: {file_path}"), None
+    if mode != "static":
+        return None, None
+    try:
+        if index is not None:
+            functions = index.lookup(file_path)
+            if functions is not None:
+                return {"file_path": file_path, "success": True, "functions": functions, "error": None}, None
+        with open(file_path, "rb") as f:
+            source = f.read()
+    except OSError as e:
+        return _error(file_path, str(e)), None
+
+    try:
+        result = discover_functions_static(file_path, source)
+        return dict(result, file_path=file_path), source
+    except DynamicMetadata:
+        return None, None
+    except SyntaxError as e:
+        return _error(file_path, f"SyntaxError: {e}"), None
+    except Exception:
+        # A gap in the static reader mustn't end a whole directory scan; importing still works
+        return None, None
+
+
+def _scan_import(file_path: str) -> Dict[str, Any]:
+    """Import discovery for one file; runs in a pool worker."""
+    try:
+        return dict(discover_functions_by_import(file_path), file_path=file_path)
+    except BaseException as e:
+        # SystemExit or KeyboardInterrupt from module code stays with this file
+        return _error(file_path, f"{type(e).__name__}: {e}")
+
+
+def discover_functions(file_path: str, mode: str = "static", index: Optional[DiscoveryIndex] = None):
+    """
+    Discover all @aicalc_function decorated functions in a Python file.
+
+    Args:
+        file_path: Path to Python file to scan
+        mode: "static" to read the syntax tree (importing only when metadata
+            is dynamic) or "import" to always execute the module
+        index: Index consulted before a static scan and updated with its result
+
+    Returns:
+        Dictionary with discovered functions and metadata
+    """
+    if mode not in ("static", "import"):
+        raise ValueError(f"mode must be 'static' or 'import', got {mode!r}")
+
+    result, source = _scan_static(file_path, mode, index)
+    if result is None:
+        result = discover_functions_by_import(file_path)
+    elif index is not None and source is not None:
+        index.store(file_path, source, result["functions"])
+    return {key: result[key] for key in ("success", "functions", "error")}
+
+
+def collect_files(paths: Iterable[str]) -> List[str]:
+    """Expand directories to the .py files AiCalc loads functions from."""
+    files = []
+    for path in paths:
+        if not os.path.isdir(path):
+            files.append(path)
+            continue
+        for root, dirs, names in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+            files.extend(os.path.join(root, name) for name in sorted(names)
+                         if name.endswith(".py") and name != "__init__.py")
+    return files
+
+
+def discover_paths(paths: Iterable[str], mode: str = "static", index: Optional[DiscoveryIndex] = None,
+                   jobs: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Discover functions in many files and directories, yielding one result per file.
+
+    Indexed and statically readable files are handled in this process, which
+    is only a few milliseconds each. Files that have to be imported are
+    spread over a pool of ``jobs`` processes (default: one per CPU), so slow
+    top-level imports run in parallel, never in this process, and a module
+    that crashes its interpreter only fails its own entry. Results are yielded as they finish;
+    each carries its ``file_path``.
+    """
+    if mode not in ("static", "import"):
+        raise ValueError(f"mode must be 'static' or 'import', got {mode!r}")
+
+    pending: List[str] = []
+    for file_path in collect_files(paths):
+        result, source = _scan_static(file_path, mode, index)
+        if result is None:
+            pending.append(file_path)
+            continue
+        if index is not None and source is not None:
+            index.store(file_path, source, result["functions"])
+        yield result
+
+    if not pending:
+        return
+
+    workers = max(1, min(jobs or os.cpu_count() or 1, len(pending)))
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from concurrent.futures.process import BrokenProcessPool
+
+    outstanding: Dict[Any, str] = {}
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outstanding = {pool.submit(_scan_import, file_path): file_path for file_path in pending}
+            for future in as_completed(list(outstanding)):
+                result = future.result()
+                del outstanding[future]
+                yield result
+    except BrokenProcessPool:
+        # A worker died (os._exit, a crash in an extension) and took the pool
+        # with it. Retry what was still outstanding one process per file, so
+        # only the culprit is reported.
+        for file_path in outstanding.values():
+            try:
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    result = pool.submit(_scan_import, file_path).result()
+            except BrokenProcessPool:
+                result = _error(file_path, "Worker process exited while importing the file")
+            yield result
+
+
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Discover @aicalc_function functions in Python files")
+    parser.add_argument("paths", nargs="*", metavar="path", help="Python files or directories")
+    parser.add_argument("--stdin", action="store_true", help="Also read paths from stdin, one per line")
+    parser.add_argument("--mode", choices=("static", "import"), default="static")
+    parser.add_argument("--format", choices=("json", "ndjson"), default="json",
+                        help="ndjson streams one result per file as it finishes")
+    parser.add_argument("--jobs", type=int, default=None, help="Processes for files that must be imported")
+    parser.add_argument("--index", help="Index file (default: discovery_index.json in the cache directory)")
+    parser.add_argument("--no-index", action="store_true", help="Always scan, without reading or writing the index")
+    options = parser.parse_args()
+
+    paths = list(options.paths)
+    if options.stdin:
+        paths.extend(line.strip() for line in sys.stdin if line.strip())
+
+    if not paths:
         print(json.dumps({
             "success": False,
             "functions": [],
-            "error": "Usage: python discover_functions.py <python_file_path>"
+            "error": "Usage: python discover_functions.py <python_file_path> | <directory> | --stdin"
         }))
         sys.exit(1)
-    
-    file_path = sys.argv[1]
-    result = discover_functions(file_path)
-    print(json.dumps(result, indent=2))
+
+    index = None if options.no_index else DiscoveryIndex(options.index)
+    if len(paths) == 1 and not os.path.isdir(paths[0]) and options.format == "json":
+        # Single file: the original output shape
+        output = discover_functions(paths[0], options.mode, index)
+    elif options.format == "ndjson":
+        for result in discover_paths(paths, options.mode, index, options.jobs):
+            sys.stdout.write(json.dumps(result) + "\n")
+            sys.stdout.flush()
+        output = None
+    else:
+        results = list(discover_paths(paths, options.mode, index, options.jobs))
+        order = {file_path: i for i, file_path in enumerate(collect_files(paths))}
+        results.sort(key=lambda result: order.get(result["file_path"], len(order)))
+        output = {
+            "success": True,
+            "functions": [function for result in results for function in result["functions"]],
+            "errors": [{"file_path": r["file_path"], "error": r["error"]} for r in results if not r["success"]],
+            "error": None
+        }
+
+    if index is not None:
+        try:
+            index.save()
+        except OSError:
+            pass  # A read-only cache directory only costs the next startup
+    if output is not None:
+        print(json.dumps(output, indent=2))
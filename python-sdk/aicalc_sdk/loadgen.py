@@ -0,0 +1,430 @@
+"""
+Load generator for the AiCalc bridge
+
+Runs many clients against PythonBridgeService (or the stand-in
+LocalBridgeServer), each sending a weighted mix of get_value, set_value,
+get_range and run_function commands, and reports throughput, latency
+percentiles, error rates and bytes on the wire. Every client opens its
+own connection, which the bridge serves concurrently; connecting while
+all pipe instances are taken waits for the next one instead of failing.
+
+Usage:
+    aicalc-loadgen --local --clients 8 --duration 10
+    aicalc-loadgen --address tcp:127.0.0.1:8765 --scenario mix.json --rate 500 --json results.json
+    python -m aicalc_sdk.loadgen --pipe-name AiCalc_Bridge --processes --clients 16
+
+Scenario files are JSON:
+    {
+        "name": "interactive",
+        "operations": [
+            {"op": "get_value", "weight": 60, "cells": "Sheet1!A1:L20"},
+            {"op": "set_value", "weight": 20, "cells": "Sheet1!A1:L20"},
+            {"op": "get_range", "weight": 15, "range": "Sheet1!A1:L20"},
+            {"op": "run_function", "weight": 5, "function": "SUM", "args": [1, 2, 3]}
+        ]
+    }
+
+get_value and set_value pick a random cell of ``cells`` each time;
+set_value writes ``value`` if given, otherwise a random number. A scenario
+may also set "duration" and "rate", which the command line overrides.
+
+With ``--rate`` each client sends at its share of the target rate, and
+latency is measured from when a command was due rather than when it was
+sent, so a bridge that falls behind shows its queueing delay instead of
+quietly lowering the offered load. Without a rate, clients send as fast
+as they are answered.
+
+The exit status is 1 when a --max-error-rate, --max-p99 or
+--min-throughput threshold is missed, so the command can gate a release.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from .client import AiCalcClient
+from .transports import Transport, open_transport
+
+OPERATIONS = ("get_value", "set_value", "get_range", "run_function")
+
+DEFAULT_SCENARIO: Dict[str, Any] = {
+    "name": "default",
+    "operations": [
+        {"op": "get_value", "weight": 60, "cells": "Sheet1!A1:L20"},
+        {"op": "set_value", "weight": 20, "cells": "Sheet1!A1:L20"},
+        {"op": "get_range", "weight": 15, "range": "Sheet1!A1:L20"},
+        {"op": "run_function", "weight": 5, "function": "SUM", "args": [1, 2, 3]},
+    ],
+}
+
+# Error messages kept per operation, for the report
+_ERROR_SAMPLES = 5
+
+
+class CountingTransport(Transport):
+    """Transport wrapper that counts the bytes sent and received."""
+
+    def __init__(self, transport: Transport):
+        self._transport = transport
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def send(self, data: bytes) -> None:
+        self._transport.send(data)
+        self.bytes_sent += len(data)
+
+    def recv(self, max_bytes: int) -> bytes:
+        data = self._transport.recv(max_bytes)
+        self.bytes_received += len(data)
+        return data
+
+    def recv_into(self, buffer: memoryview) -> int:
+        count = self._transport.recv_into(buffer)
+        self.bytes_received += count
+        return count
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+def _column_index(letters: str) -> int:
+    index = 0
+    for letter in letters.upper():
+        index = index * 26 + ord(letter) - 64
+    return index - 1
+
+
+def _column_name(index: int) -> str:
+    name = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(65 + remainder) + name
+    return name
+
+
+def expand_cells(range_ref: str) -> List[str]:
+    """Cell references of a range, e.g. "Sheet1!A1:B2" -> ["Sheet1!A1", "Sheet1!B1", ...]."""
+    sheet, sep, cells = range_ref.rpartition("!")
+    bounds = []
+    for cell in cells.split(":"):
+        letters = cell.rstrip("0123456789")
+        digits = cell[len(letters):]
+        if not letters.isalpha() or not digits:
+            raise ValueError(f"Invalid range: {range_ref!r}")
+        bounds.append((int(digits), _column_index(letters)))
+    (first_row, first_column), (last_row, last_column) = bounds[0], bounds[-1]
+    return [f"{sheet}{sep}{_column_name(column)}{row}"
+            for row in range(min(first_row, last_row), max(first_row, last_row) + 1)
+            for column in range(min(first_column, last_column), max(first_column, last_column) + 1)]
+
+
+def load_scenario(path: Optional[str]) -> Dict[str, Any]:
+    """Read and check a scenario file; None gives DEFAULT_SCENARIO.
+
+    Raises:
+        ValueError: if an operation is unknown or lacks what it needs
+    """
+    if path is None:
+        scenario = DEFAULT_SCENARIO
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            scenario = json.load(f)
+
+    operations = scenario.get("operations") or []
+    if not operations:
+        raise ValueError("Scenario has no operations")
+    required = {"get_value": "cells", "set_value": "cells", "get_range": "range", "run_function": "function"}
+    for operation in operations:
+        op = operation.get("op")
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown operation {op!r}; expected one of {', '.join(OPERATIONS)}")
+        if required[op] not in operation:
+            raise ValueError(f"{op} needs {required[op]!r}")
+        if operation.get("weight", 1) <= 0:
+            raise ValueError(f"{op} weight must be positive")
+    return scenario
+
+
+def run_client(address: str, scenario: Dict[str, Any], duration: float, rate: Optional[float],
+               start_at: float, seed: int, codecs: Optional[Sequence[str]] = None,
+               compression: bool = True) -> Dict[str, Any]:
+    """
+    Run one client until duration has passed; used by each thread or process.
+
+    Args:
+        address: Bridge address, as accepted by AiCalcClient
+        scenario: Checked scenario (see load_scenario)
+        duration: Seconds to send for, once started
+        rate: Commands per second for this client, or None for as fast as possible
+        start_at: time.time() at which every client starts sending
+        seed: Seed for this client's choice of operations and cells
+
+    Returns:
+        Latencies in seconds and error counts per operation, and bytes
+        sent and received
+    """
+    rng = random.Random(seed)
+    operations = scenario["operations"]
+    weights = [operation.get("weight", 1) for operation in operations]
+    cells = [expand_cells(operation["cells"]) if "cells" in operation else None for operation in operations]
+    stats = {operation["op"]: {"latencies": [], "errors": 0, "error_samples": []} for operation in operations}
+    transferred = {"bytes_sent": 0, "bytes_received": 0}
+
+    def open_client():
+        transport = CountingTransport(open_transport(address))
+        client = AiCalcClient(address=address, transport=transport, codecs=codecs, compression=compression)
+        if not client.connect():
+            client.disconnect()
+            raise ConnectionError(f"AiCalc at {address} did not answer ping")
+        return client, transport
+
+    def close_client(client, transport):
+        client.disconnect()
+        transferred["bytes_sent"] += transport.bytes_sent
+        transferred["bytes_received"] += transport.bytes_received
+
+    client, transport = open_client()
+    try:
+        time.sleep(max(0.0, start_at - time.time()))
+        started = time.perf_counter()
+        deadline = started + duration
+        interval = 1.0 / rate if rate else 0.0
+        sent = 0
+        while True:
+            due = started + sent * interval if interval else time.perf_counter()
+            if due >= deadline:
+                break
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            sent += 1
+
+            index = rng.choices(range(len(operations)), weights)[0]
+            operation = operations[index]
+            op = operation["op"]
+            try:
+                if op == "get_value":
+                    client.get_value(rng.choice(cells[index]))
+                elif op == "set_value":
+                    value = operation["value"] if "value" in operation else round(rng.random() * 1000, 3)
+                    client.set_value(rng.choice(cells[index]), value)
+                elif op == "get_range":
+                    client.get_range(operation["range"])
+                else:
+                    client.run_function(operation["function"], *operation.get("args", []))
+            except Exception as e:
+                stats[op]["errors"] += 1
+                if len(stats[op]["error_samples"]) < _ERROR_SAMPLES:
+                    stats[op]["error_samples"].append(f"{type(e).__name__}: {e}")
+                if isinstance(e, (ConnectionError, OSError)) or not client.is_connected():
+                    # Counted as an error; carry on with a fresh connection
+                    close_client(client, transport)
+                    client, transport = open_client()
+                continue
+            stats[op]["latencies"].append(time.perf_counter() - due)
+    finally:
+        close_client(client, transport)
+
+    return {"operations": stats, **transferred}
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values (0 when empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(-(-fraction * len(sorted_values) // 1)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _summary(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    latencies = sorted(latencies)
+    attempts = len(latencies) + errors
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "error_rate": errors / attempts if attempts else 0.0,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+    }
+
+
+def summarize(results: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    """Combine run_client results into per-operation and total figures."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for result in results:
+        for op, stats in result["operations"].items():
+            entry = merged.setdefault(op, {"latencies": [], "errors": 0, "error_samples": []})
+            entry["latencies"].extend(stats["latencies"])
+            entry["errors"] += stats["errors"]
+            entry["error_samples"].extend(stats["error_samples"][:_ERROR_SAMPLES - len(entry["error_samples"])])
+
+    operations = {}
+    for op, entry in merged.items():
+        operations[op] = _summary(entry["latencies"], entry["errors"], elapsed)
+        if entry["error_samples"]:
+            operations[op]["error_samples"] = entry["error_samples"]
+    total = _summary([latency for entry in merged.values() for latency in entry["latencies"]],
+                     sum(entry["errors"] for entry in merged.values()), elapsed)
+
+    return {
+        "elapsed": elapsed,
+        "operations": operations,
+        "total": total,
+        "bytes_sent": sum(result["bytes_sent"] for result in results),
+        "bytes_received": sum(result["bytes_received"] for result in results),
+    }
+
+
+def run(address: str, scenario: Dict[str, Any], clients: int = 4, duration: float = 10.0,
+        rate: Optional[float] = None, processes: bool = False, seed: int = 0,
+        codecs: Optional[Sequence[str]] = None, compression: bool = True) -> Dict[str, Any]:
+    """
+    Run clients against a bridge and summarize what they measured.
+
+    Args:
+        address: Bridge address, e.g. "tcp:127.0.0.1:8765" or a pipe name
+        scenario: Checked scenario (see load_scenario)
+        clients: Number of concurrent clients
+        duration: Seconds every client sends for
+        rate: Target commands per second across all clients (None: unthrottled)
+        processes: Run each client in its own process instead of a thread,
+            so client-side work doesn't share one interpreter lock
+        seed: Base seed; client i uses seed + i
+    """
+    if clients < 1:
+        raise ValueError(f"clients must be at least 1, got {clients}")
+    per_client_rate = rate / clients if rate else None
+    # Leave every client time to connect before anyone starts sending
+    start_at = time.time() + 0.5 + 0.05 * clients
+    executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with executor_class(max_workers=clients) as executor:
+        futures = [executor.submit(run_client, address, scenario, duration, per_client_rate,
+                                   start_at, seed + i, codecs, compression)
+                   for i in range(clients)]
+        results = [future.result() for future in futures]
+
+    report = summarize(results, duration)
+    report.update({
+        "scenario": scenario.get("name", "unnamed"),
+        "address": address,
+        "clients": clients,
+        "mode": "processes" if processes else "threads",
+        "target_rate": rate,
+    })
+    return report
+
+
+def _format_bytes(count: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if count < 1024:
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GB"
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Human-readable table of a run() report."""
+    lines = [
+        f"Scenario {report['scenario']}: {report['clients']} clients ({report['mode']}) for "
+        f"{report['elapsed']:g} s against {report['address']}"
+        + (f" at {report['target_rate']:g}/s" if report.get("target_rate") else ""),
+        "",
+        f"{'operation':<14}{'count':>9}{'errors':>8}{'err %':>8}{'ops/s':>10}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}",
+    ]
+    rows = list(report["operations"].items()) + [("total", report["total"])]
+    for op, stats in rows:
+        lines.append(f"{op:<14}{stats['count']:>9}{stats['errors']:>8}{stats['error_rate'] * 100:>8.2f}"
+                     f"{stats['throughput']:>10.1f}{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}"
+                     f"{stats['p99_ms']:>9.2f}{stats['max_ms']:>9.2f}")
+    lines.append("")
+    lines.append(f"Sent {_format_bytes(report['bytes_sent'])}, received {_format_bytes(report['bytes_received'])}")
+    for op, stats in report["operations"].items():
+        for sample in stats.get("error_samples", []):
+            lines.append(f"  {op} error: {sample}")
+    return "\n".join(lines)
+
+
+def check_thresholds(report: Dict[str, Any], max_error_rate: Optional[float] = None,
+                     max_p99_ms: Optional[float] = None, min_throughput: Optional[float] = None) -> List[str]:
+    """Descriptions of the thresholds the run missed (empty when all were met)."""
+    total = report["total"]
+    failures = []
+    if max_error_rate is not None and total["error_rate"] > max_error_rate:
+        failures.append(f"error rate {total['error_rate']:.4f} > {max_error_rate}")
+    if max_p99_ms is not None and total["p99_ms"] > max_p99_ms:
+        failures.append(f"p99 {total['p99_ms']:.2f} ms > {max_p99_ms} ms")
+    if min_throughput is not None and total["throughput"] < min_throughput:
+        failures.append(f"throughput {total['throughput']:.1f}/s < {min_throughput}/s")
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="aicalc-loadgen",
+                                     description="Drive an AiCalc bridge with concurrent clients and report latency")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--address", help="unix:/path or tcp:host:port of a running bridge")
+    target.add_argument("--pipe-name", default="AiCalc_Bridge", help="Named pipe of a running AiCalc (default)")
+    target.add_argument("--local", action="store_true",
+                        help="Start a stand-in LocalBridgeServer in this process and load it")
+    parser.add_argument("--scenario", help="Scenario JSON file (default: a mostly-read interactive mix)")
+    parser.add_argument("--clients", type=int, default=4, help="Concurrent clients (default: 4)")
+    parser.add_argument("--processes", action="store_true", help="One process per client instead of threads")
+    parser.add_argument("--duration", type=float, help="Seconds to run (default: scenario's, or 10)")
+    parser.add_argument("--rate", type=float, help="Target commands per second across all clients")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--codec", action="append", dest="codecs", metavar="NAME",
+                        help="Codec to offer (repeatable), e.g. json or msgpack")
+    parser.add_argument("--no-compression", action="store_true", help="Don't offer frame compression")
+    parser.add_argument("--json", metavar="FILE", help="Also write the report as JSON")
+    parser.add_argument("--max-error-rate", type=float, help="Fail if the error rate (0-1) is higher")
+    parser.add_argument("--max-p99", type=float, metavar="MS", help="Fail if p99 latency is higher")
+    parser.add_argument("--min-throughput", type=float, metavar="OPS", help="Fail if throughput is lower")
+    args = parser.parse_args(argv)
+
+    try:
+        scenario = load_scenario(args.scenario)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    duration = args.duration or scenario.get("duration") or 10.0
+    rate = args.rate or scenario.get("rate")
+
+    server = None
+    if args.local:
+        from .server import LocalBridgeServer
+        server = LocalBridgeServer().start()
+        address = server.address
+    else:
+        address = args.address or args.pipe_name
+
+    try:
+        report = run(address, scenario, args.clients, duration, rate, args.processes, args.seed,
+                     args.codecs, not args.no_compression)
+    except ConnectionError as e:
+        print(f"aicalc-loadgen: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if server is not None:
+            server.stop()
+
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    failures = check_thresholds(report, args.max_error_rate, args.max_p99, args.min_throughput)
+    for failure in failures:
+        print(f"FAILED: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
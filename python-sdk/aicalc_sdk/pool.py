@@ -0,0 +1,245 @@
+"""Thread-safe pool of AiCalc connections
+
+AiCalcClient sends one command at a time over its connection. The bridge
+serves each connection on its own task, so threads that each check out
+their own client from a pool have their commands in flight at once.
+
+Example:
+    from aicalc_sdk.pool import AiCalcClientPool
+
+    with AiCalcClientPool(max_size=8) as pool:
+        def ingest(rows):
+            with pool.connection() as client:
+                client.set_range("Data!A1", rows)
+
+        with ThreadPoolExecutor(8) as executor:
+            executor.map(ingest, batches)
+"""
+
+import collections
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Deque, Iterator, Optional, Set, Tuple
+
+from .client import AiCalcClient
+
+# Idle connections older than this are pinged before being handed out
+DEFAULT_HEALTH_CHECK_INTERVAL = 30.0
+
+
+class PoolTimeoutError(TimeoutError):
+    """No connection became available within the checkout timeout."""
+
+
+class AiCalcClientPool:
+    """Pool of connected AiCalcClient instances for use across threads.
+
+    The pool opens ``min_size`` connections up front and grows up to
+    ``max_size`` as threads ask for more. Each client is used by one thread
+    at a time: take one with ``connection()`` (or ``acquire()`` and
+    ``release()``), and when every connection is busy, callers wait up to
+    ``timeout`` seconds for one to be returned.
+
+    Broken connections are replaced automatically. A connection is closed
+    instead of returned when an error from the connection escapes the
+    ``connection()`` block. Idle connections that haven't been used for
+    ``health_check_interval`` seconds are pinged before they are handed out,
+    and any that fail are replaced with a new connection.
+    """
+
+    def __init__(self, pipe_name: str = "AiCalc_Bridge", address: Optional[str] = None,
+                 min_size: int = 1, max_size: int = 8, timeout: Optional[float] = 30.0,
+                 connect_timeout: int = 5000,
+                 health_check_interval: Optional[float] = DEFAULT_HEALTH_CHECK_INTERVAL,
+                 client_factory: Optional[Callable[[], AiCalcClient]] = None):
+        """
+        Args:
+            pipe_name: Name of the named pipe (default: AiCalc_Bridge)
+            address: Transport address overriding pipe_name, e.g. "tcp:127.0.0.1:8765"
+            min_size: Connections opened up front and kept open while idle
+            max_size: Most connections open at once
+            timeout: Default seconds acquire() waits for a free connection (None waits forever)
+            connect_timeout: Timeout for opening each connection, in milliseconds
+            health_check_interval: Seconds a connection may sit idle before
+                it is pinged on checkout; 0 pings every time, None never
+            client_factory: Returns a new, unconnected client; defaults to
+                AiCalcClient(pipe_name, address)
+        """
+        if max_size < 1 or not 0 <= min_size <= max_size:
+            raise ValueError(f"Need 0 <= min_size <= max_size and max_size >= 1, got {min_size}, {max_size}")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.health_check_interval = health_check_interval
+        self._client_factory = client_factory or (lambda: AiCalcClient(pipe_name, address))
+        # Idle clients with the time they were returned; the most recent is reused first
+        self._idle: Deque[Tuple[AiCalcClient, float]] = collections.deque()
+        self._in_use: Set[AiCalcClient] = set()
+        # Open connections plus connections being opened
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+        try:
+            for _ in range(min_size):
+                self._idle.append((self._open(), time.monotonic()))
+                self._size += 1
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def size(self) -> int:
+        """Open connections, idle or in use"""
+        with self._condition:
+            return self._size
+
+    @property
+    def idle(self) -> int:
+        """Connections waiting to be checked out"""
+        with self._condition:
+            return len(self._idle)
+
+    @property
+    def in_use(self) -> int:
+        """Connections checked out"""
+        with self._condition:
+            return len(self._in_use)
+
+    def _open(self) -> AiCalcClient:
+        client = self._client_factory()
+        try:
+            if not client.connect(self.connect_timeout):
+                raise ConnectionError("AiCalc did not answer ping")
+        except BaseException:
+            client.disconnect()
+            raise
+        return client
+
+    def _is_healthy(self, client: AiCalcClient, idle_since: float) -> bool:
+        if not client.is_connected():
+            return False
+        if self.health_check_interval is None or time.monotonic() - idle_since < self.health_check_interval:
+            return True
+        return client.ping()
+
+    def acquire(self, timeout: Optional[float] = None) -> AiCalcClient:
+        """Check out a connection for the calling thread's exclusive use.
+
+        Args:
+            timeout: Seconds to wait for a free connection; defaults to the
+                pool's timeout
+
+        Raises:
+            PoolTimeoutError: if every connection stayed busy for timeout seconds
+            ConnectionError: if a new connection couldn't be opened
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._condition:
+                while not self._idle and self._size >= self.max_size and not self._closed:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise PoolTimeoutError(
+                            f"No AiCalc connection became free within {timeout}s "
+                            f"({self.max_size} in use)")
+                    self._condition.wait(remaining)
+                if self._closed:
+                    raise ConnectionError("Connection pool is closed")
+                if self._idle:
+                    client, idle_since = self._idle.pop()
+                else:
+                    client, idle_since = None, 0.0
+                    self._size += 1  # Reserve the slot while connecting outside the lock
+
+            if client is not None:
+                # Health checks do I/O, so they also run outside the lock
+                if self._is_healthy(client, idle_since):
+                    break
+                self._discard(client)
+                continue
+
+            try:
+                client = self._open()
+            except BaseException:
+                with self._condition:
+                    self._size -= 1
+                    self._condition.notify()
+                raise
+            break
+
+        with self._condition:
+            if self._closed:
+                self._size -= 1
+                client.disconnect()
+                raise ConnectionError("Connection pool is closed")
+            self._in_use.add(client)
+        return client
+
+    def release(self, client: AiCalcClient, discard: bool = False) -> None:
+        """Return a connection to the pool.
+
+        Args:
+            client: A client from acquire()
+            discard: Close the connection instead, e.g. after a protocol
+                error left it in an unknown state
+        """
+        with self._condition:
+            if client not in self._in_use:
+                raise ValueError("Client was not checked out from this pool")
+            self._in_use.discard(client)
+            if not (discard or self._closed or not client.is_connected()):
+                self._idle.append((client, time.monotonic()))
+                self._condition.notify()
+                return
+            self._size -= 1
+            self._condition.notify()
+        client.disconnect()
+
+    def _discard(self, client: AiCalcClient) -> None:
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+        client.disconnect()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[AiCalcClient]:
+        """Check out a connection for the duration of a with block.
+
+        The connection is closed rather than returned if a ConnectionError
+        or OSError escapes the block.
+        """
+        client = self.acquire(timeout)
+        try:
+            yield client
+        except (ConnectionError, OSError):
+            self.release(client, discard=True)
+            raise
+        except BaseException:
+            self.release(client)
+            raise
+        self.release(client)
+
+    def close(self) -> None:
+        """Close idle connections; checked-out ones close when released."""
+        with self._condition:
+            self._closed = True
+            idle = [client for client, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._condition.notify_all()
+        for client in idle:
+            client.disconnect()
+
+    def __enter__(self) -> "AiCalcClientPool":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return (f"AiCalcClientPool(size={self.size}, idle={self.idle}, in_use={self.in_use}, "
+                f"max_size={self.max_size})")
@@ -0,0 +1,131 @@
+"""Message codecs for the bridge protocol
+
+Messages are JSON until the hello handshake picks something else. The
+client lists the codecs it can use, most preferred first, and whether it
+accepts compressed frames:
+
+    {"command": "hello", "framing": "length", "codecs": ["msgpack", "json"], "compression": ["zlib"]}
+
+The bridge answers with its choice, and both sides use it for every frame
+that follows:
+
+    {"protocol": 1, "framing": "length", "codec": "msgpack", "compression": "zlib"}
+
+A bridge that leaves out "codec" keeps JSON, and one that leaves out
+"compression" never sends or expects compressed frames. MessagePack needs
+the optional ``msgpack`` package and is only offered when it is installed.
+The AiCalc app always picks JSON; only the stand-in bridge in
+aicalc_sdk.server picks MessagePack.
+"""
+
+import importlib.util
+import json
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+Payload = Union[bytes, bytearray, memoryview, str]
+
+
+class JsonCodec:
+    """UTF-8 JSON, the codec every bridge understands."""
+
+    name = "json"
+
+    def encode(self, message: Any) -> bytes:
+        return json.dumps(message, separators=(",", ":")).encode('utf-8')
+
+    def decode(self, payload: Payload) -> Any:
+        if isinstance(payload, memoryview):
+            payload = bytes(payload)
+        return json.loads(payload)
+
+
+class MsgpackCodec:
+    """MessagePack via the optional msgpack package.
+
+    Strings stay str and bytes stay bytes, and integer map keys are
+    allowed, so anything JSON carries round-trips unchanged.
+    """
+
+    name = "msgpack"
+
+    def __init__(self):
+        try:
+            import msgpack
+        except ImportError:
+            raise ImportError("The msgpack codec needs the msgpack package. Install with: pip install msgpack")
+        self._packb = msgpack.packb
+        self._unpackb = msgpack.unpackb
+
+    def encode(self, message: Any) -> bytes:
+        return self._packb(message, use_bin_type=True)
+
+    def decode(self, payload: Payload) -> Any:
+        return self._unpackb(payload, raw=False, strict_map_key=False)
+
+
+Codec = Union[JsonCodec, MsgpackCodec]
+
+JSON = JsonCodec()
+
+# Codec name -> class, in order of preference
+_CODECS = {
+    "msgpack": MsgpackCodec,
+    "json": JsonCodec,
+}
+
+# Compression schemes in order of preference; zlib is the only one for now
+COMPRESSION_SCHEMES = ("zlib",)
+
+
+def available_codecs() -> List[str]:
+    """Codecs usable in this process, most preferred first."""
+    names = []
+    for name in _CODECS:
+        if name != "msgpack" or importlib.util.find_spec("msgpack") is not None:
+            names.append(name)
+    return names
+
+
+def get_codec(name: str) -> Codec:
+    """Codec instance for a negotiated name.
+
+    Raises:
+        ValueError: for an unknown codec
+        ImportError: if the codec's package isn't installed
+    """
+    if name == "json":
+        return JSON
+    codec_class = _CODECS.get(name)
+    if codec_class is None:
+        raise ValueError(f"Unknown codec: {name!r}")
+    return codec_class()
+
+
+def hello_command(codecs: Optional[Sequence[str]] = None, compression: bool = True) -> Dict[str, Any]:
+    """The hello request a client sends to negotiate framing, codec and compression.
+
+    Send it on its own, not in a batch. The AiCalc app answers with JSON
+    whatever codecs are offered; only the stand-in bridge in
+    aicalc_sdk.server accepts MessagePack.
+
+    Args:
+        codecs: Codec names to offer, most preferred first; defaults to
+            available_codecs()
+        compression: Whether to accept compressed frames
+    """
+    command: Dict[str, Any] = {
+        "command": "hello",
+        "framing": "length",
+        "codecs": list(codecs) if codecs is not None else available_codecs(),
+    }
+    if compression:
+        command["compression"] = list(COMPRESSION_SCHEMES)
+    return command
+
+
+def choose(offered: Optional[Sequence[str]], supported: Sequence[str]) -> Optional[str]:
+    """First offered name that is also supported, or None."""
+    for name in offered or ():
+        if name in supported:
+            return name
+    return None
@@ -0,0 +1,665 @@
+"""
+Stand-in AiCalc bridge server
+
+A pure-Python server speaking the same JSON protocol as PythonBridgeService
+(ping, get_value, set_value, set_range, set_values, get_range, run_function,
+get_sheets, batch, watch/unwatch and the hello negotiation of framing, codec
+and compression) against an in-memory workbook. It lets the SDK be
+tested and benchmarked without the WinUI app, on any platform.
+
+Usage:
+    python -m aicalc_sdk.server --address tcp:127.0.0.1:8765 --functions my_functions.py
+
+Example:
+    from aicalc_sdk import connect
+    from aicalc_sdk.server import LocalBridgeServer
+
+    with LocalBridgeServer() as server:
+        client = connect(address=server.address)
+        client.set_value("A1", 42)
+"""
+
+import argparse
+import importlib.util
+import inspect
+import json
+import os
+import socketserver
+import statistics
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .serialization import COMPRESSION_SCHEMES, JSON, Codec, available_codecs, choose, get_codec
+from .transports import (COMPRESSION_THRESHOLD, FRAME_HEADER, decompress, encode_frame, parse_address,
+                         split_header, _split_host_port)
+
+# Same coalescing window as PythonBridgeService
+NOTIFICATION_INTERVAL = 0.016
+
+
+def _column_index(letters: str) -> int:
+    column = 0
+    for ch in letters:
+        column = column * 26 + (ord(ch.upper()) - ord('A') + 1)
+    return column - 1
+
+
+def _column_name(column: int) -> str:
+    letters = ""
+    column += 1
+    while column:
+        column, remainder = divmod(column - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def _format_value(value: Any) -> str:
+    """Render a value the way AiCalc displays it."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+
+def _object_type(raw: str) -> str:
+    if raw == "":
+        return "Empty"
+    if raw.upper() in ("TRUE", "FALSE"):
+        return "Boolean"
+    try:
+        float(raw)
+        return "Number"
+    except ValueError:
+        return "Text"
+
+
+def _numbers(args: List[Any]) -> List[float]:
+    values = []
+    for arg in args:
+        items = arg if isinstance(arg, list) else [arg]
+        for item in items:
+            try:
+                values.append(float(item))
+            except (TypeError, ValueError):
+                continue
+    return values
+
+
+BUILTIN_FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    "SUM": lambda *args: sum(_numbers(list(args))),
+    "AVERAGE": lambda *args: statistics.fmean(_numbers(list(args))),
+    "MIN": lambda *args: min(_numbers(list(args)), default=0),
+    "MAX": lambda *args: max(_numbers(list(args)), default=0),
+    "COUNT": lambda *args: len(_numbers(list(args))),
+}
+
+
+class InMemoryWorkbook:
+    """Sheets of raw cell values, addressed like AiCalc ("A1", "Sheet2!B3").
+
+    New sheets default to the same 20 x 12 grid AiCalc creates.
+    """
+
+    def __init__(self, sheet_names: Optional[List[str]] = None, rows: int = 20, columns: int = 12):
+        self.rows = rows
+        self.columns = columns
+        self.sheets: Dict[str, Dict[Tuple[int, int], str]] = {
+            name: {} for name in (sheet_names or ["Sheet1"])
+        }
+        self.functions: Dict[str, Callable[..., Any]] = dict(BUILTIN_FUNCTIONS)
+        self._listeners: List[Callable[[str, int, int], None]] = []
+        self._lock = threading.RLock()
+
+    @property
+    def default_sheet(self) -> str:
+        return next(iter(self.sheets))
+
+    def parse_cell_ref(self, cell_ref: str, bounded: bool = True) -> Optional[Tuple[str, int, int]]:
+        """Return (sheet, row, column) with 0-based indices, or None if invalid.
+
+        With ``bounded=False`` cells past the edge of the sheet are allowed.
+        """
+        sheet, _, cell_part = cell_ref.rpartition("!")
+        letters = cell_part.rstrip("0123456789")
+        digits = cell_part[len(letters):]
+        if not letters.isalpha() or not digits:
+            return None
+
+        row, column = int(digits) - 1, _column_index(letters)
+        sheet = sheet if sheet in self.sheets else self.default_sheet
+        if row < 0 or (bounded and not (row < self.rows and column < self.columns)):
+            return None
+        return sheet, row, column
+
+    def parse_range_ref(self, range_ref: str) -> Optional[Tuple[str, int, int, int, int]]:
+        """Return (sheet, first_row, first_column, last_row, last_column), or None.
+
+        Like AiCalc, the range is clipped to the sheet, so a range starting
+        past the last row comes back with first_row > last_row (no rows).
+        """
+        sheet, sep, cells = range_ref.rpartition("!")
+        start, _, end = cells.partition(":")
+        prefix = sheet + sep
+        first = self.parse_cell_ref(prefix + start, bounded=False)
+        last = self.parse_cell_ref(prefix + (end or start), bounded=False)
+        if first is None or last is None:
+            return None
+        return (first[0], min(first[1], last[1]), min(first[2], last[2]),
+                min(max(first[1], last[1]), self.rows - 1), min(max(first[2], last[2]), self.columns - 1))
+
+    def get(self, sheet: str, row: int, column: int) -> str:
+        with self._lock:
+            return self.sheets[sheet].get((row, column), "")
+
+    def set(self, sheet: str, row: int, column: int, value: Any) -> None:
+        self.set_many([(sheet, row, column, value)])
+
+    def set_many(self, writes: List[Tuple[str, int, int, Any]]) -> None:
+        """Apply (sheet, row, column, value) writes under one lock acquisition."""
+        with self._lock:
+            for sheet, row, column, value in writes:
+                raw = _format_value(value)
+                if raw:
+                    self.sheets[sheet][(row, column)] = raw
+                else:
+                    self.sheets[sheet].pop((row, column), None)
+            listeners = list(self._listeners)
+        for listener in listeners:
+            for sheet, row, column, _ in writes:
+                listener(sheet, row, column)
+
+    def add_listener(self, listener: Callable[[str, int, int], None]) -> None:
+        """Call listener(sheet, row, column) after every change."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, int, int], None]) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def get_range(self, sheet: str, first_row: int, first_column: int, last_row: int, last_column: int) -> List[List[str]]:
+        with self._lock:
+            cells = self.sheets[sheet]
+            return [
+                [cells.get((row, column), "") for column in range(first_column, last_column + 1)]
+                for row in range(first_row, last_row + 1)
+            ]
+
+    def register_function(self, func: Callable[..., Any], name: Optional[str] = None) -> None:
+        """Make a function callable through run_function.
+
+        Functions decorated with @aicalc_function register under their
+        AiCalc name unless ``name`` is given.
+        """
+        name = name or getattr(func, '_aicalc_name', None) or func.__name__.upper()
+        self.functions[name.upper()] = func
+
+    def load_functions(self, file_path: str) -> int:
+        """Register every @aicalc_function in a Python file; returns how many."""
+        path = os.path.abspath(file_path)
+        spec = importlib.util.spec_from_file_location(Path(path).stem, path)
+        if spec is None or spec.loader is None:
+            raise ImportError(f"Could not load module from {path}")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+        count = 0
+        for value in vars(module).values():
+            if callable(value) and getattr(value, '_aicalc_function', False):
+                self.register_function(value)
+                count += 1
+        return count
+
+
+class BridgeRequestHandler:
+    """Executes bridge commands against an InMemoryWorkbook.
+
+    Responses match PythonBridgeService: {"success": true, "data": ...} or
+    {"success": false, "error": "..."}.
+
+    Each connection gets its own handler. watch subscriptions need ``notify``,
+    which is called with each cells_changed event to push to the client.
+    """
+
+    def __init__(self, workbook: InMemoryWorkbook, notify: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.workbook = workbook
+        self._notify = notify
+        self._subscriptions: Dict[int, Tuple[str, int, int, int, int]] = {}
+        self._pending: Dict[Tuple[str, int, int], None] = {}
+        self._flush_timer: Optional[threading.Timer] = None
+        self._next_subscription_id = 0
+        self._watch_lock = threading.Lock()
+        self._commands = {
+            "ping": lambda request: self._success("pong"),
+            "get_value": self._get_value,
+            "set_value": self._set_value,
+            "set_range": self._set_range,
+            "set_values": self._set_values,
+            "get_range": self._get_range,
+            "run_function": self._run_function,
+            "get_sheets": self._get_sheets,
+            "batch": self._batch,
+            "hello": self._hello,
+            "watch": self._watch,
+            "unwatch": self._unwatch,
+        }
+
+    @staticmethod
+    def _success(data: Any = None) -> Dict[str, Any]:
+        return {"success": True, "data": data}
+
+    @staticmethod
+    def _error(error: str) -> Dict[str, Any]:
+        return {"success": False, "error": error}
+
+    def handle_message(self, payload: bytes, codec: Codec = JSON) -> Dict[str, Any]:
+        """Process one encoded request and return the response."""
+        try:
+            request = codec.decode(payload)
+            if not isinstance(request, dict):
+                return self._error("Invalid request format")
+            return self.execute(request)
+        except Exception as e:
+            return self._error(str(e))
+
+    def execute(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        # The C# service binds property names case-insensitively
+        request = {str(key).lower(): value for key, value in request.items()}
+        handler = self._commands.get(request.get("command"))
+        if handler is None:
+            return self._error(f"Unknown command: {request.get('command')}")
+        try:
+            return handler(request)
+        except Exception as e:
+            return self._error(str(e))
+
+    def _get_value(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        cell_ref = request.get("cellref")
+        if not cell_ref:
+            return self._error("CellRef is required")
+        address = self.workbook.parse_cell_ref(cell_ref)
+        if address is None:
+            return self._error(f"Cell not found: {cell_ref}")
+
+        raw = self.workbook.get(*address)
+        return self._success({
+            "cell_ref": cell_ref,
+            "value": raw,
+            "serialized_value": raw or None,
+            "object_type": _object_type(raw),
+            "formula": None,
+        })
+
+    def _set_value(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        cell_ref = request.get("cellref")
+        if not cell_ref:
+            return self._error("CellRef is required")
+        address = self.workbook.parse_cell_ref(cell_ref)
+        if address is None:
+            return self._error(f"Cell not found: {cell_ref}")
+
+        self.workbook.set(*address, request.get("value"))
+        return self._success({"cell_ref": cell_ref})
+
+    def _set_range(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        range_ref = request.get("rangeref")
+        if not range_ref:
+            return self._error("RangeRef is required")
+        rows = request.get("values")
+        if not isinstance(rows, list) or not all(isinstance(row, list) for row in rows):
+            return self._error("Values must be a list of rows")
+        anchor = self.workbook.parse_cell_ref(range_ref.split(":")[0])
+        if anchor is None:
+            return self._error(f"Invalid range: {range_ref}")
+
+        sheet, first_row, first_column = anchor
+        width = max((len(row) for row in rows), default=0)
+        if first_row + len(rows) > self.workbook.rows or first_column + width > self.workbook.columns:
+            return self._error("Range exceeds sheet bounds")
+
+        writes = [
+            (sheet, first_row + r, first_column + c, value)
+            for r, row in enumerate(rows)
+            for c, value in enumerate(row)
+        ]
+        self.workbook.set_many(writes)
+        if writes:
+            range_ref = (f"{sheet}!{_column_name(first_column)}{first_row + 1}:"
+                         f"{_column_name(first_column + width - 1)}{first_row + len(rows)}")
+        return self._success({"range_ref": range_ref, "cells_written": len(writes), "cells_evaluated": 0})
+
+    def _set_values(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        values = request.get("values")
+        if not isinstance(values, dict):
+            return self._error("Values must map cell references to values")
+
+        writes = []
+        for cell_ref, value in values.items():
+            address = self.workbook.parse_cell_ref(cell_ref)
+            if address is None:
+                return self._error(f"Cell not found: {cell_ref}")
+            writes.append((*address, value))
+        self.workbook.set_many(writes)
+        return self._success({"cells_written": len(writes), "cells_evaluated": 0})
+
+    def _get_range(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        range_ref = request.get("rangeref")
+        if not range_ref:
+            return self._error("RangeRef is required")
+        bounds = self.workbook.parse_range_ref(range_ref)
+        if bounds is None:
+            return self._error(f"Invalid range: {range_ref}")
+
+        return self._success({"range_ref": range_ref, "values": self.workbook.get_range(*bounds)})
+
+    def _run_function(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        function_name = request.get("functionname")
+        if not function_name:
+            return self._error("FunctionName is required")
+        func = self.workbook.functions.get(function_name.upper())
+        if func is None:
+            return self._error(f"Function not found: {function_name}")
+
+        try:
+            result = func(*(request.get("args") or []))
+            if inspect.iscoroutine(result):
+                # async def functions run to completion on this connection's thread
+                import asyncio
+                result = asyncio.run(result)
+            result = _format_value(result)
+        except Exception as e:
+            return self._error(f"Function execution failed: {e}")
+
+        return self._success({
+            "function_name": function_name,
+            "result": result,
+            "serialized_value": result or None,
+            "object_type": _object_type(result),
+        })
+
+    def _get_sheets(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        sheets = [
+            {"name": name, "row_count": self.workbook.rows, "column_count": self.workbook.columns}
+            for name in self.workbook.sheets
+        ]
+        return self._success({"sheets": sheets})
+
+    def _hello(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if request.get("framing") != "length":
+            return self._success({"protocol": 1, "framing": "newline"})
+        agreed = {"protocol": 1, "framing": "length", "codec": choose(request.get("codecs"), available_codecs()) or "json"}
+        compression = choose(request.get("compression"), COMPRESSION_SCHEMES)
+        if compression:
+            agreed["compression"] = compression
+        return self._success(agreed)
+
+    def _watch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if self._notify is None:
+            return self._error("Subscriptions are not supported on this connection")
+        range_ref = request.get("rangeref") or request.get("cellref")
+        if not range_ref:
+            return self._error("RangeRef is required")
+        bounds = self.workbook.parse_range_ref(range_ref)
+        if bounds is None:
+            return self._error(f"Invalid range: {range_ref}")
+
+        with self._watch_lock:
+            subscription_id = request.get("subscriptionid")
+            if subscription_id is None:
+                self._next_subscription_id += 1
+                while self._next_subscription_id in self._subscriptions:
+                    self._next_subscription_id += 1
+                subscription_id = self._next_subscription_id
+            if not self._subscriptions:
+                self.workbook.add_listener(self._on_change)
+            self._subscriptions[subscription_id] = bounds
+        return self._success({"subscription_id": subscription_id, "range_ref": range_ref})
+
+    def _unwatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        subscription_id = request.get("subscriptionid")
+        if subscription_id is None:
+            return self._error("SubscriptionId is required")
+        with self._watch_lock:
+            removed = self._subscriptions.pop(subscription_id, None) is not None
+            if removed and not self._subscriptions:
+                self.workbook.remove_listener(self._on_change)
+                self._pending.clear()
+        return self._success({"subscription_id": subscription_id, "removed": removed})
+
+    @staticmethod
+    def _contains(bounds: Tuple[str, int, int, int, int], sheet: str, row: int, column: int) -> bool:
+        return (bounds[0] == sheet and bounds[1] <= row <= bounds[3]
+                and bounds[2] <= column <= bounds[4])
+
+    def _on_change(self, sheet: str, row: int, column: int) -> None:
+        with self._watch_lock:
+            if not any(self._contains(b, sheet, row, column) for b in self._subscriptions.values()):
+                return
+            self._pending[(sheet, row, column)] = None
+            if self._flush_timer is not None:
+                return
+            self._flush_timer = threading.Timer(NOTIFICATION_INTERVAL, self._flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _flush(self) -> None:
+        """Push the latest state of every watched cell that changed during the last frame."""
+        with self._watch_lock:
+            self._flush_timer = None
+            pending, self._pending = self._pending, {}
+            subscriptions = list(self._subscriptions.items())
+
+        for subscription_id, bounds in subscriptions:
+            changes = []
+            for sheet, row, column in pending:
+                if self._contains(bounds, sheet, row, column):
+                    raw = self.workbook.get(sheet, row, column)
+                    changes.append({
+                        "cell_ref": f"{sheet}!{_column_name(column)}{row + 1}",
+                        "value": raw,
+                        "serialized_value": raw or None,
+                        "object_type": _object_type(raw),
+                        "formula": None,
+                    })
+            if changes and self._notify is not None:
+                try:
+                    self._notify({"event": "cells_changed", "subscription_id": subscription_id, "changes": changes})
+                except OSError:
+                    # The client is gone; close() drops its subscriptions
+                    return
+
+    def close(self) -> None:
+        """Drop all subscriptions."""
+        with self._watch_lock:
+            if self._subscriptions:
+                self.workbook.remove_listener(self._on_change)
+            self._subscriptions.clear()
+            self._pending.clear()
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+
+    def _batch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        commands = request.get("commands")
+        if not commands:
+            return self._error("Commands are required")
+
+        results = []
+        for command in commands:
+            if not isinstance(command, dict):
+                results.append(self._error("Invalid request format"))
+            elif str(command.get("command", "")).lower() == "batch":
+                results.append(self._error("Nested batches are not supported"))
+            elif str(command.get("command", "")).lower() == "hello":
+                # Its answer would promise framing the connection never switches to
+                results.append(self._error("hello can't be sent in a batch"))
+            else:
+                results.append(self.execute(command))
+        return self._success({"results": results})
+
+
+class _StreamHandler(socketserver.StreamRequestHandler):
+    def _read_frame(self) -> Optional[bytes]:
+        header = self.rfile.read(FRAME_HEADER.size)
+        if len(header) < FRAME_HEADER.size:
+            return None
+        try:
+            length, compressed = split_header(FRAME_HEADER.unpack(header)[0])
+            payload = self.rfile.read(length)
+            if len(payload) != length:
+                return None
+            return decompress(payload) if compressed else payload
+        except ConnectionError:
+            return None
+
+    def _write(self, message: Dict[str, Any]) -> None:
+        """Send a response or pushed event in the connection's current framing."""
+        with self._write_lock:
+            if self._framed:
+                self.wfile.write(encode_frame(self._codec.encode(message), self._compress_threshold))
+                return
+            self.wfile.write(json.dumps(message).encode('utf-8') + b"\n")
+            # Everything after an accepted hello is length-prefixed, in the agreed codec
+            agreed = message.get("data")
+            if isinstance(agreed, dict) and agreed.get("protocol") and agreed.get("framing") == "length":
+                self._codec = get_codec(agreed.get("codec", "json"))
+                self._compress_threshold = COMPRESSION_THRESHOLD if agreed.get("compression") else None
+                self._framed = True
+
+    def handle(self) -> None:
+        self._write_lock = threading.Lock()
+        self._framed = False
+        self._codec: Codec = JSON
+        self._compress_threshold: Optional[int] = None
+        bridge = BridgeRequestHandler(self.server.workbook, notify=self._write)
+        try:
+            while True:
+                payload = self._read_frame() if self._framed else self.rfile.readline()
+                if not payload:
+                    break
+                if not self._framed and not payload.strip():
+                    continue
+                self._write(bridge.handle_message(payload, self._codec))
+        finally:
+            bridge.close()
+
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _ThreadingUnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+
+class LocalBridgeServer:
+    """Serves an InMemoryWorkbook over a Unix socket or TCP.
+
+    Each connection gets its own thread; commands on a connection are
+    answered in order, as with the real bridge.
+
+    Args:
+        address: "tcp:host:port" (port 0 picks a free port) or "unix:/path"
+        workbook: Workbook to serve (default: a new InMemoryWorkbook)
+    """
+
+    def __init__(self, address: str = "tcp:127.0.0.1:0", workbook: Optional[InMemoryWorkbook] = None):
+        self.workbook = workbook or InMemoryWorkbook()
+        self._requested_address = address
+        self._server: Optional[socketserver.BaseServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> str:
+        """Address clients should connect to (with the bound port for TCP)."""
+        if self._server is None:
+            return self._requested_address
+        if isinstance(self._server, _ThreadingTCPServer):
+            host, port = self._server.server_address[:2]
+            return f"tcp:{host}:{port}"
+        return f"unix:{self._server.server_address}"
+
+    def start(self) -> "LocalBridgeServer":
+        """Bind and serve on a background thread."""
+        if self._server is not None:
+            return self
+
+        scheme, target = parse_address(self._requested_address)
+        if scheme == "tcp":
+            server = _ThreadingTCPServer(_split_host_port(target), _StreamHandler)
+        elif scheme == "unix":
+            if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+                raise ValueError("Unix domain sockets are not supported on this platform")
+            if os.path.exists(target):
+                os.unlink(target)
+            server = _ThreadingUnixServer(target, _StreamHandler)
+        else:
+            raise ValueError(f"LocalBridgeServer supports unix: and tcp: addresses, got {self._requested_address!r}")
+
+        server.workbook = self.workbook
+        self._server = server
+        self._thread = threading.Thread(target=server.serve_forever, name="aicalc-local-bridge", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and release the address."""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        scheme, target = parse_address(self._requested_address)
+        if scheme == "unix" and os.path.exists(target):
+            os.unlink(target)
+        self._server = None
+        self._thread = None
+
+    def serve_forever(self) -> None:
+        """Serve until interrupted."""
+        self.start()
+        try:
+            self._thread.join()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve an in-memory AiCalc workbook over the bridge protocol")
+    parser.add_argument("--address", default="tcp:127.0.0.1:8765", help="unix:/path or tcp:host:port")
+    parser.add_argument("--sheets", type=int, default=1, help="Number of sheets")
+    parser.add_argument("--rows", type=int, default=20, help="Rows per sheet")
+    parser.add_argument("--columns", type=int, default=12, help="Columns per sheet")
+    parser.add_argument("--functions", action="append", default=[], metavar="FILE",
+                        help="Python file whose @aicalc_function functions are exposed to run_function")
+    args = parser.parse_args(argv)
+
+    workbook = InMemoryWorkbook([f"Sheet{i + 1}" for i in range(args.sheets)], args.rows, args.columns)
+    for file_path in args.functions:
+        workbook.load_functions(file_path)
+
+    server = LocalBridgeServer(args.address, workbook)
+    server.start()
+    print(f"Serving AiCalc bridge on {server.address}")
+    server.serve_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,351 @@
+"""Transports carrying bridge messages between the SDK and AiCalc
+
+Addresses select the backend:
+
+    "AiCalc_Bridge" or "pipe:AiCalc_Bridge"   Windows named pipe
+    "unix:/tmp/aicalc.sock"                   Unix domain socket
+    "tcp:127.0.0.1:8765"                      TCP (loopback)
+
+Named pipes need pywin32, which is only imported when a pipe is opened, so
+the socket backends work on any platform. asyncio is likewise only imported
+by open_stream, keeping the synchronous client's import cheap.
+
+Messages start out newline-delimited. After a successful
+{"command": "hello", "framing": "length"} exchange both sides switch to
+frames: a 4-byte little-endian length followed by that many bytes of the
+negotiated codec (JSON unless hello chose another, see serialization.py),
+so responses of any size arrive intact. If hello also agreed on
+compression, the top bit of the length marks a zlib-compressed body.
+"""
+
+import socket
+import struct
+import sys
+import time
+import zlib
+from typing import TYPE_CHECKING, Any, Optional, Tuple
+
+if TYPE_CHECKING:
+    import asyncio
+
+FRAME_HEADER = struct.Struct('<I')
+
+# Same limit as PythonBridgeService
+MAX_FRAME_SIZE = 256 * 1024 * 1024
+
+# Top bit of a frame's length: the body is zlib-compressed
+COMPRESSED_FLAG = 0x80000000
+
+# Smallest body worth compressing once compression is negotiated
+COMPRESSION_THRESHOLD = 16 * 1024
+
+# Every instance of the pipe is connected; wait for the bridge to open another
+ERROR_PIPE_BUSY = 231
+
+
+def parse_address(address: str) -> Tuple[str, str]:
+    """Split an address into (scheme, target); bare names are pipe names."""
+    scheme, sep, target = address.partition(":")
+    if sep and scheme in ("pipe", "unix", "tcp"):
+        return scheme, target
+    return "pipe", address
+
+
+def _split_host_port(target: str) -> Tuple[str, int]:
+    host, _, port = target.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"TCP address must be host:port, got {target!r}")
+    return host.strip("[]"), int(port)
+
+
+class Transport:
+    """Byte stream to the bridge. Subclasses implement send/recv/close."""
+
+    def send(self, data: bytes) -> None:
+        """Write all of data."""
+        raise NotImplementedError
+
+    def recv(self, max_bytes: int) -> bytes:
+        """Read up to max_bytes; returns b"" when the peer has closed."""
+        raise NotImplementedError
+
+    def recv_into(self, buffer: memoryview) -> int:
+        """Read into buffer and return the number of bytes read (0 at end of stream)."""
+        data = self.recv(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+
+class NamedPipeTransport(Transport):
+    """Windows named pipe (byte mode) via pywin32.
+
+    The handle is overlapped so a thread blocked reading (e.g. a client
+    watching cells) doesn't stall writes from other threads.
+
+    The bridge keeps one unconnected pipe instance open and creates the next
+    as soon as a client takes it. Clients that connect in the gap between the
+    two get ERROR_PIPE_BUSY and wait for the next instance, up to timeout
+    seconds (None waits indefinitely).
+    """
+
+    def __init__(self, pipe_name: str, timeout: Optional[float] = 5.0):
+        try:
+            import win32event
+            import win32file
+            import win32pipe
+            import pywintypes
+        except ImportError:
+            raise ConnectionError("pywin32 is required for named pipe communication. Install with: pip install pywin32")
+
+        self._win32event = win32event
+        self._win32file = win32file
+        self._pywintypes = pywintypes
+        self.pipe_name = pipe_name if pipe_name.startswith("\\\\") else f"\\\\.\\pipe\\{pipe_name}"
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                self._handle = win32file.CreateFile(
+                    self.pipe_name,
+                    win32file.GENERIC_READ | win32file.GENERIC_WRITE,
+                    0,
+                    None,
+                    win32file.OPEN_EXISTING,
+                    win32file.FILE_FLAG_OVERLAPPED,
+                    None
+                )
+                return
+            except pywintypes.error as e:
+                if e.winerror != ERROR_PIPE_BUSY:
+                    raise ConnectionError(str(e))
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise ConnectionError(f"Timed out waiting for {self.pipe_name}: {e}")
+
+            try:
+                # Another client may take the instance first, in which case CreateFile fails busy again
+                win32pipe.WaitNamedPipe(self.pipe_name,
+                                        win32pipe.NMPWAIT_WAIT_FOREVER if remaining is None
+                                        else max(1, int(remaining * 1000)))
+            except pywintypes.error as e:
+                raise ConnectionError(f"Timed out waiting for {self.pipe_name}: {e}")
+
+    def _overlapped_io(self, operation, data) -> Tuple[Any, int]:
+        """Run an overlapped ReadFile/WriteFile and wait for it to finish."""
+        overlapped = self._pywintypes.OVERLAPPED()
+        overlapped.hEvent = self._win32event.CreateEvent(None, True, False, None)
+        try:
+            _, buffer = operation(self._handle, data, overlapped)
+            return buffer, self._win32file.GetOverlappedResult(self._handle, overlapped, True)
+        finally:
+            self._win32file.CloseHandle(overlapped.hEvent)
+
+    def send(self, data: bytes) -> None:
+        self._overlapped_io(self._win32file.WriteFile, data)
+
+    def recv(self, max_bytes: int) -> bytes:
+        buffer, transferred = self._overlapped_io(self._win32file.ReadFile,
+                                                  self._win32file.AllocateReadBuffer(max_bytes))
+        return bytes(buffer[:transferred])
+
+    def close(self) -> None:
+        if self._handle:
+            self._win32file.CloseHandle(self._handle)
+            self._handle = None
+
+
+class SocketTransport(Transport):
+    """Unix domain or TCP socket."""
+
+    def __init__(self, sock: socket.socket):
+        self._socket = sock
+
+    @classmethod
+    def connect_unix(cls, path: str, timeout: Optional[float] = None) -> "SocketTransport":
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.settimeout(None)
+        return cls(sock)
+
+    @classmethod
+    def connect_tcp(cls, host: str, port: int, timeout: Optional[float] = None) -> "SocketTransport":
+        sock = socket.create_connection((host, port), timeout=timeout)
+        sock.settimeout(None)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return cls(sock)
+
+    def send(self, data: bytes) -> None:
+        self._socket.sendall(data)
+
+    def recv(self, max_bytes: int) -> bytes:
+        return self._socket.recv(max_bytes)
+
+    def recv_into(self, buffer: memoryview) -> int:
+        return self._socket.recv_into(buffer)
+
+    def close(self) -> None:
+        try:
+            # Wake up a thread blocked in recv() before closing
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            self._socket.close()
+        except OSError:
+            pass
+
+
+def encode_frame(payload: bytes, compress_threshold: Optional[int] = None) -> bytes:
+    """Prefix a payload with its length.
+
+    With a compress_threshold, payloads at least that large are sent
+    zlib-compressed when that makes them smaller.
+    """
+    if compress_threshold is not None and len(payload) >= compress_threshold:
+        compressed = zlib.compress(payload, 1)
+        if len(compressed) < len(payload):
+            return FRAME_HEADER.pack(len(compressed) | COMPRESSED_FLAG) + compressed
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+def split_header(header: int) -> Tuple[int, bool]:
+    """Frame length field -> (body length, whether the body is compressed)."""
+    length = header & ~COMPRESSED_FLAG
+    if length > MAX_FRAME_SIZE:
+        raise ConnectionError(f"Frame of {length} bytes exceeds the {MAX_FRAME_SIZE} byte limit")
+    return length, bool(header & COMPRESSED_FLAG)
+
+
+def decompress(body: Any) -> bytes:
+    """Inflate a compressed frame body, refusing more than MAX_FRAME_SIZE bytes."""
+    inflater = zlib.decompressobj()
+    data = inflater.decompress(body, MAX_FRAME_SIZE)
+    if inflater.unconsumed_tail or not inflater.eof:
+        raise ConnectionError("Compressed frame is truncated or inflates past the frame size limit")
+    return data
+
+
+class MessageReader:
+    """Reads messages from a transport into one reusable buffer.
+
+    Data is received straight into a bytearray with recv_into() and decoded
+    from a memoryview, so a large response costs one buffer rather than a
+    growing pile of chunks. The buffer grows to fit the largest message and
+    shrinks back once a message over ``retain_size`` has been consumed.
+    """
+
+    def __init__(self, transport: Transport, initial_size: int = 64 * 1024, retain_size: int = 4 * 1024 * 1024):
+        self._transport = transport
+        self._initial_size = initial_size
+        self._retain_size = retain_size
+        self._buffer = bytearray(initial_size)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+
+    def _reserve(self, needed: int) -> None:
+        """Make room for at least ``needed`` unread bytes in total."""
+        unread = self._end - self._start
+        if needed <= len(self._buffer) - self._start:
+            return
+        if needed <= len(self._buffer):
+            # Compact unread bytes to the front
+            self._view[:unread] = self._view[self._start:self._end]
+        else:
+            size = len(self._buffer)
+            while size < needed:
+                size *= 2
+            buffer = bytearray(size)
+            buffer[:unread] = self._view[self._start:self._end]
+            self._view.release()
+            self._buffer = buffer
+            self._view = memoryview(buffer)
+        self._start, self._end = 0, unread
+
+    def _fill(self) -> None:
+        if self._end == len(self._buffer):
+            self._reserve(self._end - self._start + self._initial_size)
+        count = self._transport.recv_into(self._view[self._end:])
+        if count == 0:
+            raise ConnectionError("Connection closed by AiCalc")
+        self._end += count
+
+    def _advance(self, next_start: int) -> None:
+        """Mark everything before next_start as consumed."""
+        self._start = next_start
+        if self._start == self._end:
+            self._start = self._end = 0
+            if len(self._buffer) > self._retain_size:
+                self._view.release()
+                self._buffer = bytearray(self._initial_size)
+                self._view = memoryview(self._buffer)
+
+    def read_line(self) -> str:
+        """Read one newline-terminated message (without the newline)."""
+        scanned = self._start
+        while True:
+            index = self._buffer.find(b"\n", scanned, self._end)
+            if index >= 0:
+                text = str(self._view[self._start:index], 'utf-8')
+                self._advance(index + 1)
+                return text
+            scanned = self._end
+            offset = self._start
+            self._fill()
+            scanned -= offset - self._start
+
+    def read_frame(self) -> bytes:
+        """Read one length-prefixed message, inflated if it was compressed."""
+        while self._end - self._start < FRAME_HEADER.size:
+            self._fill()
+        (header,) = FRAME_HEADER.unpack_from(self._buffer, self._start)
+        length, compressed = split_header(header)
+
+        self._reserve(FRAME_HEADER.size + length)
+        while self._end - self._start < FRAME_HEADER.size + length:
+            self._fill()
+        body = self._start + FRAME_HEADER.size
+        view = self._view[body:body + length]
+        data = decompress(view) if compressed else bytes(view)
+        view.release()
+        self._advance(body + length)
+        return data
+
+
+def open_transport(address: str, timeout: Optional[float] = 5.0) -> Transport:
+    """Open a blocking transport for an address (see module docstring)."""
+    scheme, target = parse_address(address)
+    try:
+        if scheme == "unix":
+            return SocketTransport.connect_unix(target, timeout)
+        if scheme == "tcp":
+            host, port = _split_host_port(target)
+            return SocketTransport.connect_tcp(host, port, timeout)
+    except OSError as e:
+        raise ConnectionError(f"Could not connect to {address}: {e}")
+    return NamedPipeTransport(target, timeout)
+
+
+async def open_stream(address: str, limit: int) -> Tuple["asyncio.StreamReader", "asyncio.StreamWriter"]:
+    """Open an asyncio (reader, writer) pair for an address."""
+    import asyncio
+
+    scheme, target = parse_address(address)
+    if scheme == "unix":
+        return await asyncio.open_unix_connection(target, limit=limit)
+    if scheme == "tcp":
+        host, port = _split_host_port(target)
+        return await asyncio.open_connection(host, port, limit=limit)
+
+    loop = asyncio.get_running_loop()
+    if sys.platform != "win32" or not hasattr(loop, "create_pipe_connection"):
+        raise OSError("Named pipes require Windows with the Proactor event loop")
+
+    pipe_name = target if target.startswith("\\\\") else f"\\\\.\\pipe\\{target}"
+    reader = asyncio.StreamReader(limit=limit)
+    protocol = asyncio.StreamReaderProtocol(reader)
+    transport, _ = await loop.create_pipe_connection(lambda: protocol, pipe_name)
+    return reader, asyncio.StreamWriter(transport, protocol, reader, loop)
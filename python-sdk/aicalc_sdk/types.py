@@ -31,3 +31,22 @@ class CellValue:
     
     def __str__(self) -> str:
         return self.display_value or ""
+
+@dataclass
+class CellChange:
+    """A changed cell pushed to a watch() subscription"""
+    cell_ref: str
+    value: Optional[str]
+    object_type: str
+    formula: Optional[str] = None
+    serialized_value: Optional[str] = None
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'CellChange':
+        return cls(
+            cell_ref=data.get("cell_ref", ""),
+            value=data.get("value"),
+            object_type=data.get("object_type", "Empty"),
+            formula=data.get("formula"),
+            serialized_value=data.get("serialized_value"),
+        )
@@ -0,0 +1,506 @@
+"""
+AiCalc Function Worker
+
+Long-lived worker process that AiCalc keeps running to execute
+@aicalc_function calls. Modules are imported once and stay resident, so a
+call costs a frame round trip instead of an interpreter startup.
+
+Usage:
+    python worker.py
+
+Protocol:
+    Every message in both directions is a frame: a 4-byte little-endian
+    unsigned length followed by that many bytes of UTF-8 JSON.
+
+    Requests:
+        {"id": 1, "command": "ping"}
+        {"id": 2, "command": "load", "file_path": "path/to/file.py"}
+        {"id": 3, "command": "call", "file_path": "path/to/file.py",
+         "function_name": "custom_sum", "args": [1, 2]}
+        {"id": 4, "command": "call_batch", "file_path": "path/to/file.py",
+         "function_name": "scale", "args_batch": [[1, 2], [3, 2]]}
+        {"id": 5, "command": "shutdown"}
+
+    Responses echo the request id:
+        {"id": 3, "success": true, "output": "3", "error": null}
+        {"id": 4, "success": true, "outputs": ["2", "6"], "errors": [null, null]}
+
+    ``output`` is the function result rendered as text: dicts and lists are
+    JSON encoded, None becomes an empty string and anything else goes
+    through ``str()``.
+
+    ``call_batch`` evaluates one argument list per cell. Functions declared
+    with ``vectorized=True`` are called once per batch with one column per
+    parameter; other functions are called once per cell. Failures are
+    reported per cell in ``errors``.
+
+    ``async def`` functions run on an event loop in a second thread, so
+    calls to them overlap: the worker keeps reading requests while they
+    wait on I/O, and answers each one when it finishes. The cells of a
+    ``call_batch`` also run concurrently. At most ``max_concurrency`` calls
+    of one function are in flight at a time (DEFAULT_MAX_CONCURRENCY unless
+    the decorator sets it); further calls wait their turn.
+
+    Other functions run on a small thread pool (DEFAULT_THREADS), so one
+    slow call doesn't hold up calls to other functions. Calls of one sync
+    function run one at a time, since most weren't written to be
+    thread-safe; a function that is can opt in to more with
+    ``max_concurrency``. Calls past the limit wait in a queue of their own
+    rather than on a pool thread, so they don't hold up other functions.
+
+    Responses to calls can therefore arrive in a different order from the
+    requests. Modules are imported on the thread that reads requests.
+"""
+
+import os
+import sys
+
+# Running as a script puts aicalc_sdk/ on sys.path, where types.py would
+# shadow the standard library module of the same name.
+_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:] = [p for p in sys.path if os.path.abspath(p or os.curdir) != _SCRIPT_DIR]
+
+import asyncio
+import inspect
+import json
+import struct
+import threading
+import weakref
+import importlib.util
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple
+
+_HEADER = struct.Struct('<I')
+
+# Calls of one async function in flight at once, unless it sets max_concurrency
+DEFAULT_MAX_CONCURRENCY = 1000
+
+# Threads running calls to sync functions
+DEFAULT_THREADS = 4
+
+# Calls of one sync function running at once, unless it sets max_concurrency
+DEFAULT_SYNC_CONCURRENCY = 1
+
+
+def read_frame(stream: BinaryIO) -> Optional[Dict[str, Any]]:
+    """Read one length-prefixed JSON frame, or None at end of stream."""
+    header = stream.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None
+
+    (length,) = _HEADER.unpack(header)
+    payload = stream.read(length)
+    if len(payload) < length:
+        return None
+
+    return json.loads(payload)
+
+
+def write_frame(stream: BinaryIO, message: Dict[str, Any]) -> None:
+    """Write one length-prefixed JSON frame and flush it."""
+    payload = json.dumps(message, ensure_ascii=False).encode('utf-8')
+    stream.write(_HEADER.pack(len(payload)) + payload)
+    stream.flush()
+
+
+def render_output(result: Any) -> str:
+    """Render a function result the way AiCalc parses it."""
+    if isinstance(result, (dict, list)):
+        return json.dumps(result, ensure_ascii=False)
+    if result is None:
+        return ''
+    return str(result)
+
+
+def is_async_function(func) -> bool:
+    """Whether calling func returns a coroutine to await."""
+    return getattr(func, '_aicalc_async', False) or inspect.iscoroutinefunction(func)
+
+
+def _columns(func, rows: List[list]) -> list:
+    """Arguments for a vectorized call: one column per parameter."""
+    columns = [list(column) for column in zip(*rows)] if rows and rows[0] else []
+
+    if getattr(func, '_aicalc_array_type', 'list') == "numpy":
+        import numpy
+        columns = [numpy.asarray(column) for column in columns]
+    return columns
+
+
+def _vectorized_results(results, rows: List[list]) -> list:
+    if hasattr(results, 'tolist'):
+        results = results.tolist()
+    results = list(results)
+
+    if len(results) != len(rows):
+        raise ValueError(f"Vectorized function returned {len(results)} results for {len(rows)} cells")
+    return results
+
+
+def call_vectorized(func, rows: List[list]) -> list:
+    """Call a vectorized function with one column per parameter."""
+    return _vectorized_results(func(*_columns(func, rows)), rows)
+
+
+async def call_vectorized_async(func, rows: List[list]) -> list:
+    """call_vectorized for an async def function."""
+    return _vectorized_results(await func(*_columns(func, rows)), rows)
+
+
+def _group_by_length(args_batch: List[list]) -> List[List[int]]:
+    """Cell indices grouped by argument count.
+
+    Columns must line up, so cells passing fewer optional arguments are
+    called as a separate group.
+    """
+    groups: Dict[int, List[int]] = {}
+    for index, args in enumerate(args_batch):
+        groups.setdefault(len(args), []).append(index)
+    return list(groups.values())
+
+
+class _SyncLimit:
+    """Calls of one sync function running on the pool, and those waiting for a turn."""
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self.running = 0
+        # (request, respond) pairs in arrival order
+        self.waiting: deque = deque()
+
+
+class FunctionWorker:
+    """Keeps user modules resident and dispatches calls into them."""
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, threads: int = DEFAULT_THREADS):
+        """
+        Args:
+            max_concurrency: Calls of one async function in flight at once,
+                for functions that don't set their own max_concurrency
+            threads: Threads running calls to sync functions; 0 runs them on
+                the thread that reads requests, one at a time
+        """
+        # file path -> (mtime, module)
+        self._modules: Dict[str, Tuple[float, Any]] = {}
+        self._module_lock = threading.RLock()
+        self.max_concurrency = max_concurrency
+        self.threads = threads
+        # Thread pool for sync functions, started on first use
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # sync function -> calls running and queued
+        self._sync_limits: "weakref.WeakKeyDictionary[Callable, _SyncLimit]" = weakref.WeakKeyDictionary()
+        self._sync_limits_lock = threading.Lock()
+        # Event loop for async functions, started on first use
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        # function -> semaphore bounding its calls; only touched on the loop thread.
+        # Keyed weakly so functions from re-imported modules don't pile up.
+        self._limits: "weakref.WeakKeyDictionary[Callable, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+    def load_module(self, file_path: str):
+        """Import a module once, re-importing only when the file changes."""
+        path = os.path.abspath(file_path)
+        mtime = os.path.getmtime(path)
+
+        cached = self._modules.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        with self._module_lock:
+            # Another thread may have imported it while this one waited
+            cached = self._modules.get(path)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+
+            spec = importlib.util.spec_from_file_location(Path(path).stem, path)
+            if spec is None or spec.loader is None:
+                raise ImportError(f"Could not load module from {path}")
+
+            module = importlib.util.module_from_spec(spec)
+
+            # Add parent directory to sys.path so relative imports work
+            parent_dir = str(Path(path).parent)
+            if parent_dir not in sys.path:
+                sys.path.insert(0, parent_dir)
+
+            spec.loader.exec_module(module)
+            self._modules[path] = (mtime, module)
+            return module
+
+    def get_function(self, file_path: str, function_name: str):
+        """Look up a function in a (cached) module."""
+        module = self.load_module(file_path)
+        func = getattr(module, function_name, None)
+        if func is None or not callable(func):
+            raise AttributeError(f"Function not found: {function_name}")
+        return func
+
+    def call(self, file_path: str, function_name: str, args: list) -> Any:
+        """Call a function from a (cached) module."""
+        func = self.get_function(file_path, function_name)
+        if is_async_function(func):
+            return self.run(self.call_async(func, args))
+        if getattr(func, '_aicalc_vectorized', False):
+            return call_vectorized(func, [args])[0]
+        return func(*args)
+
+    def call_batch(self, file_path: str, function_name: str, args_batch: List[list]) -> Tuple[List[Optional[str]], List[Optional[str]]]:
+        """Call a function for many cells, returning rendered outputs and per-cell errors."""
+        func = self.get_function(file_path, function_name)
+        if is_async_function(func):
+            return self.run(self.call_batch_async(func, args_batch))
+
+        outputs: List[Optional[str]] = [None] * len(args_batch)
+        errors: List[Optional[str]] = [None] * len(args_batch)
+
+        if getattr(func, '_aicalc_vectorized', False):
+            for indices in _group_by_length(args_batch):
+                try:
+                    results = call_vectorized(func, [args_batch[i] for i in indices])
+                    for index, result in zip(indices, results):
+                        outputs[index] = render_output(result)
+                except Exception as e:
+                    for index in indices:
+                        errors[index] = f"{type(e).__name__}: {e}"
+        else:
+            for index, args in enumerate(args_batch):
+                try:
+                    outputs[index] = render_output(func(*args))
+                except Exception as e:
+                    errors[index] = f"{type(e).__name__}: {e}"
+
+        return outputs, errors
+
+    def _submit_sync(self, request: Dict[str, Any], func, respond: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Start a sync call on the thread pool, or queue it if func already has
+        max_concurrency calls running (DEFAULT_SYNC_CONCURRENCY unless the
+        decorator sets it). Queued calls don't occupy a pool thread:
+        whichever call of func finishes first runs the next one.
+        """
+        max_concurrency = getattr(func, '_aicalc_max_concurrency', None) or DEFAULT_SYNC_CONCURRENCY
+        with self._sync_limits_lock:
+            limit = self._sync_limits.get(func)
+            if limit is None:
+                limit = self._sync_limits[func] = _SyncLimit(max_concurrency)
+            if limit.running >= limit.max_concurrency:
+                limit.waiting.append((request, respond))
+                return
+            limit.running += 1
+        self._thread_pool().submit(self._run_limited, limit, request, respond)
+
+    def _run_limited(self, limit: _SyncLimit, request: Dict[str, Any],
+                     respond: Callable[[Dict[str, Any]], None]) -> None:
+        """Answer a call, then the calls queued behind it, on one pool thread."""
+        while True:
+            try:
+                response = self.handle(request)
+            except BaseException as e:
+                # handle() reports ordinary exceptions itself; this catches e.g. SystemExit
+                response = {"id": request.get("id"), "success": False, "output": None,
+                            "error": f"{type(e).__name__}: {e}"}
+            respond(response)
+            with self._sync_limits_lock:
+                if not limit.waiting:
+                    limit.running -= 1
+                    return
+                request, respond = limit.waiting.popleft()
+
+    def _limit(self, func) -> asyncio.Semaphore:
+        """Semaphore bounding func's calls in flight; call on the loop thread."""
+        limit = self._limits.get(func)
+        if limit is None:
+            limit = asyncio.Semaphore(getattr(func, '_aicalc_max_concurrency', None) or self.max_concurrency)
+            self._limits[func] = limit
+        return limit
+
+    async def call_async(self, func, args: list) -> Any:
+        """Await one call of an async function, within its concurrency limit."""
+        async with self._limit(func):
+            if getattr(func, '_aicalc_vectorized', False):
+                return (await call_vectorized_async(func, [args]))[0]
+            return await func(*args)
+
+    async def call_batch_async(self, func, args_batch: List[list]) -> Tuple[List[Optional[str]], List[Optional[str]]]:
+        """call_batch for an async function; the cells (or groups) run concurrently."""
+        outputs: List[Optional[str]] = [None] * len(args_batch)
+        errors: List[Optional[str]] = [None] * len(args_batch)
+        limit = self._limit(func)
+
+        async def run_group(indices: List[int]) -> None:
+            try:
+                async with limit:
+                    results = await call_vectorized_async(func, [args_batch[i] for i in indices])
+                for index, result in zip(indices, results):
+                    outputs[index] = render_output(result)
+            except Exception as e:
+                for index in indices:
+                    errors[index] = f"{type(e).__name__}: {e}"
+
+        async def run_cell(index: int) -> None:
+            try:
+                async with limit:
+                    result = await func(*args_batch[index])
+                outputs[index] = render_output(result)
+            except Exception as e:
+                errors[index] = f"{type(e).__name__}: {e}"
+
+        if getattr(func, '_aicalc_vectorized', False):
+            await asyncio.gather(*(run_group(indices) for indices in _group_by_length(args_batch)))
+        else:
+            await asyncio.gather(*(run_cell(index) for index in range(len(args_batch))))
+        return outputs, errors
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(target=self._loop.run_forever, name="aicalc-worker-loop", daemon=True)
+            self._loop_thread.start()
+        return self._loop
+
+    def _thread_pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.threads, thread_name_prefix="aicalc-worker")
+        return self._executor
+
+    def run(self, coroutine) -> Any:
+        """Run a coroutine on the worker's event loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._event_loop()).result()
+
+    async def handle_async(self, request: Dict[str, Any], func) -> Dict[str, Any]:
+        """Process a call or call_batch request for an async function."""
+        request_id = request.get("id")
+        try:
+            if request.get("command") == "call_batch":
+                outputs, errors = await self.call_batch_async(func, request.get("args_batch") or [])
+                return {"id": request_id, "success": True, "outputs": outputs, "errors": errors, "error": None}
+            output = render_output(await self.call_async(func, request.get("args") or []))
+            return {"id": request_id, "success": True, "output": output, "error": None}
+        except Exception as e:
+            return {"id": request_id, "success": False, "output": None, "error": f"{type(e).__name__}: {e}"}
+
+    def dispatch(self, request: Dict[str, Any], respond: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Process a request, passing its response to respond.
+
+        Calls to async functions are started on the event loop, and calls to
+        other functions on the thread pool; respond is called from that
+        thread once they finish. Everything else, including a call whose
+        module fails to import, is handled before dispatch returns.
+        """
+        if request.get("command") in ("call", "call_batch"):
+            try:
+                func = self.get_function(request["file_path"], request["function_name"])
+            except Exception:
+                func = None  # handle() reports the error
+            if func is not None and is_async_function(func):
+                future = asyncio.run_coroutine_threadsafe(self.handle_async(request, func), self._event_loop())
+                future.add_done_callback(lambda done: self._respond_when_done(request, done, respond))
+                return
+            if func is not None and self.threads > 0:
+                self._submit_sync(request, func, respond)
+                return
+        respond(self.handle(request))
+
+    @staticmethod
+    def _respond_when_done(request: Dict[str, Any], done: Future,
+                           respond: Callable[[Dict[str, Any]], None]) -> None:
+        if done.cancelled():
+            return
+        error = done.exception()
+        if error is None:
+            respond(done.result())
+        else:
+            # handle() reports ordinary exceptions itself; this catches e.g. SystemExit
+            respond({"id": request.get("id"), "success": False, "output": None,
+                     "error": f"{type(error).__name__}: {error}"})
+
+    def close(self) -> None:
+        """Finish sync calls in flight, cancel async ones and stop the event loop."""
+        executor = self._executor
+        if executor is not None:
+            self._executor = None
+            executor.shutdown(wait=True)
+
+        loop = self._loop
+        if loop is None:
+            return
+        self._loop = None
+
+        async def cancel_pending():
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(cancel_pending(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        self._loop_thread.join()
+        loop.close()
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Process a single request and build its response."""
+        request_id = request.get("id")
+        command = request.get("command")
+
+        try:
+            if command == "ping":
+                output = "pong"
+            elif command == "load":
+                self.load_module(request["file_path"])
+                output = ""
+            elif command == "call":
+                result = self.call(
+                    request["file_path"],
+                    request["function_name"],
+                    request.get("args") or []
+                )
+                output = render_output(result)
+            elif command == "call_batch":
+                outputs, errors = self.call_batch(
+                    request["file_path"],
+                    request["function_name"],
+                    request.get("args_batch") or []
+                )
+                return {"id": request_id, "success": True, "outputs": outputs, "errors": errors, "error": None}
+            else:
+                raise ValueError(f"Unknown command: {command}")
+
+            return {"id": request_id, "success": True, "output": output, "error": None}
+        except Exception as e:
+            return {"id": request_id, "success": False, "output": None, "error": f"{type(e).__name__}: {e}"}
+
+    def serve(self, stdin: BinaryIO, stdout: BinaryIO) -> None:
+        """Serve requests until shutdown or end of input."""
+        write_lock = threading.Lock()
+
+        def respond(response: Dict[str, Any]) -> None:
+            # Async calls answer from the loop thread
+            with write_lock:
+                write_frame(stdout, response)
+
+        try:
+            while True:
+                request = read_frame(stdin)
+                if request is None or request.get("command") == "shutdown":
+                    break
+                self.dispatch(request, respond)
+        finally:
+            self.close()
+
+
+def main() -> int:
+    stdin = sys.stdin.buffer
+    stdout = sys.stdout.buffer
+
+    # User code that prints must not corrupt the frame stream
+    sys.stdout = sys.stderr
+
+    FunctionWorker().serve(stdin, stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
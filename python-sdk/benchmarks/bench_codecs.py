@@ -0,0 +1,111 @@
+"""Encode/decode cost and bytes on the wire for each bridge codec
+
+Runs typical command mixes through every available codec, with and without
+compression, and prints the time per message and the size of the frames
+that would be sent. The AiCalc app only speaks JSON; the MessagePack rows
+apply to the stand-in bridge in aicalc_sdk.server.
+
+Usage:
+    python benchmarks/bench_codecs.py [--repeat 200] [--json results.json]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from aicalc_sdk.serialization import available_codecs, get_codec  # noqa: E402
+from aicalc_sdk.transports import (COMPRESSION_THRESHOLD, FRAME_HEADER, decompress,  # noqa: E402
+                                   encode_frame, split_header)
+
+
+def _interactive() -> List[Dict[str, Any]]:
+    """Single-cell requests and their responses, as a UI automation script sends them."""
+    messages: List[Dict[str, Any]] = []
+    for row in range(1, 51):
+        messages.append({"command": "get_value", "cellRef": f"Sheet1!B{row}"})
+        messages.append({"success": True, "data": {"cell_ref": f"Sheet1!B{row}", "value": str(row * 1.5),
+                                                    "serialized_value": str(row * 1.5), "object_type": "Number",
+                                                    "formula": None}})
+        messages.append({"command": "set_value", "cellRef": f"Sheet1!C{row}", "value": row * 3})
+        messages.append({"success": True, "data": {"cell_ref": f"Sheet1!C{row}"}})
+    return messages
+
+
+def _bulk_write() -> List[Dict[str, Any]]:
+    rows = [[row, row * 0.25, f"item-{row % 50}", row % 2 == 0, None] for row in range(2000)]
+    return [{"command": "set_range", "rangeRef": "Data!A1", "values": rows},
+            {"success": True, "data": {"cells_written": 10000, "cells_evaluated": 0}}]
+
+
+def _bulk_read() -> List[Dict[str, Any]]:
+    values = [[str(row), f"{row * 0.25:g}", f"item-{row % 50}", "", "TRUE"] for row in range(5000)]
+    return [{"command": "get_range", "rangeRef": "Data!A1:E5000"},
+            {"success": True, "data": {"range_ref": "Data!A1:E5000", "values": values}}]
+
+
+MIXES = {
+    "interactive": _interactive,
+    "bulk_write": _bulk_write,
+    "bulk_read": _bulk_read,
+}
+
+
+def measure(codec_name: str, compression: bool, messages: List[Dict[str, Any]], repeat: int) -> Dict[str, Any]:
+    codec = get_codec(codec_name)
+    threshold = COMPRESSION_THRESHOLD if compression else None
+    frames = [encode_frame(codec.encode(message), threshold) for message in messages]
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for message in messages:
+            encode_frame(codec.encode(message), threshold)
+    encode_seconds = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for frame in frames:
+            length, compressed = split_header(FRAME_HEADER.unpack_from(frame)[0])
+            body = memoryview(frame)[FRAME_HEADER.size:FRAME_HEADER.size + length]
+            codec.decode(decompress(body) if compressed else body)
+    decode_seconds = (time.perf_counter() - start) / repeat
+
+    return {
+        "codec": codec_name,
+        "compression": compression,
+        "messages": len(messages),
+        "bytes": sum(len(frame) for frame in frames),
+        "encode_us": encode_seconds * 1e6,
+        "decode_us": decode_seconds * 1e6,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200, help="Passes over each mix (bulk mixes run a tenth as many)")
+    parser.add_argument("--json", metavar="FILE", help="Also write the results to FILE")
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f"{'mix':<12} {'codec':<8} {'zlib':<5} {'bytes':>10} {'encode us':>11} {'decode us':>11}")
+    for mix, build in MIXES.items():
+        messages = build()
+        repeat = args.repeat if mix == "interactive" else max(1, args.repeat // 10)
+        for codec_name in available_codecs():
+            for compression in (False, True):
+                result = dict(mix=mix, **measure(codec_name, compression, messages, repeat))
+                results.append(result)
+                print(f"{mix:<12} {codec_name:<8} {'yes' if compression else 'no':<5} {result['bytes']:>10,} "
+                      f"{result['encode_us']:>11,.0f} {result['decode_us']:>11,.0f}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,311 @@
+"""Micro-benchmarks for the SDK hot paths, with regression checks
+
+Times the per-call overhead of both Python SDKs and writes the results as
+JSON, so runs from different commits can be compared:
+
+    address.*     CellAddress.parse / to_string and ranges.parse_many (sdk/python)
+    message.*     IPCMessage.to_bytes / from_bytes (sdk/python)
+    decorator.*   @aicalc_function wrapper overhead against a plain call
+    discovery.*   discover_functions on generated files of 10 to 1000 functions
+    roundtrip.*   full client round trips to in-process servers over loopback:
+                  AiCalcClient to LocalBridgeServer, and Workbook to a stub
+                  that answers like PipeServer
+
+Each benchmark is timed in ``--repeat`` runs of at least ``--min-time``
+seconds; the fastest run is reported per operation, as timeit recommends,
+with the median alongside it for judging noise.
+
+Usage:
+    python benchmarks/microbench.py --json results/$(git rev-parse --short HEAD).json
+    python benchmarks/microbench.py --compare results/main.json --threshold 10
+    python benchmarks/microbench.py -k roundtrip --repeat 9
+
+With ``--compare``, benchmarks that got slower than the baseline by more
+than ``--threshold`` percent are listed and the exit status is 1.
+"""
+
+import argparse
+import contextlib
+import datetime
+import fnmatch
+import json
+import os
+import platform
+import socketserver
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import timeit
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+PYTHON_SDK = Path(__file__).resolve().parents[1]
+SDK_SRC = PYTHON_SDK.parent / "sdk" / "python" / "src"
+sys.path.insert(0, str(PYTHON_SDK))
+if SDK_SRC.is_dir():
+    sys.path.insert(0, str(SDK_SRC))
+
+RESULTS_VERSION = 1
+
+# name -> (function doing one batch, operations per batch)
+Benchmarks = Dict[str, Tuple[Callable[[], Any], int]]
+
+
+def _address_benchmarks(stack: contextlib.ExitStack) -> Benchmarks:
+    from aicalc.models import CellAddress
+    from aicalc.ranges import parse_many
+
+    # A spread of references, so lookups cached by column letters behave as in real use
+    refs = [f"Sheet{i % 3 + 1}!{'ABCDEFGHIJKLMNOPQRSTUVWXYZ'[i % 26]}{'Z' * (i % 2)}{i + 1}" for i in range(1000)]
+    addresses = [CellAddress.parse(ref) for ref in refs]
+    return {
+        "address.parse": (lambda: [CellAddress.parse(ref) for ref in refs], len(refs)),
+        "address.to_string": (lambda: [address.to_string() for address in addresses], len(addresses)),
+        "address.parse_many": (lambda: parse_many(refs), len(refs)),
+    }
+
+
+def _message_benchmarks(stack: contextlib.ExitStack) -> Benchmarks:
+    from aicalc.client import IPCMessage
+
+    small = IPCMessage("GetValue", {"sheet": "Sheet1", "row": 4, "column": 2}, 17)
+    block = IPCMessage("SetRange", {"range": "Data!A1", "values": [
+        [row, row * 0.25, f"item-{row}", row % 2 == 0, None] for row in range(1000)]}, 18)
+    small_bytes, block_bytes = small.to_bytes(), block.to_bytes()
+    return {
+        "message.to_bytes": (small.to_bytes, 1),
+        "message.from_bytes": (lambda: IPCMessage.from_bytes(small_bytes), 1),
+        "message.to_bytes.1k_rows": (block.to_bytes, 1),
+        "message.from_bytes.1k_rows": (lambda: IPCMessage.from_bytes(block_bytes), 1),
+    }
+
+
+def _decorator_benchmarks(stack: contextlib.ExitStack) -> Benchmarks:
+    from aicalc_sdk.decorators import aicalc_function
+
+    def plain(a, b):
+        return a + b
+
+    wrapped = aicalc_function(name="BENCH_ADD")(plain)
+    cached = aicalc_function(name="BENCH_CACHED", cache="memory")(plain)
+    cached(1, 2)
+    return {
+        "decorator.plain_call": (lambda: plain(1, 2), 1),
+        "decorator.wrapped_call": (lambda: wrapped(1, 2), 1),
+        "decorator.cache_hit": (lambda: cached(1, 2), 1),
+    }
+
+
+def _function_file(count: int) -> str:
+    """Source of a function library with count decorated functions."""
+    lines = ["from aicalc_sdk import aicalc_function", ""]
+    for i in range(count):
+        lines += [
+            f'@aicalc_function(name="FN_{i}", category="Bench", examples=["=FN_{i}(A1, 2)"])',
+            f"def fn_{i}(value: float, factor: float = 2.0) -> float:",
+            f'    """Function {i}"""',
+            "    return value * factor",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+def _discovery_benchmarks(stack: contextlib.ExitStack) -> Benchmarks:
+    from aicalc_sdk.discover_functions import discover_functions
+
+    directory = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="aicalc-bench-")))
+    benchmarks: Benchmarks = {}
+    for count in (10, 100, 1000):
+        path = directory / f"functions_{count}.py"
+        path.write_text(_function_file(count))
+        benchmarks[f"discovery.static.{count}"] = (
+            lambda path=str(path): discover_functions(path, mode="static"), 1)
+    benchmarks["discovery.import.100"] = (
+        lambda path=str(directory / "functions_100.py"): discover_functions(path, mode="import"), 1)
+    return benchmarks
+
+
+class _PipeServerStub(socketserver.BaseRequestHandler):
+    """Answers every request like PipeServer answers GetValue."""
+
+    def handle(self) -> None:
+        from aicalc.client import IPCMessage
+
+        stream = self.request.makefile("rb")
+        while True:
+            header = stream.read(4)
+            if len(header) < 4:
+                return
+            request = IPCMessage.from_bytes(stream.read(struct.unpack('<I', header)[0]))
+            response = IPCMessage(request.command + "Response", {"value": "42", "status": "success"},
+                                  request.request_id)
+            self.request.sendall(response.to_bytes())
+
+
+class _StubServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def _roundtrip_benchmarks(stack: contextlib.ExitStack) -> Benchmarks:
+    from aicalc_sdk.client import AiCalcClient
+    from aicalc_sdk.server import LocalBridgeServer
+
+    bridge = stack.enter_context(LocalBridgeServer("tcp:127.0.0.1:0"))
+    client = AiCalcClient(address=bridge.address)
+    if not client.connect():
+        raise ConnectionError("LocalBridgeServer did not answer")
+    stack.callback(client.disconnect)
+    client.set_range("Sheet1!A1", [[row * 12 + column for column in range(12)] for row in range(20)])
+
+    benchmarks: Benchmarks = {
+        "roundtrip.client.get_value": (lambda: client.get_value("Sheet1!B2"), 1),
+        "roundtrip.client.set_value": (lambda: client.set_value("Sheet1!C3", 1.5), 1),
+        "roundtrip.client.get_range": (lambda: client.get_range("Sheet1!A1:L20"), 1),
+        "roundtrip.client.run_function": (lambda: client.run_function("SUM", 1, 2, 3), 1),
+    }
+
+    try:
+        from aicalc.client import Workbook
+    except ImportError:
+        return benchmarks
+    stub = _StubServer(("127.0.0.1", 0), _PipeServerStub)
+    threading.Thread(target=stub.serve_forever, name="aicalc-bench-stub", daemon=True).start()
+    stack.callback(stub.server_close)
+    stack.callback(stub.shutdown)
+    workbook = Workbook(address=f"tcp:127.0.0.1:{stub.server_address[1]}")
+    workbook.connect()
+    stack.callback(workbook.disconnect)
+    refs = [f"B{row}" for row in range(1, 101)]
+    benchmarks.update({
+        "roundtrip.workbook.get_value": (lambda: workbook.get_value("B2"), 1),
+        "roundtrip.workbook.get_values.100": (lambda: workbook.get_values(refs), len(refs)),
+    })
+    return benchmarks
+
+
+GROUPS: Dict[str, Callable[[contextlib.ExitStack], Benchmarks]] = {
+    "address": _address_benchmarks,
+    "message": _message_benchmarks,
+    "decorator": _decorator_benchmarks,
+    "discovery": _discovery_benchmarks,
+    "roundtrip": _roundtrip_benchmarks,
+}
+
+
+def measure(func: Callable[[], Any], ops: int, repeat: int, min_time: float) -> Dict[str, Any]:
+    """Time func in repeat runs of at least min_time seconds each; nanoseconds per operation."""
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    runs = [seconds / (number * ops) * 1e9 for seconds in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "min_ns": min(runs),
+        "median_ns": statistics.median(runs),
+        "ops": number * ops,
+        "repeat": repeat,
+    }
+
+
+def _selected(name: str, patterns: List[str]) -> bool:
+    return not patterns or any(pattern in name or fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+def run(patterns: Optional[List[str]] = None, repeat: int = 5, min_time: float = 0.2,
+        report: Callable[[str, Dict[str, Any]], None] = lambda name, result: None) -> Dict[str, Dict[str, Any]]:
+    """Run the selected benchmarks; a group whose SDK can't be imported is skipped."""
+    patterns = patterns or []
+    results: Dict[str, Dict[str, Any]] = {}
+    for group, build in GROUPS.items():
+        with contextlib.ExitStack() as stack:
+            try:
+                benchmarks = build(stack)
+            except ImportError as e:
+                print(f"Skipping {group}: {e}", file=sys.stderr)
+                continue
+            for name, (func, ops) in benchmarks.items():
+                if _selected(name, patterns):
+                    results[name] = measure(func, ops, repeat, min_time)
+                    report(name, results[name])
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=PYTHON_SDK, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            threshold: float) -> List[Tuple[str, float]]:
+    """(name, percent slower) for each benchmark more than threshold percent slower than baseline."""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before or not before.get("min_ns"):
+            continue
+        change = (result["min_ns"] - before["min_ns"]) / before["min_ns"] * 100
+        if change > threshold:
+            regressions.append((name, change))
+    return regressions
+
+
+def _format_ns(ns: float) -> str:
+    if ns >= 1e6:
+        return f"{ns / 1e6:.2f} ms"
+    if ns >= 1e3:
+        return f"{ns / 1e3:.2f} us"
+    return f"{ns:.0f} ns"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", dest="patterns", action="append", default=[], metavar="PATTERN",
+                        help="Only run benchmarks whose name contains or matches PATTERN (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark (default: 5)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per timed run (default: 0.2)")
+    parser.add_argument("--json", metavar="FILE", help="Write the results to FILE")
+    parser.add_argument("--compare", metavar="FILE", help="Baseline results to check against")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Percent slowdown against the baseline counted as a regression (default: 10)")
+    args = parser.parse_args(argv)
+
+    baseline: Dict[str, Dict[str, Any]] = {}
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())["benchmarks"]
+
+    print(f"{'benchmark':<36} {'per op':>10} {'median':>10} {'change':>8}")
+
+    def report(name: str, result: Dict[str, Any]) -> None:
+        before = baseline.get(name)
+        change = f"{(result['min_ns'] - before['min_ns']) / before['min_ns'] * 100:+.1f}%" if before else ""
+        print(f"{name:<36} {_format_ns(result['min_ns']):>10} {_format_ns(result['median_ns']):>10} {change:>8}")
+
+    results = run(args.patterns, args.repeat, args.min_time, report)
+
+    if args.json:
+        path = Path(args.json)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            "version": RESULTS_VERSION,
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "benchmarks": results,
+        }, indent=2))
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, change in regressions:
+        print(f"REGRESSION {name}: {change:+.1f}% (threshold {args.threshold:g}%)", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -67,3 +67,15 @@ def celsius_to_fahrenheit(celsius: float) -> float:
 def reverse_text(text: str) -> str:
     """Returns the text reversed"""
     return str(text)[::-1]
+
+
+@aicalc_function(
+    name="PYTHON_SCALE",
+    category="Math",
+    description="Multiplies a number by a factor (vectorized)",
+    examples=["=PYTHON_SCALE(A1, 1.5)"],
+    vectorized=True
+)
+def scale_numbers(values: float, factors: float) -> float:
+    """Receives whole columns of arguments and returns one result per cell"""
+    return [float(v) * float(f) for v, f in zip(values, factors)]
@@ -0,0 +1,31 @@
+"""Shared test setup: the SDK on sys.path and a stand-in bridge server"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from aicalc_sdk.client import AiCalcClient  # noqa: E402
+from aicalc_sdk.server import LocalBridgeServer  # noqa: E402
+
+
+@pytest.fixture
+def workbook():
+    """Workbook the server starts with; test files override this to seed one"""
+    return None
+
+
+@pytest.fixture
+def server(workbook):
+    with LocalBridgeServer(workbook=workbook) as server:
+        yield server
+
+
+@pytest.fixture
+def client(server):
+    client = AiCalcClient(address=server.address)
+    client.connect()
+    yield client
+    client.disconnect()
@@ -0,0 +1,224 @@
+"""async def functions: decorator metadata, discovery and concurrent worker calls"""
+
+import asyncio
+import sys
+import textwrap
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from aicalc_sdk.decorators import aicalc_function, get_function_metadata  # noqa: E402
+from aicalc_sdk.discover_functions import discover_functions_by_import, discover_functions_static  # noqa: E402
+from aicalc_sdk.worker import FunctionWorker  # noqa: E402
+
+FUNCTIONS = textwrap.dedent('''
+    import asyncio
+    import threading
+    import time
+
+    from aicalc_sdk import aicalc_function
+
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    @aicalc_function(name="LOOKUP")
+    async def lookup(key: str) -> str:
+        await asyncio.sleep(0.05)
+        return key.upper()
+
+    @aicalc_function(name="LIMITED", max_concurrency=3)
+    async def limited(x: int) -> int:
+        global in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        return x
+
+    @aicalc_function(name="ASYNC_SCALE", vectorized=True)
+    async def async_scale(values: float, factor: float) -> float:
+        await asyncio.sleep(0)
+        return [v * f for v, f in zip(values, factor)]
+
+    @aicalc_function(name="FAILS")
+    async def fails(x):
+        raise ValueError(f"bad {x}")
+
+    @aicalc_function(name="DOUBLE")
+    def double(x: int) -> int:
+        return x * 2
+
+    release = threading.Event()
+    serial_in_flight = 0
+    serial_peak = 0
+
+    @aicalc_function(name="SERIAL", max_concurrency=1)
+    def serial(x: int) -> int:
+        global serial_in_flight, serial_peak
+        with lock:
+            serial_in_flight += 1
+            serial_peak = max(serial_peak, serial_in_flight)
+        release.wait(10)
+        with lock:
+            serial_in_flight -= 1
+        return x
+
+    running = {}
+    peaks = {}
+
+    def _hold(name, x):
+        with lock:
+            running[name] = running.get(name, 0) + 1
+            peaks[name] = max(peaks.get(name, 0), running[name])
+        time.sleep(0.1)
+        with lock:
+            running[name] -= 1
+        return x
+
+    @aicalc_function(name="UNMARKED")
+    def unmarked(x: int) -> int:
+        return _hold("unmarked", x)
+
+    @aicalc_function(name="THREADED", max_concurrency=2)
+    def threaded(x: int) -> int:
+        return _hold("threaded", x)
+''')
+
+
+@pytest.fixture
+def functions_file(tmp_path):
+    path = tmp_path / "async_functions.py"
+    path.write_text(FUNCTIONS)
+    return str(path)
+
+
+@pytest.fixture
+def worker():
+    worker = FunctionWorker()
+    yield worker
+    worker.close()
+
+
+def test_decorator_keeps_async_functions_awaitable():
+    @aicalc_function(max_concurrency=4, deterministic=True)
+    async def fetch(x: int) -> int:
+        return x + 1
+
+    assert asyncio.iscoroutinefunction(fetch)
+    metadata = get_function_metadata(fetch)
+    assert metadata["is_async"] and metadata["max_concurrency"] == 4
+    assert asyncio.run(fetch(1)) == 2
+    assert asyncio.run(fetch(1)) == 2
+    assert fetch.cache_info().hits == 1
+
+
+def test_invalid_max_concurrency():
+    with pytest.raises(ValueError):
+        aicalc_function(max_concurrency=0)
+
+
+def test_static_and_import_discovery_agree(functions_file):
+    static = discover_functions_static(functions_file)["functions"]
+    imported = discover_functions_by_import(functions_file)["functions"]
+    assert static == imported
+    flags = {f["name"]: (f["is_async"], f["max_concurrency"]) for f in static}
+    assert flags["LOOKUP"] == (True, None)
+    assert flags["LIMITED"] == (True, 3)
+    assert flags["DOUBLE"] == (False, None)
+
+
+def test_calls_overlap(worker, functions_file):
+    responses = []
+    done = threading.Event()
+
+    def respond(response):
+        responses.append(response)
+        if len(responses) == 200:
+            done.set()
+
+    start = time.perf_counter()
+    for i in range(200):
+        worker.dispatch({"id": i, "command": "call", "file_path": functions_file,
+                         "function_name": "lookup", "args": [f"k{i}"]}, respond)
+    assert done.wait(10)
+    # 200 sequential calls would take 10 s
+    assert time.perf_counter() - start < 2
+    assert sorted((r["id"], r["output"]) for r in responses) == [(i, f"K{i}") for i in range(200)]
+
+
+def test_batch_runs_cells_concurrently_within_limit(worker, functions_file):
+    outputs, errors = worker.call_batch(functions_file, "limited", [[i] for i in range(30)])
+    assert outputs == [str(i) for i in range(30)] and errors == [None] * 30
+    assert worker.load_module(functions_file).peak == 3
+
+
+def test_vectorized_and_errors(worker, functions_file):
+    assert worker.call_batch(functions_file, "async_scale", [[1, 2], [3, 4]]) == (["2", "12"], [None, None])
+    assert worker.call(functions_file, "async_scale", [5, 2]) == 10
+    outputs, errors = worker.call_batch(functions_file, "fails", [[1], [2]])
+    assert outputs == [None, None] and errors == ["ValueError: bad 1", "ValueError: bad 2"]
+    response = worker.handle({"id": 7, "command": "call", "file_path": functions_file,
+                              "function_name": "fails", "args": [3]})
+    assert response == {"id": 7, "success": False, "output": None, "error": "ValueError: bad 3"}
+
+
+def test_sync_functions_run_on_the_thread_pool(worker, functions_file):
+    responses = []
+    worker.dispatch({"id": 1, "command": "call", "file_path": functions_file,
+                     "function_name": "double", "args": [4]}, responses.append)
+    worker.close()
+    assert responses == [{"id": 1, "success": True, "output": "8", "error": None}]
+
+
+def test_limited_sync_calls_queue_outside_the_pool(functions_file):
+    worker = FunctionWorker(threads=2)
+    responses = []
+    doubled = threading.Event()
+
+    def respond(response):
+        responses.append(response)
+        if response["id"] == "double":
+            doubled.set()
+
+    for i in range(4):
+        worker.dispatch({"id": i, "command": "call", "file_path": functions_file,
+                         "function_name": "serial", "args": [i]}, respond)
+    worker.dispatch({"id": "double", "command": "call", "file_path": functions_file,
+                     "function_name": "double", "args": [4]}, respond)
+    # The queued SERIAL calls would otherwise fill both pool threads
+    assert doubled.wait(5)
+    assert [r["output"] for r in responses] == ["8"]
+
+    module = worker.load_module(functions_file)
+    module.release.set()
+    worker.close()
+    assert [r["output"] for r in responses[1:]] == ["0", "1", "2", "3"]
+    assert module.serial_peak == 1
+
+
+@pytest.mark.parametrize("name, peak", [("unmarked", 1), ("threaded", 2)])
+def test_sync_functions_run_one_call_at_a_time_unless_they_opt_in(functions_file, name, peak):
+    worker = FunctionWorker(threads=4)
+    responses = []
+    for i in range(4):
+        worker.dispatch({"id": i, "command": "call", "file_path": functions_file,
+                         "function_name": name, "args": [i]}, responses.append)
+    worker.close()
+    assert sorted(r["output"] for r in responses) == ["0", "1", "2", "3"]
+    assert worker.load_module(functions_file).peaks[name] == peak
+
+
+def test_sync_functions_without_threads_answer_in_order(functions_file):
+    worker = FunctionWorker(threads=0)
+    responses = []
+    worker.dispatch({"id": 1, "command": "call", "file_path": functions_file,
+                     "function_name": "double", "args": [4]}, responses.append)
+    assert responses == [{"id": 1, "success": True, "output": "8", "error": None}]
+    worker.close()
@@ -0,0 +1,122 @@
+"""execute_many and client.batch() against the stand-in bridge server"""
+
+import asyncio
+
+import pytest
+
+from aicalc_sdk.aio import AsyncAiCalcClient
+from aicalc_sdk.client import AiCalcClient
+from aicalc_sdk.server import InMemoryWorkbook
+
+
+@pytest.fixture
+def workbook():
+    return InMemoryWorkbook(["Sheet1", "Sheet2"], rows=2000)
+
+
+def test_execute_many_answers_in_order(client, server):
+    commands = [{"command": "set_value", "cellRef": f"A{row}", "value": row * 10} for row in range(1, 1001)]
+    # Commands run in order, so reads see the writes before them
+    commands += [{"command": "get_value", "cellRef": f"A{row}"} for row in range(1000, 0, -1)]
+    commands.append({"command": "run_function", "functionName": "SUM", "args": [1, 2, 3.5]})
+
+    responses = client.execute_many(commands)
+    assert len(responses) == len(commands)
+    assert all(response["success"] for response in responses)
+    assert [response["data"]["value"] for response in responses[1000:2000]] == [
+        str(row * 10) for row in range(1000, 0, -1)]
+    assert responses[-1]["data"]["result"] == "6.5"
+    assert server.workbook.get("Sheet1", 999, 0) == "10000"
+
+
+def test_failed_commands_only_fail_their_own_response(client):
+    responses = client.execute_many([
+        {"command": "set_value", "cellRef": "B1", "value": "kept"},
+        {"command": "get_value", "cellRef": "ZZ99999"},
+        {"command": "no_such_command"},
+        {"command": "batch", "commands": [{"command": "ping"}]},
+        "not a command",
+        {"command": "run_function", "functionName": "MISSING"},
+        {"command": "get_value", "cellRef": "B1"},
+    ])
+    assert [response["success"] for response in responses] == [True, False, False, False, False, False, True]
+    assert [response.get("error") for response in responses[1:6]] == [
+        "Cell not found: ZZ99999",
+        "Unknown command: no_such_command",
+        "Nested batches are not supported",
+        "Invalid request format",
+        "Function not found: MISSING",
+    ]
+    assert responses[-1]["data"]["value"] == "kept"
+
+
+def test_empty_batches_send_nothing(client, monkeypatch):
+    sent = []
+    send = client._send_command
+    monkeypatch.setattr(client, "_send_command", lambda command: sent.append(command) or send(command))
+
+    assert client.execute_many([]) == []
+    with client.batch() as batch:
+        assert len(batch) == 0
+    assert batch.execute() == []
+    assert sent == []
+
+    # The server itself rejects an empty batch
+    assert send({"command": "batch", "commands": []}) == {"success": False, "error": "Commands are required"}
+    assert client.ping()
+
+
+def test_command_batch_fills_in_items(client):
+    client.set_value("A1", 4)
+    with client.batch() as batch:
+        written = batch.set_values({"A2": 6, "Sheet2!A1": "other"})
+        block = batch.set_range("B1", [[1, 2], [3, 4]])
+        total = batch.run_function("SUM", [4, 6])
+        values = batch.get_range("A1:C2")
+        missing = batch.get_value("A99999")
+        sheets = batch.get_sheets()
+        with pytest.raises(RuntimeError, match="not been executed"):
+            written.result()
+        assert not written.done and written.error is None
+        assert len(batch) == 6
+
+    assert len(batch) == 0
+    assert (written.result(), block.result(), total.result()) == (2, 4, "10")
+    assert values.result() == [["4", "1", "2"], ["6", "3", "4"]]
+    assert [sheet["name"] for sheet in sheets.result()] == ["Sheet1", "Sheet2"]
+
+    assert missing.done and not missing.success
+    assert missing.error == "Cell not found: A99999"
+    with pytest.raises(ValueError, match="Cell not found"):
+        missing.result()
+
+
+def test_batch_is_dropped_when_the_block_raises(client):
+    with pytest.raises(KeyError):
+        with client.batch() as batch:
+            item = batch.set_value("C1", "never")
+            raise KeyError("stop")
+    assert not item.done
+    assert client.get_value("C1") == ""
+
+
+def test_execute_many_needs_a_connection(server):
+    with pytest.raises(ConnectionError):
+        AiCalcClient(address=server.address).execute_many([{"command": "ping"}])
+
+
+def test_async_execute_many(server):
+    async def run():
+        async with AsyncAiCalcClient(address=server.address) as client:
+            empty = await client.execute_many([])
+            responses = await client.execute_many([
+                {"command": "set_value", "cellRef": "D1", "value": True},
+                {"command": "get_value", "cellRef": "D0"},
+                {"command": "get_value", "cellRef": "D1"},
+            ])
+        return empty, responses
+
+    empty, responses = asyncio.run(run())
+    assert empty == []
+    assert [response["success"] for response in responses] == [True, False, True]
+    assert responses[2]["data"]["value"] == "TRUE"
@@ -0,0 +1,200 @@
+"""Result caches and the cache= option of @aicalc_function"""
+
+import datetime
+import decimal
+import sys
+import threading
+import uuid
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from aicalc_sdk import cache as cache_module  # noqa: E402
+from aicalc_sdk.cache import MISSING, DiskCache, MemoryCache, make_key  # noqa: E402
+from aicalc_sdk.decorators import aicalc_function  # noqa: E402
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "time", clock)
+    return clock
+
+
+def test_keys_distinguish_values_that_look_alike_in_json():
+    keys = [make_key("ns", (value,)) for value in
+            ([1, 2], (1, 2), {"1": 2}, "1", 1, 1.0, True, None, b"1", decimal.Decimal("1"))]
+    assert None not in keys
+    assert len(set(keys)) == len(keys)
+    assert make_key("ns", (1,)) != make_key("other", (1,))
+    assert make_key("ns", (1,), {"a": 1}) != make_key("ns", (1,), {"b": 1})
+
+
+def test_keys_are_stable_for_known_value_types():
+    def values():
+        # Fresh but equal objects each time
+        return (datetime.date(2024, 1, 2), datetime.datetime(2024, 1, 2, 3, 4, tzinfo=datetime.timezone.utc),
+                uuid.UUID(int=7), Path("data/file.csv"), decimal.Decimal("1.50"), 2 + 3j)
+
+    assert make_key("ns", values()) is not None
+    assert make_key("ns", values()) == make_key("ns", values())
+    assert make_key("ns", (decimal.Decimal("1.5"),)) != make_key("ns", (decimal.Decimal("1.50"),))
+
+
+def test_unkeyable_arguments_return_none():
+    class Point:
+        def __init__(self, x):
+            self.x = x
+
+        def __repr__(self):
+            return f"Point({self.x})"
+
+    # A repr that looks stable still says nothing about equality
+    assert make_key("ns", (Point(1),)) is None
+    assert make_key("ns", ({1: "x"},)) is None
+    assert make_key("ns", ({"a": {("t",): 1}},)) is None
+    assert make_key("ns", ({1, 2},)) is None
+    assert make_key("ns", (1,), {"key": object()}) is None
+
+
+def test_memory_cache_evicts_least_recently_used():
+    store = MemoryCache(max_entries=2)
+    store.set("a", 1)
+    store.set("b", 2)
+    assert store.get("a") == 1
+    store.set("c", 3)
+    assert store.get("b") is MISSING
+    assert (store.get("a"), store.get("c"), len(store)) == (1, 3, 2)
+
+    store.set("none", None)
+    assert store.get("none") is None and store.get("a") is MISSING
+
+
+def test_memory_cache_expires_entries(clock):
+    store = MemoryCache(ttl=10)
+    store.set("a", 1)
+    clock.now += 10
+    assert store.get("a") == 1
+    clock.now += 0.5
+    assert store.get("a") is MISSING and len(store) == 0
+
+
+def test_memory_cache_results_are_not_shared_with_callers():
+    store = MemoryCache()
+    table = [["a", 1]]
+    store.set("t", table)
+    table.append(["b", 2])
+    store.get("t")[0][1] = 99
+    assert store.get("t") == [["a", 1]]
+
+
+def test_disk_cache_persists_and_is_namespaced(tmp_path):
+    path = str(tmp_path / "cache" / "functions.sqlite")
+    first = DiskCache("mod.f:1", path)
+    first.set("k", {"rows": [1, 2]})
+    DiskCache("mod.g:1", path).set("k", "other function")
+    first.close()
+
+    reopened = DiskCache("mod.f:1", path)
+    assert reopened.get("k") == {"rows": [1, 2]}
+    assert DiskCache("mod.g:1", path).get("k") == "other function"
+    assert DiskCache("mod.f:2", path).get("k") is MISSING
+
+    reopened.clear()
+    assert reopened.get("k") is MISSING and len(reopened) == 0
+    assert DiskCache("mod.g:1", path).get("k") == "other function"
+
+
+def test_disk_cache_evicts_and_expires(tmp_path, clock):
+    store = DiskCache("ns", str(tmp_path / "functions.sqlite"), max_entries=2, ttl=5)
+    store.set("a", 1)
+    clock.now += 1
+    store.set("b", 2)
+    clock.now += 1
+    assert store.get("a") == 1
+    clock.now += 1
+    store.set("c", 3)
+    assert store.get("b") is MISSING and len(store) == 2
+
+    clock.now += 5
+    assert store.get("c") == 3
+    assert store.get("a") is MISSING
+    store.close()
+
+
+def test_cached_function_counts_hits_and_skips_unkeyable_calls():
+    calls = []
+
+    @aicalc_function(cache="memory", max_entries=2)
+    def describe(value):
+        calls.append(value)
+        return repr(value)
+
+    assert describe(1) == describe(1) == "1"
+    assert describe({1: "x"}) == describe({1: "x"})
+    assert describe({"1": "x"}) != describe({1: "x"})
+    assert calls == [1, {1: "x"}, {1: "x"}, {"1": "x"}, {1: "x"}]
+
+    info = describe.cache_info()
+    assert (info.hits, info.maxsize, info.currsize) == (1, 2, 2)
+    describe.cache_clear()
+    assert describe.cache_info() == (0, 0, 2, 0)
+
+
+def test_cache_counters_are_exact_across_threads():
+    @aicalc_function(cache="memory")
+    def square(value):
+        return value * value
+
+    def call():
+        for value in range(500):
+            square(value % 10)
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    info = square.cache_info()
+    assert info.hits + info.misses == 2000
+
+
+def test_vectorized_cache_computes_only_missing_cells():
+    batches = []
+
+    @aicalc_function(vectorized=True, cache="memory")
+    def scale(values, factor):
+        batches.append(list(values))
+        return [v * f for v, f in zip(values, factor)]
+
+    assert scale([1, 2, 3], [10, 10, 10]) == [10, 20, 30]
+    assert scale([2, 4, 3, 5], [10, 10, 10, 10]) == [20, 40, 30, 50]
+    assert scale([1, 2], [10, 10]) == [10, 20]
+    assert batches == [[1, 2, 3], [4, 5]]
+    assert scale.cache_info()[:2] == (4, 5)
+
+
+def test_disk_cached_function_survives_a_new_decorator(tmp_path):
+    calls = []
+
+    def make():
+        @aicalc_function(cache="disk", cache_dir=str(tmp_path))
+        def lookup(key):
+            calls.append(key)
+            return key.upper()
+        return lookup
+
+    assert make()("a") == "A"
+    assert make()("a") == "A"
+    assert calls == ["a"]
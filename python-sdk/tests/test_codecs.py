@@ -0,0 +1,74 @@
+"""Codec and compression negotiation in the hello handshake"""
+
+import asyncio
+
+import pytest
+
+from aicalc_sdk.aio import AsyncAiCalcClient
+from aicalc_sdk.client import AiCalcClient
+from aicalc_sdk.serialization import available_codecs, get_codec
+from aicalc_sdk.server import InMemoryWorkbook
+from aicalc_sdk.transports import COMPRESSED_FLAG, FRAME_HEADER, decompress, encode_frame, split_header
+
+CODECS = [pytest.param(name, id=name) for name in ["json", "msgpack"]]
+
+
+@pytest.fixture
+def workbook():
+    return InMemoryWorkbook(rows=2000, columns=4)
+
+
+def require(codec):
+    if codec not in available_codecs():
+        pytest.skip(f"{codec} is not installed")
+
+
+def test_large_frames_are_compressed():
+    payload = b'{"values": [' + b'"repeated", ' * 5000 + b'""]}'
+    frame = encode_frame(payload, compress_threshold=1024)
+    (header,) = FRAME_HEADER.unpack_from(frame)
+    length, compressed = split_header(header)
+
+    assert compressed and header & COMPRESSED_FLAG and length < len(payload) // 10
+    assert decompress(frame[FRAME_HEADER.size:]) == payload
+    assert encode_frame(b"{}", compress_threshold=1024) == FRAME_HEADER.pack(2) + b"{}"
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_codec_round_trip(codec):
+    require(codec)
+    message = {"command": "set_values", "values": {"A1": 1.5, "B1": "text", "C1": None, "D1": True}}
+    assert get_codec(codec).decode(get_codec(codec).encode(message)) == message
+
+
+@pytest.mark.parametrize("codec", CODECS)
+@pytest.mark.parametrize("compression", [True, False])
+def test_clients_use_the_negotiated_codec(server, codec, compression):
+    require(codec)
+    rows = [[f"row {row}", row, row * 0.5, "same text"] for row in range(2000)]
+
+    client = AiCalcClient(address=server.address, codecs=[codec], compression=compression)
+    client.connect()
+    try:
+        assert client._codec.name == codec
+        assert (client._compress_threshold is not None) == compression
+        assert client.set_range("A1", rows) == 8000
+        values = client.get_range("A1:D2000")
+        assert values[1999] == ["row 1999", "1999", "999.5", "same text"]
+    finally:
+        client.disconnect()
+
+    async def read():
+        async with AsyncAiCalcClient(address=server.address, codecs=[codec], compression=compression) as client:
+            return client._codec.name, await client.get_range("A1:D2000")
+
+    name, async_values = asyncio.run(read())
+    assert name == codec and async_values == values
+
+
+def test_hello_is_rejected_inside_a_batch(client):
+    responses = client.execute_many([{"command": "hello", "framing": "newline"}, {"command": "ping"}])
+    assert [response["success"] for response in responses] == [False, True]
+    assert responses[0]["error"] == "hello can't be sent in a batch"
+    # The connection keeps the framing agreed on connect
+    assert client.get_value("A1") is not None
@@ -0,0 +1,215 @@
+"""Scanning many files at once: discover_paths and the --format ndjson command line"""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+SDK_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SDK_ROOT))
+
+from aicalc_sdk import discover_functions as discovery  # noqa: E402
+from aicalc_sdk.discover_functions import DiscoveryIndex, collect_files, discover_paths  # noqa: E402
+
+SCRIPT = SDK_ROOT / "aicalc_sdk" / "discover_functions.py"
+
+MODULES = {
+    # Read from the syntax tree
+    "a_static.py": '''
+        from aicalc_sdk import aicalc_function
+
+        @aicalc_function(name="STATIC_ONE")
+        def one(x: float) -> float:
+            return x
+    ''',
+    # Dynamic metadata, so these are imported in the pool
+    "b_dynamic.py": '''
+        from aicalc_sdk import aicalc_function
+
+        NAME = "DYNAMIC_ONE"
+
+        @aicalc_function(name=NAME)
+        def one(x: float) -> float:
+            return x
+    ''',
+    "c_broken.py": '''
+        from aicalc_sdk import aicalc_function
+
+        NAME = 1 / 0
+
+        @aicalc_function(name=NAME)
+        def one(x):
+            return x
+    ''',
+    "d_kills_worker.py": '''
+        import os
+
+        from aicalc_sdk import aicalc_function
+
+        os._exit(3)
+
+        @aicalc_function(name=str(3))
+        def one(x):
+            return x
+    ''',
+    "e_sys_exit.py": '''
+        import sys
+
+        from aicalc_sdk import aicalc_function
+
+        sys.exit(2)
+
+        @aicalc_function(name=str(2))
+        def one(x):
+            return x
+    ''',
+    "nested/f_dynamic.py": '''
+        from aicalc_sdk import aicalc_function
+
+        @aicalc_function(name="DYNAMIC_" + "TWO")
+        def two(x: float) -> float:
+            return x
+    ''',
+    "nested/g_syntax_error.py": "def broken(:\n",
+    # Not function files
+    "nested/__init__.py": "raise RuntimeError('never imported')\n",
+    "notes.txt": "not python\n",
+}
+
+
+@pytest.fixture
+def library(tmp_path):
+    root = tmp_path / "functions"
+    for name, source in MODULES.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(textwrap.dedent(source))
+    return root
+
+
+def by_file(results, root):
+    return {os.path.relpath(result["file_path"], root).replace(os.sep, "/"): result for result in results}
+
+
+def check_results(results, root):
+    results = by_file(results, root)
+    assert sorted(results) == ["a_static.py", "b_dynamic.py", "c_broken.py", "d_kills_worker.py",
+                               "e_sys_exit.py", "nested/f_dynamic.py", "nested/g_syntax_error.py"]
+
+    names = {path: [f["name"] for f in result["functions"]] for path, result in results.items() if result["success"]}
+    assert names == {"a_static.py": ["STATIC_ONE"], "b_dynamic.py": ["DYNAMIC_ONE"],
+                     "nested/f_dynamic.py": ["DYNAMIC_TWO"]}
+
+    errors = {path: result["error"] for path, result in results.items() if not result["success"]}
+    assert errors["c_broken.py"] == "division by zero"
+    assert errors["d_kills_worker.py"] == "Worker process exited while importing the file"
+    assert errors["e_sys_exit.py"] == "SystemExit: 2"
+    assert errors["nested/g_syntax_error.py"].startswith("SyntaxError")
+
+
+def test_collect_files_skips_packages_and_other_files(library):
+    files = [os.path.relpath(path, library) for path in collect_files([str(library)])]
+    assert files == ["a_static.py", "b_dynamic.py", "c_broken.py", "d_kills_worker.py", "e_sys_exit.py",
+                     os.path.join("nested", "f_dynamic.py"), os.path.join("nested", "g_syntax_error.py")]
+    assert collect_files([str(library / "a_static.py")]) == [str(library / "a_static.py")]
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_a_crashing_module_only_fails_its_own_file(library, jobs):
+    check_results(discover_paths([str(library)], jobs=jobs), library)
+
+
+def test_import_mode_sends_every_file_to_the_pool(library):
+    results = by_file(discover_paths([str(library)], mode="import", jobs=2), library)
+    assert [f["name"] for f in results["a_static.py"]["functions"]] == ["STATIC_ONE"]
+    assert results["d_kills_worker.py"]["error"] == "Worker process exited while importing the file"
+    # Imported, so the error is the interpreter's rather than the static scan's
+    assert results["nested/g_syntax_error.py"]["error"].startswith("invalid syntax")
+
+
+def test_unexpected_static_errors_fall_back_to_import(library, monkeypatch):
+    parse = discovery.discover_functions_static
+
+    def fail_on_a_static(file_path, source=None):
+        if file_path.endswith("a_static.py"):
+            raise RuntimeError("static reader bug")
+        return parse(file_path, source)
+
+    monkeypatch.setattr(discovery, "discover_functions_static", fail_on_a_static)
+    check_results(discover_paths([str(library)], jobs=1), library)
+
+
+def test_static_results_are_indexed(library, tmp_path):
+    index = DiscoveryIndex(str(tmp_path / "discovery_index.json"))
+    results = list(discover_paths([str(library)], index=index, jobs=2))
+    assert sorted(index.entries) == [str(library / "a_static.py")]
+    assert by_file(list(discover_paths([str(library)], index=index, jobs=2)), library) == by_file(results, library)
+
+
+def run_script(*args, **kwargs):
+    env = dict(os.environ, PYTHONPATH=str(SDK_ROOT))
+    return subprocess.Popen([sys.executable, str(SCRIPT), "--no-index", *args], env=env,
+                            stdout=subprocess.PIPE, text=True, **kwargs)
+
+
+def test_ndjson_prints_one_line_per_file(library):
+    process = run_script(str(library), "--format", "ndjson", "--jobs", "2")
+    stdout = process.communicate(timeout=60)[0]
+    assert process.returncode == 0
+
+    lines = [json.loads(line) for line in stdout.splitlines()]
+    assert len(lines) == 7
+    check_results(lines, library)
+
+
+def test_ndjson_streams_results_as_files_finish(tmp_path):
+    # c_waits.py holds its worker until the test has seen the other two lines
+    release = tmp_path / "release"
+    for name in ("a_static.py", "b_dynamic.py"):
+        (tmp_path / name).write_text(textwrap.dedent(MODULES[name]))
+    (tmp_path / "c_waits.py").write_text(textwrap.dedent(f'''
+        import os
+        import time
+
+        from aicalc_sdk import aicalc_function
+
+        deadline = time.monotonic() + 30
+        while not os.path.exists({str(release)!r}) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        @aicalc_function(name="WAITED" + "")
+        def waited(x):
+            return x
+    '''))
+
+    process = run_script(str(tmp_path), "--format", "ndjson", "--jobs", "2")
+    try:
+        first = [json.loads(process.stdout.readline()) for _ in range(2)]
+        release.touch()
+        rest = [json.loads(line) for line in process.stdout]
+    finally:
+        release.touch()
+        assert process.wait(30) == 0
+        process.stdout.close()
+
+    assert sorted(os.path.basename(result["file_path"]) for result in first) == ["a_static.py", "b_dynamic.py"]
+    assert [[f["name"] for f in result["functions"]] for result in rest] == [["WAITED"]]
+
+
+def test_json_format_combines_files_in_order(library):
+    process = run_script(str(library / "nested"), str(library / "a_static.py"), str(library / "d_kills_worker.py"))
+    output = json.loads(process.communicate(timeout=60)[0])
+    assert output["success"]
+    assert [f["name"] for f in output["functions"]] == ["DYNAMIC_TWO", "STATIC_ONE"]
+    assert [os.path.basename(e["file_path"]) for e in output["errors"]] == ["g_syntax_error.py", "d_kills_worker.py"]
+
+
+def test_paths_from_stdin(library):
+    process = run_script("--stdin", "--format", "ndjson", stdin=subprocess.PIPE)
+    stdout = process.communicate(f"{library / 'a_static.py'}\n\n{library / 'b_dynamic.py'}\n", timeout=60)[0]
+    assert sorted(os.path.basename(json.loads(line)["file_path"]) for line in stdout.splitlines()) == [
+        "a_static.py", "b_dynamic.py"]
@@ -0,0 +1,249 @@
+"""Static and import discovery, and the index that remembers static results"""
+
+import ast
+import json
+import os
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from aicalc_sdk import discover_functions as discovery  # noqa: E402
+from aicalc_sdk.discover_functions import (  # noqa: E402
+    DiscoveryIndex,
+    discover_functions,
+    discover_functions_by_import,
+    discover_functions_static,
+)
+
+FUNCTIONS = textwrap.dedent('''
+    import typing
+    from typing import List
+
+    import aicalc_sdk
+    from aicalc_sdk import aicalc_function as fn
+
+    @fn(name="RATE", category="Finance", description="Interest rate", examples=["=RATE(1)"])
+    def rate(principal: float, years: int = 10, *rates: float, compound: bool = True,
+             label: str = "x", **options) -> float:
+        return principal
+
+    @aicalc_sdk.aicalc_function("SPLIT", "Text")
+    def split(text: str, parts: List[str] = None, sep=",") -> typing.List:
+        """Split text.
+
+        Uses the docstring as its description.
+        """
+        return text.split(sep)
+
+    @fn(vectorized=True, array_type="numpy", deterministic=True, max_concurrency=2)
+    def scale(values: float, factor: float = 2.5) -> float:
+        return values
+
+    @fn(cache="disk", ttl=60)
+    async def fetch(url: str, retries: int = -1):
+        return url
+
+    def plain(x):
+        return x
+''')
+
+
+def write(tmp_path, name, source):
+    path = tmp_path / name
+    path.write_text(textwrap.dedent(source))
+    return str(path)
+
+
+@pytest.fixture
+def functions_file(tmp_path):
+    return write(tmp_path, "discovery_functions.py", FUNCTIONS)
+
+
+@pytest.fixture
+def index(tmp_path):
+    return DiscoveryIndex(str(tmp_path / "cache" / "discovery_index.json"))
+
+
+def as_json(functions):
+    """What AiCalc reads: the metadata after a JSON round trip."""
+    return json.loads(json.dumps(functions))
+
+
+def test_static_matches_import(functions_file):
+    static = discover_functions_static(functions_file)
+    imported = discover_functions_by_import(functions_file)
+    assert static["success"] and imported["success"]
+    assert as_json(static["functions"]) == as_json(imported["functions"])
+
+    functions = {f["name"]: f for f in static["functions"]}
+    assert list(functions) == ["FETCH", "RATE", "SCALE", "SPLIT"]
+    assert [(p["name"], p["type"], p["required"], p["default"]) for p in functions["RATE"]["parameters"]] == [
+        ("principal", "float", True, None), ("years", "int", False, 10), ("rates", "float", True, None),
+        ("compound", "bool", False, True), ("label", "str", False, "x"), ("options", "any", True, None)]
+    assert (functions["RATE"]["category"], functions["RATE"]["description"]) == ("Finance", "Interest rate")
+    assert functions["SPLIT"]["category"] == "Text"
+    assert functions["SPLIT"]["description"].startswith("Split text.\n")
+    assert (functions["SPLIT"]["return_type"], functions["SCALE"]["return_type"]) == ("List", "float")
+    assert (functions["SCALE"]["cache"], functions["SCALE"]["max_concurrency"]) == ("memory", 2)
+    assert (functions["FETCH"]["is_async"], functions["FETCH"]["cache"]) == (True, "disk")
+
+
+@pytest.mark.parametrize("decorator", [
+    '@aicalc_function(name=NAME)',
+    '@aicalc_function(**OPTIONS)',
+    '@aicalc_function()\n        @staticmethod',
+])
+def test_dynamic_metadata_falls_back_to_import(tmp_path, index, decorator):
+    path = write(tmp_path, "dynamic_functions.py", f'''
+        from aicalc_sdk import aicalc_function
+
+        NAME = "TAXED"
+        OPTIONS = {{"name": NAME}}
+
+        {decorator}
+        def taxed(amount: float) -> float:
+            return amount * 1.2
+    ''')
+    with pytest.raises(discovery.DynamicMetadata):
+        discover_functions_static(path)
+
+    result = discover_functions(path, index=index)
+    assert result["success"], result["error"]
+    assert [f["function_name"] for f in result["functions"]] == ["taxed"]
+    assert result["functions"] == discover_functions_by_import(path)["functions"]
+    # What the module computed at import time isn't indexed
+    assert index.entries == {} and not index.dirty
+
+
+@pytest.mark.parametrize("block, after", [
+    ("if True:", ""),
+    ("try:", "except ImportError:\n            pass"),
+    ("with contextlib.suppress(ImportError):", ""),
+])
+def test_nested_definitions_fall_back_to_import(tmp_path, index, block, after):
+    path = write(tmp_path, "nested_functions.py", f'''
+        import contextlib
+
+        try:
+            from aicalc_sdk import aicalc_function
+        except ImportError:
+            aicalc_function = None
+
+        @aicalc_function(name="TOP")
+        def top(x: float) -> float:
+            return x
+
+        {block}
+            @aicalc_function(name="NP_SUM")
+            def np_sum(values: float) -> float:
+                return sum(values)
+        {after}
+    ''')
+    with pytest.raises(discovery.DynamicMetadata, match="line 14"):
+        discover_functions_static(path)
+
+    result = discover_functions(path, index=index)
+    assert [f["name"] for f in result["functions"]] == ["NP_SUM", "TOP"]
+    assert result == discover_functions(path, mode="import")
+    assert index.entries == {}
+
+
+def test_static_discovery_does_not_need_ast_unparse(functions_file, tmp_path, monkeypatch):
+    # ast.unparse is new in Python 3.9
+    monkeypatch.delattr(ast, "unparse", raising=False)
+    assert discover_functions_static(functions_file)["functions"] == \
+        discover_functions_by_import(functions_file)["functions"]
+
+    path = write(tmp_path, "computed_functions.py", '''
+        import aicalc_sdk
+
+        @aicalc_sdk.aicalc_function()
+        def computed(x: "list[int]" = [1] * 3) -> float:
+            return x
+    ''')
+    with pytest.raises(discovery.DynamicMetadata, match="line 5"):
+        discover_functions_static(path)
+
+
+def test_unbuildable_literal_default_is_dynamic(tmp_path):
+    path = write(tmp_path, "unhashable_default.py", '''
+        from aicalc_sdk import aicalc_function
+
+        @aicalc_function()
+        def lookup(table={[1]: 2}):
+            return table
+    ''')
+    with pytest.raises(discovery.DynamicMetadata):
+        discover_functions_static(path)
+    # Importing it fails the same way Python does
+    result = discover_functions(path)
+    assert not result["success"] and "unhashable" in result["error"]
+
+
+def test_index_hits_misses_and_invalidates(functions_file, index, monkeypatch):
+    expected = discover_functions(functions_file)
+    assert discover_functions(functions_file, index=index) == expected
+    index.save()
+    assert not index.dirty
+
+    reopened = DiscoveryIndex(index.path)
+    parse = discovery.discover_functions_static
+    parsed = []
+    monkeypatch.setattr(discovery, "discover_functions_static",
+                        lambda *args: parsed.append(args[0]) or parse(*args))
+
+    # Hit: an unchanged file isn't parsed again
+    assert discover_functions(functions_file, index=reopened) == expected
+    assert parsed == []
+
+    # Only the timestamp changed: the hash still matches, the entry is refreshed
+    stat = os.stat(functions_file)
+    os.utime(functions_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert discover_functions(functions_file, index=reopened) == expected
+    assert parsed == [] and reopened.dirty
+    assert reopened.entries[os.path.abspath(functions_file)]["mtime_ns"] == stat.st_mtime_ns + 10**9
+
+    # Miss: new content is parsed and replaces the entry
+    with open(functions_file, "a") as f:
+        f.write("\n@fn()\ndef added(x):\n    return x\n")
+    result = discover_functions(functions_file, index=reopened)
+    assert parsed == [functions_file]
+    assert "ADDED" in [f["name"] for f in result["functions"]]
+    assert discover_functions(functions_file, index=reopened) == result
+    assert parsed == [functions_file]
+
+    # Files that no longer exist are dropped on save
+    os.remove(functions_file)
+    reopened.save()
+    assert DiscoveryIndex(index.path).entries == {}
+
+
+def test_import_mode_is_not_indexed(functions_file, index):
+    result = discover_functions(functions_file, mode="import", index=index)
+    assert result["success"]
+    assert index.entries == {}
+
+    # A static entry isn't used to answer an import scan either
+    discover_functions(functions_file, index=index)
+    assert list(index.entries) == [os.path.abspath(functions_file)]
+    assert discover_functions(functions_file, mode="import", index=index) == result
+
+
+def test_failures_are_not_indexed(tmp_path, index):
+    path = write(tmp_path, "broken_functions.py", "def broken(:\n")
+    result = discover_functions(path, index=index)
+    assert not result["success"] and result["error"].startswith("SyntaxError")
+    assert discover_functions(str(tmp_path / "missing.py"), index=index)["error"].startswith("File not found")
+    assert index.entries == {}
+
+
+def test_stale_index_versions_are_ignored(functions_file, index):
+    os.makedirs(os.path.dirname(index.path))
+    with open(index.path, "w") as f:
+        json.dump({"version": discovery.INDEX_VERSION - 1, "files": {
+            os.path.abspath(functions_file): {"mtime_ns": 0, "size": 0, "sha256": "", "functions": []}}}, f)
+    assert DiscoveryIndex(index.path).entries == {}
@@ -0,0 +1,74 @@
+"""Import-time budget for aicalc_sdk
+
+Function files only import aicalc_function, so the package must not pull in
+clients, transports, asyncio or pywin32 until they are used.
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+SDK_ROOT = Path(__file__).resolve().parents[1]
+
+# Cumulative import time allowed for the package, in milliseconds
+BUDGET_MS = float(os.environ.get("AICALC_IMPORT_BUDGET_MS", "50"))
+
+HEAVY_MODULES = [
+    "aicalc_sdk.client",
+    "aicalc_sdk.aio",
+    "aicalc_sdk.transports",
+    "aicalc_sdk.cache",
+    "asyncio",
+    "socket",
+    "sqlite3",
+    "win32file",
+    "win32pipe",
+    "pywintypes",
+]
+
+
+def run_python(code, *options):
+    env = dict(os.environ, PYTHONPATH=str(SDK_ROOT))
+    return subprocess.run([sys.executable, *options, "-c", code], env=env, cwd=SDK_ROOT.parent,
+                          capture_output=True, text=True, check=True)
+
+
+def test_decorator_import_loads_no_io_modules():
+    result = run_python(
+        "import json, sys\n"
+        "from aicalc_sdk import aicalc_function, CellValue\n"
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    assert json.loads(result.stdout) == []
+
+
+def test_clients_load_on_first_access():
+    result = run_python(
+        "import sys, aicalc_sdk\n"
+        "assert 'aicalc_sdk.client' not in sys.modules\n"
+        "assert aicalc_sdk.AiCalcClient.__module__ == 'aicalc_sdk.client'\n"
+        "assert aicalc_sdk.AsyncAiCalcClient.__module__ == 'aicalc_sdk.aio'\n"
+        "assert callable(aicalc_sdk.connect)\n"
+        "assert 'connect' in dir(aicalc_sdk)\n"
+        "try:\n"
+        "    aicalc_sdk.missing\n"
+        "except AttributeError:\n"
+        "    pass\n"
+        "else:\n"
+        "    raise AssertionError('missing attribute resolved')\n"
+    )
+    assert result.returncode == 0
+
+
+def test_import_time_within_budget():
+    # Best of a few runs, so a busy machine doesn't fail the build
+    timings = []
+    for _ in range(3):
+        result = run_python("import aicalc_sdk", "-X", "importtime")
+        match = re.search(r"^import time:\s+\d+ \|\s+(\d+) \| aicalc_sdk$", result.stderr, re.MULTILINE)
+        assert match, result.stderr
+        timings.append(int(match.group(1)) / 1000)
+    assert min(timings) <= BUDGET_MS, f"import aicalc_sdk took {min(timings):.1f} ms (budget {BUDGET_MS} ms)"
@@ -0,0 +1,53 @@
+"""Paged reads with iter_rows() against the stand-in bridge server"""
+
+import asyncio
+
+import pytest
+
+from aicalc_sdk.aio import AsyncAiCalcClient
+from aicalc_sdk.client import _range_pages
+from aicalc_sdk.server import InMemoryWorkbook
+
+
+@pytest.fixture
+def workbook():
+    workbook = InMemoryWorkbook(["Sheet1", "Data"], rows=23, columns=4)
+    for row in range(23):
+        workbook.set_many([("Data", row, column, row * 10 + column) for column in range(4)])
+    return workbook
+
+
+def test_range_pages():
+    assert list(_range_pages("Data!$B$2:C11", 4)) == ["Data!B2:C5", "Data!B6:C9", "Data!B10:C11"]
+    assert list(_range_pages("C3:A1", 10)) == ["A1:C3"]
+    assert list(_range_pages("2:3", 10)) == ["A2:XFD3"]
+    whole_columns = _range_pages("Data!AA:B", 100)
+    assert [next(whole_columns), next(whole_columns)] == ["Data!B1:AA100", "Data!B101:AA200"]
+    for bad in ["A1:3", "A0", "Data!", "A1:B:C"]:
+        with pytest.raises(ValueError):
+            list(_range_pages(bad, 10))
+
+
+def test_iter_rows_pages_through_whole_columns(client):
+    rows = list(client.iter_rows("Data!B:C", page_size=5))
+    assert rows == [[str(row * 10 + 1), str(row * 10 + 2)] for row in range(23)]
+    assert list(client.iter_rows("Data!A3:A4", page_size=5)) == [["20"], ["30"]]
+
+
+def test_iter_rows_stops_at_an_exact_page_boundary(client):
+    assert len(list(client.iter_rows("Data!A1:D20", page_size=10))) == 20
+    assert len(list(client.iter_rows("Data!A:D", page_size=23))) == 23
+
+
+def test_async_iter_rows(server):
+    async def read():
+        async with AsyncAiCalcClient(address=server.address) as client:
+            rows = [row async for row in client.iter_rows("Data!A:A", page_size=4)]
+            first = client.iter_rows("Data!A:A", page_size=4)
+            head = await first.__anext__()
+            await first.aclose()
+            return rows, head, await client.get_value("Data!A2")
+
+    rows, head, value = asyncio.run(read())
+    assert rows == [[str(row * 10)] for row in range(23)]
+    assert head == ["0"] and value == "10"
@@ -0,0 +1,62 @@
+"""aicalc-loadgen against the stand-in bridge server"""
+
+import json
+
+import pytest
+
+from aicalc_sdk.loadgen import DEFAULT_SCENARIO, check_thresholds, expand_cells, load_scenario, main, percentile, run
+
+
+def test_expand_cells():
+    assert expand_cells("Sheet1!A1:B2") == ["Sheet1!A1", "Sheet1!B1", "Sheet1!A2", "Sheet1!B2"]
+    assert expand_cells("Z9:AA9") == ["Z9", "AA9"]
+    with pytest.raises(ValueError):
+        expand_cells("A1:B")
+
+
+def test_load_scenario_checks_operations(tmp_path):
+    assert load_scenario(None) is DEFAULT_SCENARIO
+    path = tmp_path / "bad.json"
+    path.write_text(json.dumps({"operations": [{"op": "get_range"}]}))
+    with pytest.raises(ValueError, match="range"):
+        load_scenario(str(path))
+    path.write_text(json.dumps({"operations": [{"op": "delete_sheet"}]}))
+    with pytest.raises(ValueError, match="Unknown operation"):
+        load_scenario(str(path))
+
+
+def test_percentile():
+    values = [float(i) for i in range(1, 101)]
+    assert (percentile(values, 0.5), percentile(values, 0.99), percentile(values, 1.0)) == (50.0, 99.0, 100.0)
+    assert percentile([], 0.5) == 0.0
+
+
+def test_run_reports_rate_latency_and_bytes(server):
+    report = run(server.address, DEFAULT_SCENARIO, clients=2, duration=0.5, rate=200)
+    total = report["total"]
+    assert total["errors"] == 0
+    assert 80 <= total["count"] <= 100
+    assert 0 < total["p50_ms"] <= total["p95_ms"] <= total["p99_ms"] <= total["max_ms"]
+    assert set(report["operations"]) == {"get_value", "set_value", "get_range", "run_function"}
+    assert report["bytes_sent"] > 0 and report["bytes_received"] > report["bytes_sent"]
+
+
+def test_errors_are_counted_and_fail_thresholds(server, tmp_path, capsys):
+    scenario = tmp_path / "missing.json"
+    scenario.write_text(json.dumps({"name": "missing", "operations": [
+        {"op": "get_value", "weight": 1, "cells": "A1:B2"},
+        {"op": "run_function", "weight": 1, "function": "NO_SUCH_FUNCTION"},
+    ]}))
+    report_path = tmp_path / "report.json"
+
+    status = main(["--address", server.address, "--scenario", str(scenario), "--clients", "1",
+                   "--duration", "0.3", "--rate", "100", "--json", str(report_path), "--max-error-rate", "0.01"])
+
+    assert status == 1
+    report = json.loads(report_path.read_text())
+    stats = report["operations"]["run_function"]
+    assert stats["count"] == 0 and stats["errors"] > 0 and stats["error_rate"] == 1.0
+    assert "Function not found" in stats["error_samples"][0]
+    assert report["operations"]["get_value"]["errors"] == 0
+    assert "FAILED: error rate" in capsys.readouterr().err
+    assert check_thresholds(report, max_error_rate=1.0, min_throughput=1) == []
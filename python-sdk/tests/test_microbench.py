@@ -0,0 +1,34 @@
+"""Result files and regression checks of benchmarks/microbench.py"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+
+import microbench  # noqa: E402
+
+
+def test_compare_flags_only_slowdowns_past_threshold():
+    baseline = {"a": {"min_ns": 100.0}, "b": {"min_ns": 100.0}, "c": {"min_ns": 100.0}}
+    results = {"a": {"min_ns": 109.0}, "b": {"min_ns": 125.0}, "c": {"min_ns": 50.0}, "new": {"min_ns": 1.0}}
+    assert microbench.compare(results, baseline, threshold=10) == [("b", 25.0)]
+    assert microbench.compare(results, baseline, threshold=30) == []
+
+
+def test_results_round_trip_and_gate(tmp_path, capsys):
+    first = tmp_path / "first.json"
+    options = ["-k", "decorator.wrapped_call", "--repeat", "2", "--min-time", "0.01"]
+    assert microbench.main(options + ["--json", str(first)]) == 0
+
+    saved = json.loads(first.read_text())
+    assert saved["version"] == microbench.RESULTS_VERSION
+    assert list(saved["benchmarks"]) == ["decorator.wrapped_call"]
+    assert saved["benchmarks"]["decorator.wrapped_call"]["min_ns"] > 0
+
+    # A baseline ten times faster than anything possible makes this run a regression
+    saved["benchmarks"]["decorator.wrapped_call"]["min_ns"] /= 10
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(saved))
+    assert microbench.main(options + ["--compare", str(baseline), "--threshold", "50"]) == 1
+    assert "REGRESSION decorator.wrapped_call" in capsys.readouterr().err
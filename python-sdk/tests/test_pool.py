@@ -0,0 +1,57 @@
+"""AiCalcClientPool against the stand-in bridge server"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from aicalc_sdk.pool import AiCalcClientPool, PoolTimeoutError
+
+
+def test_threads_get_their_own_connections(server):
+    seen = set()
+    lock = threading.Lock()
+    barrier = threading.Barrier(4)
+
+    def work(row):
+        with pool.connection() as client:
+            with lock:
+                seen.add(id(client))
+            barrier.wait(timeout=5)
+            client.set_value(f"A{row}", row)
+
+    with AiCalcClientPool(address=server.address, min_size=2, max_size=4) as pool:
+        assert pool.size == 2
+        with ThreadPoolExecutor(4) as executor:
+            list(executor.map(work, range(1, 5)))
+        assert len(seen) == 4 and pool.size == pool.idle == 4
+        with pool.connection() as client:
+            assert client.get_range("A1:A4") == [["1"], ["2"], ["3"], ["4"]]
+
+
+def test_checkout_times_out_when_every_connection_is_busy(server):
+    with AiCalcClientPool(address=server.address, max_size=1, timeout=0.05) as pool:
+        client = pool.acquire()
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire()
+        pool.release(client)
+        assert pool.acquire() is client
+
+
+def test_broken_connections_are_replaced(server):
+    with AiCalcClientPool(address=server.address, max_size=1, health_check_interval=0) as pool:
+        client = pool.acquire()
+        pool.release(client)
+        client._transport.close()  # Dies while idle; the checkout ping notices
+
+        replacement = pool.acquire()
+        assert replacement is not client and replacement.ping()
+
+        pool.release(replacement)
+
+        with pytest.raises(ConnectionError):
+            with pool.connection() as broken:
+                raise ConnectionError("lost")
+        assert broken is replacement and pool.size == 0
+        with pool.connection() as client:
+            assert client is not replacement and client.ping()
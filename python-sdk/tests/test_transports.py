@@ -0,0 +1,238 @@
+"""Transport connection handling and message framing"""
+
+import asyncio
+import json
+import os
+import sys
+import types
+import zlib
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from aicalc_sdk import transports  # noqa: E402
+from aicalc_sdk.aio import AsyncAiCalcClient  # noqa: E402
+from aicalc_sdk.client import AiCalcClient  # noqa: E402
+from aicalc_sdk.server import BridgeRequestHandler, InMemoryWorkbook, LocalBridgeServer  # noqa: E402
+from aicalc_sdk.transports import (  # noqa: E402
+    COMPRESSED_FLAG,
+    ERROR_PIPE_BUSY,
+    FRAME_HEADER,
+    MAX_FRAME_SIZE,
+    MessageReader,
+    NamedPipeTransport,
+    Transport,
+    encode_frame,
+    split_header,
+)
+
+
+class _PyWinError(Exception):
+    def __init__(self, winerror, funcname="CreateFile", strerror="error"):
+        super().__init__(winerror, funcname, strerror)
+        self.winerror = winerror
+
+
+@pytest.fixture
+def win32(monkeypatch):
+    """Stand-in pywin32 modules whose CreateFile fails busy a given number of times."""
+    state = types.SimpleNamespace(busy=0, opened=0, waits=[], wait_error=False)
+
+    def create_file(name, *args):
+        if state.busy:
+            state.busy -= 1
+            raise _PyWinError(ERROR_PIPE_BUSY)
+        state.opened += 1
+        return "handle"
+
+    def wait_named_pipe(name, timeout):
+        state.waits.append(timeout)
+        if state.wait_error:
+            raise _PyWinError(121, "WaitNamedPipe")
+
+    win32file = types.SimpleNamespace(CreateFile=create_file, GENERIC_READ=1, GENERIC_WRITE=2,
+                                      OPEN_EXISTING=3, FILE_FLAG_OVERLAPPED=4)
+    win32pipe = types.SimpleNamespace(WaitNamedPipe=wait_named_pipe, NMPWAIT_WAIT_FOREVER=-1)
+    monkeypatch.setitem(sys.modules, "win32file", win32file)
+    monkeypatch.setitem(sys.modules, "win32pipe", win32pipe)
+    monkeypatch.setitem(sys.modules, "win32event", types.SimpleNamespace())
+    monkeypatch.setitem(sys.modules, "pywintypes", types.SimpleNamespace(error=_PyWinError))
+    return state
+
+
+def test_named_pipe_waits_while_every_instance_is_busy(win32):
+    win32.busy = 2
+    transport = NamedPipeTransport("AiCalc_Bridge", timeout=5.0)
+    assert transport.pipe_name == "\\\\.\\pipe\\AiCalc_Bridge"
+    assert win32.opened == 1 and len(win32.waits) == 2
+    assert all(0 < wait <= 5000 for wait in win32.waits)
+
+
+def test_named_pipe_without_timeout_waits_forever(win32):
+    win32.busy = 1
+    NamedPipeTransport("AiCalc_Bridge", timeout=None)
+    assert win32.waits == [-1]
+
+
+def test_named_pipe_busy_past_the_timeout_fails(win32):
+    win32.busy = 1
+    win32.wait_error = True
+    with pytest.raises(ConnectionError, match="Timed out"):
+        NamedPipeTransport("AiCalc_Bridge")
+    assert win32.opened == 0
+
+
+def test_named_pipe_other_errors_fail_immediately(win32, monkeypatch):
+    def missing(name, *args):
+        raise _PyWinError(2)
+
+    monkeypatch.setattr(sys.modules["win32file"], "CreateFile", missing)
+    with pytest.raises(ConnectionError):
+        NamedPipeTransport("AiCalc_Bridge")
+    assert win32.waits == []
+
+
+class _ChunkedTransport(Transport):
+    """Replays bytes a few at a time, as a socket or pipe may deliver them."""
+
+    def __init__(self, data, chunk_size=7):
+        self.data = memoryview(data)
+        self.chunk_size = chunk_size
+        self.received = 0
+
+    def recv(self, max_bytes):
+        count = min(max_bytes, self.chunk_size, len(self.data) - self.received)
+        chunk = bytes(self.data[self.received:self.received + count])
+        self.received += count
+        return chunk
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def server():
+    with LocalBridgeServer(workbook=InMemoryWorkbook(rows=2000, columns=4)) as server:
+        yield server
+
+
+@pytest.fixture
+def frame_headers(monkeypatch):
+    """(length, compressed) of every frame the clients read."""
+    headers = []
+
+    def recording_split_header(header):
+        headers.append(split_header(header))
+        return headers[-1]
+
+    monkeypatch.setattr(transports, "split_header", recording_split_header)
+    return headers
+
+
+def large_rows(count=2000):
+    return [[f"row {row}", row, row * 0.5, "the same text in every row"] for row in range(count)]
+
+
+def test_reader_handles_messages_larger_than_its_buffer():
+    payload = json.dumps({"values": large_rows()}).encode("utf-8")
+    line = json.dumps({"text": "x" * 5000}).encode("utf-8")
+    data = line + b"\n" + encode_frame(payload) + encode_frame(b"{}") + line + b"\n"
+
+    reader = MessageReader(_ChunkedTransport(data, chunk_size=4093), initial_size=1024, retain_size=8192)
+    assert reader.read_line() == line.decode("utf-8")
+    assert reader.read_frame() == payload
+    assert reader.read_frame() == b"{}"
+    assert reader.read_line() == line.decode("utf-8")
+    # Back to a small buffer once everything received is consumed
+    assert len(reader._buffer) == 1024
+    with pytest.raises(ConnectionError, match="closed"):
+        reader.read_frame()
+
+
+def test_reader_inflates_compressed_frames():
+    payload = json.dumps({"values": large_rows()}).encode("utf-8")
+    frame = encode_frame(payload, compress_threshold=4096)
+    (header,) = FRAME_HEADER.unpack_from(frame)
+    assert header & COMPRESSED_FLAG
+    assert len(frame) < len(payload) // 4
+
+    # Incompressible or small payloads keep a plain header
+    noise = os.urandom(600)
+    assert encode_frame(noise, compress_threshold=16) == FRAME_HEADER.pack(len(noise)) + noise
+
+    reader = MessageReader(_ChunkedTransport(frame + encode_frame(noise, compress_threshold=16), chunk_size=1000))
+    assert reader.read_frame() == payload
+    assert reader.read_frame() == noise
+
+
+def test_frames_over_the_size_limit_are_refused():
+    assert split_header(MAX_FRAME_SIZE) == (MAX_FRAME_SIZE, False)
+    assert split_header(MAX_FRAME_SIZE | COMPRESSED_FLAG) == (MAX_FRAME_SIZE, True)
+    for header in (MAX_FRAME_SIZE + 1, (MAX_FRAME_SIZE + 1) | COMPRESSED_FLAG, 0x7FFFFFFF):
+        with pytest.raises(ConnectionError, match="exceeds"):
+            split_header(header)
+
+    # Refused from the header alone, before reserving space for the body
+    reader = MessageReader(_ChunkedTransport(FRAME_HEADER.pack(MAX_FRAME_SIZE + 1)), initial_size=1024)
+    with pytest.raises(ConnectionError, match="exceeds"):
+        reader.read_frame()
+    assert len(reader._buffer) == 1024
+
+
+def test_compressed_frames_may_not_inflate_past_the_limit(monkeypatch):
+    monkeypatch.setattr(transports, "MAX_FRAME_SIZE", 64 * 1024)
+    bomb = zlib.compress(b"\0" * (64 * 1024 + 1))
+    reader = MessageReader(_ChunkedTransport(FRAME_HEADER.pack(len(bomb) | COMPRESSED_FLAG) + bomb))
+    with pytest.raises(ConnectionError, match="inflates past"):
+        reader.read_frame()
+
+    truncated = zlib.compress(b"x" * 1000)[:-4]
+    reader = MessageReader(_ChunkedTransport(FRAME_HEADER.pack(len(truncated) | COMPRESSED_FLAG) + truncated))
+    with pytest.raises(ConnectionError, match="truncated"):
+        reader.read_frame()
+
+
+@pytest.mark.parametrize("compression", [True, False])
+def test_large_responses_over_length_framing(server, frame_headers, compression):
+    client = AiCalcClient(address=server.address, codecs=["json"], compression=compression)
+    client.connect()
+    try:
+        assert client._framed
+        assert client.set_range("A1", large_rows()) == 8000
+        values = client.get_range("A1:D2000")
+    finally:
+        client.disconnect()
+
+    assert values[1999] == ["row 1999", "1999", "999.5", "the same text in every row"]
+    largest = max(frame_headers)
+    assert largest[1] == compression
+    if not compression:
+        assert largest[0] > 64 * 1024 and not any(compressed for _, compressed in frame_headers)
+    # Small responses are never compressed
+    assert any(length < 100 and not compressed for length, compressed in frame_headers)
+
+
+def test_newline_json_when_the_bridge_has_no_hello(server, frame_headers, monkeypatch):
+    monkeypatch.setattr(BridgeRequestHandler, "_hello",
+                        lambda self, request: self._error(f"Unknown command: {request.get('command')}"))
+
+    client = AiCalcClient(address=server.address)
+    client.connect()
+    try:
+        assert client.is_connected() and not client._framed
+        assert client.set_range("A1", large_rows()) == 8000
+        values = client.get_range("A1:D2000")
+        assert client.get_value("D2000") == "the same text in every row"
+    finally:
+        client.disconnect()
+    assert values[1999][0] == "row 1999"
+
+    async def read():
+        async with AsyncAiCalcClient(address=server.address) as client:
+            return client._framed, await client.get_range("A1:D2000")
+
+    framed, async_values = asyncio.run(read())
+    assert not framed and async_values == values
+    assert frame_headers == []
@@ -0,0 +1,119 @@
+"""watch/unwatch push notifications against the stand-in bridge server"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from aicalc_sdk.aio import AsyncAiCalcClient
+from aicalc_sdk.client import AiCalcClient
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def thread_names():
+    return {thread.name for thread in threading.enumerate()}
+
+
+def test_changes_in_range_reach_the_callback_thread(client):
+    received = []
+    subscription_id = client.watch("A1:B2", lambda changes: received.append(
+        (threading.current_thread().name, [(c.cell_ref, c.value) for c in changes])))
+
+    assert {"aicalc-listener", "aicalc-callbacks"} <= thread_names()
+    client.set_value("A1", 5)
+    client.set_value("C3", 1)
+    client.set_value("B2", "x")
+
+    assert wait_for(lambda: sum(len(changes) for _, changes in received) == 2)
+    assert {name for name, _ in received} == {"aicalc-callbacks"}
+    assert sorted(change for _, changes in received for change in changes) == [("Sheet1!A1", "5"), ("Sheet1!B2", "x")]
+    assert client.unwatch(subscription_id) is True
+    assert client.unwatch(subscription_id) is False
+
+
+def test_callbacks_may_use_the_client(client):
+    seen = []
+    client.watch("A1", lambda changes: seen.append(client.get_value("A1")))
+    client.set_value("A1", 7)
+    assert wait_for(lambda: seen == ["7"])
+    assert client.get_value("A1") == "7"
+
+
+def test_unwatch_drops_changes_already_in_flight(client):
+    release = threading.Event()
+    calls = []
+
+    def slow(changes):
+        calls.append([c.cell_ref for c in changes])
+        release.wait(5)
+
+    subscription_id = client.watch("A1:A10", slow)
+    client.set_value("A1", 1)
+    assert wait_for(lambda: len(calls) == 1)
+
+    # The callback thread is busy, so these queue up behind it
+    for row in range(2, 11):
+        client.set_value(f"A{row}", row)
+        time.sleep(0.02)
+    assert client.unwatch(subscription_id) is True
+    release.set()
+
+    time.sleep(0.2)
+    assert len(calls) == 1
+    assert client.get_value("A10") == "10"
+
+
+def test_disconnect_stops_the_listener_threads(server):
+    client = AiCalcClient(address=server.address)
+    client.connect()
+    client.watch("A1", lambda changes: None)
+    client.disconnect()
+    assert wait_for(lambda: not {"aicalc-listener", "aicalc-callbacks"} & thread_names())
+
+    # Reconnecting starts over with plain request/response reads
+    client.connect()
+    assert client.ping()
+    client.disconnect()
+
+
+def test_failed_watch_leaves_no_subscription(client):
+    with pytest.raises(ValueError):
+        client.watch("not a range", lambda changes: None)
+    assert client.ping()
+
+
+def test_async_watch_and_unwatch(server):
+    async def run():
+        plain, awaited = [], []
+        async with AsyncAiCalcClient(address=server.address) as client:
+            async def refresh(changes):
+                awaited.append(await client.get_value(changes[0].cell_ref))
+
+            first = await client.watch("A1:A2", lambda changes: plain.extend(c.cell_ref for c in changes))
+            second = await client.watch("B1", refresh)
+            await client.set_value("A2", 1)
+            await client.set_value("B1", "b")
+            for _ in range(500):
+                if plain and awaited:
+                    break
+                await asyncio.sleep(0.01)
+
+            assert await client.unwatch(first) is True
+            await client.set_value("A1", 2)
+            await asyncio.sleep(0.1)
+            assert await client.unwatch(second) is True
+            assert await client.unwatch(second) is False
+        return plain, awaited
+
+    plain, awaited = asyncio.run(run())
+    assert plain == ["Sheet1!A2"]
+    assert awaited == ["b"]
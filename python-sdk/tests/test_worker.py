@@ -0,0 +1,162 @@
+"""worker.py driven over its stdin/stdout frame protocol, as AiCalc runs it"""
+
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+from pathlib import Path
+
+import pytest
+
+SDK_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SDK_ROOT))
+
+from aicalc_sdk.worker import read_frame, write_frame  # noqa: E402
+
+FUNCTIONS = textwrap.dedent('''
+    import asyncio
+    import time
+
+    from aicalc_sdk import aicalc_function
+
+    @aicalc_function(name="SLOW")
+    def slow(seconds: float) -> str:
+        time.sleep(seconds)
+        return "slow"
+
+    @aicalc_function(name="DOUBLE")
+    def double(x: int) -> int:
+        print("printed output goes to stderr")
+        return x * 2
+
+    @aicalc_function(name="SCALE", vectorized=True)
+    def scale(values: float, factor: float) -> float:
+        return [v * f for v, f in zip(values, factor)]
+
+    @aicalc_function(name="LOOKUP")
+    async def lookup(key: str) -> str:
+        await asyncio.sleep(0.01)
+        return key.upper()
+
+    @aicalc_function(name="FAILS")
+    def fails(x):
+        raise ValueError(f"bad {x}")
+
+    @aicalc_function(name="EXITS")
+    def exits():
+        raise SystemExit(3)
+''')
+
+
+class WorkerProcess:
+    """worker.py in a subprocess, started the way PythonWorkerHost starts it."""
+
+    def __init__(self):
+        script = SDK_ROOT / "aicalc_sdk" / "worker.py"
+        env = dict(os.environ, PYTHONPATH=str(SDK_ROOT))
+        self.process = subprocess.Popen([sys.executable, "-u", str(script)], cwd=script.parent, env=env,
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self._ids = iter(range(1, 1_000_000))
+        # Drain stderr so printing functions can't fill the pipe and block
+        self.stderr = []
+        threading.Thread(target=lambda: self.stderr.extend(self.process.stderr), daemon=True).start()
+
+    def send(self, command, **fields):
+        request_id = next(self._ids)
+        write_frame(self.process.stdin, {"id": request_id, "command": command, **fields})
+        return request_id
+
+    def receive(self):
+        return read_frame(self.process.stdout)
+
+    def request(self, command, **fields):
+        request_id = self.send(command, **fields)
+        response = self.receive()
+        assert response["id"] == request_id
+        return response
+
+    def close(self):
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait(10)
+        for stream in (self.process.stdin, self.process.stdout):
+            stream.close()
+
+
+@pytest.fixture
+def functions_file(tmp_path):
+    path = tmp_path / "worker_functions.py"
+    path.write_text(FUNCTIONS)
+    return str(path)
+
+
+@pytest.fixture
+def worker():
+    worker = WorkerProcess()
+    yield worker
+    worker.close()
+
+
+def call(worker, functions_file, name, *args):
+    return worker.request("call", file_path=functions_file, function_name=name, args=list(args))
+
+
+def test_ping_load_and_call(worker, functions_file):
+    assert worker.request("ping") == {"id": 1, "success": True, "output": "pong", "error": None}
+    assert worker.request("load", file_path=functions_file)["success"]
+    assert call(worker, functions_file, "double", 21)["output"] == "42"
+    assert call(worker, functions_file, "lookup", "key")["output"] == "KEY"
+
+
+def test_call_batch(worker, functions_file):
+    response = worker.request("call_batch", file_path=functions_file, function_name="scale",
+                              args_batch=[[1, 2], [3, 4], [5]])
+    assert response["success"]
+    assert response["outputs"][:2] == ["2", "12"]
+    assert response["outputs"][2] is None and response["errors"][2]
+
+    response = worker.request("call_batch", file_path=functions_file, function_name="fails",
+                              args_batch=[[1], [2]])
+    assert response["errors"] == ["ValueError: bad 1", "ValueError: bad 2"]
+
+
+def test_errors_are_responses(worker, functions_file):
+    assert call(worker, functions_file, "fails", 1)["error"] == "ValueError: bad 1"
+    assert call(worker, functions_file, "missing")["error"] == "AttributeError: Function not found: missing"
+    assert "FileNotFoundError" in call(worker, str(Path(functions_file).with_name("nope.py")), "f")["error"]
+    assert worker.request("bogus")["error"] == "ValueError: Unknown command: bogus"
+
+    # A function raising SystemExit fails its call, not the worker
+    assert call(worker, functions_file, "exits")["error"] == "SystemExit: 3"
+    assert worker.request("ping")["output"] == "pong"
+
+
+def test_slow_sync_call_does_not_block_others(worker, functions_file):
+    worker.request("load", file_path=functions_file)
+    slow = worker.send("call", file_path=functions_file, function_name="slow", args=[1.0])
+    fast = [worker.send("call", file_path=functions_file, function_name="double", args=[i]) for i in range(5)]
+    lookup = worker.send("call", file_path=functions_file, function_name="lookup", args=["a"])
+
+    order = [worker.receive()["id"] for _ in range(7)]
+    assert order[-1] == slow
+    assert set(order[:-1]) == set(fast) | {lookup}
+
+
+def test_shutdown_and_end_of_input_exit_cleanly(functions_file):
+    worker = WorkerProcess()
+    try:
+        worker.send("call", file_path=functions_file, function_name="slow", args=[0.2])
+        worker.send("shutdown")
+        # Calls already accepted are answered before the worker exits
+        assert worker.receive()["output"] == "slow"
+        assert worker.process.wait(10) == 0
+    finally:
+        worker.close()
+
+    worker = WorkerProcess()
+    try:
+        worker.process.stdin.close()
+        assert worker.process.wait(10) == 0
+    finally:
+        worker.process.stdout.close()
@@ -33,7 +33,7 @@ setup(
     ],
     python_requires=">=3.8",
     install_requires=[
-        "pywin32>=304",  # For named pipe communication on Windows
+        "pywin32>=304; sys_platform == 'win32'",  # For named pipe communication on Windows
     ],
     extras_require={
         "dev": [
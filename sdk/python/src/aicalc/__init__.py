@@ -1,16 +1,53 @@
 """
 AiCalc Python SDK
 Main module for connecting to and interacting with AiCalc application
+
+Models are imported with the package; the client and columnar types load on
+first access (PEP 562), so importing aicalc stays cheap.
 """
 
-from .client import Workbook, connect
-from .models import CellAddress, CellValue, CellType
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+from .models import CellAddress, CellChange, CellValue, CellType
+
+if TYPE_CHECKING:
+    from .blobs import Blob
+    from .client import Workbook, connect
+    from .columnar import RangeArray
+    from .ranges import Range
+
+# Public name -> submodule that defines it, imported on first access
+_LAZY_ATTRIBUTES = {
+    "Workbook": ".client",
+    "connect": ".client",
+    "RangeArray": ".columnar",
+    "Range": ".ranges",
+    "Blob": ".blobs",
+}
 
 __version__ = "0.1.0"
 __all__ = [
     "Workbook",
     "connect",
+    "RangeArray",
+    "Range",
+    "Blob",
     "CellAddress",
+    "CellChange",
     "CellValue",
     "CellType",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,114 @@
+"""
+Blob transfer for AiCalc SDK
+Moves large cell payloads (images, video, PDFs, tables) through memory-mapped
+files instead of the pipe
+
+Blobs live in a directory both processes can reach, %TEMP%\\AiCalc\\blobs on
+Windows. The control message names the file; each side maps it rather than
+copying it through a JSON string.
+"""
+
+import mmap
+import os
+import sys
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Any, Optional
+
+
+def blob_directory() -> Path:
+    """
+    Directory blob files are exchanged in
+
+    On Windows this follows .NET's Path.GetTempPath() (TMP, then TEMP),
+    so it is the same directory AiCalc uses.
+    """
+    if sys.platform == "win32":
+        temp = os.environ.get("TMP") or os.environ.get("TEMP") or tempfile.gettempdir()
+    else:
+        temp = tempfile.gettempdir()
+    return Path(temp) / "AiCalc" / "blobs"
+
+
+class Blob:
+    """
+    Cell payload mapped into memory
+
+    ``object_type`` is the cell's AiCalc type name, e.g. "Image" or "Table".
+    ``data`` is a read-only memoryview of the mapped file, so reading a
+    blob of any size copies nothing into the Python heap. Close the blob,
+    or use it as a context manager, to unmap it; memoryviews sliced from
+    ``data`` must be released first.
+
+    Example:
+        >>> with workbook.get_blob("B2") as blob:
+        ...     image = PIL.Image.open(io.BytesIO(blob.data))
+    """
+
+    def __init__(self, path: Path, object_type: str, temporary: bool = False):
+        self.path = path
+        self.object_type = object_type
+        self._temporary = temporary
+        self._closed = False
+        self._map: Optional[mmap.mmap] = None
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size:
+                self._map = mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ)
+        self.data = memoryview(self._map) if self._map is not None else memoryview(b"")
+        if temporary and sys.platform != "win32":
+            # The mapping keeps the data alive; Windows can't delete a mapped file
+            self._remove()
+
+    def _remove(self) -> None:
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+        self._temporary = False
+
+    def __len__(self) -> int:
+        return self.data.nbytes
+
+    def tobytes(self) -> bytes:
+        """Copy of the data"""
+        return self.data.tobytes()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self) -> None:
+        """Unmap the data and delete the file if AiCalc made it for this transfer"""
+        self.data.release()
+        self.data = memoryview(b"")
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._temporary:
+            self._remove()
+        self._closed = True
+
+    def __enter__(self) -> "Blob":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"Blob({self.object_type}, {len(self)} bytes)"
+
+
+def write_blob(buffer: Any, suffix: str = "") -> Path:
+    """
+    Write a bytes-like object to a new file in the blob directory
+
+    The buffer is written directly, without an intermediate copy.
+    """
+    directory = blob_directory()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{uuid.uuid4().hex}{suffix}"
+    with open(path, "xb") as file:
+        file.write(buffer)
+    return path
@@ -1,23 +1,49 @@
 """
 AiCalc Client - IPC communication with AiCalc application
-Uses Named Pipes on Windows for inter-process communication
+Uses Named Pipes on Windows for inter-process communication, or a Unix
+domain / TCP socket (see transport.py)
 """
 
 import json
+import logging
 import struct
-import time
-from typing import Any, Callable, Dict, List, Optional
-from dataclasses import dataclass
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Union
+from dataclasses import dataclass, field
+from pathlib import Path
 
-try:
-    import win32pipe
-    import win32file
-    import pywintypes
-    HAS_WIN32 = True
-except ImportError:
-    HAS_WIN32 = False
+from .blobs import Blob, write_blob
+from .columnar import RangeArray
+from .models import CellAddress, CellChange, CellValue, CellType, column_name
+from .ranges import Range
+from .transport import Transport, open_transport
 
-from .models import CellAddress, CellValue, CellType
+logger = logging.getLogger(__name__)
+
+
+def _wire_range(range_ref: Union[str, Range]) -> str:
+    """
+    Range as AiCalc's pipe server reads it: "Sheet1!A1:C10"
+
+    The server splits on ":" and "!" without unquoting sheet names or
+    expanding whole columns and rows, so those are resolved here.
+    """
+    r = Range.parse(range_ref)
+    return (f"{r.sheet}!{column_name(r.first_column)}{r.first_row + 1}"
+            f":{column_name(r.last_column)}{r.last_row + 1}")
+
+
+def _wire_cell(cell_ref: Union[str, Range, CellAddress], single: bool = False) -> str:
+    """
+    Top-left cell of a reference in the same form: "Sheet1!B2"
+
+    With ``single``, references to more than one cell raise ValueError.
+    """
+    r = Range.parse(cell_ref)
+    if single and len(r) != 1:
+        raise ValueError(f"Expected a single cell, got {cell_ref!r}")
+    return f"{r.sheet}!{column_name(r.first_column)}{r.first_row + 1}"
 
 
 @dataclass
@@ -26,6 +52,8 @@ class IPCMessage:
     command: str
     params: Dict[str, Any]
     request_id: int
+    # Binary data sent after the JSON message, when params has "binary_length"
+    payload: Optional[bytearray] = field(default=None, repr=False)
     
     def to_bytes(self) -> bytes:
         """Serialize message to bytes"""
@@ -36,97 +64,155 @@ class IPCMessage:
         }
         json_str = json.dumps(data)
         json_bytes = json_str.encode('utf-8')
-        # Prepend 4-byte length header
-        length = struct.pack('I', len(json_bytes))
+        # Prepend 4-byte little-endian length header
+        length = struct.pack('<I', len(json_bytes))
         return length + json_bytes
     
     @classmethod
     def from_bytes(cls, data: bytes) -> "IPCMessage":
         """Deserialize message from bytes"""
         # Remove 4-byte length header if present
-        if len(data) > 4:
+        if len(data) > 4 and struct.unpack('<I', data[:4])[0] == len(data) - 4:
             data = data[4:]
         json_str = data.decode('utf-8')
         obj = json.loads(json_str)
         return cls(
             command=obj["command"],
-            params=obj["params"],
+            params=obj.get("params") or {},
             request_id=obj["request_id"]
         )
 
 
-class NamedPipeClient:
-    """Named pipe client for Windows IPC"""
+class IPCClient:
+    """
+    IPC client for AiCalc over a named pipe or socket
     
-    def __init__(self, pipe_name: str = "AiCalcPipe"):
-        if not HAS_WIN32:
-            raise RuntimeError("pywin32 is required for named pipe communication. Install with: pip install pywin32")
-        
-        self.pipe_name = f"\\\\.\\pipe\\{pipe_name}"
-        self.handle = None
+    Requests are pipelined: send_request() writes a message and returns a
+    Future immediately, and a background reader thread completes futures as
+    responses arrive, matched by request_id. Many requests can be in flight
+    on one connection and responses may arrive in any order.
+    
+    Messages with request_id 0 are pushed by the server rather than sent in
+    reply; the reader hands them to on_push.
+    
+    Args:
+        address: Pipe name, or "pipe:NAME", "unix:/path" or "tcp:host:port"
+    """
+    
+    def __init__(self, address: str = "AiCalcPipe"):
+        self.address = address
+        self.transport: Optional[Transport] = None
         self._request_counter = 0
+        self._counter_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._pending: Dict[int, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._reader: Optional[threading.Thread] = None
+        self.on_push: Optional[Callable[[IPCMessage], None]] = None
     
     def connect(self, timeout: int = 5000) -> None:
-        """Connect to named pipe server"""
-        start_time = time.time()
-        while time.time() - start_time < timeout / 1000:
-            try:
-                self.handle = win32file.CreateFile(
-                    self.pipe_name,
-                    win32file.GENERIC_READ | win32file.GENERIC_WRITE,
-                    0,
-                    None,
-                    win32file.OPEN_EXISTING,
-                    0,
-                    None
-                )
-                # Set pipe to message mode
-                win32pipe.SetNamedPipeHandleState(
-                    self.handle,
-                    win32pipe.PIPE_READMODE_MESSAGE,
-                    None,
-                    None
-                )
-                return
-            except pywintypes.error as e:
-                if e.args[0] == 2:  # ERROR_FILE_NOT_FOUND
-                    time.sleep(0.1)
-                else:
-                    raise
-        
-        raise TimeoutError(f"Could not connect to AiCalc pipe '{self.pipe_name}' within {timeout}ms")
+        """Connect to the server"""
+        self.transport = open_transport(self.address, timeout)
+        self._start_reader()
+    
+    def next_request_id(self) -> int:
+        """Allocate a request ID (thread-safe)"""
+        with self._counter_lock:
+            self._request_counter += 1
+            return self._request_counter
     
     def send_message(self, message: IPCMessage) -> None:
-        """Send message through pipe"""
-        if not self.handle:
+        """Send message to the server"""
+        if not self.transport:
             raise RuntimeError("Not connected. Call connect() first.")
         
         data = message.to_bytes()
-        win32file.WriteFile(self.handle, data)
+        with self._write_lock:
+            # Header and body are separate pipe messages, as the server reads them
+            self.transport.send_parts([data[:4], data[4:]])
     
     def receive_message(self) -> IPCMessage:
-        """Receive message from pipe"""
-        if not self.handle:
+        """Receive message from the server"""
+        if not self.transport:
             raise RuntimeError("Not connected. Call connect() first.")
         
         # Read 4-byte length header
-        _, length_bytes = win32file.ReadFile(self.handle, 4)
-        length = struct.unpack('I', length_bytes)[0]
+        length_bytes = self.transport.read_exact(4)
+        length = struct.unpack('<I', length_bytes)[0]
         
         # Read message body
-        _, data = win32file.ReadFile(self.handle, length)
-        return IPCMessage.from_bytes(data)
+        data = self.transport.read_exact(length)
+        message = IPCMessage.from_bytes(data)
+        
+        # A binary payload follows as its own length-prefixed message
+        binary_length = message.params.get("binary_length")
+        if binary_length is not None:
+            if struct.unpack('<I', self.transport.read_exact(4))[0] != binary_length:
+                raise ConnectionError("Binary payload length does not match its header")
+            message.payload = bytearray(binary_length)
+            self.transport.read_exact_into(memoryview(message.payload))
+        return message
     
-    def send_and_receive(self, message: IPCMessage) -> IPCMessage:
+    def send_request(self, message: IPCMessage) -> Future:
+        """
+        Send message without waiting for the response
+        
+        Returns:
+            Future resolved with the response IPCMessage carrying the same request_id
+        """
+        future: Future = Future()
+        with self._pending_lock:
+            if message.request_id in self._pending:
+                raise ValueError(f"Request {message.request_id} is already in flight")
+            self._pending[message.request_id] = future
+        
+        try:
+            self.send_message(message)
+        except Exception as e:
+            with self._pending_lock:
+                self._pending.pop(message.request_id, None)
+            future.set_exception(e)
+        return future
+    
+    def send_and_receive(self, message: IPCMessage, timeout: Optional[float] = None) -> IPCMessage:
         """Send message and wait for response"""
-        self.send_message(message)
-        return self.receive_message()
+        return self.send_request(message).result(timeout)
+    
+    def _start_reader(self) -> None:
+        self._reader = threading.Thread(target=self._read_loop, name="aicalc-pipe-reader", daemon=True)
+        self._reader.start()
+    
+    def _read_loop(self) -> None:
+        """Complete pending futures as responses arrive"""
+        error: Exception = ConnectionError("Connection closed")
+        try:
+            while self.transport:
+                response = self.receive_message()
+                if response.request_id == 0:
+                    if self.on_push is not None:
+                        self.on_push(response)
+                    continue
+                with self._pending_lock:
+                    future = self._pending.pop(response.request_id, None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except Exception as e:
+            error = e if self.transport else ConnectionError("Connection closed")
+        
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
     
     def close(self) -> None:
-        """Close pipe connection"""
-        if self.handle:
-            win32file.CloseHandle(self.handle)
-            self.handle = None
+        """Close the connection"""
+        if self.transport:
+            transport, self.transport = self.transport, None
+            transport.close()
+        if self._reader is not None and self._reader is not threading.current_thread():
+            self._reader.join(timeout=1)
+            self._reader = None
     
     def __enter__(self):
         return self
@@ -135,6 +221,10 @@ class NamedPipeClient:
         self.close()
 
 
+# Original name, from when named pipes were the only transport
+NamedPipeClient = IPCClient
+
+
 class Workbook:
     """
     Workbook client for interacting with AiCalc
@@ -147,9 +237,12 @@ class Workbook:
         Hello
     """
     
-    def __init__(self, pipe_name: str = "AiCalcPipe"):
-        self.client = NamedPipeClient(pipe_name)
+    def __init__(self, pipe_name: str = "AiCalcPipe", address: Optional[str] = None):
+        self.client = IPCClient(address or pipe_name)
+        self.client.on_push = self._on_push
         self._connected = False
+        self._subscriptions: Dict[int, Callable[[List[CellChange]], Any]] = {}
+        self._callbacks: Optional[ThreadPoolExecutor] = None
     
     def connect(self, timeout: int = 5000) -> None:
         """Connect to AiCalc application"""
@@ -160,6 +253,10 @@ class Workbook:
         """Disconnect from AiCalc"""
         self.client.close()
         self._connected = False
+        self._subscriptions.clear()
+        if self._callbacks is not None:
+            self._callbacks.shutdown(wait=False)
+            self._callbacks = None
     
     def _ensure_connected(self) -> None:
         """Ensure we're connected before operations"""
@@ -168,8 +265,7 @@ class Workbook:
     
     def _next_request_id(self) -> int:
         """Get next request ID"""
-        self.client._request_counter += 1
-        return self.client._request_counter
+        return self.client.next_request_id()
     
     def get_value(self, cell_ref: str) -> Any:
         """
@@ -197,6 +293,37 @@ class Workbook:
         response = self.client.send_and_receive(message)
         return response.params.get("value")
     
+    def get_values(self, cell_refs: List[str]) -> List[Any]:
+        """
+        Get many cell values, pipelining the requests over one connection
+        
+        All requests are written before any response is awaited, so the
+        cost is close to one round trip rather than one per cell.
+        
+        Args:
+            cell_refs: Cell references like ["A1", "Sheet1!B2"]
+            
+        Returns:
+            Values in the same order as cell_refs
+        """
+        self._ensure_connected()
+        
+        futures = []
+        for cell_ref in cell_refs:
+            addr = CellAddress.parse(cell_ref)
+            message = IPCMessage(
+                command="GetValue",
+                params={
+                    "sheet": addr.sheet,
+                    "row": addr.row,
+                    "column": addr.column
+                },
+                request_id=self._next_request_id()
+            )
+            futures.append(self.client.send_request(message))
+        
+        return [future.result().params.get("value") for future in futures]
+    
     def set_value(self, cell_ref: str, value: Any) -> None:
         """
         Set cell value
@@ -223,6 +350,63 @@ class Workbook:
         if response.params.get("status") != "success":
             raise RuntimeError(f"Failed to set value: {response.params.get('error')}")
     
+    def set_range(self, start_ref: str, rows: Iterable[Iterable[Any]]) -> int:
+        """
+        Write a block of values in one message
+        
+        Cells are written in one pass on the UI thread and dependent cells
+        are evaluated once at the end. If any cell falls outside the sheet,
+        nothing is written.
+        
+        Args:
+            start_ref: Top-left cell like "A1", "Sheet1!B2" or "'My Sheet'!C3"
+            rows: Rows of values, e.g. a list of lists or a 2D NumPy array
+            
+        Returns:
+            Number of cells written
+        """
+        self._ensure_connected()
+        
+        message = IPCMessage(
+            command="SetRange",
+            params={
+                "range": _wire_cell(start_ref),
+                "values": [row.tolist() if hasattr(row, "tolist") else list(row) for row in rows]
+            },
+            request_id=self._next_request_id()
+        )
+        
+        response = self.client.send_and_receive(message)
+        if response.params.get("status") != "success":
+            raise RuntimeError(f"SetRange failed: {response.params.get('error')}")
+        return response.params.get("cells_written", 0)
+    
+    def set_values(self, values: Mapping[str, Any]) -> int:
+        """
+        Write many cells in one message, evaluating dependents once
+        
+        Args:
+            values: Cell reference to value, like {"A1": 1, "Sheet2!B3": "x"}
+            
+        Returns:
+            Number of cells written
+            
+        Raises:
+            ValueError: if a key isn't a single cell reference
+        """
+        self._ensure_connected()
+        
+        message = IPCMessage(
+            command="SetValues",
+            params={"values": {_wire_cell(cell_ref, single=True): value for cell_ref, value in values.items()}},
+            request_id=self._next_request_id()
+        )
+        
+        response = self.client.send_and_receive(message)
+        if response.params.get("status") != "success":
+            raise RuntimeError(f"SetValues failed: {response.params.get('error')}")
+        return response.params.get("cells_written", 0)
+    
     def get_formula(self, cell_ref: str) -> Optional[str]:
         """Get cell formula"""
         self._ensure_connected()
@@ -261,12 +445,12 @@ class Workbook:
         if response.params.get("status") != "success":
             raise RuntimeError(f"Failed to set formula: {response.params.get('error')}")
     
-    def get_range(self, range_ref: str) -> List[List[Any]]:
+    def get_range(self, range_ref: Union[str, Range]) -> List[List[Any]]:
         """
         Get range of cells as 2D array
         
         Args:
-            range_ref: Range reference like "A1:C10"
+            range_ref: Range reference like "A1:C10", or a Range
             
         Returns:
             2D array of cell values
@@ -275,13 +459,49 @@ class Workbook:
         
         message = IPCMessage(
             command="GetRange",
-            params={"range": range_ref},
+            params={"range": _wire_range(range_ref)},
             request_id=self._next_request_id()
         )
         
         response = self.client.send_and_receive(message)
         return response.params.get("values", [])
     
+    def get_range_array(self, range_ref: Union[str, Range], dtype: str = "auto") -> RangeArray:
+        """
+        Get range of cells as typed columns
+        
+        Values are sent as contiguous binary columns instead of JSON, and
+        numeric columns are exposed as NumPy arrays (or memoryviews without
+        NumPy) that view the received buffer directly.
+        
+        Args:
+            range_ref: Range reference like "A1:T100000", or a Range
+            dtype: "auto" sends columns whose non-empty cells are all numbers
+                as float64 and the rest as text; "float64" forces numbers
+                (NaN where a cell isn't one); "text" sends display values.
+                Any other NumPy dtype is received as float64 and converted.
+            
+        Returns:
+            RangeArray keyed by column letter
+            
+        Example:
+            >>> df = workbook.get_range_array("A1:T100000").to_pandas()
+        """
+        self._ensure_connected()
+        
+        wire_dtype = dtype if dtype in ("auto", "float64", "text") else "float64"
+        message = IPCMessage(
+            command="GetRangeColumns",
+            params={"range": _wire_range(range_ref), "dtype": wire_dtype},
+            request_id=self._next_request_id()
+        )
+        
+        response = self.client.send_and_receive(message)
+        if response.params.get("status") != "success":
+            raise RuntimeError(f"Failed to get range: {response.params.get('error')}")
+        return RangeArray(response.params, response.payload or bytearray(),
+                          dtype=None if wire_dtype == dtype else dtype)
+    
     def run_function(self, function_name: str, *args) -> Any:
         """
         Execute AiCalc function
@@ -328,6 +548,185 @@ class Workbook:
         if response.params.get("status") != "success":
             raise RuntimeError(f"Evaluation failed: {response.params.get('error')}")
     
+    def get_blob(self, cell_ref: str) -> Blob:
+        """
+        Get a cell's content as a memory-mapped blob
+        
+        Images, video and PDFs are mapped straight from the file the cell
+        refers to; other cells (tables, JSON, text) are written by AiCalc to
+        a temporary file that is removed when the blob is closed. Either way
+        the content never passes through the pipe.
+        
+        Args:
+            cell_ref: Cell reference like "B2"
+            
+        Returns:
+            Blob whose ``data`` is a read-only memoryview of the content
+        """
+        self._ensure_connected()
+        
+        addr = CellAddress.parse(cell_ref)
+        message = IPCMessage(
+            command="GetBlob",
+            params={
+                "sheet": addr.sheet,
+                "row": addr.row,
+                "column": addr.column
+            },
+            request_id=self._next_request_id()
+        )
+        
+        response = self.client.send_and_receive(message)
+        if response.params.get("status") != "success":
+            raise RuntimeError(f"Failed to get blob: {response.params.get('error')}")
+        return Blob(Path(response.params["blob_path"]), response.params.get("object_type", "Empty"),
+                    temporary=bool(response.params.get("temporary")))
+    
+    def put_blob(self, cell_ref: str, buffer: Any, object_type: Union[CellType, str, None] = None,
+                 file_name: Optional[str] = None) -> str:
+        """
+        Store a bytes-like object in a cell without sending it through the pipe
+        
+        The buffer is written once to a file that AiCalc takes over. For
+        images, video, PDFs and files, that file becomes the cell's file;
+        for other types AiCalc reads it as UTF-8 text.
+        
+        Args:
+            cell_ref: Cell reference like "B2"
+            buffer: bytes, bytearray, memoryview, mmap or C-contiguous array
+            object_type: Cell type, e.g. CellType.IMAGE; defaults to the
+                cell's current type when that is file-backed, otherwise File
+            file_name: Original file name; its extension is kept so AiCalc
+                can tell the format
+            
+        Returns:
+            The cell's new object type
+        
+        Example:
+            >>> with open("scan.png", "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            ...     wb.put_blob("B2", data, CellType.IMAGE, file_name="scan.png")
+        """
+        self._ensure_connected()
+        
+        addr = CellAddress.parse(cell_ref)
+        path = write_blob(buffer, suffix=Path(file_name).suffix if file_name else "")
+        if isinstance(object_type, CellType):
+            object_type = object_type.value
+        message = IPCMessage(
+            command="PutBlob",
+            params={
+                "sheet": addr.sheet,
+                "row": addr.row,
+                "column": addr.column,
+                "blob_path": str(path),
+                "object_type": object_type,
+                "file_name": file_name
+            },
+            request_id=self._next_request_id()
+        )
+        
+        try:
+            response = self.client.send_and_receive(message)
+        except BaseException:
+            path.unlink(missing_ok=True)
+            raise
+        if response.params.get("status") != "success":
+            path.unlink(missing_ok=True)
+            raise RuntimeError(f"Failed to put blob: {response.params.get('error')}")
+        return response.params.get("object_type", object_type or "File")
+    
+    def watch(self, range_ref: Union[str, Range], callback: Callable[[List[CellChange]], Any]) -> int:
+        """
+        Call back whenever cells in a range change
+        
+        AiCalc pushes changes as cells are edited or evaluated. Changes within
+        one frame (about 16 ms) arrive as one list with the latest state of
+        each cell. Callbacks run one at a time on a background thread and may
+        use this workbook.
+        
+        Args:
+            range_ref: Cell or range like "A1" or "Sheet1!A1:C10", or a Range
+            callback: Called with a list of CellChange
+            
+        Returns:
+            Subscription id for unwatch()
+        
+        Example:
+            >>> wb.watch("A1:A10", lambda changes: print([c.value for c in changes]))
+        """
+        self._ensure_connected()
+        
+        wire_range = _wire_range(range_ref)
+        if self._callbacks is None:
+            self._callbacks = ThreadPoolExecutor(max_workers=1, thread_name_prefix="aicalc-callbacks")
+        
+        # The id is chosen here so changes pushed before the response can be routed
+        subscription_id = self._next_request_id()
+        self._subscriptions[subscription_id] = callback
+        message = IPCMessage(
+            command="Watch",
+            params={
+                "range": wire_range,
+                "subscription_id": subscription_id
+            },
+            request_id=subscription_id
+        )
+        
+        response = self.client.send_and_receive(message)
+        if response.params.get("status") != "success":
+            self._subscriptions.pop(subscription_id, None)
+            raise RuntimeError(f"Watch failed: {response.params.get('error')}")
+        return subscription_id
+    
+    def unwatch(self, subscription_id: int) -> bool:
+        """
+        Stop a watch() subscription
+        
+        Returns:
+            True if the subscription existed
+        """
+        self._ensure_connected()
+        
+        self._subscriptions.pop(subscription_id, None)
+        message = IPCMessage(
+            command="Unwatch",
+            params={"subscription_id": subscription_id},
+            request_id=self._next_request_id()
+        )
+        
+        response = self.client.send_and_receive(message)
+        if response.params.get("status") != "success":
+            raise RuntimeError(f"Unwatch failed: {response.params.get('error')}")
+        return bool(response.params.get("removed"))
+    
+    def _on_push(self, message: IPCMessage) -> None:
+        """Queue a CellsChanged push for its subscription's callback (runs on the reader thread)"""
+        callback = self._subscriptions.get(message.params.get("subscription_id"))
+        callbacks = self._callbacks
+        if message.command != "CellsChanged" or callback is None or callbacks is None:
+            return
+        
+        changes = [
+            CellChange(
+                address=CellAddress.parse(change["cell"]),
+                value=change.get("value"),
+                object_type=change.get("object_type", "Empty"),
+                formula=change.get("formula")
+            )
+            for change in message.params.get("changes", [])
+        ]
+        try:
+            callbacks.submit(self._run_callback, callback, changes)
+        except RuntimeError:
+            pass  # Disconnected
+    
+    @staticmethod
+    def _run_callback(callback: Callable[[List[CellChange]], Any], changes: List[CellChange]) -> None:
+        try:
+            callback(changes)
+        except Exception:
+            logger.exception("Cell change callback failed")
+    
     def __enter__(self):
         if not self._connected:
             self.connect()
@@ -337,13 +736,14 @@ class Workbook:
         self.disconnect()
 
 
-def connect(pipe_name: str = "AiCalcPipe", timeout: int = 5000) -> Workbook:
+def connect(pipe_name: str = "AiCalcPipe", timeout: int = 5000, address: Optional[str] = None) -> Workbook:
     """
     Connect to running AiCalc instance
     
     Args:
         pipe_name: Named pipe name (default: "AiCalcPipe")
         timeout: Connection timeout in milliseconds
+        address: Transport address overriding pipe_name, e.g. "tcp:127.0.0.1:8766"
         
     Returns:
         Connected Workbook instance
@@ -352,6 +752,6 @@ def connect(pipe_name: str = "AiCalcPipe", timeout: int = 5000) -> Workbook:
         >>> workbook = connect()
         >>> workbook.set_value("A1", "Hello from Python!")
     """
-    workbook = Workbook(pipe_name)
+    workbook = Workbook(pipe_name, address)
     workbook.connect(timeout)
     return workbook
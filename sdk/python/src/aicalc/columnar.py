@@ -0,0 +1,158 @@
+"""
+Columnar range data for AiCalc SDK
+Typed columns decoded from a GetRangeColumns binary payload
+"""
+
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+
+def _numpy():
+    """Import NumPy on first use; returns None when it isn't installed"""
+    try:
+        import numpy
+        return numpy
+    except ImportError:
+        return None
+
+
+class TextColumn(Sequence[str]):
+    """
+    Text column stored as int32 offsets plus UTF-8 bytes
+
+    Values are decoded on access, so holding a column costs only the
+    received buffer.
+    """
+
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("TextColumn index out of range")
+        return str(self._data[self._offsets[index]:self._offsets[index + 1]], "utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        offsets, data = self._offsets, self._data
+        for i in range(len(self)):
+            yield str(data[offsets[i]:offsets[i + 1]], "utf-8")
+
+    def tolist(self) -> List[str]:
+        return list(self)
+
+    def __repr__(self) -> str:
+        return f"TextColumn(len={len(self)})"
+
+
+class RangeArray:
+    """
+    Range of cells as typed columns, keyed by column letter
+
+    Numeric columns are float64 with NaN for empty cells. With NumPy
+    installed they are arrays that view the received buffer without copying;
+    otherwise they are memoryviews of format "d". Text columns are
+    TextColumn sequences.
+
+    Example:
+        >>> data = workbook.get_range_array("A1:C100000")
+        >>> data["A"].mean()
+        >>> df = data.to_pandas()
+    """
+
+    def __init__(self, params: Dict[str, Any], payload: bytearray, dtype: Optional[str] = None):
+        if dtype and _numpy() is None:
+            raise ImportError(f"NumPy is required to convert columns to {dtype}")
+        self.rows: int = params.get("rows", 0)
+        self._descriptors: Dict[str, Dict[str, Any]] = {c["name"]: c for c in params.get("columns", [])}
+        self._payload = memoryview(payload)
+        self._dtype = dtype
+        self._cache: Dict[str, Any] = {}
+
+    @property
+    def columns(self) -> List[str]:
+        """Column letters in range order"""
+        return list(self._descriptors)
+
+    @property
+    def dtypes(self) -> Dict[str, str]:
+        """Wire type of each column: float64 or text"""
+        return {name: c["type"] for name, c in self._descriptors.items()}
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._descriptors
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._descriptors)
+
+    def __getitem__(self, name: str) -> Union[Any, memoryview, TextColumn]:
+        if name not in self._cache:
+            self._cache[name] = self._decode(self._descriptors[name])
+        return self._cache[name]
+
+    def _decode(self, descriptor: Dict[str, Any]) -> Union[Any, memoryview, TextColumn]:
+        offset = descriptor["offset"]
+
+        if descriptor["type"] == "text":
+            offsets = self._payload[offset:offset + (self.rows + 1) * 4]
+            data_offset = descriptor["data_offset"]
+            data = self._payload[data_offset:data_offset + descriptor["data_length"]]
+            if sys.byteorder != "little":
+                offsets = memoryview(bytes(offsets)).cast("i").tolist()
+                return TextColumn(offsets, data)
+            return TextColumn(offsets.cast("i"), data)
+
+        buffer = self._payload[offset:offset + descriptor["length"]]
+        numpy = _numpy()
+        if numpy is not None:
+            column = numpy.frombuffer(buffer, dtype="<f8")
+            return column.astype(self._dtype) if self._dtype else column
+
+        if sys.byteorder != "little":
+            import array
+            values = array.array("d", bytes(buffer))
+            values.byteswap()
+            return memoryview(values)
+        return buffer.cast("d")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Columns by letter"""
+        return {name: self[name] for name in self._descriptors}
+
+    def to_numpy(self):
+        """
+        Numeric columns as one 2D array (rows x columns)
+
+        Raises:
+            TypeError: if the range has text columns
+        """
+        numpy = _numpy()
+        if numpy is None:
+            raise ImportError("NumPy is required for to_numpy()")
+        text = [name for name, c in self._descriptors.items() if c["type"] == "text"]
+        if text:
+            raise TypeError(f"Columns {', '.join(text)} are text; use to_pandas() or pass dtype=\"float64\"")
+        if not self._descriptors:
+            return numpy.empty((self.rows, 0))
+        return numpy.column_stack([self[name] for name in self._descriptors])
+
+    def to_pandas(self):
+        """Columns as a pandas DataFrame"""
+        import pandas
+        return pandas.DataFrame({
+            name: column.tolist() if isinstance(column, TextColumn) else column
+            for name, column in self.to_dict().items()
+        }, copy=False)
+
+    def __repr__(self) -> str:
+        return f"RangeArray(rows={self.rows}, columns={self.columns})"
@@ -0,0 +1,342 @@
+"""
+Compact in-memory sheets
+Cells stored in typed arrays instead of one Python object per cell
+
+A CompactSheet splits each column into blocks of rows. Only blocks holding
+at least one cell are allocated. A block keeps:
+
+- a one-byte type tag per row (0 for an empty cell)
+- numbers in a float64 array, NaN where the cell isn't a number
+- text as ids into the sheet's table of interned strings
+
+Formulas are interned the same way, in an array that is only allocated for
+blocks that have one. A million numbers take about 13 MB instead of the
+hundreds of MB that CellAddress and CellValue objects would need.
+CellValue objects are created when a cell is read and are not kept.
+
+Example:
+    >>> sheet = CompactSheet("Sheet1")
+    >>> sheet["A1"] = 42
+    >>> sheet["B1"] = CellValue(84.0, CellType.NUMBER, formula="=SUM(A1, A1)")
+    >>> sheet["A1"]
+    CellValue(type=Number, value=42.0)
+    >>> sheet.column_values("A")  # array('d') of numbers, NaN elsewhere
+"""
+
+import math
+import re
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .models import CellAddress, CellType, CellValue, column_index
+
+CellRef = Union[str, CellAddress, Tuple[int, int]]
+
+_TYPES = list(CellType)
+_TAGS = {cell_type: index + 1 for index, cell_type in enumerate(_TYPES)}
+
+# Offline/IPC object type names that have no CellType member are read as text
+_TYPE_NAMES = {cell_type.value: cell_type for cell_type in _TYPES}
+
+_BOOLEAN_TAG = _TAGS[CellType.BOOLEAN]
+_NAN = math.nan
+
+_ADDRESS = re.compile(r"([A-Za-z]{1,3})([1-9][0-9]*)")
+
+# Id slot of a cell whose value is None or kept in CompactSheet._objects,
+# and of a cell whose value is in the numbers array. Booleans use 0 and 1.
+_NO_ID = -1
+_NUMBER_ID = -2
+
+
+class _Block:
+    """Rows [start, start + size) of one column"""
+    __slots__ = ("tags", "numbers", "ids", "formulas", "count")
+
+    def __init__(self, size: int):
+        self.tags = bytearray(size)
+        self.numbers = array("d", [_NAN]) * size
+        self.ids = array("i", [_NO_ID]) * size
+        self.formulas: Optional[array] = None  # interned id + 1, 0 for none
+        self.count = 0
+
+
+class CompactSheet:
+    """
+    Sheet of cells kept in typed arrays
+
+    Cells are addressed with "B2", a CellAddress or a (row, column) tuple of
+    0-based indices. Reading an empty cell gives an empty CellValue. Numbers
+    are stored as float64 and come back as float.
+    """
+
+    def __init__(self, name: str = "Sheet1", block_rows: int = 256):
+        if block_rows < 1:
+            raise ValueError(f"block_rows must be at least 1, got {block_rows!r}")
+        self.name = name
+        self.block_rows = block_rows
+        self._blocks: Dict[Tuple[int, int], _Block] = {}  # (column, row // block_rows)
+        self._strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        # Rarely used: values that aren't numbers, booleans or text, and
+        # raw_value/notes, keyed by (row, column)
+        self._objects: Dict[Tuple[int, int], Any] = {}
+        self._extras: Dict[Tuple[int, int], Tuple[Optional[str], Optional[str]]] = {}
+        self._count = 0
+
+    @classmethod
+    def from_cells(cls, name: str, cells: Iterable[Any], block_rows: int = 256) -> "CompactSheet":
+        """
+        Build a sheet from cells read by aicalc.offline
+
+        ``cells`` yields objects with ``address``, ``value``, ``object_type``
+        and ``formula`` attributes, such as OfflineCell. They are copied
+        one at a time, so a generator like iter_cells() never needs all of
+        them in memory.
+        """
+        sheet = cls(name, block_rows)
+        for cell in cells:
+            sheet.add(cell)
+        return sheet
+
+    def add(self, cell: Any) -> None:
+        """Store a cell read by aicalc.offline (see from_cells())."""
+        row, column = self._position(cell.address)
+        default = CellType.TEXT if cell.value is not None else CellType.EMPTY
+        cell_type = _TYPE_NAMES.get(cell.object_type or "", default)
+        self.set(row, column, cell.value, cell_type, formula=cell.formula or None)
+
+    def _position(self, ref: CellRef) -> Tuple[int, int]:
+        if isinstance(ref, tuple):
+            return ref
+        if isinstance(ref, str):
+            match = _ADDRESS.fullmatch(ref)
+            if match is None:
+                ref = CellAddress.parse(ref)  # Sheet-qualified or unusual forms
+            else:
+                return int(match.group(2)) - 1, column_index(match.group(1))
+        return ref.row, ref.column
+
+    def _intern(self, text: str) -> int:
+        string_id = self._string_ids.get(text)
+        if string_id is None:
+            string_id = self._string_ids[text] = len(self._strings)
+            self._strings.append(text)
+        return string_id
+
+    def set(self, row: int, column: int, value: Any, cell_type: Optional[CellType] = None,
+            formula: Optional[str] = None, raw_value: Optional[str] = None,
+            notes: Optional[str] = None) -> None:
+        """
+        Store a cell
+
+        The type is taken from the value when not given: NUMBER for int and
+        float, BOOLEAN for bool and TEXT otherwise. Setting None without a
+        formula empties the cell.
+        """
+        if row < 0 or column < 0:
+            raise IndexError(f"Cell ({row}, {column}) is outside the sheet")
+        if value is None and cell_type in (None, CellType.EMPTY) and not formula and raw_value is None and notes is None:
+            self.delete(row, column)
+            return
+        if cell_type is None:
+            if isinstance(value, bool):
+                cell_type = CellType.BOOLEAN
+            elif isinstance(value, (int, float)):
+                cell_type = CellType.NUMBER
+            else:
+                cell_type = CellType.TEXT if value is not None else CellType.EMPTY
+
+        key = (column, row // self.block_rows)
+        block = self._blocks.get(key)
+        if block is None:
+            block = self._blocks[key] = _Block(self.block_rows)
+        index = row % self.block_rows
+        if not block.tags[index]:
+            block.count += 1
+            self._count += 1
+
+        position = (row, column)
+        self._objects.pop(position, None)
+        block.numbers[index] = _NAN
+        block.ids[index] = _NO_ID
+        if cell_type is CellType.NUMBER and isinstance(value, (int, float)) and not isinstance(value, bool):
+            block.numbers[index] = value
+            block.ids[index] = _NUMBER_ID
+        elif cell_type is CellType.BOOLEAN and isinstance(value, bool):
+            block.ids[index] = int(value)
+        elif isinstance(value, str):
+            block.ids[index] = self._intern(value)
+        elif value is not None:
+            self._objects[position] = value
+        block.tags[index] = _TAGS[cell_type]
+
+        if formula:
+            if block.formulas is None:
+                block.formulas = array("i", bytes(block.ids.itemsize * self.block_rows))
+            block.formulas[index] = self._intern(formula) + 1
+        elif block.formulas is not None:
+            block.formulas[index] = 0
+
+        if raw_value is not None or notes is not None:
+            self._extras[position] = (raw_value, notes)
+        else:
+            self._extras.pop(position, None)
+
+    def delete(self, row: int, column: int) -> None:
+        """Empty a cell."""
+        block = self._blocks.get((column, row // self.block_rows))
+        index = row % self.block_rows
+        if block is None or not block.tags[index]:
+            return
+        block.tags[index] = 0
+        block.numbers[index] = _NAN
+        block.ids[index] = _NO_ID
+        if block.formulas is not None:
+            block.formulas[index] = 0
+        block.count -= 1
+        self._count -= 1
+        if not block.count:
+            del self._blocks[(column, row // self.block_rows)]
+        self._objects.pop((row, column), None)
+        self._extras.pop((row, column), None)
+
+    def _value(self, block: _Block, index: int, tag: int, position: Tuple[int, int]) -> Any:
+        string_id = block.ids[index]
+        if string_id == _NUMBER_ID:
+            return block.numbers[index]
+        if string_id == _NO_ID:
+            return self._objects.get(position)
+        if tag == _BOOLEAN_TAG:
+            return bool(string_id)
+        return self._strings[string_id]
+
+    def get_value(self, ref: CellRef) -> Any:
+        """Value of a cell without building a CellValue; None when empty"""
+        row, column = self._position(ref)
+        block = self._blocks.get((column, row // self.block_rows))
+        if block is None:
+            return None
+        index = row % self.block_rows
+        tag = block.tags[index]
+        return self._value(block, index, tag, (row, column)) if tag else None
+
+    def get(self, row: int, column: int) -> Optional[CellValue]:
+        """CellValue view of a cell, or None when it is empty"""
+        block = self._blocks.get((column, row // self.block_rows))
+        if block is None:
+            return None
+        index = row % self.block_rows
+        tag = block.tags[index]
+        if not tag:
+            return None
+        formula = None
+        if block.formulas is not None and block.formulas[index]:
+            formula = self._strings[block.formulas[index] - 1]
+        raw_value, notes = self._extras.get((row, column), (None, None))
+        return CellValue(self._value(block, index, tag, (row, column)), _TYPES[tag - 1],
+                         raw_value=raw_value, formula=formula, notes=notes)
+
+    def __getitem__(self, ref: CellRef) -> CellValue:
+        row, column = self._position(ref)
+        return self.get(row, column) or CellValue(None, CellType.EMPTY)
+
+    def __setitem__(self, ref: CellRef, value: Any) -> None:
+        row, column = self._position(ref)
+        if isinstance(value, CellValue):
+            self.set(row, column, value.value, value.cell_type, value.formula, value.raw_value, value.notes)
+        else:
+            self.set(row, column, value)
+
+    def __delitem__(self, ref: CellRef) -> None:
+        self.delete(*self._position(ref))
+
+    def __contains__(self, ref: CellRef) -> bool:
+        row, column = self._position(ref)
+        block = self._blocks.get((column, row // self.block_rows))
+        return block is not None and bool(block.tags[row % self.block_rows])
+
+    def __len__(self) -> int:
+        """Number of non-empty cells"""
+        return self._count
+
+    def set_range(self, start_ref: CellRef, rows: Iterable[Iterable[Any]]) -> int:
+        """Store a block of values with its top-left cell at start_ref; returns the cell count."""
+        first_row, first_column = self._position(start_ref)
+        count = 0
+        for row_offset, values in enumerate(rows):
+            for column_offset, value in enumerate(values):
+                self.set(first_row + row_offset, first_column + column_offset, value)
+                count += 1
+        return count
+
+    def positions(self) -> Iterator[Tuple[int, int]]:
+        """(row, column) of every non-empty cell, row by row"""
+        bands: Dict[int, List[int]] = {}
+        for column, band in self._blocks:
+            bands.setdefault(band, []).append(column)
+        for band in sorted(bands):
+            first_row = band * self.block_rows
+            cells: List[Tuple[int, int]] = []
+            for column in bands[band]:
+                tags = self._blocks[(column, band)].tags
+                cells.extend((index, column) for index, tag in enumerate(tags) if tag)
+            cells.sort()
+            for index, column in cells:
+                yield first_row + index, column
+
+    def items(self) -> Iterator[Tuple[CellAddress, CellValue]]:
+        """(address, value) of every non-empty cell, row by row"""
+        for row, column in self.positions():
+            yield CellAddress(self.name, row, column), self.get(row, column)
+
+    def column_values(self, column: Union[int, str], first_row: int = 0,
+                      last_row: Optional[int] = None) -> array:
+        """
+        Numbers of a column as array('d'), NaN for cells that aren't numbers
+
+        Blocks are copied whole, without a Python object per cell; wrap the
+        result with numpy.frombuffer() for a zero-copy NumPy array.
+
+        Args:
+            column: 0-based index or letters ("C")
+            first_row: First 0-based row (default: 0)
+            last_row: Last 0-based row, inclusive (default: last non-empty row)
+        """
+        if isinstance(column, str):
+            column = column_index(column)
+        if last_row is None:
+            bands = [band for c, band in self._blocks if c == column]
+            if not bands:
+                return array("d")
+            block = self._blocks[(column, max(bands))]
+            last_index = max(i for i, tag in enumerate(block.tags) if tag)
+            last_row = max(bands) * self.block_rows + last_index
+        if last_row < first_row:
+            return array("d")
+
+        result = array("d")
+        empty = array("d", [_NAN]) * self.block_rows
+        for band in range(first_row // self.block_rows, last_row // self.block_rows + 1):
+            block = self._blocks.get((column, band))
+            numbers = block.numbers if block is not None else empty
+            start = max(first_row - band * self.block_rows, 0)
+            stop = min(last_row - band * self.block_rows + 1, self.block_rows)
+            result.extend(numbers[start:stop])
+        return result
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the sheet's arrays and strings"""
+        total = sys.getsizeof(self._blocks) + sys.getsizeof(self._strings) + sys.getsizeof(self._string_ids)
+        for block in self._blocks.values():
+            total += sys.getsizeof(block) + sys.getsizeof(block.tags)
+            total += sys.getsizeof(block.numbers) + sys.getsizeof(block.ids)
+            if block.formulas is not None:
+                total += sys.getsizeof(block.formulas)
+        total += sum(sys.getsizeof(text) for text in self._strings)
+        return total
+
+    def __repr__(self) -> str:
+        return f"CompactSheet(name={self.name!r}, cells={self._count}, blocks={len(self._blocks)})"
@@ -0,0 +1,32 @@
+"""
+Headless evaluation engine
+Recalculates saved workbooks without AiCalc running, e.g. on batch servers
+
+Formulas are parsed into a dependency graph and evaluated in topological
+waves; the cells of a wave that call registered @aicalc_function functions
+run in parallel on a thread or process pool. After edits, only the edited
+formulas and the cells depending on edited cells are evaluated again.
+
+Example:
+    >>> from aicalc.engine import EvaluationEngine
+    >>> engine = EvaluationEngine.from_file("model.aicalc", max_degree_of_parallelism=8)
+    >>> result = engine.recalculate()
+    >>> engine.set_value("B2", 10)
+    >>> engine.recalculate().cells_evaluated  # only B2's dependents
+"""
+
+from .evaluator import DEFAULT_TIMEOUT_SECONDS, EvaluationEngine, EvaluationProgress, EvaluationResult
+from .formulas import BUILTIN_FUNCTIONS, CellError, FormulaError, parse_formula
+from .graph import DependencyGraph
+
+__all__ = [
+    "EvaluationEngine",
+    "EvaluationProgress",
+    "EvaluationResult",
+    "DependencyGraph",
+    "CellError",
+    "FormulaError",
+    "parse_formula",
+    "BUILTIN_FUNCTIONS",
+    "DEFAULT_TIMEOUT_SECONDS",
+]
@@ -0,0 +1,394 @@
+"""
+Headless recalculation of AiCalc workbooks
+
+The Python counterpart of EvaluationEngine.cs: formula cells are evaluated
+in dependency order, one wave at a time, and the cells of a wave run in
+parallel on a thread or process pool.
+"""
+
+import importlib.util
+import os
+import sys
+import time
+from concurrent.futures import ALL_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from ..offline import OfflineWorkbook, load_workbook
+from .formulas import (
+    BUILTIN_FUNCTIONS, CALL, LITERAL, CellError, CellKey, Expression, FormulaError,
+    bind, evaluate, evaluate_many, function_names, parse_cell_ref, parse_formula, references,
+)
+from .graph import DependencyGraph
+
+# Same default as EvaluationEngine.DefaultTimeoutSeconds
+DEFAULT_TIMEOUT_SECONDS = 100.0
+
+# How often running calls are checked against the timeout
+_POLL_INTERVAL = 0.05
+
+
+@dataclass
+class EvaluationProgress:
+    """Progress of a recalculation, reported before each wave and at the end"""
+    total_cells: int = 0
+    completed_cells: int = 0
+    current_batch: int = 0
+    total_batches: int = 0
+    elapsed_time: float = 0.0
+
+    @property
+    def percent_complete(self) -> float:
+        return self.completed_cells / self.total_cells * 100 if self.total_cells else 0.0
+
+
+@dataclass
+class EvaluationResult:
+    """Outcome of a recalculation; errors are (cell reference, error text) pairs"""
+    success: bool = True
+    cells_evaluated: int = 0
+    cells_failed: int = 0
+    duration: float = 0.0
+    errors: List[Tuple[str, str]] = field(default_factory=list)
+
+
+class EvaluationEngine:
+    """
+    Recalculates a workbook without AiCalc running
+
+    Built-in functions are cheap and run on the calling thread. Cells that
+    call a registered function are submitted to the pool, at most
+    ``max_degree_of_parallelism`` at a time, and a call running longer than
+    ``timeout`` seconds gives "#TIMEOUT!". Python cannot stop a running
+    call, so a timed-out call keeps its worker until it returns. All cells
+    of a wave calling the same vectorized function share one call.
+
+    After set_value() or set_formula(), recalculate() only evaluates the
+    edited formulas and the cells depending on the edited cells.
+
+    With ``executor="process"``, functions and values are pickled, so
+    registered functions must be importable by the worker processes.
+
+    Example:
+        >>> with EvaluationEngine.from_file("model.aicalc", functions=[geocode]) as engine:
+        ...     engine.recalculate()
+        ...     engine.set_value("Inputs!B2", 42)
+        ...     engine.recalculate()  # only cells depending on B2
+        ...     print(engine.get_value("Summary!C10"))
+    """
+
+    def __init__(
+        self,
+        workbook: Optional[OfflineWorkbook] = None,
+        functions: Iterable[Callable[..., Any]] = (),
+        max_degree_of_parallelism: Optional[int] = None,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        executor: Union[str, Executor] = "thread",
+    ):
+        """
+        Args:
+            workbook: Workbook to load, e.g. from aicalc.offline.load_workbook()
+            functions: @aicalc_function functions to make callable
+            max_degree_of_parallelism: Pool size (default: one per CPU)
+            timeout: Seconds a function call may run (default: 100)
+            executor: "thread", "process", or an Executor to use as is
+        """
+        if not isinstance(executor, Executor) and executor not in ("thread", "process"):
+            raise ValueError(f"executor must be 'thread', 'process' or an Executor, got {executor!r}")
+
+        self.graph = DependencyGraph()
+        self.functions: Dict[str, Callable[..., Any]] = dict(BUILTIN_FUNCTIONS)
+        self.sheets: List[str] = []
+        self._values: Dict[CellKey, Any] = {}
+        self._formulas: Dict[CellKey, str] = {}
+        self._expressions: Dict[CellKey, Expression] = {}
+        self._dirty: Set[CellKey] = set()
+        self._all_dirty = True
+        self._executor_kind = executor
+        self._executor: Optional[Executor] = executor if isinstance(executor, Executor) else None
+        self.max_degree_of_parallelism = max_degree_of_parallelism or 0
+        self.timeout = timeout
+
+        for func in functions:
+            self.register_function(func)
+        if workbook is not None:
+            self.load(workbook)
+
+    @classmethod
+    def from_file(cls, path: str, sheets: Union[str, Iterable[str], None] = None, **options: Any) -> "EvaluationEngine":
+        """Load a .aicalc file (formulas and values only) into a new engine."""
+        return cls(load_workbook(path, sheets=sheets, fields=["formula", "value"]), **options)
+
+    @property
+    def max_degree_of_parallelism(self) -> int:
+        """Maximum number of cells evaluated in parallel; 0 or less means one per CPU"""
+        return self._max_degree_of_parallelism
+
+    @max_degree_of_parallelism.setter
+    def max_degree_of_parallelism(self, value: int) -> None:
+        self._max_degree_of_parallelism = value if value > 0 else os.cpu_count() or 1
+        if isinstance(self._executor_kind, str):
+            self._shutdown_executor()  # Recreated at the new size on next use
+
+    @property
+    def timeout(self) -> float:
+        """Seconds a function call may run; 0 or less means the default of 100"""
+        return self._timeout
+
+    @timeout.setter
+    def timeout(self, value: float) -> None:
+        self._timeout = value if value > 0 else DEFAULT_TIMEOUT_SECONDS
+
+    def load(self, workbook: OfflineWorkbook) -> None:
+        """Add a workbook's cells; everything is evaluated on the next recalculate()."""
+        for sheet in workbook:
+            if sheet.name not in self.sheets:
+                self.sheets.append(sheet.name)
+            for cell in sheet:
+                key = (sheet.name, cell.address)
+                self._values[key] = cell.value
+                if cell.formula and cell.formula.startswith("="):
+                    self._set_formula(key, cell.formula)
+        self._all_dirty = True
+
+    def register_function(self, func: Callable[..., Any], name: Optional[str] = None) -> None:
+        """
+        Make a function callable from formulas
+
+        Functions decorated with @aicalc_function register under their
+        AiCalc name unless ``name`` is given. Formulas calling the function
+        are evaluated again on the next recalculate().
+        """
+        name = (name or getattr(func, '_aicalc_name', None) or func.__name__).upper()
+        self.functions[name] = func
+        self._dirty.update(key for key, expression in self._expressions.items() if name in function_names(expression))
+
+    def load_functions(self, file_path: str) -> int:
+        """Register every @aicalc_function in a Python file; returns how many."""
+        path = os.path.abspath(file_path)
+        module_name = f"aicalc_functions_{Path(path).stem}"
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        if spec is None or spec.loader is None:
+            raise ImportError(f"Could not load module from {path}")
+        module = importlib.util.module_from_spec(spec)
+
+        parent_dir = str(Path(path).parent)
+        if parent_dir not in sys.path:
+            sys.path.insert(0, parent_dir)
+        spec.loader.exec_module(module)
+        # Lets forked pool processes unpickle the functions by name
+        sys.modules[module_name] = module
+
+        count = 0
+        for value in vars(module).values():
+            if callable(value) and getattr(value, '_aicalc_function', False):
+                self.register_function(value)
+                count += 1
+        return count
+
+    def _key(self, cell_ref: str) -> CellKey:
+        return parse_cell_ref(cell_ref, self.sheets[0] if self.sheets else "Sheet1")
+
+    @staticmethod
+    def _ref(key: CellKey) -> str:
+        return f"{key[0]}!{key[1]}"
+
+    def get_value(self, cell_ref: str) -> Any:
+        """Value of a cell ("B2" or "Sheet2!B2"); None when empty, CellError when failed"""
+        return self._values.get(self._key(cell_ref))
+
+    def get_formula(self, cell_ref: str) -> Optional[str]:
+        return self._formulas.get(self._key(cell_ref))
+
+    def values(self, sheet: Optional[str] = None) -> Dict[str, Any]:
+        """Values of a sheet's non-empty cells by address (default: first sheet)"""
+        sheet = sheet or (self.sheets[0] if self.sheets else "Sheet1")
+        return {address: value for (name, address), value in self._values.items()
+                if name == sheet and value is not None}
+
+    def set_value(self, cell_ref: str, value: Any) -> None:
+        """Set a constant, replacing any formula; dependents update on recalculate()."""
+        key = self._key(cell_ref)
+        self._remove_formula(key)
+        self._track_sheet(key[0])
+        if value is None:
+            self._values.pop(key, None)
+        else:
+            self._values[key] = value
+        self._dirty.add(key)
+
+    def set_formula(self, cell_ref: str, formula: Optional[str]) -> None:
+        """Set a formula ("=SUM(A1:A3)"); it is evaluated on recalculate()."""
+        key = self._key(cell_ref)
+        self._track_sheet(key[0])
+        if formula and formula.strip().startswith("="):
+            self._set_formula(key, formula)
+        else:
+            self._remove_formula(key)
+        self._dirty.add(key)
+
+    def _set_formula(self, key: CellKey, formula: str) -> None:
+        try:
+            expression = parse_formula(formula, key[0])
+        except FormulaError as e:
+            expression = (LITERAL, CellError("#ERROR!", str(e)))
+        self._formulas[key] = formula
+        self._expressions[key] = expression
+        self.graph.update_cell(key, references(expression))
+
+    def _remove_formula(self, key: CellKey) -> None:
+        if self._formulas.pop(key, None) is not None:
+            del self._expressions[key]
+            self.graph.remove_cell(key)
+
+    def _track_sheet(self, sheet: str) -> None:
+        if sheet not in self.sheets:
+            self.sheets.append(sheet)
+
+    def recalculate(self, full: bool = False,
+                    progress: Optional[Callable[[EvaluationProgress], None]] = None) -> EvaluationResult:
+        """
+        Evaluate formulas in dependency order
+
+        Args:
+            full: Evaluate every formula, not just those affected by edits.
+                The first recalculation after load() is always full.
+            progress: Called with an EvaluationProgress before each wave and
+                once at the end
+
+        Returns:
+            EvaluationResult counting evaluated and failed cells
+        """
+        started = time.monotonic()
+        if full or self._all_dirty:
+            targets = set(self._expressions)
+        else:
+            targets = {key for key in self._dirty if key in self._expressions}
+            targets.update(self.graph.all_dependents(self._dirty))
+        self._dirty.clear()
+        self._all_dirty = False
+
+        result = EvaluationResult()
+        waves = self.graph.evaluation_order(targets)
+        completed = 0
+        for index, wave in enumerate(waves):
+            if progress is not None:
+                progress(EvaluationProgress(len(targets), completed, index + 1, len(waves), time.monotonic() - started))
+            self._evaluate_wave(wave)
+            completed += len(wave)
+
+        # Cells left out of every wave are on or behind a circular reference
+        if completed < len(targets):
+            ordered = {key for wave in waves for key in wave}
+            for key in targets - ordered:
+                cycle = self.graph.find_cycle(key) or [key]
+                self._values[key] = CellError("#CIRCULAR!", " → ".join(self._ref(k) for k in cycle))
+
+        for key in targets:
+            value = self._values.get(key)
+            if isinstance(value, CellError):
+                result.cells_failed += 1
+                result.errors.append((self._ref(key), str(value)))
+            else:
+                result.cells_evaluated += 1
+        result.success = result.cells_failed == 0
+        result.duration = time.monotonic() - started
+        if progress is not None:
+            progress(EvaluationProgress(len(targets), len(targets), len(waves), len(waves), result.duration))
+        return result
+
+    def _evaluate_wave(self, wave: List[CellKey]) -> None:
+        """Evaluate one wave: pooled cells are submitted first, then the rest run here."""
+        inline: List[Tuple[CellKey, Expression]] = []
+        single: List[Tuple[CellKey, Expression, Dict[str, Callable[..., Any]]]] = []
+        vectorized: Dict[str, List[Tuple[CellKey, Expression]]] = {}
+        for key in wave:
+            expression = bind(self._expressions[key], self._values)
+            used = {name: self.functions[name] for name in function_names(expression) if name in self.functions}
+            outer = used.get(expression[1]) if expression[0] == CALL else None
+            if (expression[0] == CALL and outer is None
+                    or all(func is BUILTIN_FUNCTIONS.get(name) for name, func in used.items())):
+                # An unknown outer function fails before its arguments run
+                inline.append((key, expression))
+            elif getattr(outer, '_aicalc_vectorized', False):
+                vectorized.setdefault(expression[1], []).append((key, expression))
+            else:
+                single.append((key, expression, used))
+
+        # Future -> (cells, whether it returns one value per cell)
+        submitted: Dict[Future, Tuple[List[CellKey], bool]] = {}
+        if single or vectorized:
+            executor = self._get_executor()
+            for key, expression, used in single:
+                submitted[executor.submit(evaluate, expression, used)] = ([key], False)
+            for name, cells in vectorized.items():
+                used = {}
+                for _, expression in cells:
+                    used.update((n, self.functions[n]) for n in function_names(expression) if n in self.functions)
+                future = executor.submit(evaluate_many, [expression for _, expression in cells], used)
+                submitted[future] = ([key for key, _ in cells], True)
+
+        for key, expression in inline:
+            self._values[key] = evaluate(expression, self.functions)
+        if submitted:
+            self._collect(submitted)
+
+    def _collect(self, submitted: Dict[Future, Tuple[List[CellKey], bool]]) -> None:
+        """Wait for pooled cells, giving each call ``timeout`` seconds from when it starts."""
+        started: Dict[Future, float] = {}
+        pending = set(submitted)
+        while pending:
+            now = time.monotonic()
+            for future in pending:
+                if future not in started and (future.running() or future.done()):
+                    started[future] = now
+            deadline = min((started[f] for f in pending if f in started), default=now) + self._timeout
+            done, pending = wait(pending, timeout=max(0.0, min(deadline - now, _POLL_INTERVAL)),
+                                 return_when=ALL_COMPLETED)
+
+            for future in done:
+                keys, many = submitted[future]
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    outcome = [CellError("#ERROR!", str(e) or type(e).__name__)] * len(keys)
+                else:
+                    if not many:
+                        outcome = [outcome]
+                for key, value in zip(keys, outcome):
+                    self._values[key] = value
+
+            now = time.monotonic()
+            expired = {f for f in pending if f in started and now - started[f] >= self._timeout}
+            for future in expired:
+                future.cancel()
+                for key in submitted[future][0]:
+                    self._values[key] = CellError("#TIMEOUT!", "Operation exceeded time limit")
+            pending -= expired
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self._executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self._max_degree_of_parallelism)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_degree_of_parallelism,
+                                                    thread_name_prefix="aicalc-engine")
+        return self._executor
+
+    def _shutdown_executor(self) -> None:
+        executor, self._executor = getattr(self, '_executor', None), None
+        if executor is not None:
+            # Don't wait for timed-out calls that are still running
+            executor.shutdown(wait=False)
+
+    def close(self) -> None:
+        """Shut down the pool the engine created; a passed-in Executor is left running."""
+        if isinstance(self._executor_kind, str):
+            self._shutdown_executor()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
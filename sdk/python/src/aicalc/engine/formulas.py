@@ -0,0 +1,479 @@
+"""
+Formula parsing and evaluation for the headless engine
+
+Formulas follow FunctionRunner: ``=NAME(arg, ...)``, where an argument is a
+cell reference ("B2", "Sheet2!B2", "'My Sheet'!B2"), a range ("A1:C3"), a
+number, a quoted string, TRUE/FALSE or another call. ``=B2`` copies a cell.
+As in AiCalc, the cells of a range are passed as separate arguments.
+
+A parsed formula is a tree of tuples, so it can be sent to another process:
+    (LITERAL, value)
+    (REFERENCE, (sheet, address))
+    (RANGE, ((sheet, address), ...))
+    (CALL, NAME, (argument, ...))
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+# (sheet, "B2")
+CellKey = Tuple[str, str]
+Expression = tuple
+
+LITERAL = "literal"
+REFERENCE = "ref"
+RANGE = "range"
+CALL = "call"
+
+# Larger ranges are almost always typos such as A1:XFD1048576
+MAX_RANGE_CELLS = 1_000_000
+
+_CALL = re.compile(r"([A-Za-z0-9_]+)\s*\((.*)\)", re.DOTALL)
+_REFERENCE = re.compile(
+    r"(?:(?:'((?:[^']|'')+)'|([A-Za-z0-9_.]+))!)?"
+    r"\$?([A-Za-z]{1,3})\$?([1-9][0-9]*)"
+    r"(?::\$?([A-Za-z]{1,3})\$?([1-9][0-9]*))?"
+)
+_NUMBER = re.compile(r"[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?")
+
+
+class FormulaError(ValueError):
+    """A formula that cannot be parsed or evaluated"""
+
+
+@dataclass(frozen=True)
+class CellError:
+    """
+    Error value of a cell, as AiCalc shows it
+
+    ``code`` is "#ERROR!", "#TIMEOUT!" or "#CIRCULAR!". Cells that read an
+    error get the same error without calling their function.
+    """
+    code: str
+    message: str = ""
+
+    def __str__(self) -> str:
+        return f"{self.code} {self.message}" if self.message else self.code
+
+
+def column_index(letters: str) -> int:
+    """0-based column for letters ("A" -> 0, "AA" -> 26)"""
+    column = 0
+    for ch in letters.upper():
+        column = column * 26 + (ord(ch) - ord('A') + 1)
+    return column - 1
+
+
+def column_name(column: int) -> str:
+    """Letters for a 0-based column"""
+    letters = ""
+    column += 1
+    while column:
+        column, remainder = divmod(column - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def parse_cell_ref(ref: str, default_sheet: str) -> CellKey:
+    """(sheet, address) for "B2" or "Sheet2!B2" """
+    match = _REFERENCE.fullmatch(ref.strip())
+    if match is None or match.group(5) is not None:
+        raise ValueError(f"Invalid cell reference: {ref!r}")
+    quoted, plain, letters, row = match.group(1, 2, 3, 4)
+    sheet = quoted.replace("''", "'") if quoted is not None else plain or default_sheet
+    return sheet, f"{letters.upper()}{row}"
+
+
+def split_arguments(args: str) -> Iterator[str]:
+    """
+    Split argument text at top-level commas
+
+    Same rules as FormulaParser.SplitArguments: quotes (" or ') and nested
+    parentheses are kept together, and a backslash escapes a quote.
+    """
+    depth = 0
+    quote = None
+    escaped = False
+    start = 0
+    for index, ch in enumerate(args):
+        if quote is not None:
+            if ch == quote and not escaped:
+                quote = None
+            escaped = ch == "\\" and not escaped
+        elif ch in "\"'":
+            quote = ch
+            escaped = False
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth < 0:
+                raise FormulaError("Unbalanced parentheses")
+        elif ch == "," and depth == 0:
+            yield args[start:index]
+            start = index + 1
+    if quote is not None:
+        raise FormulaError("Unterminated string")
+    if depth:
+        raise FormulaError("Unbalanced parentheses")
+    if args[start:].strip() or start:
+        yield args[start:]
+
+
+def parse_formula(formula: str, sheet: str) -> Expression:
+    """
+    Parse a formula into an expression tree
+
+    Args:
+        formula: Formula text starting with "="
+        sheet: Sheet holding the formula, used for unqualified references
+
+    Raises:
+        FormulaError: if the formula cannot be parsed
+    """
+    text = formula.strip()
+    if not text.startswith("="):
+        raise FormulaError("Formulas start with '='")
+    return _parse_term(text[1:].strip(), sheet)
+
+
+def _parse_term(text: str, sheet: str) -> Expression:
+    match = _CALL.fullmatch(text)
+    if match is not None:
+        arguments = tuple(
+            _parse_term(arg.strip(), sheet)
+            for arg in split_arguments(match.group(2))
+            if arg.strip()  # FunctionRunner skips empty arguments
+        )
+        return (CALL, match.group(1).upper(), arguments)
+
+    match = _REFERENCE.fullmatch(text)
+    if match is not None:
+        quoted, plain, letters, row, end_letters, end_row = match.groups()
+        target = quoted.replace("''", "'") if quoted is not None else plain or sheet
+        if end_letters is None:
+            return (REFERENCE, (target, f"{letters.upper()}{row}"))
+        return (RANGE, _range_keys(target, letters, int(row), end_letters, int(end_row)))
+
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        return (LITERAL, text[1:-1].replace("\\" + text[0], text[0]))
+    if text.upper() in ("TRUE", "FALSE"):
+        return (LITERAL, text.upper() == "TRUE")
+    if _NUMBER.fullmatch(text):
+        return (LITERAL, float(text))
+    raise FormulaError(f"Cannot parse '{text}'")
+
+
+def _range_keys(sheet: str, first_letters: str, first_row: int,
+                last_letters: str, last_row: int) -> Tuple[CellKey, ...]:
+    """Every cell of a range, row by row, like TryResolveRangeArgument"""
+    first_column, last_column = column_index(first_letters), column_index(last_letters)
+    rows = range(min(first_row, last_row), max(first_row, last_row) + 1)
+    columns = [column_name(c) for c in range(min(first_column, last_column), max(first_column, last_column) + 1)]
+    if len(rows) * len(columns) > MAX_RANGE_CELLS:
+        raise FormulaError(f"Range has more than {MAX_RANGE_CELLS} cells")
+    return tuple((sheet, f"{letters}{row}") for row in rows for letters in columns)
+
+
+def references(expression: Expression) -> Set[CellKey]:
+    """Cells an expression reads"""
+    found: Set[CellKey] = set()
+    stack = [expression]
+    while stack:
+        node = stack.pop()
+        if node[0] == REFERENCE:
+            found.add(node[1])
+        elif node[0] == RANGE:
+            found.update(node[1])
+        elif node[0] == CALL:
+            stack.extend(node[2])
+    return found
+
+
+def function_names(expression: Expression) -> Set[str]:
+    """Names of the functions an expression calls"""
+    found: Set[str] = set()
+    stack = [expression]
+    while stack:
+        node = stack.pop()
+        if node[0] == CALL:
+            found.add(node[1])
+            stack.extend(node[2])
+    return found
+
+
+def bind(expression: Expression, values: Dict[CellKey, Any]) -> Expression:
+    """Replace references with the current values of the cells they name."""
+    kind = expression[0]
+    if kind == REFERENCE:
+        return (LITERAL, values.get(expression[1]))
+    if kind == RANGE:
+        return (RANGE, tuple(values.get(key) for key in expression[1]))
+    if kind == CALL:
+        return (CALL, expression[1], tuple(bind(arg, values) for arg in expression[2]))
+    return expression
+
+
+def evaluate(expression: Expression, functions: Dict[str, Callable[..., Any]]) -> Any:
+    """
+    Evaluate a bound expression (see bind())
+
+    Returns the value, or a CellError when the formula fails or reads an
+    error. Module-level so it can run in a process pool.
+    """
+    try:
+        return _evaluate(expression, functions)
+    except _Propagated as e:
+        return e.error
+    except Exception as e:
+        return _error(e)
+
+
+def evaluate_many(expressions: List[Expression], functions: Dict[str, Callable[..., Any]]) -> List[Any]:
+    """
+    Evaluate bound calls to one vectorized function
+
+    The function is called once per argument count, with a column per
+    argument, like FunctionWorker.call_batch. Returns one value or
+    CellError per expression.
+    """
+    results: List[Any] = [None] * len(expressions)
+    groups: Dict[int, List[Tuple[int, List[Any]]]] = {}
+    for index, expression in enumerate(expressions):
+        try:
+            arguments = _arguments(expression, functions)
+        except _Propagated as e:
+            results[index] = e.error
+        except Exception as e:
+            results[index] = _error(e)
+        else:
+            groups.setdefault(len(arguments), []).append((index, arguments))
+
+    for rows in groups.values():
+        try:
+            values = call_vectorized(functions[expressions[rows[0][0]][1]], [arguments for _, arguments in rows])
+        except Exception as e:
+            values = [_error(e)] * len(rows)
+        for (index, _), value in zip(rows, values):
+            results[index] = value
+    return results
+
+
+def _error(e: Exception) -> CellError:
+    return CellError("#ERROR!", str(e) or type(e).__name__)
+
+
+class _Propagated(Exception):
+    def __init__(self, error: CellError):
+        super().__init__(str(error))
+        self.error = error
+
+
+def _evaluate(expression: Expression, functions: Dict[str, Callable[..., Any]]) -> Any:
+    kind = expression[0]
+    if kind == LITERAL:
+        if isinstance(expression[1], CellError):
+            raise _Propagated(expression[1])
+        return expression[1]
+    if kind == RANGE:
+        # Only reached for =A1:B2 on its own; calls spread ranges below
+        raise FormulaError("A range must be passed to a function")
+
+    arguments = _arguments(expression, functions)
+    func = functions[expression[1]]
+    if getattr(func, '_aicalc_vectorized', False):
+        return call_vectorized(func, [arguments])[0]
+    return func(*_convert_arguments(func, arguments))
+
+
+def _arguments(call: Expression, functions: Dict[str, Callable[..., Any]]) -> List[Any]:
+    """Evaluated arguments of a call, with ranges spread into their cells"""
+    if call[1] not in functions:
+        raise FormulaError(f"Unknown function '{call[1]}'.")
+    arguments: List[Any] = []
+    for arg in call[2]:
+        if arg[0] == RANGE:
+            for value in arg[1]:
+                if isinstance(value, CellError):
+                    raise _Propagated(value)
+                arguments.append(value)
+        else:
+            arguments.append(_evaluate(arg, functions))
+    return arguments
+
+
+def call_vectorized(func: Callable[..., Any], rows: List[List[Any]]) -> List[Any]:
+    """Call a vectorized function with one column per parameter."""
+    rows = [_convert_arguments(func, arguments) for arguments in rows]
+    columns = [list(column) for column in zip(*rows)]
+    if getattr(func, '_aicalc_array_type', 'list') == "numpy":
+        import numpy
+        columns = [numpy.asarray(column) for column in columns]
+
+    results = func(*columns)
+    if hasattr(results, 'tolist'):
+        results = results.tolist()
+    results = list(results)
+    if len(results) != len(rows):
+        raise ValueError(f"Vectorized function returned {len(results)} results for {len(rows)} cells")
+    return results
+
+
+def _convert_arguments(func: Callable[..., Any], arguments: List[Any]) -> List[Any]:
+    parameters = getattr(func, '_aicalc_parameters', None)
+    if not parameters:
+        return arguments
+    return [
+        _convert_argument(value, parameters[index] if index < len(parameters) else None, index)
+        for index, value in enumerate(arguments)
+    ]
+
+
+def _convert_argument(value: Any, parameter: Optional[Dict[str, Any]], index: int) -> Any:
+    """Convert a cell value to a declared parameter type, as PythonFunctionScanner does."""
+    if parameter is None:
+        return value
+    label = f"'{parameter['name']}'" if parameter.get('name') else f"argument #{index + 1}"
+    kind = str(parameter.get('type') or "").lower()
+    if value is None or value == "":
+        if parameter.get('required'):
+            raise FormulaError(f"{label} is required.")
+        return value
+    if kind in ("int", "float", "number", "double"):
+        number = to_number(value)
+        if number is None:
+            raise FormulaError(f"{label} must be a number.")
+        return int(number) if kind == "int" and number.is_integer() else number
+    if kind == "str":
+        return display_text(value)
+    return value
+
+
+def to_number(value: Any) -> Optional[float]:
+    """Number for a value the way double.TryParse reads its display text"""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    if not _NUMBER.fullmatch(text):
+        return None
+    return float(text)
+
+
+def display_text(value: Any) -> str:
+    """Text AiCalc displays for a value"""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _numbers(args: Tuple[Any, ...]) -> List[float]:
+    return [number for number in map(to_number, args) if number is not None]
+
+
+def _number_arg(args: Tuple[Any, ...], index: int = 0) -> float:
+    """Argument as a number; missing or non-numeric arguments are 0"""
+    number = to_number(args[index]) if len(args) > index else None
+    return 0.0 if number is None else number
+
+
+def _first_text(args: Tuple[Any, ...], index: int = 0, default: str = "") -> str:
+    return display_text(args[index]) if len(args) > index else default
+
+
+def _sum(*args: Any) -> float:
+    # Non-numeric values count as 0
+    return math.fsum(_numbers(args))
+
+
+def _average(*args: Any) -> float:
+    numbers = _numbers(args)
+    return math.fsum(numbers) / len(numbers) if numbers else 0.0
+
+
+def _count(*args: Any) -> float:
+    return float(len(_numbers(args)))
+
+
+def _min(*args: Any) -> float:
+    return min(_numbers(args), default=0.0)
+
+
+def _max(*args: Any) -> float:
+    return max(_numbers(args), default=0.0)
+
+
+def _round(*args: Any) -> Any:
+    if not args:
+        return None
+    return float(round(_number_arg(args), int(_number_arg(args, 1))))
+
+
+def _abs(*args: Any) -> float:
+    return abs(_number_arg(args))
+
+
+def _sqrt(*args: Any) -> float:
+    value = _number_arg(args)
+    return math.sqrt(value) if value >= 0 else math.nan
+
+
+def _power(*args: Any) -> float:
+    return math.pow(_number_arg(args), _number_arg(args, 1))
+
+
+def _concat(*args: Any) -> str:
+    return "".join(display_text(arg) for arg in args)
+
+
+def _upper(*args: Any) -> str:
+    return _first_text(args).upper()
+
+
+def _lower(*args: Any) -> str:
+    return _first_text(args).lower()
+
+
+def _trim(*args: Any) -> str:
+    return _first_text(args).strip()
+
+
+def _len(*args: Any) -> float:
+    return float(len(_first_text(args)))
+
+
+def _replace(*args: Any) -> str:
+    return _first_text(args).replace(_first_text(args, 1), _first_text(args, 2))
+
+
+def _split(*args: Any) -> str:
+    return ", ".join(_first_text(args).split(_first_text(args, 1, ",") or ","))
+
+
+# The pure functions of FunctionRegistry. Date, file and AI functions need
+# the app and are not available headless.
+BUILTIN_FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    "SUM": _sum,
+    "AVERAGE": _average,
+    "COUNT": _count,
+    "MIN": _min,
+    "MAX": _max,
+    "ROUND": _round,
+    "ABS": _abs,
+    "SQRT": _sqrt,
+    "POWER": _power,
+    "CONCAT": _concat,
+    "UPPER": _upper,
+    "LOWER": _lower,
+    "TRIM": _trim,
+    "LEN": _len,
+    "REPLACE": _replace,
+    "SPLIT": _split,
+}
@@ -0,0 +1,128 @@
+"""
+Dependency graph of formula cells
+
+The Python counterpart of DependencyGraph.cs. Edges run from a cell to the
+cells its formula reads; evaluation_order() groups cells into waves that
+only depend on earlier waves, so each wave can be evaluated in parallel.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set
+
+from .formulas import CellKey
+
+
+class DependencyGraph:
+    """Cells, the cells they read (dependencies) and the cells reading them (dependents)"""
+
+    def __init__(self):
+        self._dependencies: Dict[CellKey, Set[CellKey]] = {}
+        self._dependents: Dict[CellKey, Set[CellKey]] = {}
+
+    def __len__(self) -> int:
+        return len(self._dependencies.keys() | self._dependents.keys())
+
+    def __contains__(self, cell: CellKey) -> bool:
+        return cell in self._dependencies or cell in self._dependents
+
+    def update_cell(self, cell: CellKey, dependencies: Iterable[CellKey]) -> None:
+        """Replace the dependencies of a cell, e.g. after its formula changed."""
+        self._unlink(cell)
+        dependencies = set(dependencies)
+        if not dependencies:
+            return
+        self._dependencies[cell] = dependencies
+        for dependency in dependencies:
+            self._dependents.setdefault(dependency, set()).add(cell)
+
+    def remove_cell(self, cell: CellKey) -> None:
+        """Forget a cell's own dependencies; cells reading it keep their edges."""
+        self._unlink(cell)
+
+    def _unlink(self, cell: CellKey) -> None:
+        for dependency in self._dependencies.pop(cell, ()):
+            dependents = self._dependents.get(dependency)
+            if dependents is not None:
+                dependents.discard(cell)
+                if not dependents:
+                    del self._dependents[dependency]
+
+    def direct_dependencies(self, cell: CellKey) -> Set[CellKey]:
+        """Cells the cell's formula reads"""
+        return self._dependencies.get(cell, set())
+
+    def direct_dependents(self, cell: CellKey) -> Set[CellKey]:
+        """Cells whose formulas read the cell"""
+        return self._dependents.get(cell, set())
+
+    def all_dependents(self, cells: Iterable[CellKey]) -> Set[CellKey]:
+        """Cells that depend on any of the given cells, directly or transitively"""
+        found: Set[CellKey] = set()
+        queue = deque(cells)
+        while queue:
+            for dependent in self._dependents.get(queue.popleft(), ()):
+                if dependent not in found:
+                    found.add(dependent)
+                    queue.append(dependent)
+        return found
+
+    def find_cycle(self, cell: CellKey) -> Optional[List[CellKey]]:
+        """
+        A circular reference reachable from the cell, or None
+
+        Returns the path from the cell into the cycle, ending with the cell
+        that closes it (e.g. [A1, B1, A1]).
+        """
+        path: List[CellKey] = [cell]
+        on_path = {cell}
+        visited = {cell}
+        stack = [iter(self._dependencies.get(cell, ()))]
+        while stack:
+            dependency = next(stack[-1], None)
+            if dependency is None:
+                stack.pop()
+                on_path.discard(path.pop())
+            elif dependency in on_path:
+                return path + [dependency]
+            elif dependency not in visited:
+                visited.add(dependency)
+                on_path.add(dependency)
+                path.append(dependency)
+                stack.append(iter(self._dependencies.get(dependency, ())))
+        return None
+
+    def evaluation_order(self, cells: Iterable[CellKey]) -> List[List[CellKey]]:
+        """
+        Group cells into waves for evaluation (Kahn's algorithm)
+
+        A cell's wave comes after the waves of every dependency among
+        ``cells``; dependencies outside ``cells`` are taken as up to date.
+        Cells on or behind a circular reference are left out.
+        """
+        cells = set(cells)
+        pending: Dict[CellKey, int] = {}
+        wave: List[CellKey] = []
+        for cell in cells:
+            count = sum(1 for dependency in self._dependencies.get(cell, ()) if dependency in cells)
+            if count:
+                pending[cell] = count
+            else:
+                wave.append(cell)
+
+        waves: List[List[CellKey]] = []
+        while wave:
+            waves.append(wave)
+            following: List[CellKey] = []
+            for cell in wave:
+                for dependent in self._dependents.get(cell, ()):
+                    if dependent in pending:
+                        pending[dependent] -= 1
+                        if not pending[dependent]:
+                            del pending[dependent]
+                            following.append(dependent)
+            wave = following
+        return waves
+
+    def clear(self) -> None:
+        self._dependencies.clear()
+        self._dependents.clear()
@@ -2,16 +2,23 @@
 Data models for AiCalc SDK
 """
 
+import sys
 from enum import Enum
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Optional
 
+# One fixed layout instead of a __dict__ per instance. dataclass() only
+# combines __slots__ with field defaults from Python 3.10 on.
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
 class CellType(Enum):
     """Cell object types supported by AiCalc"""
     EMPTY = "Empty"
     TEXT = "Text"
     NUMBER = "Number"
+    BOOLEAN = "Boolean"
     IMAGE = "Image"
     VIDEO = "Video"
     TABLE = "Table"
@@ -26,9 +33,10 @@ class CellType(Enum):
     CODE_PYTHON = "Code-Python"
     CODE_CSHARP = "Code-CSharp"
     CODE_JAVASCRIPT = "Code-JavaScript"
+    ERROR = "Error"
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class CellAddress:
     """Represents a cell address in the spreadsheet"""
     sheet: str
@@ -46,36 +54,28 @@ class CellAddress:
         Returns:
             CellAddress instance
             
+        Raises:
+            ValueError: if ref isn't a cell reference
+            
         Examples:
             >>> CellAddress.parse("A1")
             CellAddress(sheet="Sheet1", row=0, column=0)
             >>> CellAddress.parse("Sheet2!C5")
             CellAddress(sheet="Sheet2", row=4, column=2)
         """
-        if "!" in ref:
-            sheet, cell = ref.split("!", 1)
-        else:
-            sheet = "Sheet1"
-            cell = ref
-        
-        # Parse column (letters) and row (numbers)
-        col_str = ""
-        row_str = ""
-        for char in cell:
-            if char.isalpha():
-                col_str += char
-            elif char.isdigit():
-                row_str += char
+        sheet, separator, cell = ref.partition("!")
+        if not separator:
+            sheet, cell = "Sheet1", ref
+        if "$" in cell:
+            cell = cell.replace("$", "")
         
-        # Convert column letters to index (A=0, B=1, ..., Z=25, AA=26, ...)
-        col = 0
-        for char in col_str.upper():
-            col = col * 26 + (ord(char) - ord('A') + 1)
-        col -= 1  # Convert to 0-based index
+        # Column letters, then row digits
+        letters = cell.rstrip("0123456789")
+        digits = cell[len(letters):]
+        if not letters.isalpha() or not letters.isascii() or not digits:
+            raise ValueError(f"Invalid cell reference: {ref!r}")
         
-        row = int(row_str) - 1  # Convert to 0-based index
-        
-        return cls(sheet=sheet, row=row, column=col)
+        return cls(sheet=sheet, row=int(digits) - 1, column=column_index(letters))
     
     def to_string(self) -> str:
         """
@@ -84,23 +84,35 @@ class CellAddress:
         Returns:
             Cell reference like "A1" or "Sheet1!B2"
         """
-        # Convert column index to letters
-        col = self.column + 1
-        col_str = ""
-        while col > 0:
-            col -= 1
-            col_str = chr(ord('A') + (col % 26)) + col_str
-            col //= 26
-        
-        row_str = str(self.row + 1)
-        
+        cell = f"{column_name(self.column)}{self.row + 1}"
         if self.sheet == "Sheet1":
-            return f"{col_str}{row_str}"
+            return cell
         else:
-            return f"{self.sheet}!{col_str}{row_str}"
+            return f"{self.sheet}!{cell}"
+
 
+@lru_cache(maxsize=4096)
+def column_index(letters: str) -> int:
+    """0-based column index for letters (A=0, B=1, ..., Z=25, AA=26, ...)"""
+    column = 0
+    for char in letters.upper():
+        column = column * 26 + (ord(char) - ord('A') + 1)
+    return column - 1
 
-@dataclass
+
+@lru_cache(maxsize=4096)
+def column_name(column: int) -> str:
+    """Letters for a 0-based column index"""
+    column += 1
+    letters = ""
+    while column > 0:
+        column -= 1
+        letters = chr(ord('A') + (column % 26)) + letters
+        column //= 26
+    return letters
+
+
+@dataclass(**_SLOTS)
 class CellValue:
     """Represents a cell value with its type"""
     value: Any
@@ -111,3 +123,12 @@ class CellValue:
     
     def __repr__(self) -> str:
         return f"CellValue(type={self.cell_type.value}, value={self.value!r})"
+
+
+@dataclass(**_SLOTS)
+class CellChange:
+    """New state of a watched cell, pushed by AiCalc"""
+    address: CellAddress
+    value: Any
+    object_type: str
+    formula: Optional[str] = None
@@ -0,0 +1,456 @@
+"""
+Offline access to saved AiCalc workbooks
+Reads .aicalc files without running AiCalc
+
+A .aicalc file is the JSON form of WorkbookDefinition -> SheetDefinition ->
+CellDefinition, with camelCase keys. The file is parsed incrementally: only
+the requested sheets and cell fields are built into Python objects, and
+everything else (cell History in particular) is skipped by scanning, so
+memory stays bounded by what you ask for rather than by the file size.
+
+Example:
+    >>> from aicalc.offline import load_workbook, iter_cells
+    >>> workbook = load_workbook("budget.aicalc", sheets=["Sheet1"], fields=["value"])
+    >>> workbook["Sheet1"]["B2"].value
+    >>> for sheet, cell in iter_cells("huge.aicalc", fields=["formula"]):
+    ...     print(sheet, cell.address, cell.formula)
+    >>> sheets = load_compact("huge.aicalc")  # typed arrays, see aicalc.compact
+"""
+
+import io
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .compact import CompactSheet
+
+# Cell fields that can be requested, and the CellDefinition keys they come from
+CELL_FIELDS = {
+    "formula": "formula",
+    "value": "value",
+    "format": "format",
+    "history": "history",
+    "automation_mode": "automationmode",
+    "notes": "notes",
+    "source_path": "sourcepath",
+    "cloud_import": "cloudimport",
+}
+
+# Everything except history, which is usually most of the file
+DEFAULT_FIELDS = ("formula", "value", "format", "automation_mode", "notes", "source_path", "cloud_import")
+
+_CHUNK_SIZE = 1 << 20
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_TO_BRACKET = re.compile(r'[^"{}\[\]]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"{}\[\]]*)*', re.DOTALL)
+_FLAT_CONTAINER = re.compile(r'[{\[][^"{}\[\]]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"{}\[\]]*)*[}\]]', re.DOTALL)
+_SCALAR = re.compile(r"[^,}\]\s]+")
+# Characters that may continue a number: "1." or "1.5e" decode as 1 and 1.5 when split there
+_NUMBER_TAIL = re.compile(r"[0-9+\-.eE]*")
+
+
+@dataclass
+class OfflineCell:
+    """
+    A cell read from a workbook file
+
+    Fields that weren't requested are None. ``value`` is the cell's value
+    converted to Python (float for numbers, bool for booleans, None when
+    empty, otherwise the serialized text).
+    """
+    address: str
+    formula: Optional[str] = None
+    value: Any = None
+    object_type: Optional[str] = None
+    serialized_value: Optional[str] = None
+    display_value: Optional[str] = None
+    format: Optional[Dict[str, Any]] = None
+    history: Optional[List[Dict[str, Any]]] = None
+    automation_mode: Optional[str] = None
+    notes: Optional[str] = None
+    source_path: Optional[str] = None
+    cloud_import: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class OfflineSheet:
+    """A sheet read from a workbook file; cells are keyed by address ("B2")"""
+    name: str
+    row_count: int = 0
+    column_count: int = 0
+    cells: Dict[str, OfflineCell] = field(default_factory=dict)
+
+    def __getitem__(self, address: str) -> OfflineCell:
+        return self.cells[address.upper()]
+
+    def __contains__(self, address: str) -> bool:
+        return address.upper() in self.cells
+
+    def __iter__(self) -> Iterator[OfflineCell]:
+        return iter(self.cells.values())
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def values(self) -> Dict[str, Any]:
+        """Converted values by address"""
+        return {address: cell.value for address, cell in self.cells.items()}
+
+
+@dataclass
+class OfflineWorkbook:
+    """A workbook read from a .aicalc file"""
+    title: str = ""
+    sheets: Dict[str, OfflineSheet] = field(default_factory=dict)
+    settings: Optional[Dict[str, Any]] = None
+
+    def __getitem__(self, sheet: str) -> OfflineSheet:
+        return self.sheets[sheet]
+
+    def __contains__(self, sheet: str) -> bool:
+        return sheet in self.sheets
+
+    def __iter__(self) -> Iterator[OfflineSheet]:
+        return iter(self.sheets.values())
+
+
+class _JsonStream:
+    """
+    Pull parser over a text stream
+
+    Holds at most one chunk plus the value being decoded. Values that are
+    needed are decoded with json's raw_decode; values that aren't are skipped
+    by scanning for brackets and string ends, without building objects.
+    """
+
+    def __init__(self, stream: io.TextIOBase, chunk_size: int = _CHUNK_SIZE):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self, minimum: int = 0) -> bool:
+        """Read another chunk, dropping what has been consumed. False at end of file."""
+        if self._eof:
+            return False
+        chunk = self._stream.read(max(self._chunk_size, minimum))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _error(self, message: str) -> ValueError:
+        return ValueError(f"Invalid workbook file: {message}")
+
+    def peek(self) -> str:
+        """Next significant character, or "" at end of file"""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise self._error(f"expected {char!r}, found {self.peek()!r}")
+        self._pos += 1
+
+    def next_item(self, closing: str) -> bool:
+        """Step to the next array element or object member; False at the closing bracket."""
+        char = self.peek()
+        if char == ",":
+            self._pos += 1
+            char = self.peek()
+        if char == closing:
+            self._pos += 1
+            return False
+        if not char:
+            raise self._error("unexpected end of file")
+        return True
+
+    def read_key(self) -> str:
+        key = self.read_value()
+        if not isinstance(key, str):
+            raise self._error("object keys must be strings")
+        self.expect(":")
+        return key
+
+    def read_value(self) -> Any:
+        """Decode the next value into Python objects."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # A number followed only by number characters up to the end of the
+                # buffer may continue in the next chunk
+                if (self._eof or type(value) not in (int, float)
+                        or _NUMBER_TAIL.match(self._buffer, end).end() < len(self._buffer)):
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise self._error(f"malformed JSON near offset {self._pos}")
+            # Grow the buffer; at end of file this sets _eof for a final attempt
+            self._fill(len(self._buffer))
+
+    def skip_value(self) -> None:
+        """Move past the next value without decoding it."""
+        char = self.peek()
+        if char == '"':
+            while True:
+                match = _STRING.match(self._buffer, self._pos)
+                if match:
+                    self._pos = match.end()
+                    return
+                if not self._fill():
+                    raise self._error("unterminated string")
+        if char not in "{[":
+            while True:
+                match = _SCALAR.match(self._buffer, self._pos)
+                if not match:
+                    raise self._error(f"unexpected {char!r}")
+                if match.end() < len(self._buffer) or not self._fill():
+                    self._pos = match.end()
+                    return
+
+        depth = 0
+        while True:
+            # Jump over text and whole strings to the next bracket
+            self._pos = _TO_BRACKET.match(self._buffer, self._pos).end()
+            if self._pos == len(self._buffer) or self._buffer[self._pos] == '"':
+                # Buffer ends, possibly inside a string; resume from there
+                if not self._fill():
+                    raise self._error("unexpected end of file")
+                continue
+            if self._buffer[self._pos] in "{[":
+                # Containers without nested brackets go in one step
+                flat = _FLAT_CONTAINER.match(self._buffer, self._pos)
+                if flat:
+                    self._pos = flat.end()
+                    if depth == 0:
+                        return
+                    continue
+                depth += 1
+            else:
+                depth -= 1
+            self._pos += 1
+            if depth == 0:
+                return
+
+
+def _convert_value(object_type: Optional[str], serialized: Optional[str]) -> Any:
+    """Python value for a serialized CellValue"""
+    if serialized is None or object_type in (None, "Empty") and serialized == "":
+        return None
+    if object_type == "Number":
+        try:
+            return float(serialized)
+        except ValueError:
+            return serialized
+    if object_type == "Boolean":
+        return serialized.strip().lower() == "true"
+    return serialized
+
+
+def _read_cell(stream: _JsonStream, wanted: Dict[str, str]) -> Optional[OfflineCell]:
+    """Read one CellDefinition, decoding only the wanted keys."""
+    stream.expect("{")
+    values: Dict[str, Any] = {}
+    address = None
+    while stream.next_item("}"):
+        key = stream.read_key().lower()
+        if key == "address":
+            address = stream.read_value()
+        elif key in wanted:
+            values[wanted[key]] = stream.read_value()
+        else:
+            stream.skip_value()
+    if address is None:
+        return None
+
+    cell = OfflineCell(address=address.upper())
+    for name, value in values.items():
+        if name == "value":
+            if isinstance(value, dict):
+                value = {k.lower(): v for k, v in value.items()}
+                object_type = value.get("objecttype")
+                cell.object_type = None if object_type is None else str(object_type)
+                cell.serialized_value = value.get("serializedvalue")
+                cell.display_value = value.get("displayvalue")
+                cell.value = _convert_value(cell.object_type, cell.serialized_value)
+        else:
+            setattr(cell, name, value)
+    return cell
+
+
+def _wanted_fields(fields: Optional[Iterable[str]]) -> Dict[str, str]:
+    """CellDefinition key (lower case) -> OfflineCell attribute"""
+    names = DEFAULT_FIELDS if fields is None else tuple(fields)
+    unknown = [name for name in names if name not in CELL_FIELDS and name != "address"]
+    if unknown:
+        raise ValueError(f"Unknown cell fields {unknown}; expected some of {sorted(CELL_FIELDS)}")
+    return {CELL_FIELDS[name]: name for name in names if name != "address"}
+
+
+def _sheet_filter(sheets: Union[str, Iterable[str], None]) -> Optional[set]:
+    if sheets is None:
+        return None
+    return {sheets} if isinstance(sheets, str) else set(sheets)
+
+
+def _ignore(*args) -> None:
+    pass
+
+
+def _walk(path: str, sheets, fields, on_title, on_settings, on_sheet):
+    """
+    Drive the parser over a workbook file.
+
+    Yields (sheet name, cell) for each cell of a wanted sheet; the sheet name
+    is None while it's still unknown (the name comes after the cells).
+    """
+    wanted = _wanted_fields(fields)
+    sheet_names = _sheet_filter(sheets)
+
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        stream = _JsonStream(f, _CHUNK_SIZE)
+        stream.expect("{")
+        while stream.next_item("}"):
+            key = stream.read_key().lower()
+            if key == "title":
+                on_title(stream.read_value())
+            elif key == "settings" and on_settings is not None:
+                on_settings(stream.read_value())
+            elif key == "sheets":
+                stream.expect("[")
+                while stream.next_item("]"):
+                    yield from _walk_sheet(stream, sheet_names, wanted, on_sheet)
+            else:
+                stream.skip_value()
+
+
+def _walk_sheet(stream: _JsonStream, sheet_names, wanted, on_sheet):
+    stream.expect("{")
+    name = None
+    sizes = {}
+    pending: List[OfflineCell] = []  # Cells read before the sheet's name
+    while stream.next_item("}"):
+        key = stream.read_key().lower()
+        if key == "name":
+            name = stream.read_value()
+            if pending and (sheet_names is None or name in sheet_names):
+                for cell in pending:
+                    yield name, cell
+            pending = []
+        elif key == "cells":
+            if name is not None and sheet_names is not None and name not in sheet_names:
+                stream.skip_value()
+                continue
+            stream.expect("[")
+            while stream.next_item("]"):
+                cell = _read_cell(stream, wanted)
+                if cell is None:
+                    continue
+                if name is None:
+                    pending.append(cell)
+                else:
+                    yield name, cell
+        elif key in ("rowcount", "columncount"):
+            sizes[key] = stream.read_value()
+        else:
+            stream.skip_value()
+    if name is not None and (sheet_names is None or name in sheet_names):
+        on_sheet(name, sizes.get("rowcount", 0), sizes.get("columncount", 0))
+
+
+def iter_cells(path: str, sheets: Union[str, Iterable[str], None] = None,
+               fields: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, OfflineCell]]:
+    """
+    Stream the cells of a workbook file as (sheet name, cell)
+
+    Only one cell is held in memory at a time, so this suits batch jobs over
+    files of any size.
+
+    Args:
+        path: .aicalc file
+        sheets: Sheet name or names to read (default: all)
+        fields: Cell fields to read, from CELL_FIELDS (default: all but
+            "history"). The address is always read.
+
+    Raises:
+        ValueError: for unknown fields or a malformed file
+    """
+    yield from _walk(path, sheets, fields, _ignore, None, _ignore)
+
+
+def load_compact(path: str, sheets: Union[str, Iterable[str], None] = None) -> Dict[str, CompactSheet]:
+    """
+    Read the values and formulas of a workbook file into compact sheets
+
+    Cells go straight from the parser into typed arrays (see
+    aicalc.compact), so no per-cell object outlives the read.
+
+    Args:
+        path: .aicalc file
+        sheets: Sheet name or names to read (default: all)
+
+    Returns:
+        CompactSheet by sheet name
+
+    Example:
+        >>> sheets = load_compact("huge.aicalc")
+        >>> sheets["Sheet1"].column_values("B")
+    """
+    result: Dict[str, CompactSheet] = {}
+
+    def on_sheet(name, row_count, column_count):
+        result.setdefault(name, CompactSheet(name))
+
+    for name, cell in _walk(path, sheets, ["formula", "value"], _ignore, None, on_sheet):
+        sheet = result.get(name)
+        if sheet is None:
+            sheet = result[name] = CompactSheet(name)
+        sheet.add(cell)
+    return result
+
+
+def load_workbook(path: str, sheets: Union[str, Iterable[str], None] = None,
+                  fields: Optional[Iterable[str]] = None) -> OfflineWorkbook:
+    """
+    Read a workbook file
+
+    Args:
+        path: .aicalc file
+        sheets: Sheet name or names to read (default: all)
+        fields: Cell fields to read, from CELL_FIELDS (default: all but
+            "history"). The address is always read.
+
+    Returns:
+        OfflineWorkbook with the requested sheets
+
+    Example:
+        >>> workbook = load_workbook("model.aicalc", fields=["value", "formula"])
+        >>> workbook["Sheet1"].values()
+    """
+    workbook = OfflineWorkbook()
+
+    def on_title(title):
+        workbook.title = title
+
+    def on_settings(settings):
+        workbook.settings = settings
+
+    def on_sheet(name, row_count, column_count):
+        sheet = workbook.sheets.setdefault(name, OfflineSheet(name))
+        sheet.row_count, sheet.column_count = row_count, column_count
+
+    for name, cell in _walk(path, sheets, fields, on_title, on_settings, on_sheet):
+        workbook.sheets.setdefault(name, OfflineSheet(name)).cells[cell.address] = cell
+    return workbook
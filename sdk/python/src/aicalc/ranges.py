@@ -0,0 +1,330 @@
+"""
+Cell ranges for AiCalc SDK
+Parsed A1 ranges with set operations, paging and bulk address conversion
+
+Example:
+    >>> r = Range.parse("Sheet2!B2:D100")
+    >>> r.shape
+    (99, 3)
+    >>> r & Range.parse("Sheet2!C50:Z60")
+    Range('Sheet2!C50:D60')
+    >>> [page.to_string() for page in r.pages(40)]
+    ['Sheet2!B2:D41', 'Sheet2!B42:D81', 'Sheet2!B82:D100']
+    >>> r[0], r[-1]
+    (CellAddress(sheet='Sheet2', row=1, column=1), CellAddress(sheet='Sheet2', row=99, column=3))
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from .models import CellAddress, column_index, column_name
+
+# Bounds of whole columns ("A:C") and whole rows ("2:5"), the same as Excel's
+MAX_ROWS = 1_048_576
+MAX_COLUMNS = 16_384
+
+DEFAULT_SHEET = "Sheet1"
+
+_SHEET = r"(?:'((?:[^']|'')+)'|([^'!:]+))!"
+_RANGE = re.compile(
+    rf"(?:{_SHEET})?"
+    r"(?:\$?([A-Za-z]{1,3})\$?([0-9]+)(?::\$?([A-Za-z]{1,3})\$?([0-9]+))?"  # A1, A1:C10
+    r"|\$?([A-Za-z]{1,3}):\$?([A-Za-z]{1,3})"                               # A:C
+    r"|\$?([0-9]+):\$?([0-9]+))"                                             # 2:5
+)
+_CELL = re.compile(rf"(?:{_SHEET})?\$?([A-Za-z]{{1,3}})\$?([0-9]+)")
+_PLAIN_SHEET = re.compile(r"[A-Za-z_][A-Za-z0-9_.]*")
+
+
+def _sheet_prefix(sheet: str) -> str:
+    """"Sheet2!" or "'My Sheet'!"; empty for the default sheet"""
+    if sheet == DEFAULT_SHEET:
+        return ""
+    if _PLAIN_SHEET.fullmatch(sheet):
+        return f"{sheet}!"
+    return "'{}'!".format(sheet.replace("'", "''"))
+
+
+class Range:
+    """
+    Rectangular block of cells on one sheet, with 0-based inclusive bounds
+
+    Ranges are immutable and hashable. Indexing, len() and membership are
+    O(1); iteration yields CellAddress objects row by row.
+    """
+
+    __slots__ = ("sheet", "first_row", "first_column", "last_row", "last_column")
+
+    sheet: str
+    first_row: int
+    first_column: int
+    last_row: int
+    last_column: int
+
+    def __init__(self, sheet: str, first_row: int, first_column: int,
+                 last_row: Optional[int] = None, last_column: Optional[int] = None):
+        last_row = first_row if last_row is None else last_row
+        last_column = first_column if last_column is None else last_column
+        if first_row > last_row:
+            first_row, last_row = last_row, first_row
+        if first_column > last_column:
+            first_column, last_column = last_column, first_column
+        if first_row < 0 or first_column < 0 or last_row >= MAX_ROWS or last_column >= MAX_COLUMNS:
+            raise ValueError(f"Range ({first_row}, {first_column})-({last_row}, {last_column}) is outside the sheet")
+        set_field = object.__setattr__
+        set_field(self, "sheet", sheet)
+        set_field(self, "first_row", first_row)
+        set_field(self, "first_column", first_column)
+        set_field(self, "last_row", last_row)
+        set_field(self, "last_column", last_column)
+
+    @classmethod
+    def parse(cls, ref: Union[str, "Range", CellAddress], default_sheet: str = DEFAULT_SHEET) -> "Range":
+        """
+        Parse "A1", "A1:C10", "Sheet2!A1:C10", "'My Sheet'!B:D" or "Sheet1!3:7"
+
+        Results are cached, so parsing the same reference again costs a
+        dictionary lookup.
+
+        Raises:
+            ValueError: if ref isn't a range reference
+        """
+        if isinstance(ref, Range):
+            return ref
+        if isinstance(ref, CellAddress):
+            return cls(ref.sheet, ref.row, ref.column)
+        return _parse(ref, default_sheet)
+
+    @classmethod
+    def from_addresses(cls, start: CellAddress, end: CellAddress) -> "Range":
+        """Range spanning two cells of the same sheet"""
+        if start.sheet != end.sheet:
+            raise ValueError(f"Cells are on different sheets: {start.sheet!r}, {end.sheet!r}")
+        return cls(start.sheet, start.row, start.column, end.row, end.column)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Range is immutable")
+
+    def _key(self) -> Tuple[str, int, int, int, int]:
+        return (self.sheet, self.first_row, self.first_column, self.last_row, self.last_column)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Range) and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __reduce__(self):
+        return (Range, self._key())
+
+    @property
+    def row_count(self) -> int:
+        return self.last_row - self.first_row + 1
+
+    @property
+    def column_count(self) -> int:
+        return self.last_column - self.first_column + 1
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """(rows, columns)"""
+        return self.row_count, self.column_count
+
+    @property
+    def start(self) -> CellAddress:
+        """Top-left cell"""
+        return CellAddress(self.sheet, self.first_row, self.first_column)
+
+    @property
+    def end(self) -> CellAddress:
+        """Bottom-right cell"""
+        return CellAddress(self.sheet, self.last_row, self.last_column)
+
+    @property
+    def is_whole_columns(self) -> bool:
+        return self.first_row == 0 and self.last_row == MAX_ROWS - 1
+
+    @property
+    def is_whole_rows(self) -> bool:
+        return self.first_column == 0 and self.last_column == MAX_COLUMNS - 1
+
+    def __len__(self) -> int:
+        """Number of cells"""
+        return self.row_count * self.column_count
+
+    def __getitem__(self, index: int) -> CellAddress:
+        """Cell at a row-major position, in O(1)"""
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("Range index out of range")
+        row, column = divmod(index, self.column_count)
+        return CellAddress(self.sheet, self.first_row + row, self.first_column + column)
+
+    def index(self, address: Union[str, CellAddress]) -> int:
+        """Row-major position of a cell, in O(1)"""
+        if isinstance(address, str):
+            address = CellAddress.parse(address)
+        if address not in self:
+            raise ValueError(f"{address.to_string()} is not in {self.to_string()}")
+        return (address.row - self.first_row) * self.column_count + address.column - self.first_column
+
+    def __iter__(self) -> Iterator[CellAddress]:
+        sheet = self.sheet
+        columns = range(self.first_column, self.last_column + 1)
+        for row in range(self.first_row, self.last_row + 1):
+            for column in columns:
+                yield CellAddress(sheet, row, column)
+
+    def __contains__(self, item: Union[str, CellAddress, "Range"]) -> bool:
+        """Whether a cell, or a whole range, lies inside this range"""
+        if isinstance(item, str):
+            item = Range.parse(item, self.sheet)
+        if isinstance(item, CellAddress):
+            return (item.sheet == self.sheet
+                    and self.first_row <= item.row <= self.last_row
+                    and self.first_column <= item.column <= self.last_column)
+        return (item.sheet == self.sheet
+                and self.first_row <= item.first_row and item.last_row <= self.last_row
+                and self.first_column <= item.first_column and item.last_column <= self.last_column)
+
+    def intersection(self, other: "Range") -> Optional["Range"]:
+        """Cells in both ranges, or None when they don't overlap"""
+        if other.sheet != self.sheet:
+            return None
+        first_row = max(self.first_row, other.first_row)
+        last_row = min(self.last_row, other.last_row)
+        first_column = max(self.first_column, other.first_column)
+        last_column = min(self.last_column, other.last_column)
+        if first_row > last_row or first_column > last_column:
+            return None
+        return Range(self.sheet, first_row, first_column, last_row, last_column)
+
+    def union(self, other: "Range") -> "Range":
+        """
+        Smallest range covering both ranges
+
+        Raises:
+            ValueError: for ranges on different sheets
+        """
+        if other.sheet != self.sheet:
+            raise ValueError(f"Ranges are on different sheets: {self.sheet!r}, {other.sheet!r}")
+        return Range(self.sheet,
+                     min(self.first_row, other.first_row), min(self.first_column, other.first_column),
+                     max(self.last_row, other.last_row), max(self.last_column, other.last_column))
+
+    __and__ = intersection
+    __or__ = union
+
+    def clip(self, row_count: int, column_count: int) -> Optional["Range"]:
+        """Part of the range inside a sheet of the given size, or None"""
+        if row_count <= 0 or column_count <= 0:
+            return None
+        return self.intersection(Range(self.sheet, 0, 0, row_count - 1, column_count - 1))
+
+    def pages(self, page_rows: int) -> Iterator["Range"]:
+        """Split into consecutive ranges of at most page_rows rows"""
+        if page_rows < 1:
+            raise ValueError(f"page_rows must be at least 1, got {page_rows!r}")
+        for first_row in range(self.first_row, self.last_row + 1, page_rows):
+            yield Range(self.sheet, first_row, self.first_column,
+                        min(first_row + page_rows - 1, self.last_row), self.last_column)
+
+    def to_string(self, include_sheet: Optional[bool] = None) -> str:
+        """
+        Reference like "A1:C10", "Sheet2!B:D" or "'My Sheet'!3:7"
+
+        Args:
+            include_sheet: Prefix the sheet name; by default only sheets
+                other than Sheet1 are named, as in CellAddress.to_string()
+        """
+        if self.is_whole_columns:
+            cells = f"{column_name(self.first_column)}:{column_name(self.last_column)}"
+        elif self.is_whole_rows:
+            cells = f"{self.first_row + 1}:{self.last_row + 1}"
+        else:
+            cells = f"{column_name(self.first_column)}{self.first_row + 1}"
+            if self.last_row != self.first_row or self.last_column != self.first_column:
+                cells += f":{column_name(self.last_column)}{self.last_row + 1}"
+        if include_sheet is None:
+            return _sheet_prefix(self.sheet) + cells
+        if include_sheet:
+            return (_sheet_prefix(self.sheet) or f"{self.sheet}!") + cells
+        return cells
+
+    def __str__(self) -> str:
+        return self.to_string()
+
+    def __repr__(self) -> str:
+        return f"Range({self.to_string(include_sheet=True)!r})"
+
+
+@lru_cache(maxsize=65536)
+def _parse(ref: str, default_sheet: str) -> Range:
+    match = _RANGE.fullmatch(ref.strip())
+    if match is None:
+        raise ValueError(f"Invalid range reference: {ref!r}")
+    (quoted, plain, first_letters, first_digits, last_letters, last_digits,
+     first_whole_column, last_whole_column, first_whole_row, last_whole_row) = match.groups()
+    sheet = quoted.replace("''", "'") if quoted is not None else plain or default_sheet
+
+    if first_letters is not None:
+        first_row, first_column = int(first_digits) - 1, column_index(first_letters)
+        if last_letters is None:
+            last_row, last_column = first_row, first_column
+        else:
+            last_row, last_column = int(last_digits) - 1, column_index(last_letters)
+    elif first_whole_column is not None:
+        first_row, last_row = 0, MAX_ROWS - 1
+        first_column, last_column = column_index(first_whole_column), column_index(last_whole_column)
+    else:
+        first_row, last_row = int(first_whole_row) - 1, int(last_whole_row) - 1
+        first_column, last_column = 0, MAX_COLUMNS - 1
+    try:
+        return Range(sheet, first_row, first_column, last_row, last_column)
+    except ValueError:
+        raise ValueError(f"Invalid range reference: {ref!r}") from None
+
+
+def parse_many(refs: Iterable[str], default_sheet: str = DEFAULT_SHEET) -> List[CellAddress]:
+    """
+    Parse many cell references
+
+    One precompiled match per reference, and column letters are converted
+    through a cache, so this handles about a million references a second.
+
+    Raises:
+        ValueError: naming the first reference that isn't a cell
+    """
+    match_cell = _CELL.fullmatch
+    result: List[CellAddress] = []
+    append = result.append
+    for ref in refs:
+        match = match_cell(ref)
+        row = int(match.group(4)) - 1 if match is not None else -1
+        if row < 0:
+            raise ValueError(f"Invalid cell reference: {ref!r}")
+        quoted, plain, letters, _ = match.groups()
+        sheet = plain or default_sheet if quoted is None else quoted.replace("''", "'")
+        append(CellAddress(sheet, row, column_index(letters)))
+    return result
+
+
+def to_string_many(addresses: Iterable[CellAddress]) -> List[str]:
+    """
+    Format many cells, like CellAddress.to_string() on each
+
+    Unlike CellAddress.to_string(), sheet names with spaces or quotes are
+    quoted, so the results parse back with parse_many().
+    """
+    prefixes = {}
+    result: List[str] = []
+    append = result.append
+    for address in addresses:
+        prefix = prefixes.get(address.sheet)
+        if prefix is None:
+            prefix = prefixes[address.sheet] = _sheet_prefix(address.sheet)
+        append(f"{prefix}{column_name(address.column)}{address.row + 1}")
+    return result
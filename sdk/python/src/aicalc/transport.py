@@ -0,0 +1,199 @@
+"""
+Transports for AiCalc IPC
+Named pipes on Windows, plus Unix domain sockets and TCP loopback
+
+Addresses select the backend:
+    "AiCalcPipe" or "pipe:AiCalcPipe"   Windows named pipe (needs pywin32)
+    "unix:/tmp/aicalc.sock"             Unix domain socket
+    "tcp:127.0.0.1:8765"                TCP
+
+pywin32 is imported when a pipe is opened rather than with this module, so
+the SDK imports quickly and works without it on sockets.
+"""
+
+import socket
+import time
+from typing import Any, List, Tuple
+
+
+def parse_address(address: str) -> Tuple[str, str]:
+    """Split an address into (scheme, target); bare names are pipe names"""
+    scheme, sep, target = address.partition(":")
+    if sep and scheme in ("pipe", "unix", "tcp"):
+        return scheme, target
+    return "pipe", address
+
+
+class Transport:
+    """Bidirectional byte stream used by IPCClient"""
+
+    def send_parts(self, parts: List[bytes]) -> None:
+        """Write each part in order"""
+        raise NotImplementedError
+
+    def read(self, count: int) -> bytes:
+        """Read up to count bytes; returns b"" once the peer has closed"""
+        raise NotImplementedError
+
+    def read_into(self, view: memoryview) -> int:
+        """Read into view and return the number of bytes read (0 once the peer has closed)"""
+        data = self.read(len(view))
+        view[:len(data)] = data
+        return len(data)
+
+    def read_exact_into(self, view: memoryview) -> None:
+        """Fill view completely"""
+        offset = 0
+        while offset < len(view):
+            count = self.read_into(view[offset:])
+            if count == 0:
+                raise ConnectionError("Connection closed by server")
+            offset += count
+
+    def read_exact(self, count: int) -> bytes:
+        """Read exactly count bytes"""
+        chunks = []
+        remaining = count
+        while remaining > 0:
+            chunk = self.read(remaining)
+            if not chunk:
+                raise ConnectionError("Connection closed by server")
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+
+class PipeTransport(Transport):
+    """
+    Windows named pipe in message mode
+
+    The handle is overlapped so a reader thread's pending read doesn't block
+    writes from other threads.
+    """
+
+    def __init__(self, pipe_name: str, timeout: int = 5000):
+        try:
+            import win32event
+            import win32pipe
+            import win32file
+            import pywintypes
+        except ImportError:
+            raise RuntimeError("pywin32 is required for named pipe communication. Install with: pip install pywin32")
+        self._win32event = win32event
+        self._win32file = win32file
+        self._pywintypes = pywintypes
+
+        self.pipe_name = pipe_name if pipe_name.startswith("\\\\") else f"\\\\.\\pipe\\{pipe_name}"
+        self.handle = None
+
+        start_time = time.time()
+        while time.time() - start_time < timeout / 1000:
+            try:
+                self.handle = win32file.CreateFile(
+                    self.pipe_name,
+                    win32file.GENERIC_READ | win32file.GENERIC_WRITE,
+                    0,
+                    None,
+                    win32file.OPEN_EXISTING,
+                    win32file.FILE_FLAG_OVERLAPPED,
+                    None
+                )
+                # Set pipe to message mode
+                win32pipe.SetNamedPipeHandleState(
+                    self.handle,
+                    win32pipe.PIPE_READMODE_MESSAGE,
+                    None,
+                    None
+                )
+                return
+            except pywintypes.error as e:
+                if e.args[0] == 2:  # ERROR_FILE_NOT_FOUND
+                    time.sleep(0.1)
+                else:
+                    raise
+
+        raise TimeoutError(f"Could not connect to AiCalc pipe '{self.pipe_name}' within {timeout}ms")
+
+    def _overlapped_io(self, operation, data) -> Any:
+        """Run an overlapped ReadFile/WriteFile and wait for it to finish"""
+        overlapped = self._pywintypes.OVERLAPPED()
+        overlapped.hEvent = self._win32event.CreateEvent(None, True, False, None)
+        try:
+            _, buffer = operation(self.handle, data, overlapped)
+            transferred = self._win32file.GetOverlappedResult(self.handle, overlapped, True)
+            return buffer, transferred
+        finally:
+            self._win32file.CloseHandle(overlapped.hEvent)
+
+    def send_parts(self, parts: List[bytes]) -> None:
+        # Each part becomes its own pipe message, as the server reads them
+        for part in parts:
+            self._overlapped_io(self._win32file.WriteFile, part)
+
+    def read(self, count: int) -> bytes:
+        if not self.handle:
+            return b""
+        buffer, transferred = self._overlapped_io(self._win32file.ReadFile, self._win32file.AllocateReadBuffer(count))
+        return bytes(buffer[:transferred])
+
+    def close(self) -> None:
+        if self.handle:
+            handle, self.handle = self.handle, None
+            self._win32file.CloseHandle(handle)
+
+
+class SocketTransport(Transport):
+    """Unix domain or TCP socket"""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+
+    def send_parts(self, parts: List[bytes]) -> None:
+        self.sock.sendall(b"".join(parts))
+
+    def read(self, count: int) -> bytes:
+        return self.sock.recv(count)
+
+    def read_into(self, view: memoryview) -> int:
+        return self.sock.recv_into(view)
+
+    def close(self) -> None:
+        try:
+            # Wake up a reader blocked in recv() before closing
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+def open_transport(address: str, timeout: int = 5000) -> Transport:
+    """
+    Connect to an address
+
+    Args:
+        address: Pipe name or "pipe:", "unix:" or "tcp:" address
+        timeout: Connection timeout in milliseconds
+    """
+    scheme, target = parse_address(address)
+    if scheme == "pipe":
+        return PipeTransport(target, timeout)
+
+    try:
+        if scheme == "unix":
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(timeout / 1000)
+            sock.connect(target)
+        else:
+            host, _, port = target.rpartition(":")
+            if not host or not port.isdigit():
+                raise ValueError(f"TCP address must be host:port, got {target!r}")
+            sock = socket.create_connection((host.strip("[]"), int(port)), timeout=timeout / 1000)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    except socket.timeout:
+        raise TimeoutError(f"Could not connect to AiCalc at '{address}' within {timeout}ms")
+
+    sock.settimeout(None)
+    return SocketTransport(sock)
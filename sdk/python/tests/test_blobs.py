@@ -0,0 +1,46 @@
+"""Memory-mapped blob files in aicalc.blobs"""
+
+import array
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from aicalc import blobs  # noqa: E402
+from aicalc.blobs import Blob, write_blob  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def blob_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(blobs, "blob_directory", lambda: tmp_path / "blobs")
+    return tmp_path / "blobs"
+
+
+def test_write_and_map(blob_dir):
+    payload = array.array("d", range(1000))
+    path = write_blob(memoryview(payload), suffix=".bin")
+    assert path.parent == blob_dir and path.suffix == ".bin"
+
+    with Blob(path, "File") as blob:
+        assert len(blob) == payload.itemsize * len(payload)
+        assert blob.data.readonly
+        assert blob.data.cast("d")[999] == 999.0
+        assert blob.tobytes() == payload.tobytes()
+    assert blob.closed and len(blob) == 0
+    assert path.exists()  # The cell's own file is left alone
+
+
+def test_temporary_blob_is_removed():
+    path = write_blob(b'[["a", 1]]')
+    blob = Blob(path, "Table", temporary=True)
+    assert blob.tobytes() == b'[["a", 1]]'
+    blob.close()
+    assert not path.exists()
+
+
+def test_empty_file():
+    with Blob(write_blob(b""), "Text", temporary=True) as blob:
+        assert len(blob) == 0 and blob.tobytes() == b""
+    assert repr(blob) == "Blob(Text, 0 bytes)"
@@ -0,0 +1,119 @@
+"""Decoding GetRangeColumns payloads into RangeArray columns"""
+
+import math
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from aicalc import columnar  # noqa: E402
+from aicalc.columnar import RangeArray, TextColumn  # noqa: E402
+
+NAN = float("nan")
+
+
+def align(size):
+    return (size + 7) & ~7
+
+
+def encode(columns):
+    """
+    Build a payload the way RangeColumns.Encode lays it out
+
+    columns maps a letter to a list of floats, or to a list of strings for a
+    text column. Returns (params, payload).
+    """
+    rows = len(next(iter(columns.values()), []))
+    payload = bytearray()
+    descriptors = []
+    for name, values in columns.items():
+        descriptor = {"name": name, "offset": len(payload)}
+        if values and isinstance(values[0], str):
+            data = [value.encode("utf-8") for value in values]
+            offsets = [0]
+            for item in data:
+                offsets.append(offsets[-1] + len(item))
+            table = struct.pack(f"<{rows + 1}i", *offsets)
+            payload += table + bytes(align(len(table)) - len(table))
+            descriptor.update(type="text", data_offset=len(payload), data_length=offsets[-1])
+            payload += b"".join(data)
+        else:
+            payload += struct.pack(f"<{rows}d", *values)
+            descriptor.update(type="float64", length=rows * 8)
+        payload += bytes(align(len(payload)) - len(payload))
+        descriptors.append(descriptor)
+    return {"rows": rows, "columns": descriptors, "binary_length": len(payload)}, payload
+
+
+@pytest.fixture
+def without_numpy(monkeypatch):
+    monkeypatch.setattr(columnar, "_numpy", lambda: None)
+
+
+def test_columns_start_on_8_byte_boundaries():
+    params, payload = encode({"A": ["x", "é"], "B": [1.0, 2.0]})
+    offsets = [c["offset"] for c in params["columns"]]
+    # Three int32 offsets pad to 16 bytes, "xé" is 3 bytes, so B starts at 24
+    assert offsets == [0, 24]
+    assert params["columns"][0]["data_offset"] == 16
+
+    data = RangeArray(params, payload)
+    assert data.columns == ["A", "B"] and data.dtypes == {"A": "text", "B": "float64"}
+    assert list(data["B"]) == [1.0, 2.0]
+
+
+def test_text_columns_slice_utf8_by_offset():
+    params, payload = encode({"C": ["naïve", "", "日本", "z"]})
+    column = RangeArray(params, payload)["C"]
+    assert isinstance(column, TextColumn)
+    assert len(column) == 4
+    assert column.tolist() == ["naïve", "", "日本", "z"]
+    assert (column[2], column[-1], column[1:3]) == ("日本", "z", ["", "日本"])
+    with pytest.raises(IndexError):
+        column[4]
+
+
+def test_a_column_that_fell_back_to_text_stays_out_of_to_numpy():
+    pytest.importorskip("numpy")
+    params, payload = encode({"A": [1.0, 2.0], "B": ["3", "n/a"]})
+    with pytest.raises(TypeError, match="B are text"):
+        RangeArray(params, payload).to_numpy()
+
+
+def test_numpy_columns_view_the_payload_with_nan_for_empty_cells():
+    numpy = pytest.importorskip("numpy")
+    params, payload = encode({"A": [1.5, NAN, 3.0], "B": [4.0, 5.0, NAN]})
+    data = RangeArray(params, payload)
+
+    column = data["A"]
+    assert column.dtype == numpy.dtype("<f8") and column.flags.aligned
+    assert numpy.shares_memory(column, numpy.frombuffer(payload, dtype="u1"))
+    assert numpy.isnan(column[1]) and column[2] == 3.0
+    assert data.to_numpy().shape == (3, 2)
+
+
+def test_dtype_converts_numeric_columns():
+    numpy = pytest.importorskip("numpy")
+    params, payload = encode({"A": [1.0, NAN]})
+    column = RangeArray(params, payload, dtype="float32")["A"]
+    assert column.dtype == numpy.float32
+    assert column[0] == 1.0 and numpy.isnan(column[1])
+
+
+def test_memoryview_columns_without_numpy(without_numpy):
+    params, payload = encode({"A": [1.5, NAN, -2.0], "B": ["a", "b", "c"]})
+    data = RangeArray(params, payload)
+
+    column = data["A"]
+    assert isinstance(column, memoryview) and column.format == "d"
+    assert column[0] == 1.5 and math.isnan(column[1]) and column[2] == -2.0
+    assert data["B"].tolist() == ["a", "b", "c"]
+    assert data["A"] is column  # Decoded once
+
+    with pytest.raises(ImportError, match="NumPy is required to convert"):
+        RangeArray(params, payload, dtype="float32")
+    with pytest.raises(ImportError):
+        data.to_numpy()
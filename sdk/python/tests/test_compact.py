@@ -0,0 +1,62 @@
+"""Array-backed sheets in aicalc.compact"""
+
+import math
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from aicalc.compact import CompactSheet  # noqa: E402
+from aicalc.models import CellAddress, CellType, CellValue  # noqa: E402
+
+
+def test_values_round_trip_with_their_types():
+    sheet = CompactSheet()
+    sheet["A1"] = 42
+    sheet["B1"] = "text"
+    sheet["C1"] = False
+    sheet["D1"] = CellValue(84.0, CellType.NUMBER, formula="=SUM(A1, A1)", notes="doubled")
+    sheet[(999, 2)] = {"key": "value"}
+
+    assert sheet["A1"] == CellValue(42.0, CellType.NUMBER)
+    assert sheet["B1"] == CellValue("text", CellType.TEXT)
+    assert sheet["C1"] == CellValue(False, CellType.BOOLEAN)
+    assert sheet["D1"] == CellValue(84.0, CellType.NUMBER, formula="=SUM(A1, A1)", notes="doubled")
+    assert sheet.get_value(CellAddress("Sheet1", 999, 2)) == {"key": "value"}
+    assert sheet["E5"] == CellValue(None, CellType.EMPTY)
+    assert len(sheet) == 5
+
+
+def test_overwrite_and_delete_keep_the_numeric_column_consistent():
+    sheet = CompactSheet(block_rows=4)
+    sheet.set_range("A1", [[1], [2], [3], [4], [5]])
+    sheet["A2"] = "two"
+    del sheet["A5"]
+
+    assert len(sheet) == 4
+    assert "A5" not in sheet
+    values = sheet.column_values("A")
+    assert values[0] == 1.0 and math.isnan(values[1]) and values.tolist()[2:] == [3.0, 4.0]
+
+
+def test_cells_are_listed_row_by_row():
+    sheet = CompactSheet(block_rows=2)
+    for ref in ["C3", "A1", "B1", "A3"]:
+        sheet[ref] = ref
+
+    assert [address.to_string() for address, _ in sheet.items()] == ["A1", "B1", "A3", "C3"]
+
+
+def test_strings_are_interned():
+    sheet = CompactSheet()
+    for row in range(100):
+        sheet.set(row, 0, "repeated " + "value")
+
+    assert len(sheet._strings) == 1
+    assert sheet.get_value((99, 0)) == "repeated value"
+
+
+def test_models_use_slots_where_supported():
+    if sys.version_info >= (3, 10):
+        assert not hasattr(CellAddress("Sheet1", 0, 0), "__dict__")
+        assert not hasattr(CellValue(1.0, CellType.NUMBER), "__dict__")
@@ -0,0 +1,158 @@
+"""Headless recalculation with aicalc.engine"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from aicalc.engine import CellError, EvaluationEngine  # noqa: E402
+
+
+def registered(name, **attributes):
+    """Mark a function the way @aicalc_function does"""
+    def decorate(func):
+        func._aicalc_function = True
+        func._aicalc_name = name
+        for key, value in attributes.items():
+            setattr(func, f"_aicalc_{key}", value)
+        return func
+    return decorate
+
+
+def test_formulas_evaluate_in_dependency_order():
+    engine = EvaluationEngine()
+    for row in range(1, 4):
+        engine.set_value(f"A{row}", row)
+    engine.set_formula("B1", "=SUM(A1:A3)")
+    engine.set_formula("B2", "=CONCAT(B1, \"!\")")
+    engine.set_formula("Sheet2!A1", "=MAX(Sheet1!A1:A3, 10)")
+
+    result = engine.recalculate()
+
+    assert result.success and result.cells_evaluated == 3
+    assert engine.get_value("B1") == 6.0
+    assert engine.get_value("B2") == "6!"
+    assert engine.get_value("Sheet2!A1") == 10.0
+
+
+def test_recalculate_after_edit_only_evaluates_dependents():
+    calls = []
+
+    @registered("TRACK")
+    def track(x):
+        calls.append(x)
+        return x
+
+    engine = EvaluationEngine(functions=[track])
+    engine.set_value("A1", 1)
+    engine.set_value("A2", 2)
+    engine.set_formula("B1", "=TRACK(A1)")
+    engine.set_formula("B2", "=TRACK(A2)")
+    engine.set_formula("C1", "=SUM(B1, 1)")
+    engine.recalculate()
+    calls.clear()
+
+    engine.set_value("A1", 5)
+    result = engine.recalculate()
+
+    assert calls == [5]
+    assert result.cells_evaluated == 2
+    assert engine.get_value("C1") == 6.0
+    assert engine.recalculate().cells_evaluated == 0
+
+
+def test_independent_cells_run_in_parallel_up_to_the_limit():
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    @registered("WORK")
+    def work(x):
+        with lock:
+            running.append(x)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(x)
+        return x
+
+    engine = EvaluationEngine(functions=[work], max_degree_of_parallelism=3)
+    for row in range(1, 10):
+        engine.set_formula(f"A{row}", f"=WORK({row})")
+    with engine:
+        assert engine.recalculate().success
+    assert max(peak) == 3
+
+
+def test_slow_call_times_out_and_errors_propagate():
+    @registered("HANG")
+    def hang(x):
+        time.sleep(1)
+        return x
+
+    engine = EvaluationEngine(functions=[hang], timeout=0.1)
+    engine.set_formula("A1", "=HANG(1)")
+    engine.set_formula("A2", "=SUM(A1, 1)")
+    engine.set_formula("A3", "=NOPE(1)")
+    with engine:
+        result = engine.recalculate()
+
+    assert engine.get_value("A1").code == "#TIMEOUT!"
+    assert engine.get_value("A2") == engine.get_value("A1")
+    assert engine.get_value("A3") == CellError("#ERROR!", "Unknown function 'NOPE'.")
+    assert result.cells_failed == 3
+
+
+def test_unknown_function_around_a_registered_one_is_a_cell_error():
+    calls = []
+
+    @registered("GEO")
+    def geo(x):
+        calls.append(x)
+        return x
+
+    engine = EvaluationEngine(functions=[geo])
+    engine.set_value("A1", 1)
+    engine.set_formula("B1", "=GEO(A1)")
+    engine.set_formula("D1", "=NOPE(GEO(A1))")
+    with engine:
+        result = engine.recalculate()
+
+    assert engine.get_value("B1") == 1
+    assert engine.get_value("D1") == CellError("#ERROR!", "Unknown function 'NOPE'.")
+    assert result.cells_evaluated == 1 and result.cells_failed == 1
+    assert calls == [1]
+
+
+def test_circular_references_are_reported():
+    engine = EvaluationEngine()
+    engine.set_formula("A1", "=SUM(B1)")
+    engine.set_formula("B1", "=SUM(A1)")
+    engine.set_formula("C1", "=SUM(2)")
+
+    result = engine.recalculate()
+
+    assert engine.get_value("A1").code == "#CIRCULAR!"
+    assert engine.get_value("C1") == 2.0
+    assert sorted(ref for ref, _ in result.errors) == ["Sheet1!A1", "Sheet1!B1"]
+
+
+def test_vectorized_function_is_called_once_per_wave():
+    batches = []
+
+    @registered("SCALE", vectorized=True)
+    def scale(values, factors):
+        batches.append(len(values))
+        return [v * f for v, f in zip(values, factors)]
+
+    engine = EvaluationEngine(functions=[scale])
+    for row in range(1, 6):
+        engine.set_value(f"A{row}", row)
+        engine.set_formula(f"B{row}", f"=SCALE(A{row}, 10)")
+    with engine:
+        engine.recalculate()
+
+    assert batches == [5]
+    assert engine.values()["B5"] == 50
@@ -0,0 +1,64 @@
+"""Import-time budget for aicalc
+
+The client, its transports and pywin32 load when first used, not with the
+package.
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_ROOT = Path(__file__).resolve().parents[1] / "src"
+
+# Cumulative import time allowed for the package, in milliseconds
+BUDGET_MS = float(os.environ.get("AICALC_IMPORT_BUDGET_MS", "50"))
+
+HEAVY_MODULES = [
+    "aicalc.client",
+    "aicalc.transport",
+    "concurrent.futures",
+    "socket",
+    "win32file",
+    "win32pipe",
+    "pywintypes",
+]
+
+
+def run_python(code, *options):
+    env = dict(os.environ, PYTHONPATH=str(SRC_ROOT))
+    return subprocess.run([sys.executable, *options, "-c", code], env=env,
+                          capture_output=True, text=True, check=True)
+
+
+def test_models_import_loads_no_io_modules():
+    result = run_python(
+        "import json, sys\n"
+        "from aicalc import CellAddress, CellValue\n"
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    assert json.loads(result.stdout) == []
+
+
+def test_client_loads_on_first_access():
+    result = run_python(
+        "import sys, aicalc\n"
+        "assert 'aicalc.client' not in sys.modules\n"
+        "assert aicalc.Workbook.__module__ == 'aicalc.client'\n"
+        "assert aicalc.RangeArray.__module__ == 'aicalc.columnar'\n"
+        "assert callable(aicalc.connect)\n"
+    )
+    assert result.returncode == 0
+
+
+def test_import_time_within_budget():
+    # Best of a few runs, so a busy machine doesn't fail the build
+    timings = []
+    for _ in range(3):
+        result = run_python("import aicalc", "-X", "importtime")
+        match = re.search(r"^import time:\s+\d+ \|\s+(\d+) \| aicalc$", result.stderr, re.MULTILINE)
+        assert match, result.stderr
+        timings.append(int(match.group(1)) / 1000)
+    assert min(timings) <= BUDGET_MS, f"import aicalc took {min(timings):.1f} ms (budget {BUDGET_MS} ms)"
@@ -0,0 +1,112 @@
+"""Pipelined requests on one IPCClient connection, against a socket stub"""
+
+import socket
+import struct
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from aicalc import client as client_module  # noqa: E402
+from aicalc.client import IPCClient, IPCMessage, Workbook  # noqa: E402
+from aicalc.transport import SocketTransport  # noqa: E402
+
+
+class _Peer:
+    """Server end of a socketpair that reads requests and answers when told to."""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.sock.settimeout(5)
+        self.stream = sock.makefile("rb")
+
+    def read_request(self) -> IPCMessage:
+        header = self.stream.read(4)
+        return IPCMessage.from_bytes(self.stream.read(struct.unpack('<I', header)[0]))
+
+    def respond(self, request_id: int, **params) -> None:
+        self.sock.sendall(IPCMessage("Response", params, request_id).to_bytes())
+
+    def close(self) -> None:
+        self.stream.close()
+        self.sock.close()
+
+
+@pytest.fixture
+def connection(monkeypatch):
+    """An address that connects to a fresh socketpair; yields the server end."""
+    ours, theirs = socket.socketpair()
+    monkeypatch.setattr(client_module, "open_transport", lambda address, timeout: SocketTransport(ours))
+    peer = _Peer(theirs)
+    yield peer
+    peer.close()
+
+
+@pytest.fixture
+def ipc(connection):
+    ipc = IPCClient("tcp:stub:0")
+    ipc.connect()
+    yield ipc
+    ipc.close()
+
+
+def test_responses_arriving_out_of_order_complete_the_right_futures(ipc, connection):
+    futures = {request_id: ipc.send_request(IPCMessage("GetValue", {}, request_id)) for request_id in (1, 2, 3)}
+    assert [connection.read_request().request_id for _ in range(3)] == [1, 2, 3]
+
+    for request_id in (3, 1, 2):
+        connection.respond(request_id, value=f"v{request_id}")
+
+    assert {request_id: future.result(5).params["value"] for request_id, future in futures.items()} == {
+        1: "v1", 2: "v2", 3: "v3"}
+
+
+def test_a_request_id_in_flight_cannot_be_reused(ipc, connection):
+    first = ipc.send_request(IPCMessage("GetValue", {}, 7))
+    with pytest.raises(ValueError, match="already in flight"):
+        ipc.send_request(IPCMessage("GetValue", {}, 7))
+
+    connection.read_request()
+    connection.respond(7, value="x")
+    assert first.result(5).params["value"] == "x"
+    # Free again once answered
+    second = ipc.send_request(IPCMessage("GetValue", {}, 7))
+    connection.read_request()
+    connection.respond(7, value="y")
+    assert second.result(5).params["value"] == "y"
+
+
+def test_a_closed_connection_fails_every_pending_future(ipc, connection):
+    futures = [ipc.send_request(IPCMessage("GetValue", {}, request_id)) for request_id in (1, 2)]
+    connection.read_request()
+    connection.respond(1, value="done")
+    connection.close()
+
+    assert futures[0].result(5).params["value"] == "done"
+    with pytest.raises(ConnectionError):
+        futures[1].result(5)
+
+
+def test_get_values_sends_every_request_before_reading_a_response(connection):
+    def serve():
+        # Only answers once all three requests are in, last first
+        try:
+            requests = [connection.read_request() for _ in range(3)]
+        except socket.timeout:
+            connection.close()  # Fails the client's futures rather than hanging the test
+            return
+        for request in reversed(requests):
+            connection.respond(request.request_id, value=f"{request.params['row']},{request.params['column']}")
+
+    server = threading.Thread(target=serve, daemon=True)
+    server.start()
+    workbook = Workbook(address="tcp:stub:0")
+    workbook.connect()
+    try:
+        assert workbook.get_values(["A1", "B2", "C3"]) == ["0,0", "1,1", "2,2"]
+    finally:
+        workbook.disconnect()
+    server.join(5)
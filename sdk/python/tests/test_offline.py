@@ -0,0 +1,138 @@
+"""Incremental reading of .aicalc files in aicalc.offline"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from aicalc import offline  # noqa: E402
+from aicalc.offline import CELL_FIELDS, DEFAULT_FIELDS, OfflineCell, iter_cells, load_workbook  # noqa: E402
+
+CHUNK_SIZES = [pytest.param(size, id=f"chunk{size}") for size in range(1, 8)]
+
+
+def cell(address, serialized, object_type="Number", **extra):
+    return {
+        "address": address,
+        "formula": extra.pop("formula", None),
+        "value": {"objectType": object_type, "serializedValue": serialized, "displayValue": serialized},
+        "history": extra.pop("history", []),
+        **extra,
+    }
+
+
+WORKBOOK = {
+    "title": 'Budget "2024" \\ draft',
+    "settings": {"defaultEvaluationTimeoutSeconds": 100, "ratio": 1.5e-3, "offset": -0.25,
+                 "big": 12345678901234567890, "flags": [True, False, None]},
+    "sheets": [
+        {
+            "name": "Sheet1",
+            # Numbers that decode to a shorter number when split after "1." or "2.5e"
+            "rowCount": 2.5e1,
+            "columnCount": 1.0,
+            "cells": [
+                cell("a1", "1.5", formula="=SUM(A2:A3)",
+                     format={"fontSize": 11.5, "bold": True, "color": "#FF00\u00e9E"},
+                     notes='line\nbreak "quoted" back\\slash \u00e9 \U0001F600 \\u0041'),
+                cell("A2", "-2E-3", history=[{"timestamp": "2024-01-01", "nested": {
+                    "deep": [[1, [2, {"x": 'y"}z]', "w": "[{"}]], 3.25e2], "empty": {}, "list": []}}]),
+                cell("B2", "TRUE", "Boolean", automationMode="OnEdit", sourcePath="C:\\data\\in.csv"),
+                cell("C3", "", "Empty", cloudImport={"provider": "s3", "retries": 3}),
+            ],
+        },
+        {
+            # The name arrives after the cells, as older files write it
+            "cells": [cell("A1", "late"), cell("B1", "7", history=[{"v": 1e2}])],
+            "rowCount": 3,
+            "columnCount": 2,
+            "name": "Late",
+        },
+        {"name": "Skipped", "rowCount": 1, "columnCount": 1, "cells": [cell("Z9", "9")]},
+    ],
+}
+
+
+@pytest.fixture
+def workbook_file(tmp_path):
+    path = tmp_path / "book.aicalc"
+    # AiCalc writes a BOM; indent so values straddle chunk boundaries at every offset
+    path.write_text(json.dumps(WORKBOOK, indent=1, ensure_ascii=False), encoding="utf-8-sig")
+    return str(path)
+
+
+def expected_cell(definition, fields):
+    keys = {key.lower(): value for key, value in definition.items()}
+    result = OfflineCell(address=keys["address"].upper())
+    for name in fields:
+        if name == "address" or CELL_FIELDS[name] not in keys:
+            continue
+        value = keys[CELL_FIELDS[name]]
+        if name == "value":
+            result.object_type = value["objectType"]
+            result.serialized_value = value["serializedValue"]
+            result.display_value = value["displayValue"]
+            result.value = offline._convert_value(result.object_type, result.serialized_value)
+        else:
+            setattr(result, name, value)
+    return result
+
+
+def expected_cells(path, sheets=None, fields=DEFAULT_FIELDS):
+    with open(path, encoding="utf-8-sig") as f:
+        document = json.load(f)
+    return [(sheet["name"], expected_cell(definition, fields))
+            for sheet in document["sheets"] if sheets is None or sheet["name"] in sheets
+            for definition in sheet["cells"]]
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_iter_cells_matches_json_load(workbook_file, monkeypatch, chunk_size):
+    monkeypatch.setattr(offline, "_CHUNK_SIZE", chunk_size)
+    assert list(iter_cells(workbook_file)) == expected_cells(workbook_file)
+
+    every_field = list(CELL_FIELDS)
+    assert list(iter_cells(workbook_file, fields=every_field)) == expected_cells(workbook_file, fields=every_field)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_load_workbook_matches_json_load(workbook_file, monkeypatch, chunk_size):
+    monkeypatch.setattr(offline, "_CHUNK_SIZE", chunk_size)
+    workbook = load_workbook(workbook_file, sheets=["Sheet1", "Late"], fields=["value", "notes"])
+
+    assert workbook.title == WORKBOOK["title"]
+    assert workbook.settings == WORKBOOK["settings"]
+    assert list(workbook.sheets) == ["Sheet1", "Late"]
+    assert (workbook["Sheet1"].row_count, workbook["Sheet1"].column_count) == (25.0, 1.0)
+    assert (workbook["Late"].row_count, workbook["Late"].column_count) == (3, 2)
+
+    expected = expected_cells(workbook_file, sheets={"Sheet1", "Late"}, fields=["value", "notes"])
+    actual = [(sheet.name, cell) for sheet in workbook for cell in sheet]
+    assert actual == expected
+    assert workbook["Sheet1"]["a2"].value == -0.002
+    assert workbook["Sheet1"]["B2"].value is True and workbook["Sheet1"]["C3"].value is None
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_sheet_filter_skips_other_sheets(workbook_file, monkeypatch, chunk_size):
+    monkeypatch.setattr(offline, "_CHUNK_SIZE", chunk_size)
+    assert [(name, c.address) for name, c in iter_cells(workbook_file, sheets="Late")] == [("Late", "A1"), ("Late", "B1")]
+    assert [c.address for _, c in iter_cells(workbook_file, sheets=["Skipped"], fields=["formula"])] == ["Z9"]
+
+
+def test_unrequested_fields_stay_none(workbook_file):
+    first = next(iter_cells(workbook_file, fields=["formula"]))[1]
+    assert first == OfflineCell(address="A1", formula="=SUM(A2:A3)")
+
+
+def test_unknown_fields_and_malformed_files_raise(workbook_file, tmp_path):
+    with pytest.raises(ValueError, match="Unknown cell fields"):
+        list(iter_cells(workbook_file, fields=["colour"]))
+
+    truncated = tmp_path / "truncated.aicalc"
+    truncated.write_text(Path(workbook_file).read_text(encoding="utf-8-sig")[:-40], encoding="utf-8")
+    with pytest.raises(ValueError, match="Invalid workbook file"):
+        load_workbook(str(truncated))
@@ -0,0 +1,84 @@
+"""Range algebra and bulk address conversion in aicalc.ranges"""
+
+import pickle
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from aicalc.client import _wire_range  # noqa: E402
+from aicalc.models import CellAddress  # noqa: E402
+from aicalc.ranges import MAX_ROWS, Range, parse_many, to_string_many  # noqa: E402
+
+
+@pytest.mark.parametrize("ref, expected", [
+    ("A1", ("Sheet1", 0, 0, 0, 0)),
+    ("$B$2:c10", ("Sheet1", 1, 1, 9, 2)),
+    ("C10:A1", ("Sheet1", 0, 0, 9, 2)),
+    ("Data!AA1:AB2", ("Data", 0, 26, 1, 27)),
+    ("'My ''Q1'' Sheet'!B:D", ("My 'Q1' Sheet", 0, 1, MAX_ROWS - 1, 3)),
+    ("Sheet2!3:7", ("Sheet2", 2, 0, 6, 16_383)),
+])
+def test_parse(ref, expected):
+    r = Range.parse(ref)
+    assert (r.sheet, r.first_row, r.first_column, r.last_row, r.last_column) == expected
+    assert Range.parse(r.to_string()) == r
+
+
+@pytest.mark.parametrize("ref", ["", "A0", "A1:", "1A", "ZZZZ1", "Sheet1!", "A1:B2:C3"])
+def test_parse_rejects_bad_references(ref):
+    with pytest.raises(ValueError):
+        Range.parse(ref)
+
+
+def test_to_string_names_sheets_like_cell_address():
+    assert Range.parse("Sheet1!A1:B2").to_string() == "A1:B2"
+    assert Range.parse("Data!B:D").to_string() == "Data!B:D"
+    assert Range.parse("'My Sheet'!3:7").to_string() == "'My Sheet'!3:7"
+    assert repr(Range.parse("A1")) == "Range('Sheet1!A1')"
+
+
+def test_set_operations_and_membership():
+    r = Range.parse("B2:D10")
+
+    assert r & Range.parse("C5:Z20") == Range.parse("C5:D10")
+    assert r & Range.parse("E1:F2") is None
+    assert r & Range.parse("Other!B2:D10") is None
+    assert r | Range.parse("A20") == Range.parse("A2:D20")
+    with pytest.raises(ValueError):
+        r | Range.parse("Other!A1")
+
+    assert "C3" in r and CellAddress("Sheet1", 1, 1) in r and "C3:D4" in r
+    assert "A1" not in r and "Other!C3" not in r
+
+
+def test_indexing_paging_and_clipping():
+    r = Range.parse("B2:D100")
+
+    assert len(r) == 297 and r.shape == (99, 3)
+    assert r[0] == r.start and r[-1] == r.end
+    assert r[4] == CellAddress("Sheet1", 2, 2)
+    assert r.index("C3") == 4
+    assert list(r)[:2] == [CellAddress("Sheet1", 1, 1), CellAddress("Sheet1", 1, 2)]
+    assert [p.to_string() for p in r.pages(40)] == ["B2:D41", "B42:D81", "B82:D100"]
+    assert Range.parse("A:C").clip(500, 2) == Range.parse("A1:B500")
+    assert pickle.loads(pickle.dumps(r)) == r
+
+
+def test_bulk_conversion():
+    refs = ["A1", "$b$2", "Data!AA10", "'My Sheet'!C3"]
+    addresses = parse_many(refs)
+
+    assert addresses == [CellAddress.parse(ref) for ref in refs[:3]] + [CellAddress("My Sheet", 2, 2)]
+    assert to_string_many(addresses) == ["A1", "B2", "Data!AA10", "'My Sheet'!C3"]
+    assert parse_many(to_string_many(addresses)) == addresses
+    with pytest.raises(ValueError, match="'A0'"):
+        parse_many(["A1", "A0"])
+
+
+def test_client_sends_concrete_unquoted_ranges():
+    assert _wire_range("A1:B2") == "Sheet1!A1:B2"
+    assert _wire_range("'My Sheet'!B:C") == f"My Sheet!B1:C{MAX_ROWS}"
+    assert _wire_range(Range("Data", 0, 0, 9, 1)) == "Data!A1:B10"
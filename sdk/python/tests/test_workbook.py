@@ -0,0 +1,137 @@
+"""Workbook writes against a stand-in for AiCalc's PipeServer"""
+
+import socketserver
+import struct
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from aicalc.client import IPCMessage, Workbook, _wire_cell  # noqa: E402
+from aicalc.models import CellAddress  # noqa: E402
+from aicalc.ranges import Range  # noqa: E402
+
+
+def parse_cell(text, default_sheet="Sheet1"):
+    """CellAddress.TryParse in PipeServer: no quoting, no "$", no ranges."""
+    sheet, _, cell = text.rpartition("!") if text.count("!") == 1 else ("", "", text)
+    letters = cell.rstrip("0123456789")
+    digits = cell[len(letters):]
+    if not letters.isalpha() or not digits or int(digits) < 1:
+        raise ValueError(f"Invalid cell reference: {text}")
+    column = 0
+    for letter in letters.upper():
+        column = column * 26 + ord(letter) - ord("A") + 1
+    return sheet or default_sheet, int(digits) - 1, column - 1
+
+
+class _PipeServerStub(socketserver.BaseRequestHandler):
+    """Applies SetRange, SetValues and GetValue the way PipeServer parses them."""
+
+    def handle(self) -> None:
+        stream = self.request.makefile("rb")
+        while True:
+            header = stream.read(4)
+            if len(header) < 4:
+                return
+            request = IPCMessage.from_bytes(stream.read(struct.unpack('<I', header)[0]))
+            self.server.requests.append((request.command, request.params))
+            try:
+                params = getattr(self, request.command)(request.params)
+            except (KeyError, ValueError) as e:
+                params = {"status": "error", "error": str(e)}
+            response = IPCMessage(request.command + "Response", params, request.request_id)
+            self.request.sendall(response.to_bytes())
+
+    def SetRange(self, params):
+        sheet, row, column = parse_cell(params["range"].split(":")[0])
+        writes = {(sheet, row + r, column + c): value
+                  for r, values in enumerate(params["values"]) for c, value in enumerate(values)}
+        self.server.cells.update(writes)
+        return {"cells_written": len(writes), "cells_evaluated": 0, "status": "success"}
+
+    def SetValues(self, params):
+        writes = {parse_cell(ref): value for ref, value in params["values"].items()}
+        self.server.cells.update(writes)
+        return {"cells_written": len(writes), "cells_evaluated": 0, "status": "success"}
+
+    def GetValue(self, params):
+        value = self.server.cells.get((params["sheet"], params["row"], params["column"]))
+        return {"value": "" if value is None else str(value), "status": "success"}
+
+
+class _StubServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+@pytest.fixture
+def server():
+    server = _StubServer(("127.0.0.1", 0), _PipeServerStub)
+    server.cells = {}
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def workbook(server):
+    workbook = Workbook(address=f"tcp:127.0.0.1:{server.server_address[1]}")
+    workbook.connect()
+    yield workbook
+    workbook.disconnect()
+
+
+@pytest.mark.parametrize("ref, expected", [
+    ("b2", "Sheet1!B2"),
+    ("$C$3", "Sheet1!C3"),
+    ("Data!AA10", "Data!AA10"),
+    ("'My Sheet'!D4", "My Sheet!D4"),
+    ("Data!B2:D9", "Data!B2"),
+    ("Data!C:D", "Data!C1"),
+    (Range("Data", 4, 1, 6, 2), "Data!B5"),
+    (CellAddress("Data", 0, 27), "Data!AB1"),
+])
+def test_wire_cell(ref, expected):
+    assert _wire_cell(ref) == expected
+
+
+def test_wire_cell_single_rejects_ranges():
+    assert _wire_cell("'My Sheet'!A1", single=True) == "My Sheet!A1"
+    with pytest.raises(ValueError, match="single cell"):
+        _wire_cell("A1:B2", single=True)
+    with pytest.raises(ValueError):
+        _wire_cell("not a cell", single=True)
+
+
+@pytest.mark.parametrize("start_ref", ["$B$2", "'Sheet1'!b2", "B2:C3", Range.parse("B2"), CellAddress("Sheet1", 1, 1)])
+def test_set_range_sends_the_anchor_in_wire_form(workbook, server, start_ref):
+    assert workbook.set_range(start_ref, [[1, 2], [3, 4]]) == 4
+    assert server.requests[-1] == ("SetRange", {"range": "Sheet1!B2", "values": [[1, 2], [3, 4]]})
+    assert server.cells == {("Sheet1", 1, 1): 1, ("Sheet1", 1, 2): 2, ("Sheet1", 2, 1): 3, ("Sheet1", 2, 2): 4}
+    assert workbook.get_value("C3") == "4"
+
+
+def test_set_range_on_a_quoted_sheet(workbook, server):
+    workbook.set_range("'Q1 Data'!A1", [["x"]])
+    assert server.requests[-1][1]["range"] == "Q1 Data!A1"
+    assert server.cells == {("Q1 Data", 0, 0): "x"}
+
+
+def test_set_values_sends_keys_in_wire_form(workbook, server):
+    written = workbook.set_values({"a1": 1, "$B$2": 2.5, "'My Sheet'!C3": "text", "Data!D4": None})
+    assert written == 4
+    assert server.requests[-1] == ("SetValues", {"values": {
+        "Sheet1!A1": 1, "Sheet1!B2": 2.5, "My Sheet!C3": "text", "Data!D4": None}})
+    assert server.cells[("My Sheet", 2, 2)] == "text"
+
+
+def test_set_values_rejects_ranges_before_sending(workbook, server):
+    with pytest.raises(ValueError, match="single cell"):
+        workbook.set_values({"A1": 1, "B1:B3": 2})
+    assert server.requests == []
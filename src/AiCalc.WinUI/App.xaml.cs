@@ -155,6 +155,9 @@ public partial class App : Application
         {
             System.Diagnostics.Debug.WriteLine($"Error saving preferences on close: {ex.Message}");
         }
+
+        // Stop resident Python function workers
+        PythonWorkerHost.ShutdownAll();
     }
 
     /// <summary>
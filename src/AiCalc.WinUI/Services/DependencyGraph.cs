@@ -186,10 +186,17 @@ public class DependencyGraph
     /// Gets all cells that transitively depend on the given cell
     /// </summary>
     public HashSet<CellAddress> GetAllDependents(CellAddress address)
+    {
+        return GetAllDependents(new[] { address });
+    }
+
+    /// <summary>
+    /// Gets all cells that transitively depend on any of the given cells
+    /// </summary>
+    public HashSet<CellAddress> GetAllDependents(IEnumerable<CellAddress> addresses)
     {
         var result = new HashSet<CellAddress>();
-        var queue = new Queue<CellAddress>();
-        queue.Enqueue(address);
+        var queue = new Queue<CellAddress>(addresses);
 
         while (queue.Count > 0)
         {
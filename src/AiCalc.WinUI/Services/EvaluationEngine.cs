@@ -106,7 +106,7 @@ public class EvaluationEngine
             var oldValue = cell.DisplayValue;
 
             // Execute the formula
-            var result = await _functionRunner.EvaluateAsync(cell, cell.Formula);
+            var result = await _functionRunner.EvaluateAsync(cell, cell.Formula, cancellationToken);
 
             if (result != null)
             {
@@ -242,17 +242,30 @@ public class EvaluationEngine
     /// <summary>
     /// Evaluates only the cells that depend on the given cell (cascade evaluation)
     /// </summary>
-    public async Task<EvaluationResult> EvaluateDependentsAsync(
+    public Task<EvaluationResult> EvaluateDependentsAsync(
         CellAddress changedCell,
         Dictionary<CellAddress, CellViewModel> cells,
         CancellationToken cancellationToken = default,
         IProgress<EvaluationProgress>? progress = null)
+    {
+        return EvaluateDependentsAsync(new[] { changedCell }, cells, cancellationToken, progress);
+    }
+
+    /// <summary>
+    /// Evaluates the cells that depend on any of the given cells, each one once, so a
+    /// bulk write costs a single cascade instead of one per changed cell
+    /// </summary>
+    public async Task<EvaluationResult> EvaluateDependentsAsync(
+        IReadOnlyCollection<CellAddress> changedCells,
+        Dictionary<CellAddress, CellViewModel> cells,
+        CancellationToken cancellationToken = default,
+        IProgress<EvaluationProgress>? progress = null)
     {
         var stopwatch = Stopwatch.StartNew();
         var result = new EvaluationResult();
 
-        // Get all cells that depend on this cell
-        var dependents = _dependencyGraph.GetAllDependents(changedCell);
+        // Get all cells that depend on the changed cells
+        var dependents = _dependencyGraph.GetAllDependents(changedCells);
         
         if (dependents.Count == 0)
         {
@@ -1,6 +1,7 @@
 using System;
 using System.Collections.Generic;
 using System.Linq;
+using System.Threading;
 using System.Threading.Tasks;
 using AiCalc.Models;
 using AiCalc.Services.AI;
@@ -153,4 +154,10 @@ public record FunctionExecutionResult(
     public bool HasSpill => SpillRange is { Length: > 0 };
 }
 
-public record FunctionEvaluationContext(WorkbookViewModel Workbook, SheetViewModel Sheet, IReadOnlyList<CellViewModel> Arguments, string RawFormula);
+public record FunctionEvaluationContext(WorkbookViewModel Workbook, SheetViewModel Sheet, IReadOnlyList<CellViewModel> Arguments, string RawFormula)
+{
+    /// <summary>
+    /// Cancelled when the evaluation that asked for this call is cancelled
+    /// </summary>
+    public CancellationToken CancellationToken { get; init; }
+}
@@ -3,6 +3,7 @@ using System.Collections.Generic;
 using System.IO;
 using System.Linq;
 using System.Text.RegularExpressions;
+using System.Threading;
 using System.Threading.Tasks;
 using AiCalc.Models;
 using AiCalc.Models.CellObjects;
@@ -22,7 +23,7 @@ public class FunctionRunner
 
     public FunctionRegistry Registry { get; }
 
-    public async Task<FunctionExecutionResult?> EvaluateAsync(CellViewModel cell, string formula)
+    public async Task<FunctionExecutionResult?> EvaluateAsync(CellViewModel cell, string formula, CancellationToken cancellationToken = default)
     {
         if (!FunctionRegex.IsMatch(formula))
         {
@@ -39,7 +40,10 @@ public class FunctionRunner
         }
 
         var arguments = await ResolveArgumentsAsync(cell.Sheet, args);
-        var context = new FunctionEvaluationContext(cell.Sheet.Workbook, cell.Sheet, arguments, formula);
+        var context = new FunctionEvaluationContext(cell.Sheet.Workbook, cell.Sheet, arguments, formula)
+        {
+            CancellationToken = cancellationToken
+        };
         
         // Check if this is an AI function
         if (descriptor.Category == FunctionCategory.AI)
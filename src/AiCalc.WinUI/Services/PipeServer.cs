@@ -1,12 +1,17 @@
 using System;
 using System.Collections.Generic;
+using System.Globalization;
 using System.IO;
 using System.IO.Pipes;
+using System.Linq;
+using System.Runtime.InteropServices;
 using System.Text;
 using System.Text.Json;
+using System.Text.Json.Serialization;
 using System.Threading;
 using System.Threading.Tasks;
 using AiCalc.Models;
+using AiCalc.Models.CellObjects;
 using AiCalc.ViewModels;
 using Microsoft.UI.Dispatching;
 
@@ -18,6 +23,45 @@ namespace AiCalc.Services
     /// </summary>
     public class PipeServer : IDisposable
     {
+        /// <summary>
+        /// Largest request accepted; bulk writes send a whole block in one message
+        /// </summary>
+        private const int MaxMessageSize = 256 * 1024 * 1024;
+
+        /// <summary>
+        /// Where GetBlob and PutBlob exchange files; the Python SDK uses the same directory
+        /// </summary>
+        private static readonly string BlobDirectory = Path.Combine(Path.GetTempPath(), "AiCalc", "blobs");
+
+        /// <summary>
+        /// Where files written into media cells through PutBlob are kept
+        /// </summary>
+        private static readonly string MediaDirectory = Path.Combine(
+            Environment.GetFolderPath(Environment.SpecialFolder.LocalApplicationData), "AiCalc", "media");
+
+        /// <summary>
+        /// Cell types whose serialized value is the path of the file holding their content
+        /// </summary>
+        private static readonly HashSet<CellObjectType> FileBackedTypes = new()
+        {
+            CellObjectType.Image,
+            CellObjectType.Video,
+            CellObjectType.Audio,
+            CellObjectType.Pdf,
+            CellObjectType.File
+        };
+
+        /// <summary>
+        /// Commands that only read the workbook, run concurrently with each other
+        /// </summary>
+        private static readonly HashSet<string> ReadCommands = new()
+        {
+            "GetValue",
+            "GetRange",
+            "GetRangeColumns",
+            "GetFormula"
+        };
+
         private readonly string _pipeName;
         private readonly WorkbookViewModel _workbook;
         private readonly FunctionRunner _functionRunner;
@@ -69,7 +113,7 @@ namespace AiCalc.Services
             {
                 try
                 {
-                    using var pipeServer = new NamedPipeServerStream(
+                    var pipeServer = new NamedPipeServerStream(
                         _pipeName,
                         PipeDirection.InOut,
                         NamedPipeServerStream.MaxAllowedServerInstances,
@@ -77,9 +121,17 @@ namespace AiCalc.Services
                         PipeOptions.Asynchronous);
 
                     // Wait for client connection
-                    await pipeServer.WaitForConnectionAsync(cancellationToken);
+                    try
+                    {
+                        await pipeServer.WaitForConnectionAsync(cancellationToken);
+                    }
+                    catch
+                    {
+                        pipeServer.Dispose();
+                        throw;
+                    }
 
-                    // Handle client in separate task (allows multiple clients)
+                    // Handle client in separate task (allows multiple clients); it owns the stream
                     _ = Task.Run(() => HandleClient(pipeServer), CancellationToken.None);
                 }
                 catch (OperationCanceledException)
@@ -95,10 +147,30 @@ namespace AiCalc.Services
         }
 
         /// <summary>
-        /// Handle individual client connection
+        /// Handle individual client connection. A client can pipeline many requests;
+        /// reads are processed concurrently and their responses carry the request id, so
+        /// they may be written in a different order than the requests arrived. Everything
+        /// else runs in arrival order (see RequestScheduler).
         /// </summary>
         private async Task HandleClient(NamedPipeServerStream pipeServer)
         {
+            var writeLock = new SemaphoreSlim(1, 1);
+            var scheduler = new RequestScheduler();
+
+            async Task SendLocked(IPCMessage response)
+            {
+                await writeLock.WaitAsync();
+                try
+                {
+                    await SendMessage(pipeServer, response);
+                }
+                finally
+                {
+                    writeLock.Release();
+                }
+            }
+
+            var subscriptions = new CellSubscriptions(_workbook, SendLocked);
             try
             {
                 while (pipeServer.IsConnected)
@@ -107,14 +179,31 @@ namespace AiCalc.Services
                     if (message == null)
                         break;
 
-                    var response = await ProcessMessage(message);
-                    await SendMessage(pipeServer, response);
+                    _ = scheduler.Schedule(ReadCommands.Contains(message.Command), async () =>
+                    {
+                        var response = await ProcessMessage(message, subscriptions);
+                        await SendLocked(response);
+                    });
                 }
             }
             catch (Exception ex)
             {
                 System.Diagnostics.Debug.WriteLine($"Client handler error: {ex.Message}");
             }
+            finally
+            {
+                // Requests already received finish (and write their responses) before the pipe goes away
+                try
+                {
+                    await scheduler.WhenIdle();
+                }
+                catch (Exception ex)
+                {
+                    System.Diagnostics.Debug.WriteLine($"Client request error: {ex.Message}");
+                }
+                subscriptions.Dispose();
+                pipeServer.Dispose();
+            }
         }
 
         /// <summary>
@@ -126,22 +215,24 @@ namespace AiCalc.Services
             {
                 // Read 4-byte length header
                 var lengthBuffer = new byte[4];
-                var bytesRead = await pipe.ReadAsync(lengthBuffer, 0, 4);
-                if (bytesRead != 4)
+                if (!await ReadExactAsync(pipe, lengthBuffer, 4))
                     return null;
 
                 var length = BitConverter.ToInt32(lengthBuffer, 0);
-                if (length <= 0 || length > 1024 * 1024) // Max 1MB
+                if (length <= 0 || length > MaxMessageSize)
                     return null;
 
                 // Read message body
                 var messageBuffer = new byte[length];
-                bytesRead = await pipe.ReadAsync(messageBuffer, 0, length);
-                if (bytesRead != length)
+                if (!await ReadExactAsync(pipe, messageBuffer, length))
                     return null;
 
-                var json = Encoding.UTF8.GetString(messageBuffer);
-                return JsonSerializer.Deserialize<IPCMessage>(json);
+                var message = JsonSerializer.Deserialize<IPCMessage>(messageBuffer);
+                if (message != null)
+                {
+                    message.Parameters = NormalizeParameters(message.Parameters);
+                }
+                return message;
             }
             catch
             {
@@ -149,6 +240,50 @@ namespace AiCalc.Services
             }
         }
 
+        private static async Task<bool> ReadExactAsync(Stream stream, byte[] buffer, int count)
+        {
+            var offset = 0;
+            while (offset < count)
+            {
+                var read = await stream.ReadAsync(buffer, offset, count - offset);
+                if (read == 0)
+                    return false;
+                offset += read;
+            }
+            return true;
+        }
+
+        /// <summary>
+        /// Converts deserialized JsonElement parameter values into plain CLR values
+        /// (string, long, double, bool, List, Dictionary) so handlers can use Convert.*
+        /// </summary>
+        private static Dictionary<string, object> NormalizeParameters(Dictionary<string, object>? parameters)
+        {
+            var normalized = new Dictionary<string, object>();
+            if (parameters == null)
+                return normalized;
+
+            foreach (var (key, value) in parameters)
+            {
+                normalized[key] = value is JsonElement element ? FromJsonElement(element) ?? "" : value;
+            }
+            return normalized;
+        }
+
+        private static object? FromJsonElement(JsonElement element)
+        {
+            return element.ValueKind switch
+            {
+                JsonValueKind.String => element.GetString(),
+                JsonValueKind.Number => element.TryGetInt64(out var integer) ? integer : element.GetDouble(),
+                JsonValueKind.True => true,
+                JsonValueKind.False => false,
+                JsonValueKind.Array => element.EnumerateArray().Select(FromJsonElement).ToList(),
+                JsonValueKind.Object => element.EnumerateObject().ToDictionary(p => p.Name, p => FromJsonElement(p.Value)),
+                _ => null
+            };
+        }
+
         /// <summary>
         /// Send message to pipe
         /// </summary>
@@ -163,6 +298,13 @@ namespace AiCalc.Services
                 // Send length header + message
                 await pipe.WriteAsync(lengthBytes, 0, 4);
                 await pipe.WriteAsync(messageBytes, 0, messageBytes.Length);
+
+                // Binary payload follows as one more length-prefixed message
+                if (message.Payload != null)
+                {
+                    await pipe.WriteAsync(BitConverter.GetBytes(message.Payload.Length), 0, 4);
+                    await pipe.WriteAsync(message.Payload, 0, message.Payload.Length);
+                }
                 await pipe.FlushAsync();
             }
             catch (Exception ex)
@@ -174,7 +316,7 @@ namespace AiCalc.Services
         /// <summary>
         /// Process IPC message and generate response
         /// </summary>
-        private async Task<IPCMessage> ProcessMessage(IPCMessage message)
+        private async Task<IPCMessage> ProcessMessage(IPCMessage message, CellSubscriptions subscriptions)
         {
             try
             {
@@ -185,14 +327,32 @@ namespace AiCalc.Services
                 {
                     "GetValue" => await GetValue(parameters),
                     "SetValue" => await SetValue(parameters),
+                    "SetRange" => await SetRange(parameters),
+                    "SetValues" => await SetValues(parameters),
                     "GetFormula" => await GetFormula(parameters),
                     "SetFormula" => await SetFormula(parameters),
                     "GetRange" => await GetRange(parameters),
+                    "GetRangeColumns" => await GetRangeColumns(parameters),
                     "RunFunction" => await RunFunction(parameters),
                     "EvaluateCell" => await EvaluateCell(parameters),
+                    "GetBlob" => await GetBlob(parameters),
+                    "PutBlob" => await PutBlob(parameters),
+                    "Watch" => Watch(parameters, subscriptions),
+                    "Unwatch" => Unwatch(parameters, subscriptions),
                     _ => new { status = "error", error = $"Unknown command: {command}" }
                 };
 
+                if (result is RangeColumns columns)
+                {
+                    return new IPCMessage
+                    {
+                        Command = message.Command + "Response",
+                        Parameters = columns.Parameters,
+                        RequestId = message.RequestId,
+                        Payload = columns.Payload
+                    };
+                }
+
                 return new IPCMessage
                 {
                     Command = message.Command + "Response",
@@ -284,6 +444,107 @@ namespace AiCalc.Services
             return new Dictionary<string, object> { ["status"] = "success" };
         }
 
+        /// <summary>
+        /// Write rows of values starting at a cell, then evaluate dependents once
+        /// </summary>
+        private async Task<object> SetRange(Dictionary<string, object> parameters)
+        {
+            var (start, _) = ParseRange(parameters["range"].ToString() ?? "A1");
+            if (parameters["values"] is not List<object?> rows)
+            {
+                throw new ArgumentException("values must be a list of rows");
+            }
+
+            var writes = new List<(CellAddress Address, object? Value)>();
+            for (var r = 0; r < rows.Count; r++)
+            {
+                if (rows[r] is not List<object?> row)
+                {
+                    throw new ArgumentException("values must be a list of rows");
+                }
+                for (var c = 0; c < row.Count; c++)
+                {
+                    writes.Add((new CellAddress(start.SheetName, start.Row + r, start.Column + c), row[c]));
+                }
+            }
+
+            var result = await ApplyWrites(writes);
+            return new Dictionary<string, object>
+            {
+                ["cells_written"] = writes.Count,
+                ["cells_evaluated"] = result.CellsEvaluated,
+                ["status"] = "success"
+            };
+        }
+
+        /// <summary>
+        /// Write {cell reference: value} pairs, then evaluate dependents once
+        /// </summary>
+        private async Task<object> SetValues(Dictionary<string, object> parameters)
+        {
+            if (parameters["values"] is not Dictionary<string, object?> values)
+            {
+                throw new ArgumentException("values must map cell references to values");
+            }
+
+            var writes = new List<(CellAddress Address, object? Value)>(values.Count);
+            foreach (var (cellRef, value) in values)
+            {
+                if (!CellAddress.TryParse(cellRef, "Sheet1", out var address))
+                {
+                    throw new ArgumentException($"Invalid cell reference: {cellRef}");
+                }
+                writes.Add((address, value));
+            }
+
+            var result = await ApplyWrites(writes);
+            return new Dictionary<string, object>
+            {
+                ["cells_written"] = writes.Count,
+                ["cells_evaluated"] = result.CellsEvaluated,
+                ["status"] = "success"
+            };
+        }
+
+        /// <summary>
+        /// Apply writes in one UI-thread pass and evaluate their dependents together.
+        /// Every cell is resolved before any is written, so a bad reference writes nothing.
+        /// </summary>
+        private async Task<EvaluationResult> ApplyWrites(List<(CellAddress Address, object? Value)> writes)
+        {
+            var tcs = new TaskCompletionSource<EvaluationResult>();
+
+            _dispatcherQueue.TryEnqueue(async () =>
+            {
+                try
+                {
+                    var cells = new List<(CellViewModel Cell, string Value)>(writes.Count);
+                    foreach (var (address, value) in writes)
+                    {
+                        var sheet = _workbook.GetSheet(address.SheetName) ?? _workbook.Sheets.FirstOrDefault();
+                        var cell = sheet?.GetCell(address.Row, address.Column)
+                                   ?? throw new ArgumentException($"Cell out of range: {address}");
+                        cells.Add((cell, Convert.ToString(value, CultureInfo.InvariantCulture) ?? ""));
+                    }
+
+                    var changed = new HashSet<CellAddress>();
+                    foreach (var (cell, value) in cells)
+                    {
+                        cell.RawValue = value;
+                        changed.Add(cell.Address);
+                    }
+
+                    tcs.SetResult(await _workbook.EvaluateDependentsAsync(changed));
+                }
+                catch (Exception ex)
+                {
+                    tcs.SetException(ex);
+                }
+            });
+
+            return await tcs.Task;
+        }
+
         /// <summary>
         /// Get cell formula
         /// </summary>
@@ -353,22 +614,39 @@ namespace AiCalc.Services
             return new Dictionary<string, object> { ["status"] = "success" };
         }
 
+        /// <summary>
+        /// Subscribe this client to changes in a cell or range. Changes are pushed as
+        /// CellsChanged messages with request_id 0.
+        /// </summary>
+        private static object Watch(Dictionary<string, object> parameters, CellSubscriptions subscriptions)
+        {
+            var (start, end) = ParseRange(parameters["range"].ToString() ?? "A1");
+            int? requestedId = parameters.TryGetValue("subscription_id", out var id) ? Convert.ToInt32(id) : null;
+            return new Dictionary<string, object>
+            {
+                ["subscription_id"] = subscriptions.Add(start, end, requestedId),
+                ["status"] = "success"
+            };
+        }
+
+        /// <summary>
+        /// Cancel a subscription made with Watch
+        /// </summary>
+        private static object Unwatch(Dictionary<string, object> parameters, CellSubscriptions subscriptions)
+        {
+            return new Dictionary<string, object>
+            {
+                ["removed"] = subscriptions.Remove(Convert.ToInt32(parameters["subscription_id"])),
+                ["status"] = "success"
+            };
+        }
+
         /// <summary>
         /// Get range of cells
         /// </summary>
         private async Task<object> GetRange(Dictionary<string, object> parameters)
         {
-            var rangeRef = parameters["range"].ToString() ?? "A1";
-            var rangeParts = rangeRef.Split(':');
-            
-            if (!CellAddress.TryParse(rangeParts[0], "Sheet1", out var start))
-            {
-                throw new ArgumentException($"Invalid cell reference: {rangeParts[0]}");
-            }
-            
-            var end = rangeParts.Length > 1 && CellAddress.TryParse(rangeParts[1], start.SheetName, out var endAddr)
-                ? endAddr
-                : start;
+            var (start, end) = ParseRange(parameters["range"].ToString() ?? "A1");
 
             var values = new List<List<object>>();
             var tcs = new TaskCompletionSource<bool>();
@@ -407,6 +685,71 @@ namespace AiCalc.Services
             };
         }
 
+        /// <summary>
+        /// Get range of cells as typed columns. The response parameters describe the
+        /// columns and their values follow as one binary payload (see RangeColumns).
+        /// </summary>
+        private async Task<object> GetRangeColumns(Dictionary<string, object> parameters)
+        {
+            var (start, end) = ParseRange(parameters["range"].ToString() ?? "A1");
+            var dtype = parameters.TryGetValue("dtype", out var requested) ? requested.ToString() ?? "auto" : "auto";
+            if (dtype is not ("auto" or "float64" or "text"))
+            {
+                throw new ArgumentException($"Unsupported dtype: {dtype}");
+            }
+
+            var rowCount = Math.Max(end.Row - start.Row + 1, 0);
+            var columnCount = Math.Max(end.Column - start.Column + 1, 0);
+            var columns = new CellValue?[columnCount][];
+            var tcs = new TaskCompletionSource<bool>();
+
+            // Only collect the values on the UI thread; encoding happens on this one
+            _dispatcherQueue.TryEnqueue(() =>
+            {
+                try
+                {
+                    var sheet = _workbook.GetSheet(start.SheetName) ?? _workbook.Sheets.FirstOrDefault();
+                    for (int col = 0; col < columnCount; col++)
+                    {
+                        columns[col] = new CellValue?[rowCount];
+                    }
+                    if (sheet != null)
+                    {
+                        for (int row = 0; row < rowCount; row++)
+                        {
+                            for (int col = 0; col < columnCount; col++)
+                            {
+                                columns[col][row] = sheet.GetCell(start.Row + row, start.Column + col)?.Value;
+                            }
+                        }
+                    }
+                    tcs.SetResult(true);
+                }
+                catch (Exception ex)
+                {
+                    tcs.SetException(ex);
+                }
+            });
+
+            await tcs.Task;
+            return RangeColumns.Encode(columns, start.Column, rowCount, dtype);
+        }
+
+        private static (CellAddress Start, CellAddress End) ParseRange(string rangeRef)
+        {
+            var rangeParts = rangeRef.Split(':');
+
+            if (!CellAddress.TryParse(rangeParts[0], "Sheet1", out var start))
+            {
+                throw new ArgumentException($"Invalid cell reference: {rangeParts[0]}");
+            }
+
+            var end = rangeParts.Length > 1 && CellAddress.TryParse(rangeParts[1], start.SheetName, out var endAddr)
+                ? endAddr
+                : start;
+            return (start, end);
+        }
+
         /// <summary>
         /// Run AiCalc function
         /// </summary>
@@ -498,6 +841,157 @@ namespace AiCalc.Services
             return new Dictionary<string, object> { ["status"] = "success" };
         }
 
+        /// <summary>
+        /// Hand a cell's content to the client as a file it can memory-map.
+        /// File-backed cells share their own file; anything else is written to a
+        /// temporary file in the blob directory that the client deletes when done.
+        /// </summary>
+        private async Task<object> GetBlob(Dictionary<string, object> parameters)
+        {
+            var sheetName = parameters["sheet"].ToString() ?? "Sheet1";
+            var row = Convert.ToInt32(parameters["row"]);
+            var column = Convert.ToInt32(parameters["column"]);
+
+            CellValue? value = null;
+            var tcs = new TaskCompletionSource<bool>();
+
+            _dispatcherQueue.TryEnqueue(() =>
+            {
+                try
+                {
+                    var sheet = _workbook.GetSheet(sheetName) ?? _workbook.Sheets.FirstOrDefault();
+                    value = sheet?.GetCell(row, column)?.Value;
+                    tcs.SetResult(true);
+                }
+                catch (Exception ex)
+                {
+                    tcs.SetException(ex);
+                }
+            });
+
+            await tcs.Task;
+            value ??= CellValue.Empty;
+
+            string path;
+            var temporary = false;
+            if (FileBackedTypes.Contains(value.ObjectType) && File.Exists(value.SerializedValue))
+            {
+                path = value.SerializedValue!;
+            }
+            else
+            {
+                Directory.CreateDirectory(BlobDirectory);
+                path = Path.Combine(BlobDirectory, $"{Guid.NewGuid():N}.blob");
+                await File.WriteAllTextAsync(path, value.SerializedValue ?? value.DisplayValue ?? "", new UTF8Encoding(false));
+                temporary = true;
+            }
+
+            return new Dictionary<string, object>
+            {
+                ["object_type"] = value.ObjectType.ToString(),
+                ["blob_path"] = path,
+                ["blob_length"] = new FileInfo(path).Length,
+                ["temporary"] = temporary,
+                ["status"] = "success"
+            };
+        }
+
+        /// <summary>
+        /// Store a file the client wrote to the blob directory in a cell, then
+        /// evaluate its dependents. File-backed types take the file over; other
+        /// types read it as UTF-8 text and delete it.
+        /// </summary>
+        private async Task<object> PutBlob(Dictionary<string, object> parameters)
+        {
+            var sheetName = parameters["sheet"].ToString() ?? "Sheet1";
+            var row = Convert.ToInt32(parameters["row"]);
+            var column = Convert.ToInt32(parameters["column"]);
+            var blobPath = Path.GetFullPath(parameters["blob_path"].ToString() ?? "");
+
+            if (!blobPath.StartsWith(BlobDirectory + Path.DirectorySeparatorChar, StringComparison.OrdinalIgnoreCase))
+            {
+                throw new ArgumentException("blob_path must be in the AiCalc blob directory");
+            }
+            if (!File.Exists(blobPath))
+            {
+                throw new FileNotFoundException("Blob file not found", blobPath);
+            }
+
+            CellViewModel? cell = null;
+            var cellTcs = new TaskCompletionSource<bool>();
+            _dispatcherQueue.TryEnqueue(() =>
+            {
+                try
+                {
+                    var sheet = _workbook.GetSheet(sheetName) ?? _workbook.Sheets.FirstOrDefault();
+                    cell = sheet?.GetCell(row, column);
+                    cellTcs.SetResult(true);
+                }
+                catch (Exception ex)
+                {
+                    cellTcs.SetException(ex);
+                }
+            });
+            await cellTcs.Task;
+
+            if (cell == null)
+            {
+                throw new ArgumentException($"Cell out of range: {sheetName}!{row},{column}");
+            }
+
+            var requestedType = parameters.TryGetValue("object_type", out var typeValue) ? typeValue?.ToString() : null;
+            CellObjectType objectType;
+            if (!string.IsNullOrEmpty(requestedType))
+            {
+                if (!Enum.TryParse(requestedType.Replace("-", ""), true, out objectType))
+                {
+                    throw new ArgumentException($"Unknown object type: {requestedType}");
+                }
+            }
+            else
+            {
+                objectType = FileBackedTypes.Contains(cell.Value.ObjectType) ? cell.Value.ObjectType : CellObjectType.File;
+            }
+
+            string serialized;
+            if (FileBackedTypes.Contains(objectType))
+            {
+                var fileName = parameters.TryGetValue("file_name", out var nameValue) ? nameValue?.ToString() : null;
+                var extension = Path.GetExtension(string.IsNullOrEmpty(fileName) ? blobPath : fileName);
+                Directory.CreateDirectory(MediaDirectory);
+                serialized = Path.Combine(MediaDirectory, $"{Guid.NewGuid():N}{extension}");
+                File.Move(blobPath, serialized);
+            }
+            else
+            {
+                serialized = await File.ReadAllTextAsync(blobPath, Encoding.UTF8);
+                File.Delete(blobPath);
+            }
+
+            var tcs = new TaskCompletionSource<bool>();
+            _dispatcherQueue.TryEnqueue(async () =>
+            {
+                try
+                {
+                    var display = CellObjectFactory.Create(objectType, serialized).DisplayValue;
+                    cell.ApplyEvaluationResult(new FunctionExecutionResult(new CellValue(objectType, serialized, display)), "Blob written");
+                    await _workbook.EvaluateDependentsAsync(new HashSet<CellAddress> { cell.Address });
+                    tcs.SetResult(true);
+                }
+                catch (Exception ex)
+                {
+                    tcs.SetException(ex);
+                }
+            });
+
+            await tcs.Task;
+            return new Dictionary<string, object>
+            {
+                ["object_type"] = objectType.ToString(),
+                ["status"] = "success"
+            };
+        }
+
         public void Dispose()
         {
             Stop();
@@ -510,8 +1004,182 @@ namespace AiCalc.Services
     /// </summary>
     public class IPCMessage
     {
+        [JsonPropertyName("command")]
         public string Command { get; set; } = string.Empty;
+
+        [JsonPropertyName("params")]
         public Dictionary<string, object> Parameters { get; set; } = new();
+
+        [JsonPropertyName("request_id")]
         public int RequestId { get; set; }
+
+        /// <summary>
+        /// Optional binary payload sent as a separate length-prefixed message right after
+        /// this one. Responses that carry one set "binary_length" in their parameters.
+        /// </summary>
+        [JsonIgnore]
+        public byte[]? Payload { get; set; }
+    }
+
+    /// <summary>
+    /// Cell watches held by one pipe client. Changed cells are snapshotted when the
+    /// workbook raises CellChanged, and pushed once per frame so a recalculation that
+    /// touches many cells sends one message per subscription.
+    /// </summary>
+    internal sealed class CellSubscriptions : IDisposable
+    {
+        private const int NotificationIntervalMs = 16;
+
+        private readonly WorkbookViewModel _workbook;
+        private readonly Func<IPCMessage, Task> _send;
+        private readonly object _lock = new();
+        private readonly Dictionary<int, (string Sheet, int FirstRow, int LastRow, int FirstColumn, int LastColumn)> _ranges = new();
+        private readonly Dictionary<CellAddress, (CellValue Value, string? Formula)> _pending = new();
+        private int _nextId;
+        private bool _flushScheduled;
+        private bool _disposed;
+
+        public CellSubscriptions(WorkbookViewModel workbook, Func<IPCMessage, Task> send)
+        {
+            _workbook = workbook;
+            _send = send;
+        }
+
+        /// <summary>
+        /// Watch the cells between start and end. Clients may choose the id so they can
+        /// route changes that arrive before the response.
+        /// </summary>
+        public int Add(CellAddress start, CellAddress end, int? requestedId)
+        {
+            lock (_lock)
+            {
+                var id = requestedId ?? NextId();
+                if (_ranges.Count == 0)
+                {
+                    _workbook.CellChanged += OnCellChanged;
+                }
+                _ranges[id] = (start.SheetName,
+                    Math.Min(start.Row, end.Row), Math.Max(start.Row, end.Row),
+                    Math.Min(start.Column, end.Column), Math.Max(start.Column, end.Column));
+                return id;
+            }
+        }
+
+        public bool Remove(int id)
+        {
+            lock (_lock)
+            {
+                var removed = _ranges.Remove(id);
+                if (removed && _ranges.Count == 0)
+                {
+                    _workbook.CellChanged -= OnCellChanged;
+                    _pending.Clear();
+                }
+                return removed;
+            }
+        }
+
+        private int NextId()
+        {
+            do
+            {
+                _nextId++;
+            }
+            while (_ranges.ContainsKey(_nextId));
+            return _nextId;
+        }
+
+        private static bool Contains((string Sheet, int FirstRow, int LastRow, int FirstColumn, int LastColumn) range, CellAddress address)
+        {
+            return address.SheetName == range.Sheet
+                && address.Row >= range.FirstRow && address.Row <= range.LastRow
+                && address.Column >= range.FirstColumn && address.Column <= range.LastColumn;
+        }
+
+        private void OnCellChanged(object? sender, CellViewModel cell)
+        {
+            // Raised on the UI thread, so the cell can be read here
+            lock (_lock)
+            {
+                if (!_ranges.Values.Any(range => Contains(range, cell.Address)))
+                {
+                    return;
+                }
+
+                _pending[cell.Address] = (cell.Value, cell.Formula);
+                if (_flushScheduled)
+                {
+                    return;
+                }
+                _flushScheduled = true;
+            }
+
+            _ = FlushAsync();
+        }
+
+        private async Task FlushAsync()
+        {
+            await Task.Delay(NotificationIntervalMs);
+
+            var messages = new List<IPCMessage>();
+            lock (_lock)
+            {
+                _flushScheduled = false;
+                if (_disposed)
+                {
+                    return;
+                }
+
+                foreach (var (id, range) in _ranges)
+                {
+                    var changes = _pending
+                        .Where(change => Contains(range, change.Key))
+                        .Select(change => (object)new
+                        {
+                            cell = change.Key.ToString(),
+                            value = change.Value.Value?.DisplayValue ?? "",
+                            object_type = (change.Value.Value?.ObjectType ?? CellObjectType.Empty).ToString(),
+                            formula = change.Value.Formula
+                        })
+                        .ToList();
+                    if (changes.Count > 0)
+                    {
+                        messages.Add(new IPCMessage
+                        {
+                            Command = "CellsChanged",
+                            Parameters = new Dictionary<string, object>
+                            {
+                                ["subscription_id"] = id,
+                                ["changes"] = changes
+                            }
+                        });
+                    }
+                }
+                _pending.Clear();
+            }
+
+            foreach (var message in messages)
+            {
+                await _send(message);
+            }
+        }
+
+        public void Dispose()
+        {
+            lock (_lock)
+            {
+                if (_disposed)
+                {
+                    return;
+                }
+                _disposed = true;
+                if (_ranges.Count > 0)
+                {
+                    _workbook.CellChanged -= OnCellChanged;
+                }
+                _ranges.Clear();
+                _pending.Clear();
+            }
+        }
     }
 }
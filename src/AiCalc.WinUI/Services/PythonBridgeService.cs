@@ -1,6 +1,9 @@
 using System;
+using System.Buffers;
+using System.Buffers.Binary;
 using System.Collections.Generic;
 using System.IO;
+using System.IO.Compression;
 using System.IO.Pipes;
 using System.Linq;
 using System.Text;
@@ -8,6 +11,7 @@ using System.Text.Json;
 using System.Threading;
 using System.Threading.Tasks;
 using AiCalc.ViewModels;
+using Microsoft.UI.Dispatching;
 
 namespace AiCalc.Services;
 
@@ -17,6 +21,43 @@ namespace AiCalc.Services;
 /// </summary>
 public class PythonBridgeService : IDisposable
 {
+    /// <summary>
+    /// Largest frame accepted after a client switches to length-prefixed framing
+    /// </summary>
+    private const int MaxFrameSize = 256 * 1024 * 1024;
+
+    /// <summary>
+    /// Response to a "hello" that asks for length-prefixed framing. Everything after
+    /// it on the connection is a 4-byte little-endian length followed by UTF-8 JSON.
+    /// JSON is the only codec offered here; clients that prefer MessagePack fall back to it.
+    /// </summary>
+    private const string LengthFramingAccepted = "{\"success\":true,\"data\":{\"protocol\":1,\"framing\":\"length\",\"codec\":\"json\"}}";
+
+    /// <summary>
+    /// As <see cref="LengthFramingAccepted"/>, for clients that also accept zlib. The top
+    /// bit of a frame's length then marks a zlib-compressed body, in both directions.
+    /// </summary>
+    private const string CompressedFramingAccepted = "{\"success\":true,\"data\":{\"protocol\":1,\"framing\":\"length\",\"codec\":\"json\",\"compression\":\"zlib\"}}";
+
+    private const uint CompressedFrameFlag = 0x80000000;
+
+    /// <summary>
+    /// Responses smaller than this are sent uncompressed even when compression was agreed
+    /// </summary>
+    private const int CompressionThreshold = 16 * 1024;
+
+    /// <summary>
+    /// Request property names are bound case-insensitively; the options are reused because
+    /// building them per request discards System.Text.Json's metadata cache
+    /// </summary>
+    private static readonly JsonSerializerOptions RequestOptions = new() { PropertyNameCaseInsensitive = true };
+
+    /// <summary>
+    /// Changes to watched cells are collected for one frame and pushed together, so a
+    /// recalculation that touches many cells sends one notification per subscription
+    /// </summary>
+    private const int NotificationIntervalMs = 16;
+
     private readonly WorkbookViewModel _workbook;
     private NamedPipeServerStream? _pipeServer;
     private CancellationTokenSource? _cancellationTokenSource;
@@ -24,15 +65,25 @@ public class PythonBridgeService : IDisposable
     private readonly string _pipeName;
     private bool _disposed;
 
+    // Connected clients, each served by its own task
+    private readonly HashSet<BridgeConnection> _connections = new();
+
+    // Writes from different clients are applied and evaluated one batch at a time
+    private readonly SemaphoreSlim _evaluationLock = new(1, 1);
+
+    // Cell view models belong to the UI thread; null when created without one
+    private readonly DispatcherQueue? _dispatcherQueue;
+
     public event EventHandler<string>? MessageReceived;
     public event EventHandler<Exception>? ErrorOccurred;
 
     public bool IsRunning { get; private set; }
 
-    public PythonBridgeService(WorkbookViewModel workbook, string pipeName = "AiCalc_Bridge")
+    public PythonBridgeService(WorkbookViewModel workbook, string pipeName = "AiCalc_Bridge", DispatcherQueue? dispatcherQueue = null)
     {
         _workbook = workbook ?? throw new ArgumentNullException(nameof(workbook));
         _pipeName = pipeName;
+        _dispatcherQueue = dispatcherQueue ?? DispatcherQueue.GetForCurrentThread();
     }
 
     /// <summary>
@@ -95,20 +146,32 @@ public class PythonBridgeService : IDisposable
         MessageReceived?.Invoke(this, "Python bridge service stopping");
         _cancellationTokenSource?.Cancel();
         _pipeServer?.Dispose();
+        lock (_connections)
+        {
+            foreach (var connection in _connections)
+            {
+                connection.Pipe.Dispose();
+            }
+        }
         IsRunning = false;
     }
 
+    /// <summary>
+    /// Accept loop. One unconnected pipe instance is always waiting; as soon as a client
+    /// takes it, the client is handed to its own task and the next instance is created,
+    /// so clients (e.g. a connection pool) are served concurrently.
+    /// </summary>
     private async Task RunServerAsync(CancellationToken cancellationToken)
     {
         var logPath = Path.Combine(Path.GetTempPath(), "aicalc_python_bridge.log");
-        File.AppendAllText(logPath, $"[{DateTime.Now}] RunServerAsync started\n");
+        try { File.AppendAllText(logPath, $"[{DateTime.Now}] RunServerAsync started\n"); } catch { }
         MessageReceived?.Invoke(this, "Python bridge server loop started");
         
         while (!cancellationToken.IsCancellationRequested)
         {
             try
             {
-                File.AppendAllText(logPath, $"[{DateTime.Now}] Creating pipe server instance...\n");
+                try { File.AppendAllText(logPath, $"[{DateTime.Now}] Creating pipe server instance...\n"); } catch { }
                 MessageReceived?.Invoke(this, "Creating new pipe server instance...");
                 _pipeServer = new NamedPipeServerStream(
                     _pipeName,
@@ -117,53 +180,89 @@ public class PythonBridgeService : IDisposable
                     PipeTransmissionMode.Byte,
                     PipeOptions.Asynchronous);
 
-                File.AppendAllText(logPath, $"[{DateTime.Now}] Pipe created, waiting for connection...\n");
+                try { File.AppendAllText(logPath, $"[{DateTime.Now}] Pipe created, waiting for connection...\n"); } catch { }
                 MessageReceived?.Invoke(this, $"Waiting for Python client connection on {_pipeName}...");
                 
                 // Wait for client connection
                 await _pipeServer.WaitForConnectionAsync(cancellationToken);
                 
-                File.AppendAllText(logPath, $"[{DateTime.Now}] Client connected!\n");
+                try { File.AppendAllText(logPath, $"[{DateTime.Now}] Client connected!\n"); } catch { }
                 MessageReceived?.Invoke(this, "Python client connected!");
 
-                // Handle client requests
-                await HandleClientAsync(_pipeServer, cancellationToken);
-                
-                File.AppendAllText(logPath, $"[{DateTime.Now}] Client disconnected\n");
-                MessageReceived?.Invoke(this, "Python client disconnected");
+                // The connection owns the instance from here on
+                var connection = new BridgeConnection(_pipeServer, this);
+                _pipeServer = null;
+                lock (_connections)
+                {
+                    _connections.Add(connection);
+                }
+                _ = Task.Run(() => ServeClientAsync(connection, cancellationToken), CancellationToken.None);
             }
             catch (OperationCanceledException)
             {
-                File.AppendAllText(logPath, $"[{DateTime.Now}] Operation cancelled\n");
+                try { File.AppendAllText(logPath, $"[{DateTime.Now}] Operation cancelled\n"); } catch { }
                 MessageReceived?.Invoke(this, "Server operation cancelled");
                 break;
             }
             catch (Exception ex)
             {
-                File.AppendAllText(logPath, $"[{DateTime.Now}] Server error: {ex}\n");
+                try { File.AppendAllText(logPath, $"[{DateTime.Now}] Server error: {ex}\n"); } catch { }
                 ErrorOccurred?.Invoke(this, new Exception($"Server error: {ex.Message}", ex));
-                // Wait a bit before retrying
-                await Task.Delay(1000, cancellationToken);
-            }
-            finally
-            {
                 _pipeServer?.Dispose();
                 _pipeServer = null;
+                // Wait a bit before retrying
+                await Task.Delay(1000, cancellationToken);
             }
         }
+
+        _pipeServer?.Dispose();
+        _pipeServer = null;
         
-        File.AppendAllText(logPath, $"[{DateTime.Now}] RunServerAsync loop ended\n");
+        try { File.AppendAllText(logPath, $"[{DateTime.Now}] RunServerAsync loop ended\n"); } catch { }
         MessageReceived?.Invoke(this, "Python bridge server loop ended");
     }
 
-    private async Task HandleClientAsync(NamedPipeServerStream pipe, CancellationToken cancellationToken)
+    private async Task ServeClientAsync(BridgeConnection connection, CancellationToken cancellationToken)
+    {
+        var logPath = Path.Combine(Path.GetTempPath(), "aicalc_python_bridge.log");
+        try
+        {
+            await HandleClientAsync(connection, cancellationToken);
+
+            try { File.AppendAllText(logPath, $"[{DateTime.Now}] Client disconnected\n"); } catch { }
+            MessageReceived?.Invoke(this, "Python client disconnected");
+        }
+        catch (OperationCanceledException)
+        {
+        }
+        catch (Exception ex)
+        {
+            try { File.AppendAllText(logPath, $"[{DateTime.Now}] Client error: {ex}\n"); } catch { }
+            ErrorOccurred?.Invoke(this, new Exception($"Client error: {ex.Message}", ex));
+        }
+        finally
+        {
+            ClearSubscriptions(connection);
+            lock (_connections)
+            {
+                _connections.Remove(connection);
+            }
+            connection.Pipe.Dispose();
+        }
+    }
+
+    private async Task HandleClientAsync(BridgeConnection connection, CancellationToken cancellationToken)
     {
+        var pipe = connection.Pipe;
         var logPath = Path.Combine(Path.GetTempPath(), "aicalc_python_bridge.log");
         
         try { File.AppendAllText(logPath, $"[{DateTime.Now}] HandleClientAsync started\n"); } catch { }
 
         var buffer = new byte[4096];
-        var messageBuilder = new StringBuilder();
+        // Bytes read but not yet processed. Lines are decoded only once complete, so a
+        // character split across reads survives, and whatever follows the hello is
+        // passed on to the framed reader exactly as the client sent it.
+        var received = new MemoryStream();
 
         while (pipe.IsConnected && !cancellationToken.IsCancellationRequested)
         {
@@ -175,41 +274,47 @@ public class PythonBridgeService : IDisposable
                 int bytesRead = await pipe.ReadAsync(buffer, 0, buffer.Length, cancellationToken);
                 if (bytesRead == 0) break;
                 
-                var chunk = Encoding.UTF8.GetString(buffer, 0, bytesRead);
-                messageBuilder.Append(chunk);
+                received.Write(buffer, 0, bytesRead);
                 
-                try { File.AppendAllText(logPath, $"[{DateTime.Now}] Read {bytesRead} bytes: {chunk}\n"); } catch { }
+                try { File.AppendAllText(logPath, $"[{DateTime.Now}] Read {bytesRead} bytes: {Encoding.UTF8.GetString(buffer, 0, bytesRead)}\n"); } catch { }
                 
-                // Check if we have a complete message (ends with \n)
-                var message = messageBuilder.ToString();
-                if (!message.Contains('\n')) continue;
+                // Check if we have a complete message (ends with \n); only the new
+                // chunk needs scanning, so large requests aren't rescanned per read
+                if (Array.IndexOf(buffer, (byte)'\n', 0, bytesRead) < 0) continue;
+                var data = received.GetBuffer();
+                var length = (int)received.Length;
+                var lineStart = 0;
+                int newline;
                 
                 // Process complete messages
-                var lines = message.Split('\n');
-                for (int i = 0; i < lines.Length - 1; i++)
+                while ((newline = Array.IndexOf(data, (byte)'\n', lineStart, length - lineStart)) >= 0)
                 {
-                    var request = lines[i].Trim();
+                    var request = Encoding.UTF8.GetString(data, lineStart, newline - lineStart).Trim();
+                    lineStart = newline + 1;
                     if (string.IsNullOrEmpty(request)) continue;
 
                     try { File.AppendAllText(logPath, $"[{DateTime.Now}] Processing: {request}\n"); } catch { }
                     MessageReceived?.Invoke(this, request);
 
-                    var response = await ProcessRequestAsync(request);
+                    var response = await ProcessRequestAsync(connection, request);
                     try { File.AppendAllText(logPath, $"[{DateTime.Now}] Response: {response}\n"); } catch { }
                     
-                    var responseBytes = Encoding.UTF8.GetBytes(response + "\n");
-                    await pipe.WriteAsync(responseBytes, 0, responseBytes.Length, cancellationToken);
-                    await pipe.FlushAsync(cancellationToken);
+                    await WriteMessageAsync(connection, response, cancellationToken);
                     
                     try { File.AppendAllText(logPath, $"[{DateTime.Now}] Response sent\n"); } catch { }
+
+                    if (ReferenceEquals(response, LengthFramingAccepted) || ReferenceEquals(response, CompressedFramingAccepted))
+                    {
+                        // Anything the client sent after the hello is already framed
+                        var pending = data.AsSpan(lineStart, length - lineStart).ToArray();
+                        await HandleFramedClientAsync(connection, pending, cancellationToken);
+                        return;
+                    }
                 }
                 
                 // Keep the incomplete part
-                messageBuilder.Clear();
-                if (lines.Length > 0)
-                {
-                    messageBuilder.Append(lines[lines.Length - 1]);
-                }
+                Buffer.BlockCopy(data, lineStart, data, 0, length - lineStart);
+                received.SetLength(length - lineStart);
             }
             catch (IOException ex)
             {
@@ -222,32 +327,186 @@ public class PythonBridgeService : IDisposable
                 ErrorOccurred?.Invoke(this, ex);
                 
                 var errorResponse = JsonSerializer.Serialize(new { success = false, error = ex.Message });
-                var errorBytes = Encoding.UTF8.GetBytes(errorResponse + "\n");
-                await pipe.WriteAsync(errorBytes, 0, errorBytes.Length, cancellationToken);
+                await WriteMessageAsync(connection, errorResponse, cancellationToken);
             }
         }
         
         try { File.AppendAllText(logPath, $"[{DateTime.Now}] HandleClientAsync ended\n"); } catch { }
     }
 
-    private async Task<string> ProcessRequestAsync(string requestJson)
+    /// <summary>
+    /// Serves a client that negotiated length-prefixed framing. Frames are read into a
+    /// pooled buffer, so large requests and responses need no per-read string building.
+    /// </summary>
+    private async Task HandleFramedClientAsync(BridgeConnection connection, byte[] pending, CancellationToken cancellationToken)
     {
+        var pipe = connection.Pipe;
+        var logPath = Path.Combine(Path.GetTempPath(), "aicalc_python_bridge.log");
+        var header = new byte[4];
+        var pendingOffset = 0;
+
+        async Task<bool> ReadExactAsync(byte[] buffer, int count)
+        {
+            var offset = 0;
+            if (pendingOffset < pending.Length)
+            {
+                offset = Math.Min(count, pending.Length - pendingOffset);
+                Buffer.BlockCopy(pending, pendingOffset, buffer, 0, offset);
+                pendingOffset += offset;
+            }
+
+            while (offset < count)
+            {
+                var read = await pipe.ReadAsync(buffer, offset, count - offset, cancellationToken);
+                if (read == 0) return false;
+                offset += read;
+            }
+            return true;
+        }
+
+        while (pipe.IsConnected && !cancellationToken.IsCancellationRequested)
+        {
+            byte[]? payload = null;
+            try
+            {
+                if (!await ReadExactAsync(header, 4)) break;
+                var lengthField = BinaryPrimitives.ReadUInt32LittleEndian(header);
+                var compressed = connection.CompressFrames && (lengthField & CompressedFrameFlag) != 0;
+                var length = (long)(compressed ? lengthField & ~CompressedFrameFlag : lengthField);
+                if (length > MaxFrameSize)
+                {
+                    try { File.AppendAllText(logPath, $"[{DateTime.Now}] Invalid frame length {length}\n"); } catch { }
+                    break;
+                }
+
+                payload = ArrayPool<byte>.Shared.Rent((int)length);
+                if (!await ReadExactAsync(payload, (int)length)) break;
+
+                var request = compressed
+                    ? Inflate(payload, (int)length)
+                    : Encoding.UTF8.GetString(payload, 0, (int)length);
+                MessageReceived?.Invoke(this, request);
+                var response = await ProcessRequestAsync(connection, request);
+                await WriteMessageAsync(connection, response, cancellationToken);
+
+                try { File.AppendAllText(logPath, $"[{DateTime.Now}] Framed request {length} bytes, response {response.Length} chars\n"); } catch { }
+            }
+            catch (IOException ex)
+            {
+                try { File.AppendAllText(logPath, $"[{DateTime.Now}] IOException: {ex.Message}\n"); } catch { }
+                break;
+            }
+            catch (Exception ex) when (ex is not OperationCanceledException)
+            {
+                ErrorOccurred?.Invoke(this, ex);
+                await WriteMessageAsync(connection, CreateErrorResponse(ex.Message), cancellationToken);
+            }
+            finally
+            {
+                if (payload != null)
+                {
+                    ArrayPool<byte>.Shared.Return(payload);
+                }
+            }
+        }
+    }
+
+    /// <summary>
+    /// Writes a response or notification in the connection's current framing. Writes are
+    /// serialized so notifications never interleave with a response.
+    /// </summary>
+    private static async Task WriteMessageAsync(BridgeConnection connection, string message, CancellationToken cancellationToken)
+    {
+        await connection.WriteLock.WaitAsync(cancellationToken);
         try
         {
-            var options = new JsonSerializerOptions { PropertyNameCaseInsensitive = true };
-            var request = JsonSerializer.Deserialize<PythonRequest>(requestJson, options);
+            var stream = connection.Pipe;
+            if (connection.LengthFraming)
+            {
+                await WriteFrameAsync(stream, message, connection.CompressFrames, cancellationToken);
+                return;
+            }
+
+            var bytes = Encoding.UTF8.GetBytes(message + "\n");
+            await stream.WriteAsync(bytes, 0, bytes.Length, cancellationToken);
+            await stream.FlushAsync(cancellationToken);
+
+            // The hello response itself is the last newline-delimited message
+            connection.CompressFrames = ReferenceEquals(message, CompressedFramingAccepted);
+            connection.LengthFraming = connection.CompressFrames || ReferenceEquals(message, LengthFramingAccepted);
+        }
+        finally
+        {
+            connection.WriteLock.Release();
+        }
+    }
+
+    private static async Task WriteFrameAsync(Stream stream, string response, bool compress, CancellationToken cancellationToken)
+    {
+        var length = Encoding.UTF8.GetByteCount(response);
+        if (compress && length >= CompressionThreshold)
+        {
+            var deflated = Deflate(response);
+            if (deflated.Length < length)
+            {
+                var header = new byte[4];
+                BinaryPrimitives.WriteUInt32LittleEndian(header, (uint)deflated.Length | CompressedFrameFlag);
+                await stream.WriteAsync(header, 0, 4, cancellationToken);
+                await stream.WriteAsync(deflated.GetBuffer(), 0, (int)deflated.Length, cancellationToken);
+                await stream.FlushAsync(cancellationToken);
+                return;
+            }
+        }
+
+        var frame = ArrayPool<byte>.Shared.Rent(length + 4);
+        try
+        {
+            BinaryPrimitives.WriteInt32LittleEndian(frame, length);
+            Encoding.UTF8.GetBytes(response, 0, response.Length, frame, 4);
+            await stream.WriteAsync(frame, 0, length + 4, cancellationToken);
+            await stream.FlushAsync(cancellationToken);
+        }
+        finally
+        {
+            ArrayPool<byte>.Shared.Return(frame);
+        }
+    }
+
+    private async Task<string> ProcessRequestAsync(BridgeConnection connection, string requestJson)
+    {
+        try
+        {
+            var request = JsonSerializer.Deserialize<PythonRequest>(requestJson, RequestOptions);
             if (request == null)
             {
                 return CreateErrorResponse("Invalid request format");
             }
 
+            return await ExecuteRequestAsync(connection, request);
+        }
+        catch (Exception ex)
+        {
+            return CreateErrorResponse(ex.Message);
+        }
+    }
+
+    private async Task<string> ExecuteRequestAsync(BridgeConnection connection, PythonRequest request)
+    {
+        try
+        {
             return request.Command switch
             {
                 "get_value" => await GetValueAsync(request),
                 "set_value" => await SetValueAsync(request),
+                "set_range" => await SetRangeAsync(request),
+                "set_values" => await SetValuesAsync(request),
                 "get_range" => await GetRangeAsync(request),
                 "run_function" => await RunFunctionAsync(request),
                 "get_sheets" => GetSheets(),
+                "batch" => await BatchAsync(connection, request),
+                "hello" => Hello(request),
+                "watch" => Watch(connection, request),
+                "unwatch" => Unwatch(connection, request),
                 "ping" => CreateSuccessResponse("pong"),
                 _ => CreateErrorResponse($"Unknown command: {request.Command}")
             };
@@ -258,6 +517,68 @@ public class PythonBridgeService : IDisposable
         }
     }
 
+    /// <summary>
+    /// Protocol negotiation. Clients that ask for "length" framing get it for the rest of
+    /// the connection, with zlib compression when they list it; anything else keeps
+    /// newline-delimited messages. The codec is always JSON.
+    /// </summary>
+    private static string Hello(PythonRequest request)
+    {
+        if (request.Framing != "length")
+        {
+            return CreateSuccessResponse(new { protocol = 1, framing = "newline" });
+        }
+
+        return request.Compression?.Contains("zlib") == true
+            ? CompressedFramingAccepted
+            : LengthFramingAccepted;
+    }
+
+    private static MemoryStream Deflate(string message)
+    {
+        var output = new MemoryStream();
+        using (var zlib = new ZLibStream(output, CompressionLevel.Fastest, leaveOpen: true))
+        {
+            var bytes = Encoding.UTF8.GetBytes(message);
+            zlib.Write(bytes, 0, bytes.Length);
+        }
+        return output;
+    }
+
+    private static string Inflate(byte[] payload, int length)
+    {
+        using var zlib = new ZLibStream(new MemoryStream(payload, 0, length), CompressionMode.Decompress);
+        using var reader = new StreamReader(zlib, Encoding.UTF8);
+        return reader.ReadToEnd();
+    }
+
+    /// <summary>
+    /// Executes several commands from one message and returns their responses in order.
+    /// Each entry carries its own success flag, so one failure does not abort the rest.
+    /// </summary>
+    private async Task<string> BatchAsync(BridgeConnection connection, PythonRequest request)
+    {
+        if (request.Commands == null)
+        {
+            return CreateErrorResponse("Commands are required");
+        }
+
+        var results = new List<string>(request.Commands.Count);
+        foreach (var command in request.Commands)
+        {
+            // A hello here would promise framing the connection never switches to
+            results.Add(command.Command switch
+            {
+                "batch" => CreateErrorResponse("Nested batches are not supported"),
+                "hello" => CreateErrorResponse("hello can't be sent in a batch"),
+                _ => await ExecuteRequestAsync(connection, command)
+            });
+        }
+
+        // Responses are already serialized JSON objects, so splice them into the array
+        return $"{{\"success\":true,\"data\":{{\"results\":[{string.Join(",", results)}]}}}}";
+    }
+
     private Task<string> GetValueAsync(PythonRequest request)
     {
         if (string.IsNullOrEmpty(request.CellRef))
@@ -281,21 +602,185 @@ public class PythonBridgeService : IDisposable
         }));
     }
 
-    private Task<string> SetValueAsync(PythonRequest request)
+    private async Task<string> SetValueAsync(PythonRequest request)
     {
         if (string.IsNullOrEmpty(request.CellRef))
         {
-            return Task.FromResult(CreateErrorResponse("CellRef is required"));
+            return CreateErrorResponse("CellRef is required");
         }
 
         var cell = FindCell(request.CellRef);
         if (cell == null)
         {
-            return Task.FromResult(CreateErrorResponse($"Cell not found: {request.CellRef}"));
+            return CreateErrorResponse($"Cell not found: {request.CellRef}");
+        }
+
+        var value = request.Value?.ToString();
+        await _evaluationLock.WaitAsync();
+        try
+        {
+            await OnUiThreadAsync(() =>
+            {
+                cell.RawValue = value;
+                return Task.FromResult(true);
+            });
+        }
+        finally
+        {
+            _evaluationLock.Release();
+        }
+        return CreateSuccessResponse(new { cell_ref = request.CellRef });
+    }
+
+    /// <summary>
+    /// Writes a block of rows starting at the cell in RangeRef, then evaluates dependents
+    /// once. Bounds are checked before anything is written.
+    /// </summary>
+    private async Task<string> SetRangeAsync(PythonRequest request)
+    {
+        if (string.IsNullOrEmpty(request.RangeRef))
+        {
+            return CreateErrorResponse("RangeRef is required");
+        }
+        if (request.Values is not JsonElement rows || rows.ValueKind != JsonValueKind.Array)
+        {
+            return CreateErrorResponse("Values must be a list of rows");
+        }
+
+        // Only the top-left cell of the reference matters; the data decides the size
+        var error = ResolveRange(request.RangeRef.Split(':')[0], out var anchor);
+        if (error != null)
+        {
+            return CreateErrorResponse(error);
+        }
+
+        var writes = new List<(CellViewModel Cell, string? Value)>();
+        var row = anchor.FirstRow;
+        var lastColumn = anchor.FirstColumn - 1;
+        foreach (var rowValues in rows.EnumerateArray())
+        {
+            if (rowValues.ValueKind != JsonValueKind.Array)
+            {
+                return CreateErrorResponse("Values must be a list of rows");
+            }
+
+            var column = anchor.FirstColumn;
+            foreach (var value in rowValues.EnumerateArray())
+            {
+                var cell = anchor.Sheet.GetCell(row, column);
+                if (cell == null)
+                {
+                    return CreateErrorResponse($"Range exceeds sheet bounds at {new Models.CellAddress(anchor.Sheet.Name, row, column)}");
+                }
+                writes.Add((cell, ToRawValue(value)));
+                lastColumn = Math.Max(lastColumn, column);
+                column++;
+            }
+            row++;
+        }
+
+        var written = await ApplyWritesAsync(writes);
+        var rangeRef = writes.Count == 0
+            ? request.RangeRef
+            : $"{new Models.CellAddress(anchor.Sheet.Name, anchor.FirstRow, anchor.FirstColumn)}:{Models.CellAddress.ColumnIndexToName(lastColumn)}{row}";
+        return CreateSuccessResponse(new
+        {
+            range_ref = rangeRef,
+            cells_written = writes.Count,
+            cells_evaluated = written.CellsEvaluated
+        });
+    }
+
+    /// <summary>
+    /// Writes {cell reference: value} pairs, then evaluates dependents once. Every
+    /// reference is resolved before anything is written.
+    /// </summary>
+    private async Task<string> SetValuesAsync(PythonRequest request)
+    {
+        if (request.Values is not JsonElement values || values.ValueKind != JsonValueKind.Object)
+        {
+            return CreateErrorResponse("Values must map cell references to values");
+        }
+
+        var writes = new List<(CellViewModel Cell, string? Value)>();
+        foreach (var property in values.EnumerateObject())
+        {
+            var cell = FindCell(property.Name);
+            if (cell == null)
+            {
+                return CreateErrorResponse($"Cell not found: {property.Name}");
+            }
+            writes.Add((cell, ToRawValue(property.Value)));
+        }
+
+        var written = await ApplyWritesAsync(writes);
+        return CreateSuccessResponse(new
+        {
+            cells_written = writes.Count,
+            cells_evaluated = written.CellsEvaluated
+        });
+    }
+
+    /// <summary>
+    /// Write cells and evaluate their dependents in one UI-thread pass. Clients are
+    /// served concurrently, so the lock keeps another client's batch from being
+    /// written or evaluated in between.
+    /// </summary>
+    private async Task<EvaluationResult> ApplyWritesAsync(List<(CellViewModel Cell, string? Value)> writes)
+    {
+        await _evaluationLock.WaitAsync();
+        try
+        {
+            return await OnUiThreadAsync(async () =>
+            {
+                var changed = new HashSet<Models.CellAddress>();
+                foreach (var (cell, value) in writes)
+                {
+                    cell.RawValue = value;
+                    changed.Add(cell.Address);
+                }
+                return await _workbook.EvaluateDependentsAsync(changed);
+            });
+        }
+        finally
+        {
+            _evaluationLock.Release();
+        }
+    }
+
+    /// <summary>
+    /// Run work on the UI thread, as PipeServer does for its writes; inline when the
+    /// service has no dispatcher or is already on it
+    /// </summary>
+    private Task<T> OnUiThreadAsync<T>(Func<Task<T>> work)
+    {
+        if (_dispatcherQueue == null || _dispatcherQueue.HasThreadAccess)
+        {
+            return work();
+        }
+
+        var tcs = new TaskCompletionSource<T>(TaskCreationOptions.RunContinuationsAsynchronously);
+        var queued = _dispatcherQueue.TryEnqueue(async () =>
+        {
+            try
+            {
+                tcs.SetResult(await work());
+            }
+            catch (Exception ex)
+            {
+                tcs.SetException(ex);
+            }
+        });
+        if (!queued)
+        {
+            tcs.SetException(new InvalidOperationException("The UI thread is no longer accepting work"));
         }
+        return tcs.Task;
+    }
 
-        cell.RawValue = request.Value?.ToString();
-        return Task.FromResult(CreateSuccessResponse(new { cell_ref = request.CellRef }));
+    private static string? ToRawValue(JsonElement value)
+    {
+        return value.ValueKind == JsonValueKind.Null ? null : value.ToString();
     }
 
     private Task<string> GetRangeAsync(PythonRequest request)
@@ -305,8 +790,179 @@ public class PythonBridgeService : IDisposable
             return Task.FromResult(CreateErrorResponse("RangeRef is required"));
         }
 
-        // TODO: Implement range parsing and data extraction
-        return Task.FromResult(CreateErrorResponse("Range operations not yet implemented"));
+        var error = ResolveRange(request.RangeRef, out var range);
+        if (error != null)
+        {
+            return Task.FromResult(CreateErrorResponse(error));
+        }
+
+        var values = new List<string?[]>(Math.Max(range.LastRow - range.FirstRow + 1, 0));
+        for (var row = range.FirstRow; row <= range.LastRow; row++)
+        {
+            var rowValues = new string?[Math.Max(range.LastColumn - range.FirstColumn + 1, 0)];
+            for (var column = range.FirstColumn; column <= range.LastColumn; column++)
+            {
+                rowValues[column - range.FirstColumn] = range.Sheet.GetCell(row, column)?.Value.DisplayValue;
+            }
+            values.Add(rowValues);
+        }
+
+        return Task.FromResult(CreateSuccessResponse(new
+        {
+            range_ref = request.RangeRef,
+            values
+        }));
+    }
+
+    /// <summary>
+    /// Subscribes the requesting client to changes in a cell or range. Changed cells are
+    /// pushed as {"event":"cells_changed","subscription_id":..,"changes":[..]} messages,
+    /// which clients tell apart from responses by the "event" key. Subscription ids are
+    /// per connection.
+    /// </summary>
+    private string Watch(BridgeConnection connection, PythonRequest request)
+    {
+        var reference = request.RangeRef ?? request.CellRef;
+        if (string.IsNullOrEmpty(reference))
+        {
+            return CreateErrorResponse("RangeRef is required");
+        }
+
+        var error = ResolveRange(reference, out var range);
+        if (error != null)
+        {
+            return CreateErrorResponse(error);
+        }
+
+        int subscriptionId;
+        lock (connection.SubscriptionLock)
+        {
+            // Clients may pick the id so they can route notifications that race the response
+            subscriptionId = request.SubscriptionId ?? connection.NextSubscriptionId();
+            if (connection.Subscriptions.Count == 0)
+            {
+                _workbook.CellChanged += connection.CellChangedHandler;
+            }
+            connection.Subscriptions[subscriptionId] = range;
+        }
+
+        return CreateSuccessResponse(new { subscription_id = subscriptionId, range_ref = reference });
+    }
+
+    private string Unwatch(BridgeConnection connection, PythonRequest request)
+    {
+        if (request.SubscriptionId is not int subscriptionId)
+        {
+            return CreateErrorResponse("SubscriptionId is required");
+        }
+
+        bool removed;
+        lock (connection.SubscriptionLock)
+        {
+            removed = connection.Subscriptions.Remove(subscriptionId);
+            if (removed && connection.Subscriptions.Count == 0)
+            {
+                _workbook.CellChanged -= connection.CellChangedHandler;
+                connection.PendingChanges.Clear();
+            }
+        }
+
+        return CreateSuccessResponse(new { subscription_id = subscriptionId, removed });
+    }
+
+    internal void OnCellChanged(BridgeConnection connection, CellViewModel cell)
+    {
+        lock (connection.SubscriptionLock)
+        {
+            var watched = false;
+            foreach (var range in connection.Subscriptions.Values)
+            {
+                if (range.Contains(cell))
+                {
+                    watched = true;
+                    break;
+                }
+            }
+
+            if (!watched || !connection.PendingChanges.Add(cell) || connection.FlushScheduled)
+            {
+                return;
+            }
+            connection.FlushScheduled = true;
+        }
+
+        _ = FlushChangesAsync(connection);
+    }
+
+    /// <summary>
+    /// Waits one frame, then pushes the latest state of every cell that changed meanwhile
+    /// </summary>
+    private async Task FlushChangesAsync(BridgeConnection connection)
+    {
+        var cancellationToken = _cancellationTokenSource?.Token ?? CancellationToken.None;
+        try
+        {
+            await Task.Delay(NotificationIntervalMs, cancellationToken);
+
+            var notifications = new List<string>();
+            lock (connection.SubscriptionLock)
+            {
+                connection.FlushScheduled = false;
+                foreach (var (subscriptionId, range) in connection.Subscriptions)
+                {
+                    var changes = connection.PendingChanges
+                        .Where(range.Contains)
+                        .Select(cell => new
+                        {
+                            cell_ref = cell.Address.ToString(),
+                            value = cell.Value.DisplayValue,
+                            serialized_value = cell.Value.SerializedValue,
+                            object_type = cell.Value.ObjectType.ToString(),
+                            formula = cell.Formula
+                        })
+                        .ToList();
+                    if (changes.Count > 0)
+                    {
+                        notifications.Add(JsonSerializer.Serialize(new
+                        {
+                            @event = "cells_changed",
+                            subscription_id = subscriptionId,
+                            changes
+                        }));
+                    }
+                }
+                connection.PendingChanges.Clear();
+            }
+
+            foreach (var notification in notifications)
+            {
+                await WriteMessageAsync(connection, notification, cancellationToken);
+            }
+        }
+        catch (OperationCanceledException)
+        {
+        }
+        catch (Exception ex) when (ex is IOException or ObjectDisposedException)
+        {
+            // Client went away; its subscriptions are cleared when the connection ends
+        }
+        catch (Exception ex)
+        {
+            ErrorOccurred?.Invoke(this, ex);
+        }
+    }
+
+    private void ClearSubscriptions(BridgeConnection connection)
+    {
+        lock (connection.SubscriptionLock)
+        {
+            if (connection.Subscriptions.Count > 0)
+            {
+                _workbook.CellChanged -= connection.CellChangedHandler;
+            }
+            connection.Subscriptions.Clear();
+            connection.PendingChanges.Clear();
+        }
     }
 
     private async Task<string> RunFunctionAsync(PythonRequest request)
@@ -368,6 +1024,38 @@ public class PythonBridgeService : IDisposable
         return CreateSuccessResponse(new { sheets });
     }
 
+    /// <summary>
+    /// Resolves "A1:C10", "Sheet2!A1:C10" or a single cell to bounds clipped to the sheet.
+    /// Returns an error message, or null on success.
+    /// </summary>
+    private string? ResolveRange(string rangeRef, out SheetRange range)
+    {
+        range = default;
+        var defaultSheet = _workbook.SelectedSheet?.Name ?? _workbook.Sheets.FirstOrDefault()?.Name ?? "Sheet1";
+        var parts = rangeRef.Split(':');
+        if (parts.Length > 2
+            || !Models.CellAddress.TryParse(parts[0], defaultSheet, out var start)
+            || !Models.CellAddress.TryParse(parts[^1], start.SheetName, out var end))
+        {
+            return $"Invalid range: {rangeRef}";
+        }
+
+        var sheet = _workbook.Sheets.FirstOrDefault(s => s.Name == start.SheetName)
+                    ?? _workbook.Sheets.FirstOrDefault();
+        if (sheet == null)
+        {
+            return "No sheets available in workbook";
+        }
+
+        range = new SheetRange(
+            sheet,
+            Math.Min(start.Row, end.Row),
+            Math.Min(Math.Max(start.Row, end.Row), sheet.Rows.Count - 1),
+            Math.Min(start.Column, end.Column),
+            Math.Min(Math.Max(start.Column, end.Column), sheet.ColumnCount - 1));
+        return null;
+    }
+
     private CellViewModel? FindCell(string cellRef)
     {
         try
@@ -418,6 +1106,55 @@ public class PythonBridgeService : IDisposable
     }
 }
 
+/// <summary>
+/// State of one connected client: its pipe, the framing it negotiated and its
+/// subscriptions. Each client is served by its own task, so nothing here is shared
+/// between connections.
+/// </summary>
+internal sealed class BridgeConnection
+{
+    private int _nextSubscriptionId;
+
+    public BridgeConnection(NamedPipeServerStream pipe, PythonBridgeService service)
+    {
+        Pipe = pipe;
+        CellChangedHandler = (_, cell) => service.OnCellChanged(this, cell);
+    }
+
+    public NamedPipeServerStream Pipe { get; }
+
+    /// <summary>
+    /// Responses and pushed notifications share the client's pipe
+    /// </summary>
+    public SemaphoreSlim WriteLock { get; } = new(1, 1);
+
+    public bool LengthFraming { get; set; }
+    public bool CompressFrames { get; set; }
+
+    public object SubscriptionLock { get; } = new();
+    public Dictionary<int, SheetRange> Subscriptions { get; } = new();
+    public HashSet<CellViewModel> PendingChanges { get; } = new();
+    public bool FlushScheduled { get; set; }
+
+    /// <summary>
+    /// Subscribed to WorkbookViewModel.CellChanged while the client watches anything
+    /// </summary>
+    public EventHandler<CellViewModel> CellChangedHandler { get; }
+
+    /// <summary>
+    /// Call with <see cref="SubscriptionLock"/> held
+    /// </summary>
+    public int NextSubscriptionId()
+    {
+        do
+        {
+            _nextSubscriptionId++;
+        }
+        while (Subscriptions.ContainsKey(_nextSubscriptionId));
+        return _nextSubscriptionId;
+    }
+}
+
 /// <summary>
 /// Request format from Python client
 /// </summary>
@@ -427,6 +1164,25 @@ public class PythonRequest
     public string? CellRef { get; set; }
     public string? RangeRef { get; set; }
     public object? Value { get; set; }
+    public object? Values { get; set; }
     public string? FunctionName { get; set; }
     public object[]? Args { get; set; }
+    public List<PythonRequest>? Commands { get; set; }
+    public string? Framing { get; set; }
+    public List<string>? Codecs { get; set; }
+    public List<string>? Compression { get; set; }
+    public int? SubscriptionId { get; set; }
+}
+
+/// <summary>
+/// Cell bounds on one sheet, as resolved from a range reference
+/// </summary>
+internal readonly record struct SheetRange(SheetViewModel Sheet, int FirstRow, int LastRow, int FirstColumn, int LastColumn)
+{
+    public bool Contains(CellViewModel cell)
+    {
+        return ReferenceEquals(cell.Sheet, Sheet)
+            && cell.Row >= FirstRow && cell.Row <= LastRow
+            && cell.Column >= FirstColumn && cell.Column <= LastColumn;
+    }
 }
@@ -7,6 +7,7 @@ using System.Linq;
 using System.Text.Json;
 using System.Text.Json.Nodes;
 using System.Text.Json.Serialization;
+using System.Threading;
 using System.Threading.Tasks;
 using AiCalc.Models;
 using AiCalc.ViewModels;
@@ -25,40 +26,93 @@ public class PythonFunctionScanner
     public PythonFunctionScanner(string pythonExecutablePath)
     {
         _pythonExecutablePath = pythonExecutablePath;
-        
-        // discover_functions.py should be in same directory as aicalc_sdk
+        _discoverScriptPath = ResolveSdkScriptPath("discover_functions.py");
+    }
+
+    /// <summary>
+    /// Locates a script shipped in the aicalc_sdk package (discover_functions.py, worker.py).
+    /// </summary>
+    internal static string ResolveSdkScriptPath(string scriptName)
+    {
+        // Scripts should be in python-sdk/aicalc_sdk next to the application
         var sdkPath = Path.GetDirectoryName(typeof(PythonFunctionScanner).Assembly.Location);
-        _discoverScriptPath = Path.Combine(sdkPath!, "python-sdk", "aicalc_sdk", "discover_functions.py");
+        var scriptPath = Path.Combine(sdkPath!, "python-sdk", "aicalc_sdk", scriptName);
         
         // Fallback: check relative to project root
-        if (!File.Exists(_discoverScriptPath))
+        if (!File.Exists(scriptPath))
         {
             var projectRoot = Path.GetFullPath(Path.Combine(sdkPath!, "..", "..", "..", ".."));
-            _discoverScriptPath = Path.Combine(projectRoot, "python-sdk", "aicalc_sdk", "discover_functions.py");
+            scriptPath = Path.Combine(projectRoot, "python-sdk", "aicalc_sdk", scriptName);
         }
+
+        return scriptPath;
     }
 
     /// <summary>
     /// Scans a directory for Python files and discovers all @aicalc_function decorated functions.
+    /// One discovery process walks the directory, serving unchanged files from its index and
+    /// importing the rest in parallel; results stream back as one JSON line per file.
     /// </summary>
     public async Task<List<PythonFunctionInfo>> ScanDirectoryAsync(string directoryPath)
     {
         if (!Directory.Exists(directoryPath))
             return new List<PythonFunctionInfo>();
 
-        var allFunctions = new List<PythonFunctionInfo>();
+        if (!File.Exists(_discoverScriptPath))
+        {
+            throw new FileNotFoundException($"Discovery script not found: {_discoverScriptPath}");
+        }
 
-        // Find all .py files in directory and subdirectories
-        var pythonFiles = Directory.GetFiles(directoryPath, "*.py", SearchOption.AllDirectories);
+        var allFunctions = new List<PythonFunctionInfo>();
 
-        foreach (var filePath in pythonFiles)
+        try
         {
-            // Skip __init__.py and __pycache__
-            if (filePath.Contains("__pycache__") || Path.GetFileName(filePath) == "__init__.py")
-                continue;
+            var startInfo = new ProcessStartInfo
+            {
+                FileName = _pythonExecutablePath,
+                Arguments = $"\"{_discoverScriptPath}\" \"{directoryPath.TrimEnd('\\', '/')}\" --format ndjson",
+                RedirectStandardOutput = true,
+                RedirectStandardError = true,
+                UseShellExecute = false,
+                CreateNoWindow = true,
+                WorkingDirectory = directoryPath
+            };
+
+            using var process = Process.Start(startInfo);
+            if (process == null)
+                return allFunctions;
+
+            // Drain stderr concurrently so a chatty module can't fill the pipe and stall the scan
+            var errorTask = process.StandardError.ReadToEndAsync();
+            var options = new JsonSerializerOptions { PropertyNameCaseInsensitive = true };
+
+            string? line;
+            while ((line = await process.StandardOutput.ReadLineAsync()) != null)
+            {
+                if (string.IsNullOrWhiteSpace(line))
+                    continue;
+
+                var result = JsonSerializer.Deserialize<DiscoveryResult>(line, options);
+                if (result == null)
+                    continue;
 
-            var functions = await ScanFileAsync(filePath);
-            allFunctions.AddRange(functions);
+                if (result.Success && result.Functions != null)
+                    allFunctions.AddRange(result.Functions);
+                else if (!string.IsNullOrEmpty(result.Error))
+                    Console.WriteLine($"[PythonFunctionScanner] Discovery error in {result.FilePath}: {result.Error}");
+            }
+
+            var error = await errorTask;
+            await process.WaitForExitAsync();
+
+            if (process.ExitCode != 0)
+            {
+                Console.WriteLine($"[PythonFunctionScanner] Error scanning {directoryPath}: {error}");
+            }
+        }
+        catch (Exception ex)
+        {
+            Console.WriteLine($"[PythonFunctionScanner] Exception scanning {directoryPath}: {ex.Message}");
         }
 
         return allFunctions;
@@ -169,7 +223,9 @@ public class PythonFunctionScanner
                     return validationError ?? CreateErrorResult("Unable to build Python argument payload.");
                 }
 
-                return await ExecutePythonFunctionAsync(info, pythonPath, argumentsJson);
+                // A call that outlives the evaluation timeout gets its worker restarted
+                var timeout = TimeSpan.FromSeconds(context.Workbook.EvaluationEngine.DefaultTimeoutSeconds);
+                return await ExecutePythonFunctionAsync(info, pythonPath, argumentsJson, timeout, context.CancellationToken);
             },
             category: category,
             parameters: parameters
@@ -429,76 +485,34 @@ public class PythonFunctionScanner
     private static async Task<FunctionExecutionResult> ExecutePythonFunctionAsync(
         PythonFunctionInfo info,
         string pythonPath,
-        string argumentsJson)
+        string argumentsJson,
+        TimeSpan timeout,
+        CancellationToken cancellationToken)
     {
         try
         {
-            var scriptDirectory = Path.GetDirectoryName(info.FilePath);
-            if (string.IsNullOrEmpty(scriptDirectory))
-            {
-                scriptDirectory = Directory.GetCurrentDirectory();
-            }
-
-            var moduleName = Path.GetFileNameWithoutExtension(info.FilePath);
-
-            var pythonScript = $@"import json
-import os
-import sys
-
-sys.path.insert(0, '{scriptDirectory}')
-
-from {moduleName} import {info.FunctionName}
-
-try:
-    args_json = os.environ.get('AICALC_ARGS', '[]')
-    args = json.loads(args_json)
-    result = {info.FunctionName}(*args)
-    if isinstance(result, (dict, list)):
-        print(json.dumps(result, ensure_ascii=False))
-    elif result is None:
-        print('')
-    else:
-        print(result)
-except Exception as e:
-    print(f'ERROR: {{e}}', file=sys.stderr)
-    sys.exit(1)
-";
-
-            var startInfo = new ProcessStartInfo
-            {
-                FileName = pythonPath,
-                Arguments = $"-c \"{pythonScript.Replace("\"", "\\\"")}\"",
-                RedirectStandardOutput = true,
-                RedirectStandardError = true,
-                UseShellExecute = false,
-                CreateNoWindow = true,
-                WorkingDirectory = scriptDirectory
-            };
-
-            startInfo.EnvironmentVariables["AICALC_ARGS"] = argumentsJson;
-
-            using var process = Process.Start(startInfo);
-            if (process == null)
-            {
-                return CreateErrorResult("Failed to start Python process.");
-            }
-
-            var output = await process.StandardOutput.ReadToEndAsync();
-            var error = await process.StandardError.ReadToEndAsync();
-            await process.WaitForExitAsync();
+            // Calls go through a resident worker so the module is imported once
+            var worker = PythonWorkerHost.GetShared(pythonPath);
+            var response = info.Vectorized
+                ? await worker.CallVectorizedAsync(info.FilePath, info.FunctionName, argumentsJson, timeout, cancellationToken)
+                : await worker.CallAsync(info.FilePath, info.FunctionName, argumentsJson, timeout, cancellationToken);
 
-            if (process.ExitCode != 0)
+            if (!response.Success)
             {
-                var message = string.IsNullOrWhiteSpace(error)
-                    ? "Python process returned a non-zero exit code."
-                    : error.Trim();
+                var message = string.IsNullOrWhiteSpace(response.Error)
+                    ? "Python function call failed."
+                    : response.Error.Trim();
                 return CreateErrorResult(message);
             }
 
-            var resultValue = ConvertPythonOutput(output, info);
+            var resultValue = ConvertPythonOutput(response.Output ?? string.Empty, info);
             return new FunctionExecutionResult(resultValue);
         }
-        catch (Exception ex)
+        catch (TimeoutException ex)
+        {
+            return CreateErrorResult(ex.Message);
+        }
+        catch (Exception ex) when (ex is not OperationCanceledException)
         {
             return CreateErrorResult($"Execution error: {ex.Message}");
         }
@@ -507,6 +521,9 @@ except Exception as e:
     // JSON models for discovery script output
     private class DiscoveryResult
     {
+        [JsonPropertyName("file_path")]
+        public string? FilePath { get; set; }
+
         [JsonPropertyName("success")]
         public bool Success { get; set; }
 
@@ -546,6 +563,29 @@ public class PythonFunctionInfo
 
     [JsonPropertyName("examples")]
     public List<string> Examples { get; set; } = new();
+
+    /// <summary>
+    /// True when the function takes whole columns of arguments, so calls
+    /// from many cells can be grouped into one invocation.
+    /// </summary>
+    [JsonPropertyName("vectorized")]
+    public bool Vectorized { get; set; }
+
+    [JsonPropertyName("array_type")]
+    public string ArrayType { get; set; } = "list";
+
+    /// <summary>
+    /// True for async def functions. The worker runs their calls concurrently
+    /// on an event loop, so cells waiting on I/O overlap instead of queueing.
+    /// </summary>
+    [JsonPropertyName("is_async")]
+    public bool IsAsync { get; set; }
+
+    /// <summary>
+    /// Most calls of an async function the worker runs at once; null uses the worker default.
+    /// </summary>
+    [JsonPropertyName("max_concurrency")]
+    public int? MaxConcurrency { get; set; }
 }
 
 /// <summary>
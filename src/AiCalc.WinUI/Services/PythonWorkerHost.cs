@@ -0,0 +1,577 @@
+using System;
+using System.Buffers.Binary;
+using System.Collections.Concurrent;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.IO;
+using System.Text;
+using System.Text.Json;
+using System.Text.Json.Nodes;
+using System.Text.Json.Serialization;
+using System.Threading;
+using System.Threading.Tasks;
+
+namespace AiCalc.Services;
+
+/// <summary>
+/// Hosts a long-lived aicalc_sdk worker process (worker.py) and serves
+/// @aicalc_function calls through it. Modules stay imported in the worker,
+/// so each call is a framed stdin/stdout round trip instead of a new interpreter.
+/// A call that outlives its timeout kills the worker; the next call starts a new one.
+/// </summary>
+public sealed class PythonWorkerHost : IDisposable
+{
+    private static readonly ConcurrentDictionary<string, PythonWorkerHost> SharedHosts = new(StringComparer.OrdinalIgnoreCase);
+
+    /// <summary>
+    /// How long calls to a vectorized function are collected before they are sent as one batch.
+    /// </summary>
+    public static TimeSpan VectorizedBatchWindow { get; set; } = TimeSpan.FromMilliseconds(2);
+
+    /// <summary>
+    /// Upper bound on cells per vectorized call; a full batch is sent immediately.
+    /// </summary>
+    public static int MaxVectorizedBatchSize { get; set; } = 10000;
+
+    private readonly string _pythonExecutablePath;
+    private readonly string _workerScriptPath;
+    private readonly object _startLock = new();
+    private readonly Dictionary<string, VectorizedBatch> _openBatches = new();
+    private readonly object _batchLock = new();
+    private WorkerProcess? _worker;
+    private int _requestCounter;
+    private bool _disposed;
+
+    public PythonWorkerHost(string pythonExecutablePath, string workerScriptPath)
+    {
+        _pythonExecutablePath = pythonExecutablePath;
+        _workerScriptPath = workerScriptPath;
+    }
+
+    /// <summary>
+    /// Returns the worker host shared by all functions using the given interpreter.
+    /// </summary>
+    public static PythonWorkerHost GetShared(string pythonExecutablePath)
+    {
+        return SharedHosts.GetOrAdd(
+            pythonExecutablePath,
+            path => new PythonWorkerHost(path, PythonFunctionScanner.ResolveSdkScriptPath("worker.py")));
+    }
+
+    /// <summary>
+    /// Stops every shared worker process (e.g. on application shutdown).
+    /// </summary>
+    public static void ShutdownAll()
+    {
+        foreach (var host in SharedHosts.Values)
+        {
+            host.Dispose();
+        }
+
+        SharedHosts.Clear();
+    }
+
+    public bool IsRunning => _worker is { Exited: false };
+
+    /// <summary>
+    /// Calls a function in the worker. Arguments are a JSON array. If no response
+    /// arrives within <paramref name="timeout"/>, the worker is killed (failing its
+    /// other calls too) and a <see cref="TimeoutException"/> is thrown.
+    /// </summary>
+    public Task<PythonWorkerResponse> CallAsync(
+        string filePath,
+        string functionName,
+        string argumentsJson,
+        TimeSpan? timeout = null,
+        CancellationToken cancellationToken = default)
+    {
+        var request = new JsonObject
+        {
+            ["command"] = "call",
+            ["file_path"] = filePath,
+            ["function_name"] = functionName,
+            ["args"] = JsonNode.Parse(argumentsJson) ?? new JsonArray()
+        };
+
+        return SendAsync(request, timeout, cancellationToken);
+    }
+
+    /// <summary>
+    /// Calls a vectorized function for a single cell. Calls for the same function that
+    /// arrive within <see cref="VectorizedBatchWindow"/> are grouped into one call_batch
+    /// request, so a column of cells becomes one array call in the worker. The batch
+    /// uses the longest timeout of its calls; cancelling one call leaves the rest in it.
+    /// </summary>
+    public Task<PythonWorkerResponse> CallVectorizedAsync(
+        string filePath,
+        string functionName,
+        string argumentsJson,
+        TimeSpan? timeout = null,
+        CancellationToken cancellationToken = default)
+    {
+        var key = $"{filePath}|{functionName}";
+        VectorizedBatch? fullBatch = null;
+        Task<PythonWorkerResponse> result;
+
+        lock (_batchLock)
+        {
+            if (!_openBatches.TryGetValue(key, out var batch))
+            {
+                batch = new VectorizedBatch(filePath, functionName);
+                _openBatches[key] = batch;
+                _ = FlushAfterWindowAsync(key, batch);
+            }
+
+            result = batch.Add(argumentsJson, timeout, cancellationToken);
+
+            if (batch.Count >= MaxVectorizedBatchSize)
+            {
+                _openBatches.Remove(key);
+                fullBatch = batch;
+            }
+        }
+
+        if (fullBatch != null)
+        {
+            _ = FlushBatchAsync(fullBatch);
+        }
+
+        return result;
+    }
+
+    /// <summary>
+    /// Calls a function once per argument list in a single request.
+    /// </summary>
+    public Task<PythonWorkerResponse> CallBatchAsync(
+        string filePath,
+        string functionName,
+        IEnumerable<string> argumentsJson,
+        TimeSpan? timeout = null,
+        CancellationToken cancellationToken = default)
+    {
+        var argsBatch = new JsonArray();
+        foreach (var arguments in argumentsJson)
+        {
+            argsBatch.Add(JsonNode.Parse(arguments) ?? new JsonArray());
+        }
+
+        var request = new JsonObject
+        {
+            ["command"] = "call_batch",
+            ["file_path"] = filePath,
+            ["function_name"] = functionName,
+            ["args_batch"] = argsBatch
+        };
+
+        return SendAsync(request, timeout, cancellationToken);
+    }
+
+    private async Task FlushAfterWindowAsync(string key, VectorizedBatch batch)
+    {
+        await Task.Delay(VectorizedBatchWindow);
+
+        lock (_batchLock)
+        {
+            // The batch may already have been sent because it filled up
+            if (!_openBatches.TryGetValue(key, out var current) || !ReferenceEquals(current, batch))
+            {
+                return;
+            }
+
+            _openBatches.Remove(key);
+        }
+
+        await FlushBatchAsync(batch);
+    }
+
+    private async Task FlushBatchAsync(VectorizedBatch batch)
+    {
+        try
+        {
+            var response = await CallBatchAsync(batch.FilePath, batch.FunctionName, batch.Arguments, batch.Timeout);
+
+            for (var index = 0; index < batch.Count; index++)
+            {
+                var output = response.Outputs != null && index < response.Outputs.Count ? response.Outputs[index] : null;
+                var error = response.Errors != null && index < response.Errors.Count ? response.Errors[index] : null;
+
+                batch.Completions[index].TrySetResult(new PythonWorkerResponse
+                {
+                    Id = response.Id,
+                    Success = response.Success && error == null,
+                    Output = output,
+                    Error = error ?? response.Error
+                });
+            }
+        }
+        catch (Exception ex)
+        {
+            foreach (var completion in batch.Completions)
+            {
+                completion.TrySetException(ex);
+            }
+        }
+    }
+
+    /// <summary>
+    /// Checks that the worker is alive and responsive.
+    /// </summary>
+    public async Task<bool> PingAsync(TimeSpan? timeout = null, CancellationToken cancellationToken = default)
+    {
+        var response = await SendAsync(new JsonObject { ["command"] = "ping" }, timeout, cancellationToken);
+        return response.Success && response.Output == "pong";
+    }
+
+    private async Task<PythonWorkerResponse> SendAsync(JsonObject request, TimeSpan? timeout, CancellationToken cancellationToken)
+    {
+        if (_disposed)
+        {
+            throw new ObjectDisposedException(nameof(PythonWorkerHost));
+        }
+
+        var worker = EnsureStarted();
+        var id = Interlocked.Increment(ref _requestCounter);
+        request["id"] = id;
+
+        var completion = new TaskCompletionSource<PythonWorkerResponse>(TaskCreationOptions.RunContinuationsAsynchronously);
+        worker.Pending[id] = completion;
+
+        // The read loop may have drained Pending between EnsureStarted and the line above
+        if (worker.Exited && worker.Pending.TryRemove(id, out _))
+        {
+            throw new InvalidOperationException("Python worker is not available: the process exited.");
+        }
+
+        using var timeoutSource = CancellationTokenSource.CreateLinkedTokenSource(cancellationToken);
+        if (timeout is { } limit && limit > TimeSpan.Zero && limit != Timeout.InfiniteTimeSpan)
+        {
+            timeoutSource.CancelAfter(limit);
+        }
+
+        var target = request["function_name"]?.GetValue<string>() ?? request["command"]?.GetValue<string>();
+        using var registration = timeoutSource.Token.Register(() =>
+        {
+            if (!worker.Pending.TryRemove(id, out var abandoned))
+            {
+                return;
+            }
+
+            if (cancellationToken.IsCancellationRequested)
+            {
+                abandoned.TrySetCanceled(cancellationToken);
+                return;
+            }
+
+            // The call is stuck (e.g. an infinite loop in user code), and so is the worker thread
+            // running it: kill the process so the next call gets a fresh one
+            abandoned.TrySetException(new TimeoutException(
+                $"Python call {target} did not finish within {timeout.GetValueOrDefault().TotalSeconds:0.#} seconds; the worker was restarted."));
+            Restart(worker);
+        });
+
+        var payload = Encoding.UTF8.GetBytes(request.ToJsonString());
+        var frame = new byte[4 + payload.Length];
+        BinaryPrimitives.WriteUInt32LittleEndian(frame, (uint)payload.Length);
+        payload.CopyTo(frame, 4);
+
+        try
+        {
+            await worker.WriteLock.WaitAsync(timeoutSource.Token);
+        }
+        catch (OperationCanceledException)
+        {
+            // The registration above has already completed the call
+            return await completion.Task;
+        }
+
+        try
+        {
+            // Not cancellable: abandoning a half-written frame would corrupt the stream
+            await worker.Stdin.WriteAsync(frame, 0, frame.Length);
+            await worker.Stdin.FlushAsync();
+        }
+        catch (Exception ex) when (ex is IOException or ObjectDisposedException)
+        {
+            // Otherwise the call timed out and killed the worker mid-write; completion says so
+            if (worker.Pending.TryRemove(id, out _))
+            {
+                throw new InvalidOperationException($"Python worker is not available: {ex.Message}", ex);
+            }
+        }
+        finally
+        {
+            worker.WriteLock.Release();
+        }
+
+        return await completion.Task;
+    }
+
+    private WorkerProcess EnsureStarted()
+    {
+        lock (_startLock)
+        {
+            // Exited is set once the worker's stdout closes, i.e. when the process has ended
+            if (_worker is { Exited: false } current)
+            {
+                return current;
+            }
+
+            if (!File.Exists(_workerScriptPath))
+            {
+                throw new FileNotFoundException($"Worker script not found: {_workerScriptPath}");
+            }
+
+            var startInfo = new ProcessStartInfo
+            {
+                FileName = _pythonExecutablePath,
+                Arguments = $"-u \"{_workerScriptPath}\"",
+                RedirectStandardInput = true,
+                RedirectStandardOutput = true,
+                RedirectStandardError = true,
+                UseShellExecute = false,
+                CreateNoWindow = true,
+                WorkingDirectory = Path.GetDirectoryName(_workerScriptPath)
+            };
+
+            var process = Process.Start(startInfo)
+                ?? throw new InvalidOperationException("Failed to start Python worker process.");
+
+            process.ErrorDataReceived += (_, e) =>
+            {
+                if (!string.IsNullOrEmpty(e.Data))
+                {
+                    Debug.WriteLine($"[PythonWorkerHost] {e.Data}");
+                }
+            };
+            process.BeginErrorReadLine();
+
+            var worker = new WorkerProcess(process);
+            _worker = worker;
+            _ = Task.Run(() => ReadLoopAsync(worker));
+
+            return worker;
+        }
+    }
+
+    /// <summary>
+    /// Kills a worker that stopped responding. Its read loop then fails the calls it still
+    /// owns, and the next call starts a new process.
+    /// </summary>
+    private void Restart(WorkerProcess worker)
+    {
+        lock (_startLock)
+        {
+            if (ReferenceEquals(_worker, worker))
+            {
+                _worker = null;
+            }
+        }
+
+        worker.Kill();
+    }
+
+    private async Task ReadLoopAsync(WorkerProcess worker)
+    {
+        var stdout = worker.Process.StandardOutput.BaseStream;
+        var header = new byte[4];
+        Exception? failure = null;
+
+        try
+        {
+            while (true)
+            {
+                if (!await ReadExactAsync(stdout, header, header.Length))
+                {
+                    break;
+                }
+
+                var length = (int)BinaryPrimitives.ReadUInt32LittleEndian(header);
+                var payload = new byte[length];
+                if (!await ReadExactAsync(stdout, payload, length))
+                {
+                    break;
+                }
+
+                var response = JsonSerializer.Deserialize<PythonWorkerResponse>(payload);
+                if (response != null && worker.Pending.TryRemove(response.Id, out var completion))
+                {
+                    completion.TrySetResult(response);
+                }
+            }
+        }
+        catch (Exception ex)
+        {
+            failure = ex;
+        }
+
+        // This worker is gone: fail the calls sent to it so callers don't hang. Calls sent
+        // to a replacement process are tracked by that process's read loop.
+        worker.Exited = true;
+        var message = failure == null
+            ? "Python worker process exited."
+            : $"Python worker failed: {failure.Message}";
+
+        foreach (var id in worker.Pending.Keys)
+        {
+            if (worker.Pending.TryRemove(id, out var completion))
+            {
+                completion.TrySetResult(new PythonWorkerResponse { Id = id, Success = false, Error = message });
+            }
+        }
+
+        worker.Kill();
+        worker.Process.Dispose();
+    }
+
+    private static async Task<bool> ReadExactAsync(Stream stream, byte[] buffer, int count)
+    {
+        var offset = 0;
+        while (offset < count)
+        {
+            var read = await stream.ReadAsync(buffer, offset, count - offset);
+            if (read == 0)
+            {
+                return false;
+            }
+
+            offset += read;
+        }
+
+        return true;
+    }
+
+    public void Dispose()
+    {
+        if (_disposed) return;
+        _disposed = true;
+
+        WorkerProcess? worker;
+        lock (_startLock)
+        {
+            worker = _worker;
+            _worker = null;
+        }
+
+        // The read loop fails pending calls and disposes the process once it has exited
+        worker?.Kill();
+    }
+}
+
+/// <summary>
+/// One worker process and the calls sent to it that are still waiting for a response.
+/// </summary>
+internal sealed class WorkerProcess
+{
+    public WorkerProcess(Process process)
+    {
+        Process = process;
+        Stdin = process.StandardInput.BaseStream;
+    }
+
+    public Process Process { get; }
+
+    public Stream Stdin { get; }
+
+    public SemaphoreSlim WriteLock { get; } = new(1, 1);
+
+    public ConcurrentDictionary<int, TaskCompletionSource<PythonWorkerResponse>> Pending { get; } = new();
+
+    /// <summary>
+    /// Set by the read loop once stdout has closed, before it fails the pending calls.
+    /// </summary>
+    public volatile bool Exited;
+
+    public void Kill()
+    {
+        try
+        {
+            if (!Process.HasExited)
+            {
+                Process.Kill(entireProcessTree: true);
+            }
+        }
+        catch (Exception ex) when (ex is InvalidOperationException or System.ComponentModel.Win32Exception)
+        {
+            // Process already gone
+        }
+    }
+}
+
+/// <summary>
+/// Calls to one vectorized function waiting to be sent together.
+/// </summary>
+internal sealed class VectorizedBatch
+{
+    public VectorizedBatch(string filePath, string functionName)
+    {
+        FilePath = filePath;
+        FunctionName = functionName;
+    }
+
+    public string FilePath { get; }
+
+    public string FunctionName { get; }
+
+    public List<string> Arguments { get; } = new();
+
+    public List<TaskCompletionSource<PythonWorkerResponse>> Completions { get; } = new();
+
+    /// <summary>
+    /// Longest timeout of the calls in the batch; null when any call has none.
+    /// </summary>
+    public TimeSpan? Timeout { get; private set; }
+
+    public int Count => Arguments.Count;
+
+    public Task<PythonWorkerResponse> Add(string argumentsJson, TimeSpan? timeout, CancellationToken cancellationToken)
+    {
+        var completion = new TaskCompletionSource<PythonWorkerResponse>(TaskCreationOptions.RunContinuationsAsynchronously);
+        Timeout = Count == 0 ? timeout : Longest(Timeout, timeout);
+        Arguments.Add(argumentsJson);
+        Completions.Add(completion);
+
+        if (cancellationToken.CanBeCanceled)
+        {
+            // The cell stops waiting; the batch is still sent for the other cells
+            var registration = cancellationToken.Register(() => completion.TrySetCanceled(cancellationToken));
+            completion.Task.ContinueWith(_ => registration.Dispose(), TaskScheduler.Default);
+        }
+
+        return completion.Task;
+    }
+
+    private static TimeSpan? Longest(TimeSpan? first, TimeSpan? second)
+    {
+        return first == null || second == null ? null : (first > second ? first : second);
+    }
+}
+
+/// <summary>
+/// Response frame returned by the Python worker.
+/// </summary>
+public class PythonWorkerResponse
+{
+    [JsonPropertyName("id")]
+    public int Id { get; set; }
+
+    [JsonPropertyName("success")]
+    public bool Success { get; set; }
+
+    [JsonPropertyName("output")]
+    public string? Output { get; set; }
+
+    [JsonPropertyName("error")]
+    public string? Error { get; set; }
+
+    /// <summary>
+    /// Per-cell outputs of a call_batch request.
+    /// </summary>
+    [JsonPropertyName("outputs")]
+    public List<string?>? Outputs { get; set; }
+
+    /// <summary>
+    /// Per-cell errors of a call_batch request (null where the cell succeeded).
+    /// </summary>
+    [JsonPropertyName("errors")]
+    public List<string?>? Errors { get; set; }
+}
@@ -0,0 +1,136 @@
+using System.Collections.Generic;
+using System.Globalization;
+using System.Runtime.InteropServices;
+using System.Text;
+using AiCalc.Models;
+
+namespace AiCalc.Services;
+
+/// <summary>
+/// Columnar encoding of a range for GetRangeColumns. Each column is a segment of
+/// the payload, aligned to 8 bytes and little-endian:
+///   float64 - one double per row, NaN for empty or non-numeric cells
+///   text    - rows + 1 int32 offsets, then the UTF-8 bytes of every display value
+/// With dtype "auto" a column is float64 when all its non-empty cells are numbers.
+/// </summary>
+public class RangeColumns
+{
+    private RangeColumns(Dictionary<string, object> parameters, byte[] payload)
+    {
+        Parameters = parameters;
+        Payload = payload;
+    }
+
+    public Dictionary<string, object> Parameters { get; }
+
+    public byte[] Payload { get; }
+
+    public static RangeColumns Encode(IReadOnlyList<CellValue?[]> columns, int firstColumn, int rowCount, string dtype)
+    {
+        var numbers = new double[columns.Count][];
+        for (int col = 0; col < columns.Count; col++)
+        {
+            numbers[col] = dtype == "text" ? null! : new double[rowCount];
+        }
+
+        // Parse row by row, the order cells were created in, which keeps the cell
+        // objects cache-friendly; a column drops to text at its first non-number
+        for (int row = 0; row < rowCount; row++)
+        {
+            for (int col = 0; col < columns.Count; col++)
+            {
+                var values = numbers[col];
+                if (values == null)
+                    continue;
+
+                if (TryGetNumber(columns[col][row], out var number))
+                    values[row] = number;
+                else if (dtype == "float64")
+                    values[row] = double.NaN;
+                else
+                    numbers[col] = null!;
+            }
+        }
+
+        var descriptors = new List<Dictionary<string, object>>(columns.Count);
+        var size = 0;
+        for (int col = 0; col < columns.Count; col++)
+        {
+            var descriptor = new Dictionary<string, object>
+            {
+                ["name"] = CellAddress.ColumnIndexToName(firstColumn + col),
+                ["offset"] = size
+            };
+
+            if (numbers[col] != null)
+            {
+                descriptor["type"] = "float64";
+                descriptor["length"] = rowCount * sizeof(double);
+                size += rowCount * sizeof(double);
+            }
+            else
+            {
+                var dataLength = 0;
+                foreach (var value in columns[col])
+                {
+                    dataLength += Encoding.UTF8.GetByteCount(value?.DisplayValue ?? "");
+                }
+                descriptor["type"] = "text";
+                descriptor["data_offset"] = size + Align((rowCount + 1) * sizeof(int));
+                descriptor["data_length"] = dataLength;
+                size += Align((rowCount + 1) * sizeof(int)) + dataLength;
+            }
+
+            size = Align(size);
+            descriptors.Add(descriptor);
+        }
+
+        var payload = new byte[size];
+        for (int col = 0; col < columns.Count; col++)
+        {
+            var offset = (int)descriptors[col]["offset"];
+            if (numbers[col] != null)
+            {
+                MemoryMarshal.AsBytes(numbers[col].AsSpan()).CopyTo(payload.AsSpan(offset));
+                continue;
+            }
+
+            var offsets = MemoryMarshal.Cast<byte, int>(payload.AsSpan(offset, (rowCount + 1) * sizeof(int)));
+            var dataOffset = (int)descriptors[col]["data_offset"];
+            var position = 0;
+            for (int row = 0; row < rowCount; row++)
+            {
+                offsets[row] = position;
+                var text = columns[col][row]?.DisplayValue ?? "";
+                position += Encoding.UTF8.GetBytes(text, 0, text.Length, payload, dataOffset + position);
+            }
+            offsets[rowCount] = position;
+        }
+
+        var parameters = new Dictionary<string, object>
+        {
+            ["status"] = "success",
+            ["rows"] = rowCount,
+            ["columns"] = descriptors,
+            ["binary_length"] = payload.Length
+        };
+        return new RangeColumns(parameters, payload);
+    }
+
+    /// <summary>
+    /// Reads a cell as a double; empty cells are NaN. Returns false for anything
+    /// that isn't a number.
+    /// </summary>
+    private static bool TryGetNumber(CellValue? cell, out double number)
+    {
+        var text = cell?.SerializedValue ?? cell?.DisplayValue;
+        if (string.IsNullOrEmpty(text) || cell!.ObjectType == CellObjectType.Empty)
+        {
+            number = double.NaN;
+            return true;
+        }
+        return double.TryParse(text, NumberStyles.Float, CultureInfo.InvariantCulture, out number);
+    }
+
+    private static int Align(int size) => (size + 7) & ~7;
+}
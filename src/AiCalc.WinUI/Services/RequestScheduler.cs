@@ -0,0 +1,61 @@
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Threading.Tasks;
+
+namespace AiCalc.Services;
+
+/// <summary>
+/// Orders the requests of one pipe connection. Reads run concurrently with each other;
+/// every other request starts only after everything received before it has finished, so
+/// pipelined writes reach the workbook in the order the client sent them and a read
+/// always sees the writes sent ahead of it.
+/// </summary>
+/// <remarks>
+/// Schedule is called from the connection's receive loop only and is not thread-safe.
+/// </remarks>
+internal sealed class RequestScheduler
+{
+    private readonly List<Task> _reads = new();
+    private Task _ordered = Task.CompletedTask;
+
+    /// <summary>
+    /// Run work on the thread pool once the requests it must follow have finished
+    /// </summary>
+    public Task Schedule(bool isRead, Func<Task> work)
+    {
+        if (isRead)
+        {
+            _reads.RemoveAll(t => t.IsCompleted);
+            var read = RunAfter(_ordered, work);
+            _reads.Add(read);
+            return read;
+        }
+
+        var previous = _reads.Count == 0 ? _ordered : Task.WhenAll(_reads.Append(_ordered).ToArray());
+        _reads.Clear();
+        _ordered = RunAfter(previous, work);
+        return _ordered;
+    }
+
+    /// <summary>
+    /// Completes once every scheduled request has finished
+    /// </summary>
+    public Task WhenIdle() => Task.WhenAll(_reads.Append(_ordered).ToArray());
+
+    private static Task RunAfter(Task previous, Func<Task> work)
+    {
+        return Task.Run(async () =>
+        {
+            try
+            {
+                await previous.ConfigureAwait(false);
+            }
+            catch
+            {
+                // A failed request doesn't hold back the ones after it
+            }
+            await work().ConfigureAwait(false);
+        });
+    }
+}
@@ -459,6 +459,7 @@ public partial class CellViewModel : ObservableObject
         OnPropertyChanged(nameof(RawValue));
         OnPropertyChanged(nameof(CellObject));
         OnPropertyChanged(nameof(AvailableOperations));
+        _workbook.NotifyCellChanged(this);
     }
 
     partial void OnFormulaChanging(string? value)
@@ -473,6 +474,7 @@ public partial class CellViewModel : ObservableObject
             AppendHistory(Value, Value, _formulaBeforeChange, value, "Formula edited");
             Sheet.UpdateCellDependencies(this);
             MarkAsStale();
+            _workbook.NotifyCellChanged(this);
         }
 
         if (!string.IsNullOrWhiteSpace(value))
@@ -88,6 +88,16 @@ public partial class WorkbookViewModel : BaseViewModel
 
     public UndoRedoManager UndoRedoManager => _undoRedoManager;
 
+    /// <summary>
+    /// Raised when a cell's value or formula changes, whether edited, evaluated or loaded
+    /// </summary>
+    public event EventHandler<CellViewModel>? CellChanged;
+
+    internal void NotifyCellChanged(CellViewModel cell)
+    {
+        CellChanged?.Invoke(this, cell);
+    }
+
     /// <summary>
     /// Record a cell change for undo/redo (Phase 5)
     /// </summary>
@@ -230,6 +240,25 @@ public partial class WorkbookViewModel : BaseViewModel
         }
     }
 
+    /// <summary>
+    /// Recalculates everything that depends on the given cells in one pass. Used after
+    /// bulk writes so dependents are evaluated once rather than once per written cell.
+    /// </summary>
+    public async Task<EvaluationResult> EvaluateDependentsAsync(IReadOnlyCollection<CellAddress> changedCells)
+    {
+        var cells = Sheets
+            .SelectMany(s => s.Cells)
+            .Where(c => c.HasFormula && c.AutomationMode != CellAutomationMode.Manual)
+            .ToDictionary(c => c.Address, c => c);
+
+        if (changedCells.Count == 0 || cells.Count == 0)
+        {
+            return new EvaluationResult { Success = true };
+        }
+
+        return await _evaluationEngine.EvaluateDependentsAsync(changedCells, cells);
+    }
+
     /// <summary>
     /// Updates evaluation engine settings from WorkbookSettings
     /// </summary>
@@ -0,0 +1,90 @@
+using System.Text;
+using Xunit;
+using AiCalc.Models;
+using AiCalc.Services;
+
+namespace AiCalc.Tests;
+
+public class RangeColumnsTests
+{
+    private static CellValue Number(string value) => new(CellObjectType.Number, value, value);
+
+    private static CellValue Text(string value) => new(CellObjectType.Text, value, value);
+
+    private static Dictionary<string, object> Column(RangeColumns encoded, int index) =>
+        ((List<Dictionary<string, object>>)encoded.Parameters["columns"])[index];
+
+    [Fact]
+    public void Encode_Auto_LaysOutAlignedNumberAndTextColumns()
+    {
+        // Arrange: B has a non-number, so it falls back to text
+        var columns = new List<CellValue?[]>
+        {
+            new CellValue?[] { Number("1.5"), null, Number("3") },
+            new CellValue?[] { Text("x"), Text("é"), CellValue.Empty },
+            new CellValue?[] { Number("-2"), Number("4"), Number("8") }
+        };
+
+        // Act
+        var encoded = RangeColumns.Encode(columns, 1, 3, "auto");
+
+        // Assert
+        Assert.Equal(3, encoded.Parameters["rows"]);
+        Assert.Equal(encoded.Payload.Length, encoded.Parameters["binary_length"]);
+        Assert.Equal(new[] { "B", "C", "D" }, Enumerable.Range(0, 3).Select(i => (string)Column(encoded, i)["name"]));
+        Assert.Equal(new[] { "float64", "text", "float64" }, Enumerable.Range(0, 3).Select(i => (string)Column(encoded, i)["type"]));
+
+        var numbers = Column(encoded, 0);
+        Assert.Equal(0, numbers["offset"]);
+        Assert.Equal(24, numbers["length"]);
+        Assert.Equal(1.5, BitConverter.ToDouble(encoded.Payload, 0));
+        Assert.True(double.IsNaN(BitConverter.ToDouble(encoded.Payload, 8)));
+        Assert.Equal(3.0, BitConverter.ToDouble(encoded.Payload, 16));
+
+        // Four int32 offsets (16 bytes), then "x", "é" and "" as UTF-8
+        var text = Column(encoded, 1);
+        Assert.Equal(24, text["offset"]);
+        Assert.Equal(40, text["data_offset"]);
+        Assert.Equal(3, text["data_length"]);
+        Assert.Equal(new[] { 0, 1, 3, 3 }, Enumerable.Range(0, 4).Select(i => BitConverter.ToInt32(encoded.Payload, 24 + i * 4)));
+        Assert.Equal("xé", Encoding.UTF8.GetString(encoded.Payload, 40, 3));
+
+        // 43 rounds up to the next multiple of 8
+        var last = Column(encoded, 2);
+        Assert.Equal(48, last["offset"]);
+        Assert.Equal(8.0, BitConverter.ToDouble(encoded.Payload, 48 + 16));
+        Assert.Equal(72, encoded.Payload.Length);
+        Assert.All(Enumerable.Range(0, 3), i => Assert.Equal(0, (int)Column(encoded, i)["offset"] % 8));
+    }
+
+    [Fact]
+    public void Encode_Float64_TurnsTextIntoNaN()
+    {
+        // Arrange
+        var columns = new List<CellValue?[]> { new CellValue?[] { Text("x"), Number("2") } };
+
+        // Act
+        var encoded = RangeColumns.Encode(columns, 0, 2, "float64");
+
+        // Assert
+        Assert.Equal("float64", Column(encoded, 0)["type"]);
+        Assert.True(double.IsNaN(BitConverter.ToDouble(encoded.Payload, 0)));
+        Assert.Equal(2.0, BitConverter.ToDouble(encoded.Payload, 8));
+    }
+
+    [Fact]
+    public void Encode_Text_KeepsNumbersAsDisplayText()
+    {
+        // Arrange
+        var columns = new List<CellValue?[]> { new CellValue?[] { Number("1"), Number("22") } };
+
+        // Act
+        var encoded = RangeColumns.Encode(columns, 0, 2, "text");
+
+        // Assert
+        var column = Column(encoded, 0);
+        Assert.Equal("text", column["type"]);
+        Assert.Equal(16, column["data_offset"]);
+        Assert.Equal("122", Encoding.UTF8.GetString(encoded.Payload, 16, (int)column["data_length"]));
+    }
+}
@@ -0,0 +1,105 @@
+using Xunit;
+using AiCalc.Models;
+using AiCalc.Services;
+
+namespace AiCalc.Tests;
+
+public class RequestSchedulerTests
+{
+    private static readonly CellAddress A1 = new("Sheet1", 0, 0);
+
+    [Fact]
+    public async Task PipelinedSetValues_LastWriteWins()
+    {
+        // Arrange: earlier writes take longer, so unordered writes would finish last
+        var scheduler = new RequestScheduler();
+        var cells = new Dictionary<CellAddress, int>();
+        var applied = new List<int>();
+
+        // Act
+        for (var value = 1; value <= 20; value++)
+        {
+            var written = value;
+            _ = scheduler.Schedule(false, async () =>
+            {
+                await Task.Delay(21 - written);
+                lock (cells)
+                {
+                    cells[A1] = written;
+                    applied.Add(written);
+                }
+            });
+        }
+        await scheduler.WhenIdle();
+
+        // Assert
+        Assert.Equal(20, cells[A1]);
+        Assert.Equal(Enumerable.Range(1, 20), applied);
+    }
+
+    [Fact]
+    public async Task Reads_SeeEarlierWritesAndRunConcurrently()
+    {
+        // Arrange
+        var scheduler = new RequestScheduler();
+        var value = 0;
+        var bothReading = new TaskCompletionSource();
+        var readers = 0;
+        var seen = new List<int>();
+
+        async Task Read()
+        {
+            if (Interlocked.Increment(ref readers) == 2)
+            {
+                bothReading.SetResult();
+            }
+            // Only finishes if the other read is running at the same time
+            await bothReading.Task.WaitAsync(TimeSpan.FromSeconds(5));
+            lock (seen)
+            {
+                seen.Add(value);
+            }
+        }
+
+        // Act
+        _ = scheduler.Schedule(false, async () =>
+        {
+            await Task.Delay(50);
+            value = 1;
+        });
+        var first = scheduler.Schedule(true, Read);
+        var second = scheduler.Schedule(true, Read);
+        var write = scheduler.Schedule(false, () =>
+        {
+            value = 2;
+            return Task.CompletedTask;
+        });
+        await scheduler.WhenIdle();
+
+        // Assert: both reads saw the first write and finished before the second
+        Assert.True(first.IsCompletedSuccessfully && second.IsCompletedSuccessfully && write.IsCompletedSuccessfully);
+        Assert.Equal(new[] { 1, 1 }, seen);
+        Assert.Equal(2, value);
+    }
+
+    [Fact]
+    public async Task FailedRequest_DoesNotBlockLaterOnes()
+    {
+        // Arrange
+        var scheduler = new RequestScheduler();
+        var ran = false;
+
+        // Act
+        var failed = scheduler.Schedule(false, () => throw new InvalidOperationException("bad request"));
+        var next = scheduler.Schedule(false, () =>
+        {
+            ran = true;
+            return Task.CompletedTask;
+        });
+        await scheduler.WhenIdle();
+
+        // Assert
+        Assert.True(ran);
+        Assert.True(failed.IsFaulted && next.IsCompletedSuccessfully);
+    }
+}